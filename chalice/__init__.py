@@ -1,11 +1,26 @@
+from typing import Any, TYPE_CHECKING
+
 from chalice.app import Chalice, Blueprint
 from chalice.app import (
     ChaliceViewError, BadRequestError, UnauthorizedError, ForbiddenError,
     NotFoundError, ConflictError, TooManyRequestsError, Response, CORSConfig,
     CustomAuthorizer, CognitoUserPoolAuthorizer, IAMAuthorizer,
     UnprocessableEntityError, WebsocketDisconnectedError,
-    AuthResponse, AuthRoute, Cron, Rate, __version__ as chalice_version,
+    Cron, Rate, __version__ as chalice_version,
     ConvertToMiddleware, ChaliceUnhandledError
 )
 # We're reassigning version here to keep mypy happy.
 __version__ = chalice_version
+
+if TYPE_CHECKING:
+    from chalice.app import AuthResponse, AuthRoute
+
+
+def __getattr__(name: str) -> Any:
+    # AuthResponse and AuthRoute are only imported from chalice.app
+    # when they're first used, see chalice.app._LAZY_ATTRIBUTES.
+    if name in ('AuthResponse', 'AuthRoute'):
+        from chalice import app
+        return getattr(app, name)
+    raise AttributeError(
+        "module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,172 @@
+"""Runtime support for builtin authorizers.
+
+This module is part of the lambda runtime and is imported by ``chalice.app``
+the first time a builtin authorizer is registered.  The classes should be
+imported from ``chalice`` or ``chalice.app``.
+
+"""
+import copy
+
+from typing import List, Dict, Any, Optional, Union, Callable, \
+    TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chalice.app import BuiltinAuthConfig
+
+
+# ChaliceAuthorizer is unique in that the runtime component (the thing
+# that wraps the decorated function) also needs a reference to the config
+# object (the object the describes how to create the resource).  In
+# most event sources these are separate and don't need to know about
+# each other, but ChaliceAuthorizer does.  This is because the way
+# you associate a builtin authorizer with a view function is by passing
+# a direct reference:
+#
+# @app.authorizer(...)
+# def my_auth_function(...): pass
+#
+# @app.route('/', auth=my_auth_function)
+#
+# The 'route' part needs to know about the auth function for two reasons:
+#
+# 1. We use ``view.authorizer`` to figure out how to deploy the app
+# 2. We need a reference to the runtime handler for the auth in order
+#    to support local mode testing.
+# I *think* we can refactor things to handle both of those issues but
+# we would need more research to know for sure.  For now, this is a
+# special cased runtime class that knows about its config.
+class ChaliceAuthorizer(object):
+    def __init__(self, name: str, func: Callable[..., Any],
+                 scopes: Optional[List[str]] = None) -> None:
+        self.name: str = name
+        self.func: Callable[
+            ['AuthRequest'], Union['AuthResponse', Dict[str, Any]]
+        ] = func
+        self.scopes: List[str] = scopes or []
+        # This is filled in during the @app.authorizer()
+        # processing.
+        self.config: 'BuiltinAuthConfig' = None  # type: ignore
+
+    def __call__(
+            self,
+            event: Dict[str, Any],
+            context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        auth_request = self._transform_event(event)
+        result = self.func(auth_request)
+        if isinstance(result, AuthResponse):
+            return result.to_dict(auth_request)
+        return result
+
+    def _transform_event(self, event: Dict[str, Any]) -> 'AuthRequest':
+        return AuthRequest(event['type'],
+                           event['authorizationToken'],
+                           event['methodArn'])
+
+    def with_scopes(self, scopes: List[str]) -> 'ChaliceAuthorizer':
+        authorizer_with_scopes = copy.deepcopy(self)
+        authorizer_with_scopes.scopes = scopes
+        return authorizer_with_scopes
+
+
+class AuthRequest(object):
+    def __init__(self, auth_type: str, token: str, method_arn: str) -> None:
+        self.auth_type: str = auth_type
+        self.token: str = token
+        self.method_arn: str = method_arn
+
+
+class AuthResponse(object):
+    ALL_HTTP_METHODS: List[str] = ['DELETE', 'HEAD', 'OPTIONS',
+                                   'PATCH', 'POST', 'PUT', 'GET']
+
+    def __init__(self, routes: List[Union[str, 'AuthRoute']],
+                 principal_id: str, context: Optional[Dict[str, str]] = None):
+        self.routes: List[Union[str, 'AuthRoute']] = routes
+        self.principal_id: str = principal_id
+        # The request is used to generate full qualified ARNs
+        # that we need for the resource portion of the returned
+        # policy.
+        if context is None:
+            context = {}
+        self.context: Dict[str, str] = context
+
+    def to_dict(self, request: AuthRequest) -> Dict[str, Any]:
+        return {
+            'context': self.context,
+            'principalId': self.principal_id,
+            'policyDocument': self._generate_policy(request),
+        }
+
+    def _generate_policy(self, request: AuthRequest) -> Dict[str, Any]:
+        allowed_resources = self._generate_allowed_resources(request)
+        return {
+            'Version': '2012-10-17',
+            'Statement': [
+                {
+                    'Action': 'execute-api:Invoke',
+                    'Effect': 'Allow',
+                    'Resource': allowed_resources,
+                }
+            ]
+        }
+
+    def _generate_allowed_resources(self, request: AuthRequest) -> List[str]:
+        allowed_resources = []
+        for route in self.routes:
+            if isinstance(route, AuthRoute):
+                methods = route.methods
+                path = route.path
+            elif route == '*':
+                # A string route of '*' means that all paths and
+                # all HTTP methods are now allowed.
+                methods = ['*']
+                path = '*'
+            else:
+                # If 'route' is just a string, then they've
+                # opted not to use the AuthRoute(), so we'll
+                # generate a policy that allows all HTTP methods.
+                methods = ['*']
+                path = route
+            for method in methods:
+                allowed_resources.append(
+                    self._generate_arn(path, request, method))
+        return allowed_resources
+
+    def _generate_arn(
+            self,
+            route: str,
+            request: AuthRequest,
+            method: str = '*'
+    ) -> str:
+        incoming_arn = request.method_arn
+        # An incoming_arn would look like this:
+        # "arn:aws:execute-api:us-west-2:123:rest-api-id/stage/GET/needs/auth"
+        # Then we pull out the rest-api-id and stage, such that:
+        #   base = ['rest-api-id', 'stage']
+        #
+        # We rely on the fact that the first part of the ARN format is fixed
+        # as:    arn:<partition>:<service>:<region>:<account-id>:<resource>
+        arn_parts = incoming_arn.split(':', 5)
+        allowed_resource = arn_parts[-1].split('/')[:2]
+        # Now we add in the path components and rejoin everything
+        # back together to make a full arn.
+        # We're also assuming all HTTP methods (via '*') for now.
+        # To support per HTTP method routes the API will need to be updated.
+        # We also need to strip off the leading ``/`` so it can be
+        # '/'.join(...)'d properly.
+        allowed_resource.extend([method, route[1:]])
+        last_arn_segment = '/'.join(allowed_resource)
+        if route == '*':
+            # We also have to handle the '*' case which matches
+            # all routes.
+            last_arn_segment += route
+        arn_parts[-1] = last_arn_segment
+        final_arn = ':'.join(arn_parts)
+        return final_arn
+
+
+class AuthRoute(object):
+    def __init__(self, path: str, methods: List[str]):
+        self.path: str = path
+        self.methods: List[str] = methods
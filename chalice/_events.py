@@ -0,0 +1,182 @@
+"""Event classes passed to the lambda event handlers.
+
+This module is part of the lambda runtime and is imported by ``chalice.app``
+the first time an event class is used, so apps that don't use them don't
+pay for importing them on a cold start.  The classes are part of Chalice's
+public API and should be imported from ``chalice.app``.
+
+"""
+import base64
+import datetime
+import json
+from urllib.parse import unquote_plus
+
+from typing import List, Dict, Any, Optional, Iterator
+
+from chalice.app import BadRequestError
+
+
+class BaseLambdaEvent(object):
+    def __init__(self, event_dict: Dict[str, Any],
+                 context: Optional[Dict[str, Any]]) -> None:
+        self._event_dict: Dict[str, Any] = event_dict
+        self.context: Optional[Dict[str, Any]] = context
+        self._extract_attributes(event_dict)
+
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        raise NotImplementedError("_extract_attributes")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._event_dict
+
+
+# This class is only used for middleware handlers because
+# we can't change the existing interface for @app.lambda_function().
+# This could be a Chalice 2.0 thing where we make all the decorators
+# have a consistent interface that takes a single event arg.
+class LambdaFunctionEvent(BaseLambdaEvent):
+    def __init__(self, event_dict: Dict[str, Any], context: Any) -> None:
+        self.event: Dict[str, Any] = event_dict
+        self.context: Optional[Dict[str, Any]] = context
+
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        pass
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.event
+
+
+class CloudWatchEvent(BaseLambdaEvent):
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        self.version: str = event_dict['version']
+        self.account: str = event_dict['account']
+        self.region: str = event_dict['region']
+        self.detail: Dict[str, Any] = event_dict['detail']
+        self.detail_type: str = event_dict['detail-type']
+        self.source: str = event_dict['source']
+        self.time: str = event_dict['time']
+        self.event_id: str = event_dict['id']
+        self.resources: List[str] = event_dict['resources']
+
+
+class WebsocketEvent(BaseLambdaEvent):
+    def __init__(self, event_dict: Dict[str, Any], context: Any):
+        super(WebsocketEvent, self).__init__(event_dict, context)
+        self._json_body: Optional[Dict[str, Any]] = None
+
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        request_context = event_dict['requestContext']
+        self.domain_name: str = request_context['domainName']
+        self.stage: str = request_context['stage']
+        self.connection_id: str = request_context['connectionId']
+        self.body: str = str(event_dict.get('body'))
+
+    @property
+    def json_body(self) -> Dict[str, Any]:
+        if self._json_body is None:
+            try:
+                self._json_body = json.loads(self.body)
+            except ValueError:
+                raise BadRequestError('Error Parsing JSON')
+        return self._json_body
+
+
+class SNSEvent(BaseLambdaEvent):
+
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        first_record = event_dict['Records'][0]
+        self.message: str = first_record['Sns']['Message']
+        self.subject: str = first_record['Sns']['Subject']
+        self.message_attributes: Dict[str, Any] = \
+            first_record['Sns']['MessageAttributes']
+
+
+class S3Event(BaseLambdaEvent):
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        s3 = event_dict['Records'][0]['s3']
+        self.bucket: str = s3['bucket']['name']
+        self.key: str = unquote_plus(s3['object']['key'])
+
+
+class SQSEvent(BaseLambdaEvent):
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        # We don't extract anything off the top level
+        # event.
+        pass
+
+    def __iter__(self) -> Iterator['SQSRecord']:
+        for record in self._event_dict['Records']:
+            yield SQSRecord(record, self.context)
+
+
+class SQSRecord(BaseLambdaEvent):
+
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        self.body: str = event_dict['body']
+        self.receipt_handle: str = event_dict['receiptHandle']
+
+
+class KinesisEvent(BaseLambdaEvent):
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        pass
+
+    def __iter__(self) -> Iterator['KinesisRecord']:
+        for record in self._event_dict['Records']:
+            yield KinesisRecord(record, self.context)
+
+
+class KinesisRecord(BaseLambdaEvent):
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        kinesis = event_dict['kinesis']
+        encoded_payload = kinesis['data']
+        self.data: bytes = base64.b64decode(encoded_payload)
+        self.sequence_number: str = kinesis['sequenceNumber']
+        self.partition_key: str = kinesis['partitionKey']
+        self.schema_version: str = kinesis['kinesisSchemaVersion']
+        self.timestamp: datetime.datetime = datetime.datetime.utcfromtimestamp(
+            kinesis['approximateArrivalTimestamp'])
+
+
+class DynamoDBEvent(BaseLambdaEvent):
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        pass
+
+    def __iter__(self) -> Iterator['DynamoDBRecord']:
+        for record in self._event_dict['Records']:
+            yield DynamoDBRecord(record, self.context)
+
+
+class DynamoDBRecord(BaseLambdaEvent):
+
+    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
+        dynamodb = event_dict['dynamodb']
+        self.timestamp: datetime.datetime = datetime.datetime.utcfromtimestamp(
+            dynamodb['ApproximateCreationDateTime'])
+        self.keys: Any = dynamodb.get('Keys')
+        self.new_image: Any = dynamodb.get('NewImage')
+        self.old_image: Any = dynamodb.get('OldImage')
+        self.sequence_number: str = dynamodb['SequenceNumber']
+        self.size_bytes: int = dynamodb['SizeBytes']
+        self.stream_view_type: str = dynamodb['StreamViewType']
+        # These are from the top level keys in a record.
+        self.aws_region: str = event_dict['awsRegion']
+        self.event_id: str = event_dict['eventID']
+        self.event_name: str = event_dict['eventName']
+        self.event_source_arn: str = event_dict['eventSourceARN']
+
+    @property
+    def table_name(self) -> str:
+        # Converts:
+        # "arn:aws:dynamodb:us-west-2:12345:table/MyTable/"
+        # "stream/2020-09-28T16:49:14.209"
+        #
+        # into:
+        # "MyTable"
+        parts = self.event_source_arn.split(':', 5)
+        if not len(parts) == 6:
+            return ''
+        full_name = parts[-1]
+        name_parts = full_name.split('/')
+        if len(name_parts) >= 2:
+            return name_parts[1]
+        return ''
@@ -0,0 +1,152 @@
+"""Runtime support for websocket APIs.
+
+This module is part of the lambda runtime and is imported by ``chalice.app``
+the first time ``app.websocket_api`` is used or a websocket handler is
+registered.
+
+"""
+import os
+from collections.abc import MutableMapping
+
+from typing import Dict, Any, Optional, List, Callable
+
+from chalice.app import EventSourceHandler, Response
+from chalice.app import WebsocketDisconnectedError
+
+
+class WebsocketAPI(object):
+    _WEBSOCKET_ENDPOINT_TEMPLATE = 'https://{domain_name}/{stage}'
+    _REGION_ENV_VARS = ['AWS_REGION', 'AWS_DEFAULT_REGION']
+
+    def __init__(self, env: Optional[MutableMapping] = None) -> None:
+        self.session: Optional[Any] = None
+        self._endpoint: Optional[str] = None
+        self._client = None
+        if env is None:
+            self._env: MutableMapping = os.environ
+        else:
+            self._env = env
+
+    def configure(self, domain_name: str, stage: str) -> None:
+        if self._endpoint is not None:
+            return
+        self._endpoint = self._WEBSOCKET_ENDPOINT_TEMPLATE.format(
+            domain_name=domain_name,
+            stage=stage,
+        )
+
+    def configure_from_api_id(self, api_id: str, stage: str) -> None:
+        if self._endpoint is not None:
+            return
+        region_name = self._get_region()
+
+        if region_name.startswith("cn-"):
+            domain_name_template = (
+                '{api_id}.execute-api.{region}.amazonaws.com.cn'
+            )
+        else:
+            domain_name_template = (
+                '{api_id}.execute-api.{region}.amazonaws.com'
+            )
+
+        domain_name = domain_name_template.format(
+            api_id=api_id, region=region_name)
+        self.configure(domain_name, stage)
+
+    def _get_region(self) -> str:
+        # Attempt to get the region so we can configure the
+        # apigatewaymanagementapi client.  We'll first try
+        # retrieving this value from env vars because these should
+        # always be set in the Lambda runtime environment.
+        for varname in self._REGION_ENV_VARS:
+            if varname in self._env:
+                return self._env[varname]
+        # As a last attempt we'll try to retrieve the region
+        # from the currently configured region.  If the session
+        # isn't configured or we can't get the region, we have
+        # no choice but to error out.
+        if self.session is not None:
+            region_name = self.session.region_name
+            if region_name is not None:
+                return region_name
+        raise ValueError(
+            "Unable to retrieve the region name when configuring the "
+            "websocket client.  Either set the 'AWS_REGION' environment "
+            "variable or assign 'app.websocket_api.session' to a boto3 "
+            "session."
+        )
+
+    def _get_client(self) -> Any:
+        if self.session is None:
+            raise ValueError(
+                'Assign app.websocket_api.session to a boto3 session before '
+                'using the WebsocketAPI'
+            )
+        if self._endpoint is None:
+            raise ValueError(
+                'WebsocketAPI.configure must be called before using the '
+                'WebsocketAPI'
+            )
+        if self._client is None:
+            self._client = self.session.client(
+                'apigatewaymanagementapi',
+                endpoint_url=self._endpoint,
+            )
+        return self._client
+
+    def send(self, connection_id: str, message: str) -> None:
+        client = self._get_client()
+        try:
+            client.post_to_connection(
+                ConnectionId=connection_id,
+                Data=message,
+            )
+        except client.exceptions.GoneException:
+            raise WebsocketDisconnectedError(connection_id)
+
+    def close(self, connection_id: str) -> None:
+        client = self._get_client()
+        try:
+            client.delete_connection(
+                ConnectionId=connection_id,
+            )
+        except client.exceptions.GoneException:
+            raise WebsocketDisconnectedError(connection_id)
+
+    def info(self, connection_id: str) -> Any:
+        client = self._get_client()
+        try:
+            return client.get_connection(
+                ConnectionId=connection_id,
+            )
+        except client.exceptions.GoneException:
+            raise WebsocketDisconnectedError(connection_id)
+
+
+class WebsocketEventSourceHandler(EventSourceHandler):
+    WEBSOCKET_API_RESPONSE = {'statusCode': 200}
+
+    def __init__(self, func: Callable[..., Any],
+                 event_class: Any, websocket_api: WebsocketAPI,
+                 middleware_handlers: Optional[List[Callable[..., Any]]] = None
+                 ) -> None:
+        super(WebsocketEventSourceHandler, self).__init__(func, event_class,
+                                                          middleware_handlers)
+        self.websocket_api: WebsocketAPI = websocket_api
+
+    def __call__(self, event: Dict[str, Any],
+                 context: Dict[str, Any]) -> Dict[str, Any]:
+        self.websocket_api.configure_from_api_id(
+            event['requestContext']['apiId'],
+            event['requestContext']['stage'],
+        )
+        response = super(
+            WebsocketEventSourceHandler, self).__call__(event, context)
+        data = None
+        if isinstance(response, Response):
+            data = response.to_dict()
+        elif isinstance(response, dict):
+            data = response
+            if "statusCode" not in data:
+                data = {**self.WEBSOCKET_API_RESPONSE, **data}
+        return data or self.WEBSOCKET_API_RESPONSE
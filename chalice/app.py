@@ -6,20 +6,22 @@ import os
 import logging
 import json
 import traceback
-import decimal
-import base64
-import copy
 import functools
-import datetime
+import itertools
+import threading
 from collections import defaultdict
 
 # Implementation note:  This file is intended to be a standalone file
 # that gets copied into the lambda deployment package.  It has no dependencies
 # on other parts of chalice, so it can stay small and lightweight, with minimal
-# startup overhead.
-from urllib.parse import unquote_plus
+# startup overhead.  The only exception are the runtime modules next to it
+# (_authorizer.py, _events.py, _websocket.py), which are copied along with it
+# and only imported the first time they're used, see _LAZY_ATTRIBUTES below.
+# For the same reason, modules that only some apps or requests need (base64,
+# copy, decimal) are imported where they're used.
 from collections.abc import Mapping
 from collections.abc import MutableMapping
+from collections.abc import Iterator as IteratorABC
 
 
 __version__: str = '1.31.3'
@@ -28,7 +30,12 @@ from typing import List, Dict, Any, Optional, Sequence, Union, Callable, Set, \
     Iterator, TYPE_CHECKING, Tuple
 
 if TYPE_CHECKING:
+    import decimal
     from chalice.local import LambdaContext
+    from chalice._authorizer import ChaliceAuthorizer
+    from chalice._authorizer import AuthResponse  # noqa
+    from chalice._events import BaseLambdaEvent
+    from chalice._websocket import WebsocketAPI
 
 _PARAMS = re.compile(r'{\w+}')
 MiddlewareFuncType = Callable[[Any, Callable[[Any], Any]], Any]
@@ -41,11 +48,13 @@ _ANY_STRING = (str, bytes)
 
 
 def handle_extra_types(
-        obj: Union[decimal.Decimal, 'MultiDict']
+        obj: Union['decimal.Decimal', 'MultiDict']
 ) -> Union[float, Dict]:
     # Lambda will automatically serialize decimals so we need
-    # to support that as well.
-    if isinstance(obj, decimal.Decimal):
+    # to support that as well.  An object can only be a Decimal if
+    # the decimal module was imported, so we don't import it here.
+    decimal = sys.modules.get('decimal')
+    if decimal is not None and isinstance(obj, decimal.Decimal):
         return float(obj)
     # This is added for backwards compatibility.
     # It will keep only the last value for every key as it used to.
@@ -69,13 +78,58 @@ def _matches_content_type(content_type: str,
                           valid_content_types: List[str]) -> bool:
     # If '*/*' is in the Accept header or the valid types,
     # then all content_types match. Otherwise see of there are any common types
-    content_type = content_type.lower()
-    valid_content_types = [x.lower() for x in valid_content_types]
+    return _matches_lowercase_content_type(
+        content_type.lower(), [x.lower() for x in valid_content_types])
+
+
+def _matches_lowercase_content_type(content_type: str,
+                                    valid_content_types: List[str]) -> bool:
+    # Same as _matches_content_type() except the caller has already
+    # lowercased both the content_type and the valid_content_types.
     return '*/*' in content_type or \
         '*/*' in valid_content_types or \
         _content_type_header_contains(content_type, valid_content_types)
 
 
+def _is_streaming_body(body: Any) -> bool:
+    # A body is streamed when a view returns a generator or some
+    # other iterator.  Strings, bytes, lists and dicts aren't iterators
+    # so they keep their existing behavior.
+    return isinstance(body, IteratorABC)
+
+
+def _join_body_chunks(chunks: Any) -> Union[str, bytes]:
+    # Chunks are joined with a single join() call.  If any of the chunks
+    # are bytes, any str chunks are encoded as UTF-8 and the body is bytes.
+    chunks = list(chunks)
+    if any(isinstance(chunk, bytes) for chunk in chunks):
+        return b''.join(
+            chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+            for chunk in chunks)
+    return ''.join(chunks)
+
+
+def _start_body_chunks(chunks: Iterator[Any]) -> Iterator[Any]:
+    # Produce the first chunk now, so an error raised before the view
+    # sends anything is handled like any other error raised from the
+    # view.  The first chunk is then put back in front of the rest.
+    for first in chunks:
+        return itertools.chain([first], chunks)
+    return iter([])
+
+
+def _find_header(headers: Mapping, name: str) -> Optional[Any]:
+    # Case insensitive lookup of a single header, where ``name`` is
+    # lowercase.  This avoids creating a CaseInsensitiveMapping when
+    # we only need one value.  As with CaseInsensitiveMapping, the
+    # last matching header wins.
+    value = None
+    for key, header_value in headers.items():
+        if key.lower() == name:
+            value = header_value
+    return value
+
+
 def _content_type_header_contains(
         content_type_header: str,
         valid_content_types: List[str]
@@ -169,6 +223,8 @@ class MultiDict(MutableMapping):  # pylint: disable=too-many-ancestors
     the same key.
     """
 
+    __slots__ = ('_dict',)
+
     def __init__(self, mapping: Optional[Dict]):
         if mapping is None:
             mapping = {}
@@ -204,11 +260,26 @@ class MultiDict(MutableMapping):  # pylint: disable=too-many-ancestors
 
 
 class CaseInsensitiveMapping(Mapping):
-    """Case insensitive and read-only mapping."""
+    """Case insensitive and read-only mapping.
+
+    The lowercased copy of the original mapping isn't created until
+    the mapping is first accessed, but it's made from a copy of the
+    original mapping taken when this mapping is created.
+    """
+
+    __slots__ = ('_mapping', '_lowercase_dict')
 
     def __init__(self, mapping: Union[Dict[str, Any], MultiDict]) -> None:
-        mapping = mapping or {}
-        self._dict = {k.lower(): v for k, v in mapping.items()}
+        # Copying the items is cheap compared to lowercasing the keys.
+        self._mapping = dict(mapping.items()) if mapping else {}
+        self._lowercase_dict: Optional[Dict[str, Any]] = None
+
+    @property
+    def _dict(self) -> Dict[str, Any]:
+        if self._lowercase_dict is None:
+            self._lowercase_dict = {
+                k.lower(): v for k, v in self._mapping.items()}
+        return self._lowercase_dict
 
     def __getitem__(self, key: str) -> Any:
         return self._dict[key.lower()]
@@ -285,6 +356,7 @@ class CognitoUserPoolAuthorizer(Authorizer):
         }
 
     def with_scopes(self, scopes: List[str]) -> 'Authorizer':
+        import copy
         authorizer_with_scopes = copy.deepcopy(self)
         authorizer_with_scopes.scopes = scopes
         return authorizer_with_scopes
@@ -323,6 +395,7 @@ class CustomAuthorizer(Authorizer):
         return swagger
 
     def with_scopes(self, scopes: List[str]) -> 'Authorizer':
+        import copy
         authorizer_with_scopes = copy.deepcopy(self)
         authorizer_with_scopes.scopes = scopes
         return authorizer_with_scopes
@@ -387,19 +460,112 @@ class CORSConfig(object):
         return False
 
 
+class JSONCodec(object):
+    """Serialize and deserialize JSON request and response bodies.
+
+    This default codec uses the ``json`` module from the standard library.
+    A different codec can be configured with ``app.api.json_codec``.
+    """
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'),
+                          default=handle_extra_types)
+
+
+class OrjsonCodec(JSONCodec):
+    """A JSON codec that uses ``orjson``, which must be installed."""
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._orjson.dumps(
+            obj, default=handle_extra_types).decode('utf-8')
+
+
+class UjsonCodec(JSONCodec):
+    """A JSON codec that uses ``ujson``, which must be installed."""
+
+    def __init__(self) -> None:
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._ujson.dumps(obj, default=handle_extra_types,
+                                 escape_forward_slashes=False)
+
+
+class CallableJSONCodec(JSONCodec):
+    """A JSON codec that delegates to user provided functions."""
+
+    def __init__(self, loads: Callable[[Union[str, bytes]], Any],
+                 dumps: Callable[[Any], str]) -> None:
+        self._loads = loads
+        self._dumps = dumps
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj)
+
+
+def fastest_json_codec() -> JSONCodec:
+    """Return the fastest JSON codec that's installed.
+
+    This checks for ``orjson`` and then ``ujson``, falling back to the
+    default ``JSONCodec`` if neither is available.
+    """
+    for codec_cls in (OrjsonCodec, UjsonCodec):
+        try:
+            return codec_cls()
+        except ImportError:
+            pass
+    return JSONCodec()
+
+
+_DEFAULT_JSON_CODEC = JSONCodec()
+# Marks a lazily created attribute that hasn't been created yet,
+# for attributes where None is a valid value.
+_NOT_LOADED: Any = object()
+
+
 class Request(object):
-    """The current request from API gateway."""
-    _NON_SERIALIZED_ATTRS: List[str] = ['lambda_context']
+    """The current request from API gateway.
+
+    The ``headers`` and ``query_params`` attributes are views over the
+    original event dict that are only created when they're first accessed.
+    Other attributes can still be set on a request, the instance
+    ``__dict__`` is only created when the first one is set.
+    """
+    _SERIALIZED_ATTRS: List[str] = [
+        'query_params', 'headers', 'uri_params', 'method', 'context',
+        'stage_vars', 'path',
+    ]
+    __slots__ = (
+        '_query_params', '_headers', 'uri_params', 'method',
+        '_is_base64_encoded', '_body', '_json_body', '_raw_body', 'context',
+        'stage_vars', 'path', 'lambda_context', '_event_dict', '_json_codec',
+        '__dict__',
+    )
     body: Any
     base64_body: str
 
     def __init__(self, event_dict: Dict[str, Any],
-                 lambda_context: Optional[Any] = None) -> None:
-        query_params = event_dict['multiValueQueryStringParameters']
-        self.query_params: Optional[MultiDict] = None \
-            if query_params is None else MultiDict(query_params)
-        self.headers: CaseInsensitiveMapping = \
-            CaseInsensitiveMapping(event_dict['headers'])
+                 lambda_context: Optional[Any] = None,
+                 json_codec: Optional[JSONCodec] = None) -> None:
+        self._query_params: Any = _NOT_LOADED
+        self._headers: Optional[CaseInsensitiveMapping] = None
         self.uri_params: Optional[Dict[str, str]] \
             = event_dict['pathParameters']
         self.method: str = event_dict['requestContext']['httpMethod']
@@ -416,8 +582,36 @@ class Request(object):
         self.path: str = event_dict['requestContext']['resourcePath']
         self.lambda_context = lambda_context
         self._event_dict = event_dict
+        if json_codec is None:
+            json_codec = _DEFAULT_JSON_CODEC
+        self._json_codec = json_codec
+
+    @property
+    def query_params(self) -> Optional[MultiDict]:
+        if self._query_params is _NOT_LOADED:
+            query_params = self._event_dict[
+                'multiValueQueryStringParameters']
+            self._query_params = None \
+                if query_params is None else MultiDict(query_params)
+        return self._query_params
+
+    @query_params.setter
+    def query_params(self, value: Optional[MultiDict]) -> None:
+        self._query_params = value
+
+    @property
+    def headers(self) -> CaseInsensitiveMapping:
+        if self._headers is None:
+            self._headers = CaseInsensitiveMapping(
+                self._event_dict['headers'])
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: CaseInsensitiveMapping) -> None:
+        self._headers = value
 
     def _base64decode(self, encoded: Union[bytes, str]) -> bytes:
+        import base64
         if not isinstance(encoded, bytes):
             encoded = encoded.encode('ascii')
         output = base64.b64decode(encoded)
@@ -439,18 +633,17 @@ class Request(object):
         if self.headers.get('content-type', '').startswith('application/json'):
             if self._json_body is None:
                 try:
-                    self._json_body = json.loads(self.raw_body)
+                    self._json_body = self._json_codec.loads(
+                        self.raw_body)
                 except ValueError:
                     raise BadRequestError('Error Parsing JSON')
             return self._json_body
 
     def to_dict(self) -> Dict[Any, Any]:
-        # Don't copy internal attributes.
-        copied = {
-            k: v for k, v in self.__dict__.items()
-            if not k.startswith('_') and
-            k not in self._NON_SERIALIZED_ATTRS
-        }
+        # Only the public attributes of the request are copied.
+        copied = {k: getattr(self, k) for k in self._SERIALIZED_ATTRS}
+        copied.update(
+            (k, v) for k, v in self.__dict__.items() if not k.startswith('_'))
         # We want the output of `to_dict()` to be
         # JSON serializable, so we need to remove the CaseInsensitive dict.
         copied['headers'] = dict(copied['headers'])
@@ -483,12 +676,22 @@ class Response(object):
 
     def to_dict(
             self,
-            binary_types: Optional[List[str]] = None
+            binary_types: Optional[List[str]] = None,
+            json_codec: Optional[JSONCodec] = None,
+            stream_body: bool = False
     ) -> Dict[str, Any]:
         body = self.body
-        if not isinstance(body, _ANY_STRING):
-            body = json.dumps(body, separators=(',', ':'),
-                              default=handle_extra_types)
+        if _is_streaming_body(body):
+            if stream_body:
+                # The caller is responsible for sending the chunks,
+                # which also means there's no base64 encoding.
+                binary_types = None
+            else:
+                body = _join_body_chunks(body)
+        elif not isinstance(body, _ANY_STRING):
+            if json_codec is None:
+                json_codec = _DEFAULT_JSON_CODEC
+            body = json_codec.dumps(body)
         single_headers, multi_headers = self._sort_headers(self.headers)
         response = {
             'headers': single_headers,
@@ -517,8 +720,8 @@ class Response(object):
             response_dict: Dict[str, Any],
             binary_types: List[str]
     ) -> None:
-        response_headers = CaseInsensitiveMapping(response_dict['headers'])
-        content_type = response_headers.get('content-type', '')
+        content_type = _find_header(response_dict['headers'],
+                                    'content-type') or ''
         body = response_dict['body']
 
         if _matches_content_type(content_type, binary_types):
@@ -540,6 +743,7 @@ class Response(object):
         response_dict['body'] = body
 
     def _base64encode(self, data: bytes) -> str:
+        import base64
         if not isinstance(data, bytes):
             raise ValueError('Expected bytes type for body with binary '
                              'Content-Type. Got %s type body instead.'
@@ -565,6 +769,10 @@ class RouteEntry(object):
         #: e.g, '/foo/{bar}/{baz}/qux -> ['bar', 'baz']
         self.view_args: List[str] = self._parse_view_args()
         self.content_types: List[str] = content_types or []
+        #: The lowercased ``content_types``, used when matching
+        #: the Content-Type header of a request.
+        self.lowercase_content_types: List[str] = [
+            x.lower() for x in self.content_types]
         # cors is passed as either a boolean or a CORSConfig object. If it is a
         # boolean it needs to be replaced with a real CORSConfig object to
         # pass the typechecker. None in this context will not inject any cors
@@ -575,6 +783,11 @@ class RouteEntry(object):
         elif cors is False:
             cors = None
         self.cors: CORSConfig = cors  # type: ignore
+        #: The CORS headers added to every response for this route,
+        #: or None if CORS is not enabled.
+        self.cors_headers: Optional[Dict[str, str]] = None
+        if cors is not None:
+            self.cors_headers = self.cors.get_access_control_headers()
         self.authorizer: Optional[Authorizer] = authorizer
 
     def _parse_view_args(self) -> List[str]:
@@ -601,123 +814,15 @@ class APIGateway(object):
     def __init__(self) -> None:
         self.binary_types: List[str] = self.default_binary_types
         self.cors: Union[bool, CORSConfig] = False
+        self.json_codec: JSONCodec = _DEFAULT_JSON_CODEC
 
     @property
     def default_binary_types(self) -> List[str]:
         return list(self._DEFAULT_BINARY_TYPES)
 
 
-class WebsocketAPI(object):
-    _WEBSOCKET_ENDPOINT_TEMPLATE = 'https://{domain_name}/{stage}'
-    _REGION_ENV_VARS = ['AWS_REGION', 'AWS_DEFAULT_REGION']
-
-    def __init__(self, env: Optional[MutableMapping] = None) -> None:
-        self.session: Optional[Any] = None
-        self._endpoint: Optional[str] = None
-        self._client = None
-        if env is None:
-            self._env: MutableMapping = os.environ
-        else:
-            self._env = env
-
-    def configure(self, domain_name: str, stage: str) -> None:
-        if self._endpoint is not None:
-            return
-        self._endpoint = self._WEBSOCKET_ENDPOINT_TEMPLATE.format(
-            domain_name=domain_name,
-            stage=stage,
-        )
-
-    def configure_from_api_id(self, api_id: str, stage: str) -> None:
-        if self._endpoint is not None:
-            return
-        region_name = self._get_region()
-
-        if region_name.startswith("cn-"):
-            domain_name_template = (
-                '{api_id}.execute-api.{region}.amazonaws.com.cn'
-            )
-        else:
-            domain_name_template = (
-                '{api_id}.execute-api.{region}.amazonaws.com'
-            )
-
-        domain_name = domain_name_template.format(
-            api_id=api_id, region=region_name)
-        self.configure(domain_name, stage)
-
-    def _get_region(self) -> str:
-        # Attempt to get the region so we can configure the
-        # apigatewaymanagementapi client.  We'll first try
-        # retrieving this value from env vars because these should
-        # always be set in the Lambda runtime environment.
-        for varname in self._REGION_ENV_VARS:
-            if varname in self._env:
-                return self._env[varname]
-        # As a last attempt we'll try to retrieve the region
-        # from the currently configured region.  If the session
-        # isn't configured or we can't get the region, we have
-        # no choice but to error out.
-        if self.session is not None:
-            region_name = self.session.region_name
-            if region_name is not None:
-                return region_name
-        raise ValueError(
-            "Unable to retrieve the region name when configuring the "
-            "websocket client.  Either set the 'AWS_REGION' environment "
-            "variable or assign 'app.websocket_api.session' to a boto3 "
-            "session."
-        )
-
-    def _get_client(self) -> Any:
-        if self.session is None:
-            raise ValueError(
-                'Assign app.websocket_api.session to a boto3 session before '
-                'using the WebsocketAPI'
-            )
-        if self._endpoint is None:
-            raise ValueError(
-                'WebsocketAPI.configure must be called before using the '
-                'WebsocketAPI'
-            )
-        if self._client is None:
-            self._client = self.session.client(
-                'apigatewaymanagementapi',
-                endpoint_url=self._endpoint,
-            )
-        return self._client
-
-    def send(self, connection_id: str, message: str) -> None:
-        client = self._get_client()
-        try:
-            client.post_to_connection(
-                ConnectionId=connection_id,
-                Data=message,
-            )
-        except client.exceptions.GoneException:
-            raise WebsocketDisconnectedError(connection_id)
-
-    def close(self, connection_id: str) -> None:
-        client = self._get_client()
-        try:
-            client.delete_connection(
-                ConnectionId=connection_id,
-            )
-        except client.exceptions.GoneException:
-            raise WebsocketDisconnectedError(connection_id)
-
-    def info(self, connection_id: str) -> Any:
-        client = self._get_client()
-        try:
-            return client.get_connection(
-                ConnectionId=connection_id,
-            )
-        except client.exceptions.GoneException:
-            raise WebsocketDisconnectedError(connection_id)
-
-
 class DecoratorAPI(object):
-    websocket_api: Optional[WebsocketAPI] = None
+    websocket_api: Optional['WebsocketAPI'] = None
 
     def middleware(
             self,
@@ -909,7 +1014,7 @@ class DecoratorAPI(object):
                 # here.
                 user_handler = PureLambdaWrapper(user_handler)
             return EventSourceHandler(
-                user_handler, _EVENT_CLASSES[handler_type],
+                user_handler, _get_event_class(handler_type),
                 middleware_handlers=self._get_middleware_handlers(
                     event_type=_MIDDLEWARE_MAPPING[handler_type],
                 )
@@ -920,7 +1025,9 @@ class DecoratorAPI(object):
             'on_ws_message',
             'on_ws_disconnect',
         ]
-        if self.websocket_api and handler_type in websocket_event_classes:
+        if handler_type in websocket_event_classes and self.websocket_api:
+            from chalice._events import WebsocketEvent
+            from chalice._websocket import WebsocketEventSourceHandler
             return WebsocketEventSourceHandler(
                 user_handler, WebsocketEvent,
                 self.websocket_api,
@@ -930,6 +1037,7 @@ class DecoratorAPI(object):
         if handler_type == 'authorizer':
             # Authorizer is special cased and doesn't quite fit the
             # EventSourceHandler pattern.
+            from chalice._authorizer import ChaliceAuthorizer
             return ChaliceAuthorizer(handler_name, user_handler)
         return user_handler
 
@@ -1224,6 +1332,10 @@ class _HandlerRegistration(object):
 
 class Chalice(_HandlerRegistration, DecoratorAPI):
     FORMAT_STRING = '%(name)s - %(levelname)s - %(message)s'
+    # Whether generator/iterator response bodies are passed through
+    # to the caller of the app instead of being joined together.
+    # This is only enabled when running in local mode.
+    _STREAM_RESPONSE_BODY = False
     authorizers: Dict[str, Dict[str, Any]]
     lambda_context: 'LambdaContext'
     current_request: Optional[Request]
@@ -1233,10 +1345,11 @@ class Chalice(_HandlerRegistration, DecoratorAPI):
                  env: Optional[MutableMapping] = None) -> None:
         super(Chalice, self).__init__()
         self.app_name: str = app_name
-        self.websocket_api: WebsocketAPI = WebsocketAPI()
+        self._websocket_api: Optional['WebsocketAPI'] = None
         self._debug: bool = debug
         self.configure_logs: bool = configure_logs
         self.log: logging.Logger = logging.getLogger(self.app_name)
+        self._rest_api_handler: Optional[RestAPIEventHandler] = None
         if env is None:
             env = os.environ
         self._initialize(env)
@@ -1260,8 +1373,22 @@ class Chalice(_HandlerRegistration, DecoratorAPI):
     @debug.setter
     def debug(self, value: bool) -> None:
         self._debug = value
+        self._rest_api_handler = None
         self._configure_log_level()
 
+    @property  # type: ignore[override]
+    def websocket_api(self) -> 'WebsocketAPI':
+        # Most apps don't use websockets, so the websocket support isn't
+        # imported until it's needed.
+        if self._websocket_api is None:
+            from chalice._websocket import WebsocketAPI
+            self._websocket_api = WebsocketAPI()
+        return self._websocket_api
+
+    @websocket_api.setter
+    def websocket_api(self, value: 'WebsocketAPI') -> None:
+        self._websocket_api = value
+
     def _configure_logging(self) -> None:
         if self._already_configured(self.log):
             return
@@ -1303,6 +1430,12 @@ class Chalice(_HandlerRegistration, DecoratorAPI):
                           ) -> None:
         self._do_register_handler(handler_type, name, user_handler,
                                   wrapped_handler, kwargs, options)
+        self._rest_api_handler = None
+
+    def register_middleware(self, func: MiddlewareFuncType,
+                            event_type: str = 'all') -> None:
+        super(Chalice, self).register_middleware(func, event_type)
+        self._rest_api_handler = None
 
     # These are defined here on the Chalice class because we want all the
     # feature flag tracking to live in Chalice and not the DecoratorAPI.
@@ -1339,6 +1472,20 @@ class Chalice(_HandlerRegistration, DecoratorAPI):
         return (func for func, filter_type in self.middleware_handlers if
                 filter_type in [event_type, 'all'])
 
+    def _get_rest_api_handler(self) -> 'RestAPIEventHandler':
+        # The handler, along with its middleware chain, is built once and
+        # reused across invocations.  Registering a new route or middleware,
+        # or changing the debug setting, clears the cached handler so it's
+        # rebuilt on the next invocation.
+        if self._rest_api_handler is None:
+            self._rest_api_handler = RestAPIEventHandler(
+                self.routes, self.api, self.log, self.debug,
+                middleware_handlers=list(
+                    self._get_middleware_handlers('http')),
+                stream_response_body=self._STREAM_RESPONSE_BODY,
+            )
+        return self._rest_api_handler
+
     def __call__(self, event: Any, context: Any) -> Dict[str, Any]:
         # For legacy reasons, we can't move the Rest API handler entry
         # point away from this Chalice.__call__ method . However, we can
@@ -1347,10 +1494,7 @@ class Chalice(_HandlerRegistration, DecoratorAPI):
         # to the other event handlers which makes it more manageable to
         # implement shared functionality (e.g. middleware).
         self.lambda_context: 'LambdaContext' = context
-        handler = RestAPIEventHandler(
-            self.routes, self.api, self.log, self.debug,
-            middleware_handlers=self._get_middleware_handlers('http'),
-        )
+        handler = self._get_rest_api_handler()
         self.current_request: \
             Optional[Request] = handler.create_request_object(event, context)
         return handler(event, context)
@@ -1369,164 +1513,6 @@ class BuiltinAuthConfig(object):
         self.header: str = header
 
 
-# ChaliceAuthorizer is unique in that the runtime component (the thing
-# that wraps the decorated function) also needs a reference to the config
-# object (the object the describes how to create the resource).  In
-# most event sources these are separate and don't need to know about
-# each other, but ChaliceAuthorizer does.  This is because the way
-# you associate a builtin authorizer with a view function is by passing
-# a direct reference:
-#
-# @app.authorizer(...)
-# def my_auth_function(...): pass
-#
-# @app.route('/', auth=my_auth_function)
-#
-# The 'route' part needs to know about the auth function for two reasons:
-#
-# 1. We use ``view.authorizer`` to figure out how to deploy the app
-# 2. We need a reference to the runtime handler for the auth in order
-#    to support local mode testing.
-# I *think* we can refactor things to handle both of those issues but
-# we would need more research to know for sure.  For now, this is a
-# special cased runtime class that knows about its config.
-class ChaliceAuthorizer(object):
-    def __init__(self, name: str, func: Callable[..., Any],
-                 scopes: Optional[List[str]] = None) -> None:
-        self.name: str = name
-        self.func: Callable[
-            ['AuthRequest'], Union['AuthResponse', Dict[str, Any]]
-        ] = func
-        self.scopes: List[str] = scopes or []
-        # This is filled in during the @app.authorizer()
-        # processing.
-        self.config: BuiltinAuthConfig = None  # type: ignore
-
-    def __call__(
-            self,
-            event: Dict[str, Any],
-            context: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        auth_request = self._transform_event(event)
-        result = self.func(auth_request)
-        if isinstance(result, AuthResponse):
-            return result.to_dict(auth_request)
-        return result
-
-    def _transform_event(self, event: Dict[str, Any]) -> 'AuthRequest':
-        return AuthRequest(event['type'],
-                           event['authorizationToken'],
-                           event['methodArn'])
-
-    def with_scopes(self, scopes: List[str]) -> 'ChaliceAuthorizer':
-        authorizer_with_scopes = copy.deepcopy(self)
-        authorizer_with_scopes.scopes = scopes
-        return authorizer_with_scopes
-
-
-class AuthRequest(object):
-    def __init__(self, auth_type: str, token: str, method_arn: str) -> None:
-        self.auth_type: str = auth_type
-        self.token: str = token
-        self.method_arn: str = method_arn
-
-
-class AuthResponse(object):
-    ALL_HTTP_METHODS: List[str] = ['DELETE', 'HEAD', 'OPTIONS',
-                                   'PATCH', 'POST', 'PUT', 'GET']
-
-    def __init__(self, routes: List[Union[str, 'AuthRoute']],
-                 principal_id: str, context: Optional[Dict[str, str]] = None):
-        self.routes: List[Union[str, 'AuthRoute']] = routes
-        self.principal_id: str = principal_id
-        # The request is used to generate full qualified ARNs
-        # that we need for the resource portion of the returned
-        # policy.
-        if context is None:
-            context = {}
-        self.context: Dict[str, str] = context
-
-    def to_dict(self, request: AuthRequest) -> Dict[str, Any]:
-        return {
-            'context': self.context,
-            'principalId': self.principal_id,
-            'policyDocument': self._generate_policy(request),
-        }
-
-    def _generate_policy(self, request: AuthRequest) -> Dict[str, Any]:
-        allowed_resources = self._generate_allowed_resources(request)
-        return {
-            'Version': '2012-10-17',
-            'Statement': [
-                {
-                    'Action': 'execute-api:Invoke',
-                    'Effect': 'Allow',
-                    'Resource': allowed_resources,
-                }
-            ]
-        }
-
-    def _generate_allowed_resources(self, request: AuthRequest) -> List[str]:
-        allowed_resources = []
-        for route in self.routes:
-            if isinstance(route, AuthRoute):
-                methods = route.methods
-                path = route.path
-            elif route == '*':
-                # A string route of '*' means that all paths and
-                # all HTTP methods are now allowed.
-                methods = ['*']
-                path = '*'
-            else:
-                # If 'route' is just a string, then they've
-                # opted not to use the AuthRoute(), so we'll
-                # generate a policy that allows all HTTP methods.
-                methods = ['*']
-                path = route
-            for method in methods:
-                allowed_resources.append(
-                    self._generate_arn(path, request, method))
-        return allowed_resources
-
-    def _generate_arn(
-            self,
-            route: str,
-            request: AuthRequest,
-            method: str = '*'
-    ) -> str:
-        incoming_arn = request.method_arn
-        # An incoming_arn would look like this:
-        # "arn:aws:execute-api:us-west-2:123:rest-api-id/stage/GET/needs/auth"
-        # Then we pull out the rest-api-id and stage, such that:
-        #   base = ['rest-api-id', 'stage']
-        #
-        # We rely on the fact that the first part of the ARN format is fixed
-        # as:    arn:<partition>:<service>:<region>:<account-id>:<resource>
-        arn_parts = incoming_arn.split(':', 5)
-        allowed_resource = arn_parts[-1].split('/')[:2]
-        # Now we add in the path components and rejoin everything
-        # back together to make a full arn.
-        # We're also assuming all HTTP methods (via '*') for now.
-        # To support per HTTP method routes the API will need to be updated.
-        # We also need to strip off the leading ``/`` so it can be
-        # '/'.join(...)'d properly.
-        allowed_resource.extend([method, route[1:]])
-        last_arn_segment = '/'.join(allowed_resource)
-        if route == '*':
-            # We also have to handle the '*' case which matches
-            # all routes.
-            last_arn_segment += route
-        arn_parts[-1] = last_arn_segment
-        final_arn = ':'.join(arn_parts)
-        return final_arn
-
-
-class AuthRoute(object):
-    def __init__(self, path: str, methods: List[str]):
-        self.path: str = path
-        self.methods: List[str] = methods
-
-
 class LambdaFunction(object):
     def __init__(self, func: Callable[..., Any], name: str,
                  handler_string: str):
@@ -1762,50 +1748,49 @@ class EventSourceHandler(BaseLambdaHandler):
         return self.handler(event_obj)
 
 
-class WebsocketEventSourceHandler(EventSourceHandler):
-    WEBSOCKET_API_RESPONSE = {'statusCode': 200}
-
-    def __init__(self, func: Callable[..., Any],
-                 event_class: Any, websocket_api: WebsocketAPI,
-                 middleware_handlers: Optional[List[Callable[..., Any]]] = None
-                 ) -> None:
-        super(WebsocketEventSourceHandler, self).__init__(func, event_class,
-                                                          middleware_handlers)
-        self.websocket_api: WebsocketAPI = websocket_api
-
-    def __call__(self, event: Dict[str, Any],
-                 context: Dict[str, Any]) -> Dict[str, Any]:
-        self.websocket_api.configure_from_api_id(
-            event['requestContext']['apiId'],
-            event['requestContext']['stage'],
-        )
-        response = super(
-            WebsocketEventSourceHandler, self).__call__(event, context)
-        data = None
-        if isinstance(response, Response):
-            data = response.to_dict()
-        elif isinstance(response, dict):
-            data = response
-            if "statusCode" not in data:
-                data = {**self.WEBSOCKET_API_RESPONSE, **data}
-        return data or self.WEBSOCKET_API_RESPONSE
-
-
 class RestAPIEventHandler(BaseLambdaHandler):
-    def __init__(self, route_table: Dict[str, Dict[str, RouteEntry]],
-                 api: APIGateway, log: logging.Logger, debug: bool,
-                 middleware_handlers: Optional[List[Callable[..., Any]]] = None
-                 ) -> None:
+    def __init__(
+            self, route_table: Dict[str, Dict[str, RouteEntry]],
+            api: APIGateway, log: logging.Logger, debug: bool,
+            middleware_handlers: Optional[List[Callable[..., Any]]] = None,
+            stream_response_body: bool = False
+    ) -> None:
         self.routes: Dict[str, Dict[str, RouteEntry]] = route_table
         self.api: APIGateway = api
         self.log: logging.Logger = log
         self.debug: bool = debug
-        self.current_request: Optional[Request] = None
-        self.lambda_context: Optional['LambdaContext'] = None
+        # When True, a generator/iterator body returned from a view is left
+        # as is in the response dict so the caller can stream it.
+        # Otherwise it's joined into a single body.
+        self.stream_response_body: bool = stream_response_body
+        # A handler can be reused across invocations (and across threads
+        # when running in local mode), so anything specific to a single
+        # invocation is stored in a thread local.
+        self._invocation = threading.local()
         if middleware_handlers is None:
             middleware_handlers = []
         self._middleware_handlers: \
             List[Callable[..., Any]] = middleware_handlers
+        self._handler: Optional[Callable[..., Any]] = None
+        # Maps a resource path to the value of the Allow header
+        # sent back in a 405 response.
+        self._allowed_methods: Dict[str, str] = {}
+
+    @property
+    def current_request(self) -> Optional[Request]:
+        return getattr(self._invocation, 'current_request', None)
+
+    @current_request.setter
+    def current_request(self, value: Optional[Request]) -> None:
+        self._invocation.current_request = value
+
+    @property
+    def lambda_context(self) -> Optional['LambdaContext']:
+        return getattr(self._invocation, 'lambda_context', None)
+
+    @lambda_context.setter
+    def lambda_context(self, value: Optional['LambdaContext']) -> None:
+        self._invocation.lambda_context = value
 
     def _global_error_handler(self, event: Any,
                               get_response: Callable[..., Any]) -> Response:
@@ -1823,20 +1808,27 @@ class RestAPIEventHandler(BaseLambdaHandler):
         # now to minimize the potential for breaking changes.
         resource_path = event.get('requestContext', {}).get('resourcePath')
         if resource_path is not None:
-            self.current_request = Request(event, context)
+            self.current_request = Request(
+                event, context, json_codec=self.api.json_codec)
             return self.current_request
+        self.current_request = None
         return None
 
     def __call__(self, event: Any, context: Any) -> Any:
-        def wrapped_event(request: Request) -> Response:
-            return self._main_rest_api_handler(event, context)
+        self._invocation.event = event
+        self._invocation.context = context
+        if self._handler is None:
+            self._handler = self._build_middleware_handlers(
+                [self._global_error_handler] + list(self._middleware_handlers),
+                original_handler=self._invoke_main_handler,
+            )
+        response = self._handler(self.current_request)
+        return response.to_dict(self.api.binary_types, self.api.json_codec,
+                                stream_body=self.stream_response_body)
 
-        final_handler = self._build_middleware_handlers(
-            [self._global_error_handler] + list(self._middleware_handlers),
-            original_handler=wrapped_event,
-        )
-        response = final_handler(self.current_request)
-        return response.to_dict(self.api.binary_types)
+    def _invoke_main_handler(self, request: Request) -> Response:
+        return self._main_rest_api_handler(
+            self._invocation.event, self._invocation.context)
 
     def _main_rest_api_handler(self, event: Any, context: Any) -> Response:
         resource_path = event.get('requestContext', {}).get('resourcePath')
@@ -1846,12 +1838,11 @@ class RestAPIEventHandler(BaseLambdaHandler):
                                   http_status_code=500)
         http_method = event['requestContext']['httpMethod']
         if http_method not in self.routes[resource_path]:
-            allowed_methods = ', '.join(self.routes[resource_path].keys())
             return error_response(
                 error_code='MethodNotAllowedError',
                 message='Unsupported method: %s' % http_method,
                 http_status_code=405,
-                headers={'Allow': allowed_methods})
+                headers={'Allow': self._get_allowed_methods(resource_path)})
         route_entry = self.routes[resource_path][http_method]
         view_function = route_entry.view_function
         function_args = {name: event['pathParameters'][name]
@@ -1859,32 +1850,31 @@ class RestAPIEventHandler(BaseLambdaHandler):
         self.lambda_context = context
         # We're getting the CORS headers before validation to be able to
         # output desired headers with
-        cors_headers = None
-        if self._cors_enabled_for_route(route_entry):
-            cors_headers = self._get_cors_headers(route_entry.cors)
+        cors_headers = route_entry.cors_headers
         # We're doing the header validation after creating the request
         # so can leverage the case insensitive dict that the Request class
         # uses for headers.
         if self.current_request and route_entry.content_types:
             content_type = self.current_request.headers.get(
                 'content-type', 'application/json')
-            if not _matches_content_type(content_type,
-                                         route_entry.content_types):
+            if not _matches_lowercase_content_type(
+                    content_type.lower(),
+                    route_entry.lowercase_content_types):
                 return error_response(
                     error_code='UnsupportedMediaType',
                     message='Unsupported media type: %s' % content_type,
                     http_status_code=415,
-                    headers=cors_headers
+                    headers=self._copy_headers(cors_headers)
                 )
         response = self._get_view_function_response(view_function,
                                                     function_args)
         if cors_headers is not None:
             self._add_cors_headers(response, cors_headers)
 
-        response_headers = CaseInsensitiveMapping(response.headers)
+        response_content_type = _find_header(response.headers, 'content-type')
         if self.current_request and not self._validate_binary_response(
-                self.current_request.headers, response_headers):
-            content_type = response_headers.get('content-type', '')
+                self.current_request.headers, response_content_type):
+            content_type = response_content_type or ''
             return error_response(
                 error_code='BadRequest',
                 message=('Request did not specify an Accept header with %s, '
@@ -1893,20 +1883,36 @@ class RestAPIEventHandler(BaseLambdaHandler):
                          'must specify an Accept header that matches.'
                          % (content_type, content_type)),
                 http_status_code=400,
-                headers=cors_headers
+                headers=self._copy_headers(cors_headers)
             )
         return response
 
+    def _get_allowed_methods(self, resource_path: str) -> str:
+        allowed_methods = self._allowed_methods.get(resource_path)
+        if allowed_methods is None:
+            allowed_methods = ', '.join(self.routes[resource_path].keys())
+            self._allowed_methods[resource_path] = allowed_methods
+        return allowed_methods
+
+    def _copy_headers(self, headers: Optional[Dict[str, str]]
+                      ) -> Optional[HeadersType]:
+        # The precomputed headers on a RouteEntry are shared across
+        # requests, so we can't hand them to a Response that a view or
+        # middleware might modify.
+        if headers is None:
+            return None
+        return dict(headers)
+
     def _validate_binary_response(self,
                                   request_headers: CaseInsensitiveMapping,
-                                  response_headers: CaseInsensitiveMapping
+                                  response_content_type: Optional[str]
                                   ) -> bool:
         # Validates that a response is valid given the request. If the response
         # content-type specifies a binary type, there must be an accept header
         # that is a binary type as well.
         request_accept_header = request_headers.get('accept')
-        response_content_type = response_headers.get(
-            'content-type', 'application/json')
+        if response_content_type is None:
+            response_content_type = 'application/json'
         response_is_binary = _matches_content_type(response_content_type,
                                                    self.api.binary_types)
         expects_binary_response = False
@@ -1924,6 +1930,14 @@ class RestAPIEventHandler(BaseLambdaHandler):
             if not isinstance(response, Response):
                 response = Response(body=response)
             self._validate_response(response)
+            if _is_streaming_body(response.body):
+                if self.stream_response_body:
+                    response.body = _start_body_chunks(response.body)
+                else:
+                    # Join the chunks here so any errors raised while
+                    # generating the body are handled like any other
+                    # error raised from the view.
+                    response.body = _join_body_chunks(response.body)
         except ChaliceUnhandledError:
             # Reraise this exception so that middleware has a chance
             # to handle the exception.
@@ -1961,12 +1975,6 @@ class RestAPIEventHandler(BaseLambdaHandler):
                 raise ChaliceError("Bad value for header '%s': %r" %
                                    (header, value))
 
-    def _cors_enabled_for_route(self, route_entry: RouteEntry) -> bool:
-        return route_entry.cors is not None
-
-    def _get_cors_headers(self, cors: CORSConfig) -> Dict[str, Any]:
-        return cors.get_access_control_headers()
-
     def _add_cors_headers(self, response: Response,
                           cors_headers: Dict[str, str]) -> None:
         for name, value in cors_headers.items():
@@ -1974,176 +1982,6 @@ class RestAPIEventHandler(BaseLambdaHandler):
                 response.headers[name] = value
 
 
-# These classes contain all the event types that are passed
-# in as arguments in the lambda event handlers.  These are
-# part of Chalice's public API and must be backwards compatible.
-
-class BaseLambdaEvent(object):
-    def __init__(self, event_dict: Dict[str, Any],
-                 context: Optional[Dict[str, Any]]) -> None:
-        self._event_dict: Dict[str, Any] = event_dict
-        self.context: Optional[Dict[str, Any]] = context
-        self._extract_attributes(event_dict)
-
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        raise NotImplementedError("_extract_attributes")
-
-    def to_dict(self) -> Dict[str, Any]:
-        return self._event_dict
-
-
-# This class is only used for middleware handlers because
-# we can't change the existing interface for @app.lambda_function().
-# This could be a Chalice 2.0 thing where we make all the decorators
-# have a consistent interface that takes a single event arg.
-class LambdaFunctionEvent(BaseLambdaEvent):
-    def __init__(self, event_dict: Dict[str, Any], context: Any) -> None:
-        self.event: Dict[str, Any] = event_dict
-        self.context: Optional[Dict[str, Any]] = context
-
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        pass
-
-    def to_dict(self) -> Dict[str, Any]:
-        return self.event
-
-
-class CloudWatchEvent(BaseLambdaEvent):
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        self.version: str = event_dict['version']
-        self.account: str = event_dict['account']
-        self.region: str = event_dict['region']
-        self.detail: Dict[str, Any] = event_dict['detail']
-        self.detail_type: str = event_dict['detail-type']
-        self.source: str = event_dict['source']
-        self.time: str = event_dict['time']
-        self.event_id: str = event_dict['id']
-        self.resources: List[str] = event_dict['resources']
-
-
-class WebsocketEvent(BaseLambdaEvent):
-    def __init__(self, event_dict: Dict[str, Any], context: Any):
-        super(WebsocketEvent, self).__init__(event_dict, context)
-        self._json_body: Optional[Dict[str, Any]] = None
-
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        request_context = event_dict['requestContext']
-        self.domain_name: str = request_context['domainName']
-        self.stage: str = request_context['stage']
-        self.connection_id: str = request_context['connectionId']
-        self.body: str = str(event_dict.get('body'))
-
-    @property
-    def json_body(self) -> Dict[str, Any]:
-        if self._json_body is None:
-            try:
-                self._json_body = json.loads(self.body)
-            except ValueError:
-                raise BadRequestError('Error Parsing JSON')
-        return self._json_body
-
-
-class SNSEvent(BaseLambdaEvent):
-
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        first_record = event_dict['Records'][0]
-        self.message: str = first_record['Sns']['Message']
-        self.subject: str = first_record['Sns']['Subject']
-        self.message_attributes: Dict[str, Any] = \
-            first_record['Sns']['MessageAttributes']
-
-
-class S3Event(BaseLambdaEvent):
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        s3 = event_dict['Records'][0]['s3']
-        self.bucket: str = s3['bucket']['name']
-        self.key: str = unquote_plus(s3['object']['key'])
-
-
-class SQSEvent(BaseLambdaEvent):
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        # We don't extract anything off the top level
-        # event.
-        pass
-
-    def __iter__(self) -> Iterator['SQSRecord']:
-        for record in self._event_dict['Records']:
-            yield SQSRecord(record, self.context)
-
-
-class SQSRecord(BaseLambdaEvent):
-
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        self.body: str = event_dict['body']
-        self.receipt_handle: str = event_dict['receiptHandle']
-
-
-class KinesisEvent(BaseLambdaEvent):
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        pass
-
-    def __iter__(self) -> Iterator['KinesisRecord']:
-        for record in self._event_dict['Records']:
-            yield KinesisRecord(record, self.context)
-
-
-class KinesisRecord(BaseLambdaEvent):
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        kinesis = event_dict['kinesis']
-        encoded_payload = kinesis['data']
-        self.data: bytes = base64.b64decode(encoded_payload)
-        self.sequence_number: str = kinesis['sequenceNumber']
-        self.partition_key: str = kinesis['partitionKey']
-        self.schema_version: str = kinesis['kinesisSchemaVersion']
-        self.timestamp: datetime.datetime = datetime.datetime.utcfromtimestamp(
-            kinesis['approximateArrivalTimestamp'])
-
-
-class DynamoDBEvent(BaseLambdaEvent):
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        pass
-
-    def __iter__(self) -> Iterator['DynamoDBRecord']:
-        for record in self._event_dict['Records']:
-            yield DynamoDBRecord(record, self.context)
-
-
-class DynamoDBRecord(BaseLambdaEvent):
-
-    def _extract_attributes(self, event_dict: Dict[str, Any]) -> None:
-        dynamodb = event_dict['dynamodb']
-        self.timestamp: datetime.datetime = datetime.datetime.utcfromtimestamp(
-            dynamodb['ApproximateCreationDateTime'])
-        self.keys: Any = dynamodb.get('Keys')
-        self.new_image: Any = dynamodb.get('NewImage')
-        self.old_image: Any = dynamodb.get('OldImage')
-        self.sequence_number: str = dynamodb['SequenceNumber']
-        self.size_bytes: int = dynamodb['SizeBytes']
-        self.stream_view_type: str = dynamodb['StreamViewType']
-        # These are from the top level keys in a record.
-        self.aws_region: str = event_dict['awsRegion']
-        self.event_id: str = event_dict['eventID']
-        self.event_name: str = event_dict['eventName']
-        self.event_source_arn: str = event_dict['eventSourceARN']
-
-    @property
-    def table_name(self) -> str:
-        # Converts:
-        # "arn:aws:dynamodb:us-west-2:12345:table/MyTable/"
-        # "stream/2020-09-28T16:49:14.209"
-        #
-        # into:
-        # "MyTable"
-        parts = self.event_source_arn.split(':', 5)
-        if not len(parts) == 6:
-            return ''
-        full_name = parts[-1]
-        name_parts = full_name.split('/')
-        if len(name_parts) >= 2:
-            return name_parts[1]
-        return ''
-
-
 class Blueprint(DecoratorAPI):
     def __init__(self, import_name: str) -> None:
         self._import_name = import_name
@@ -2276,15 +2114,16 @@ class ConvertToMiddleware(object):
         return event.to_dict(), event.context
 
 
+# Maps a handler type to the name of its event class in chalice._events.
 _EVENT_CLASSES = {
-    'on_s3_event': S3Event,
-    'on_sns_message': SNSEvent,
-    'on_sqs_message': SQSEvent,
-    'on_cw_event': CloudWatchEvent,
-    'on_kinesis_record': KinesisEvent,
-    'on_dynamodb_record': DynamoDBEvent,
-    'schedule': CloudWatchEvent,
-    'lambda_function': LambdaFunctionEvent,
+    'on_s3_event': 'S3Event',
+    'on_sns_message': 'SNSEvent',
+    'on_sqs_message': 'SQSEvent',
+    'on_cw_event': 'CloudWatchEvent',
+    'on_kinesis_record': 'KinesisEvent',
+    'on_dynamodb_record': 'DynamoDBEvent',
+    'schedule': 'CloudWatchEvent',
+    'lambda_function': 'LambdaFunctionEvent',
 }
 
 
@@ -2298,3 +2137,48 @@ _MIDDLEWARE_MAPPING = {
     'schedule': 'scheduled',
     'lambda_function': 'pure_lambda',
 }
+
+
+# These names are part of chalice.app's public API but are defined in
+# modules that are only imported the first time one of them is accessed.
+_LAZY_ATTRIBUTES = {
+    'ChaliceAuthorizer': 'chalice._authorizer',
+    'AuthRequest': 'chalice._authorizer',
+    'AuthResponse': 'chalice._authorizer',
+    'AuthRoute': 'chalice._authorizer',
+    'BaseLambdaEvent': 'chalice._events',
+    'LambdaFunctionEvent': 'chalice._events',
+    'CloudWatchEvent': 'chalice._events',
+    'WebsocketEvent': 'chalice._events',
+    'SNSEvent': 'chalice._events',
+    'S3Event': 'chalice._events',
+    'SQSEvent': 'chalice._events',
+    'SQSRecord': 'chalice._events',
+    'KinesisEvent': 'chalice._events',
+    'KinesisRecord': 'chalice._events',
+    'DynamoDBEvent': 'chalice._events',
+    'DynamoDBRecord': 'chalice._events',
+    'WebsocketAPI': 'chalice._websocket',
+    'WebsocketEventSourceHandler': 'chalice._websocket',
+}
+
+
+def _get_event_class(handler_type: str) -> Any:
+    from chalice import _events
+    return getattr(_events, _EVENT_CLASSES[handler_type])
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name))
+    __import__(module_name)
+    value = getattr(sys.modules[module_name], name)
+    # Cache the value so this is only called once per name.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
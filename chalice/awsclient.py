@@ -24,8 +24,10 @@ import zipfile
 import shutil
 import json
 import re
+import threading
 import uuid
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
     Optional,
@@ -144,6 +146,12 @@ class TypedAWSClient(object):
     # creation + role propagation.
     LAMBDA_CREATE_ATTEMPTS = 30
     DELAY_TIME = 5
+    # Deployment packages larger than this are uploaded to S3 in parts
+    # of this size, with up to S3_MAX_CONCURRENCY parts uploaded at once.
+    S3_MULTIPART_CHUNKSIZE = 8 * (1024 ** 2)
+    S3_MAX_CONCURRENCY = 10
+    # The maximum number of parts in an S3 multipart upload.
+    S3_MAX_PARTS = 10000
 
     def __init__(
         self,
@@ -153,6 +161,9 @@ class TypedAWSClient(object):
         self._session = session
         self._sleep = sleep
         self._client_cache: Dict[str, Any] = {}
+        # Clients are thread safe once they're created, but creating
+        # them from a session isn't.
+        self._client_lock = threading.Lock()
         loader = create_loader('data_loader')
         endpoints = loader.load_data('endpoints')
         self._endpoint_resolver = EndpointResolver(endpoints)
@@ -356,17 +367,28 @@ class TypedAWSClient(object):
         return vpc_config
 
     def publish_layer(
-        self, layer_name: str, zip_contents: bytes, runtime: str
+        self,
+        layer_name: str,
+        zip_contents: Optional[bytes],
+        runtime: str,
+        architecture: OptStr = None,
+        s3_bucket: OptStr = None,
+        s3_key: OptStr = None,
     ) -> str:
+        kwargs: Dict[str, Any] = {
+            'LayerName': layer_name,
+            'Content': self._code_location(zip_contents, s3_bucket, s3_key),
+            'CompatibleRuntimes': [runtime],
+        }
+        if architecture is not None:
+            kwargs['CompatibleArchitectures'] = [architecture]
         try:
-            return self._client('lambda').publish_layer_version(
-                LayerName=layer_name,
-                Content={'ZipFile': zip_contents},
-                CompatibleRuntimes=[runtime],
-            )['LayerVersionArn']
+            return self._client('lambda').publish_layer_version(**kwargs)[
+                'LayerVersionArn'
+            ]
         except _REMOTE_CALL_ERRORS as e:
             context = LambdaErrorContext(
-                layer_name, 'publish_layer_version', len(zip_contents)
+                layer_name, 'publish_layer_version', len(zip_contents or b'')
             )
             raise self._get_lambda_code_deployment_error(e, context)
 
@@ -392,7 +414,7 @@ class TypedAWSClient(object):
         self,
         function_name: str,
         role_arn: str,
-        zip_contents: str,
+        zip_contents: OptStr,
         runtime: str,
         handler: str,
         environment_variables: Optional[StrMap] = None,
@@ -403,12 +425,15 @@ class TypedAWSClient(object):
         security_group_ids: OptStrList = None,
         subnet_ids: OptStrList = None,
         layers: OptStrList = None,
+        architecture: OptStr = None,
+        s3_bucket: OptStr = None,
+        s3_key: OptStr = None,
     ) -> str:
         # pylint: disable=too-many-locals
         kwargs: Dict[str, Any] = {
             'FunctionName': function_name,
             'Runtime': runtime,
-            'Code': {'ZipFile': zip_contents},
+            'Code': self._code_location(zip_contents, s3_bucket, s3_key),
             'Handler': handler,
             'Role': role_arn,
         }
@@ -429,6 +454,8 @@ class TypedAWSClient(object):
             )
         if layers is not None:
             kwargs['Layers'] = layers
+        if architecture is not None:
+            kwargs['Architectures'] = [architecture]
         arn, state = self._create_lambda_function(kwargs)
         # Avoid the GetFunctionConfiguration call unless
         # we're not immediately active.
@@ -436,6 +463,81 @@ class TypedAWSClient(object):
             self._wait_for_active(function_name)
         return arn
 
+    def _code_location(
+        self,
+        zip_contents: Union[str, bytes, None],
+        s3_bucket: OptStr,
+        s3_key: OptStr,
+    ) -> Dict[str, Any]:
+        if s3_bucket is not None and s3_key is not None:
+            return {'S3Bucket': s3_bucket, 'S3Key': s3_key}
+        return {'ZipFile': zip_contents}
+
+    def s3_object_exists(self, bucket: str, key: str) -> bool:
+        s3 = self._client('s3')
+        try:
+            s3.head_object(Bucket=bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response['Error'].get('Code') in ('404', 'NoSuchKey'):
+                return False
+            raise
+
+    def upload_deployment_package(
+        self, bucket: str, key: str, filename: str
+    ) -> str:
+        """Upload a deployment package to S3 and return its key.
+
+        Packages larger than ``S3_MULTIPART_CHUNKSIZE`` are uploaded with
+        a multipart upload.  Each part is read from the file right before
+        it's uploaded, so the whole package is never held in memory.
+
+        """
+        s3 = self._client('s3')
+        size = os.path.getsize(filename)
+        if size <= self.S3_MULTIPART_CHUNKSIZE:
+            with open(filename, 'rb') as f:
+                s3.put_object(Bucket=bucket, Key=key, Body=f.read())
+            return key
+        part_size = max(
+            self.S3_MULTIPART_CHUNKSIZE, -(-size // self.S3_MAX_PARTS)
+        )
+        upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key)[
+            'UploadId'
+        ]
+
+        def upload_part(part_number: int) -> Dict[str, Any]:
+            with open(filename, 'rb') as f:
+                f.seek((part_number - 1) * part_size)
+                body = f.read(part_size)
+            response = s3.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+            return {'ETag': response['ETag'], 'PartNumber': part_number}
+
+        part_numbers = range(1, -(-size // part_size) + 1)
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.S3_MAX_CONCURRENCY
+            ) as executor:
+                parts = list(executor.map(upload_part, part_numbers))
+            s3.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts},
+            )
+        except Exception:
+            s3.abort_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id
+            )
+            raise
+        return key
+
     def _wait_for_active(self, function_name: str) -> None:
         client = self._client('lambda')
         waiter = client.get_waiter('function_active')
@@ -594,7 +696,7 @@ class TypedAWSClient(object):
             context = LambdaErrorContext(
                 api_args['FunctionName'],
                 'create_function',
-                len(api_args['Code']['ZipFile']),
+                len(api_args['Code'].get('ZipFile') or b''),
             )
             raise self._get_lambda_code_deployment_error(e, context)
 
@@ -898,7 +1000,7 @@ class TypedAWSClient(object):
     def update_function(
         self,
         function_name: str,
-        zip_contents: str,
+        zip_contents: OptStr = None,
         environment_variables: Optional[StrMap] = None,
         runtime: OptStr = None,
         tags: Optional[StrMap] = None,
@@ -909,17 +1011,28 @@ class TypedAWSClient(object):
         subnet_ids: OptStrList = None,
         security_group_ids: OptStrList = None,
         layers: OptStrList = None,
+        architecture: OptStr = None,
+        s3_bucket: OptStr = None,
+        s3_key: OptStr = None,
     ) -> Dict[str, Any]:
         """Update a Lambda function's code and configuration.
 
         This method only updates the values provided to it. If a parameter
         is not provided, no changes will be made for that that parameter on
-        the targeted lambda function.
+        the targeted lambda function.  If neither ``zip_contents`` nor
+        ``s3_bucket`` and ``s3_key`` are provided the function's code isn't
+        updated, and the ``architecture`` isn't changed.
         """
-        return_value = self._update_function_code(
-            function_name=function_name, zip_contents=zip_contents
-        )
-        self._update_function_config(
+        return_value = None
+        if zip_contents is not None or s3_key is not None:
+            return_value = self._update_function_code(
+                function_name=function_name,
+                zip_contents=zip_contents,
+                architecture=architecture,
+                s3_bucket=s3_bucket,
+                s3_key=s3_key,
+            )
+        config_result = self._update_function_config(
             environment_variables=environment_variables,
             runtime=runtime,
             timeout=timeout,
@@ -931,21 +1044,34 @@ class TypedAWSClient(object):
             function_name=function_name,
             layers=layers,
         )
+        if return_value is None:
+            return_value = config_result
+        if return_value is None:
+            return_value = self.get_function_configuration(function_name)
         if tags is not None:
             self._update_function_tags(return_value['FunctionArn'], tags)
         return return_value
 
     def _update_function_code(
-        self, function_name: str, zip_contents: str
+        self,
+        function_name: str,
+        zip_contents: OptStr,
+        architecture: OptStr = None,
+        s3_bucket: OptStr = None,
+        s3_key: OptStr = None,
     ) -> Dict[str, Any]:
         lambda_client = self._client('lambda')
+        # The architecture can only be changed along with the code, it's
+        # not part of the function configuration.
+        kwargs: Dict[str, Any] = {'FunctionName': function_name}
+        kwargs.update(self._code_location(zip_contents, s3_bucket, s3_key))
+        if architecture is not None:
+            kwargs['Architectures'] = [architecture]
         try:
-            result = lambda_client.update_function_code(
-                FunctionName=function_name, ZipFile=zip_contents
-            )
+            result = lambda_client.update_function_code(**kwargs)
         except _REMOTE_CALL_ERRORS as e:
             context = LambdaErrorContext(
-                function_name, 'update_function_code', len(zip_contents)
+                function_name, 'update_function_code', len(zip_contents or '')
             )
             raise self._get_lambda_code_deployment_error(e, context)
         if result['LastUpdateStatus'] != 'Successful':
@@ -982,7 +1108,7 @@ class TypedAWSClient(object):
         function_name: str,
         layers: OptStrList,
         xray: Optional[bool],
-    ) -> None:
+    ) -> Optional[Dict[str, Any]]:
         kwargs: Dict[str, Any] = {}
         if environment_variables is not None:
             kwargs['Environment'] = {'Variables': environment_variables}
@@ -1003,11 +1129,12 @@ class TypedAWSClient(object):
         if layers is not None:
             kwargs['Layers'] = layers
         if kwargs:
-            self._do_update_function_config(function_name, kwargs)
+            return self._do_update_function_config(function_name, kwargs)
+        return None
 
     def _do_update_function_config(
         self, function_name: str, kwargs: Dict[str, Any]
-    ) -> None:
+    ) -> Dict[str, Any]:
         kwargs['FunctionName'] = function_name
         lambda_client = self._client('lambda')
         result = self._call_client_method_with_retries(
@@ -1017,6 +1144,7 @@ class TypedAWSClient(object):
         )
         if result['LastUpdateStatus'] != 'Successful':
             self._wait_for_function_update(function_name)
+        return result
 
     def _update_function_tags(
         self, function_arn: str, requested_tags: Dict[str, str]
@@ -1480,11 +1608,12 @@ class TypedAWSClient(object):
         response['events'] = list(self._iter_log_messages([response]))
 
     def _client(self, service_name: str) -> Any:
-        if service_name not in self._client_cache:
-            self._client_cache[service_name] = self._session.create_client(
-                service_name
-            )
-        return self._client_cache[service_name]
+        with self._client_lock:
+            if service_name not in self._client_cache:
+                self._client_cache[service_name] = (
+                    self._session.create_client(service_name)
+                )
+            return self._client_cache[service_name]
 
     def add_permission_for_authorizer(
         self,
@@ -32,10 +32,16 @@ from chalice.deploy.validate import ExperimentalFeatureError
 from chalice.utils import UI, serialize_to_json
 from chalice.constants import DEFAULT_STAGE_NAME
 from chalice.local import LocalDevServer  # noqa
+from chalice.local import LocalServerOptions
+from chalice.local import SERVER_TYPES, DEFAULT_POOL_SIZE
+from chalice.local import DEFAULT_LISTEN_BACKLOG, DEFAULT_KEEP_ALIVE_TIMEOUT
 from chalice.constants import DEFAULT_HANDLER_NAME
 from chalice.invoke import UnhandledLambdaError
 from chalice.deploy.swagger import TemplatedSwaggerGenerator
 from chalice.deploy.planner import PlanEncoder
+from chalice.deploy.packager import WheelCache
+from chalice.importprofile import ImportProfileError
+from chalice.importprofile import format_import_tree
 from chalice.deploy.appgraph import ApplicationGraphBuilder, GraphPrettyPrint
 from chalice.cli import newproj
 
@@ -107,16 +113,52 @@ def _configure_cli_env_vars():
 @click.option('--autoreload/--no-autoreload',
               default=True,
               help='Automatically restart server when code changes.')
+@click.option('--server', 'server_type', default='threaded',
+              type=click.Choice(SERVER_TYPES),
+              help=('The HTTP server to use.  "threaded" starts a thread '
+                    'per connection, "pool" uses a fixed size pool of '
+                    'worker threads, and "asyncio" reads requests in an '
+                    'event loop and runs the app in a fixed size pool of '
+                    'worker threads.'))
+@click.option('--pool-size', default=DEFAULT_POOL_SIZE, type=click.INT,
+              help=('Number of worker threads used by the "pool" and '
+                    '"asyncio" servers.'))
+@click.option('--listen-backlog', default=DEFAULT_LISTEN_BACKLOG,
+              type=click.INT,
+              help=('Number of pending connections the "pool" and '
+                    '"asyncio" servers queue before accepting them.'))
+@click.option('--keep-alive-timeout', default=DEFAULT_KEEP_ALIVE_TIMEOUT,
+              type=click.FLOAT,
+              help=('Seconds the "pool" and "asyncio" servers keep an '
+                    'idle connection open waiting for the next request.'))
+@click.option('--stats/--no-stats', default=False,
+              help='Periodically print requests/sec and p99 latency.')
 @click.pass_context
-def local(ctx, host='127.0.0.1', port=8000, stage=DEFAULT_STAGE_NAME,
-          autoreload=True):
-    # type: (click.Context, str, int, str, bool) -> None
+def local(ctx,  # type: click.Context
+          host='127.0.0.1',  # type: str
+          port=8000,  # type: int
+          stage=DEFAULT_STAGE_NAME,  # type: str
+          autoreload=True,  # type: bool
+          server_type='threaded',  # type: str
+          pool_size=DEFAULT_POOL_SIZE,  # type: int
+          listen_backlog=DEFAULT_LISTEN_BACKLOG,  # type: int
+          keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT,  # type: float
+          stats=False,  # type: bool
+          ):
+    # type: (...) -> None
     factory = ctx.obj['factory']  # type: CLIFactory
     from chalice.cli import reloader
+    options = LocalServerOptions(
+        server_type=server_type,
+        pool_size=pool_size,
+        listen_backlog=listen_backlog,
+        keep_alive_timeout=keep_alive_timeout,
+        stats=stats,
+    )
     # We don't create the server here because that will bind the
     # socket and we only want to do this in the worker process.
     server_factory = functools.partial(
-        create_local_server, factory, host, port, stage)
+        create_local_server, factory, host, port, stage, options)
     # When running `chalice local`, a stdout logger is configured
     # so you'll see the same stdout logging as you would when
     # running in lambda.  This is configuring the root logger.
@@ -133,11 +175,16 @@ def local(ctx, host='127.0.0.1', port=8000, stage=DEFAULT_STAGE_NAME,
         # recommended way to do this is to use sys.exit() directly,
         # see: https://github.com/pallets/click/issues/747
         sys.exit(rc)
-    run_local_server(factory, host, port, stage)
+    run_local_server(factory, host, port, stage, options)
 
 
-def create_local_server(factory, host, port, stage):
-    # type: (CLIFactory, str, int, str) -> LocalDevServer
+def create_local_server(factory,  # type: CLIFactory
+                        host,  # type: str
+                        port,  # type: int
+                        stage,  # type: str
+                        options=None,  # type: Optional[LocalServerOptions]
+                        ):
+    # type: (...) -> LocalDevServer
     config = factory.create_config_obj(
         chalice_stage_name=stage
     )
@@ -146,13 +193,14 @@ def create_local_server(factory, host, port, stage):
     # there is no point in testing locally.
     routes = config.chalice_app.routes
     validate_routes(routes)
-    server = factory.create_local_server(app_obj, config, host, port)
+    server = factory.create_local_server(app_obj, config, host, port,
+                                         options)
     return server
 
 
-def run_local_server(factory, host, port, stage):
-    # type: (CLIFactory, str, int, str) -> None
-    server = create_local_server(factory, host, port, stage)
+def run_local_server(factory, host, port, stage, options=None):
+    # type: (CLIFactory, str, int, str, Optional[LocalServerOptions]) -> None
+    server = create_local_server(factory, host, port, stage, options)
     server.serve_forever()
 
 
@@ -171,10 +219,13 @@ def run_local_server(factory, host, port, stage):
               type=int,
               help=('Overrides the default botocore connection '
                     'timeout.'))
+@click.option('-j', '--jobs', default=1, type=click.IntRange(min=1),
+              help=('Number of parallel jobs used to download and build '
+                    'dependencies and to compress deployment packages.'))
 @click.pass_context
 def deploy(ctx, autogen_policy, profile, api_gateway_stage, stage,
-           connection_timeout):
-    # type: (click.Context, Optional[bool], str, str, str, int) -> None
+           connection_timeout, jobs):
+    # type: (click.Context, Optional[bool], str, str, str, int, int) -> None
     factory = ctx.obj['factory']  # type: CLIFactory
     factory.profile = profile
     config = factory.create_config_obj(
@@ -186,7 +237,8 @@ def deploy(ctx, autogen_policy, profile, api_gateway_stage, stage,
     ui = UI()
     d = factory.create_default_deployer(session=session,
                                         config=config,
-                                        ui=ui)
+                                        ui=ui,
+                                        jobs=jobs)
     deployed_values = d.deploy(config, chalice_stage_name=stage)
     reporter = factory.create_deployment_reporter(ui=ui)
     reporter.display_report(deployed_values)
@@ -272,6 +324,108 @@ def appgraph(ctx, autogen_policy, profile, api_gateway_stage, stage):
     GraphPrettyPrint(ui).display_graph(graph)
 
 
+@cli.group()
+def cache():
+    # type: () -> None
+    """Inspect and prune the wheel cache.
+
+    When packaging an app, the wheels chalice downloads or builds for
+    Lambda are stored in a wheel cache so they don't need to be
+    downloaded or built again.  The cache is stored in
+    $CHALICE_WHEEL_CACHE_DIR if set, otherwise ~/.cache/chalice/wheel-cache.
+
+    """
+
+
+@cache.command('list')
+def cache_list():
+    # type: () -> None
+    """List the wheels in the wheel cache, most recently used first."""
+    wheel_cache = WheelCache.create_default()
+    click.echo('Cache directory: %s' % wheel_cache.cache_dir)
+    for entry in wheel_cache.entries():
+        click.echo('%s==%s (%s, %s)  %s  %s bytes' % (
+            entry.name, entry.version, entry.abi, entry.platform,
+            entry.filename, entry.size))
+    click.echo('Total size: %s bytes' % wheel_cache.total_size())
+
+
+@cache.command('prune')
+@click.option('--max-size', type=click.INT, default=None,
+              help=('Remove the least recently used wheels until the '
+                    'cache is no larger than this many bytes.  Defaults '
+                    'to the maximum size of the cache.'))
+@click.option('--all', 'remove_all', is_flag=True, default=False,
+              help='Remove every wheel from the cache.')
+def cache_prune(max_size, remove_all):
+    # type: (Optional[int], bool) -> None
+    """Remove wheels from the wheel cache."""
+    wheel_cache = WheelCache.create_default()
+    if remove_all:
+        max_size = 0
+    removed = wheel_cache.prune(max_size)
+    for entry in removed:
+        click.echo('Removed %s==%s (%s, %s)' % (
+            entry.name, entry.version, entry.abi, entry.platform))
+    click.echo('Total size: %s bytes' % wheel_cache.total_size())
+
+
+@cli.command('profile-imports')
+@click.option('--stage', default=DEFAULT_STAGE_NAME,
+              help=('Name of the Chalice stage whose environment variables '
+                    'are set while importing the app.'))
+@click.option('--min-time', default=1.0, type=click.FLOAT,
+              help=('Leave out imports that took less than this many '
+                    'milliseconds.'))
+@click.option('-o', '--output', default=None, type=click.Path(),
+              help='Write the profile to this file.')
+@click.option('--output-format', default='speedscope',
+              type=click.Choice(['json', 'speedscope']),
+              help=('The format of the --output file.  speedscope files '
+                    'can be viewed at https://www.speedscope.app.'))
+@click.option('--budget', default=None, type=click.FLOAT,
+              help=('Exit with a non zero return code if importing the app '
+                    'takes longer than this many milliseconds.'))
+@click.pass_context
+def profile_imports(ctx,  # type: click.Context
+                    stage,  # type: str
+                    min_time,  # type: float
+                    output,  # type: Optional[str]
+                    output_format,  # type: str
+                    budget,  # type: Optional[float]
+                    ):
+    # type: (...) -> None
+    """Profile how long it takes to import your app.
+
+    Your app.py is imported in a new python process the same way it's
+    imported in Lambda, with the time taken to import each module printed
+    as a tree, slowest imports first.
+    """
+    factory = ctx.obj['factory']  # type: CLIFactory
+    profiler = factory.create_import_profiler(stage)
+    try:
+        profile = profiler.profile()
+    except ImportProfileError as e:
+        err = click.ClickException(str(e))
+        err.exit_code = 1
+        raise err
+    click.echo(format_import_tree(profile, int(min_time * 1000)), nl=False)
+    if output is not None:
+        if output_format == 'json':
+            contents = profile.to_json()
+        else:
+            contents = profile.to_speedscope()
+        with open(output, 'w') as f:
+            f.write(serialize_to_json(contents))
+    total_ms = profile.total_us / 1000.0
+    if budget is not None and total_ms > budget:
+        err = click.ClickException(
+            "Importing the app took %.2f ms, which is over the budget of "
+            "%.2f ms." % (total_ms, budget))
+        err.exit_code = 1
+        raise err
+
+
 @cli.command('invoke')
 @click.option('-n', '--name', metavar='NAME', required=True,
               help=('The name of the function to invoke. '
@@ -522,11 +676,14 @@ def generate_models(ctx, stage):
               help=('Specify if the generated template should be serialized '
                     'as either JSON or YAML.  CloudFormation only.'))
 @click.option('--profile', help='Override profile at packaging time.')
+@click.option('-j', '--jobs', default=1, type=click.IntRange(min=1),
+              help=('Number of parallel jobs used to download and build '
+                    'dependencies and to compress deployment packages.'))
 @click.argument('out')
 @click.pass_context
 def package(ctx, single_file, stage, merge_template,
-            out, pkg_format, template_format, profile):
-    # type: (click.Context, bool, str, str, str, str, str, str) -> None
+            out, pkg_format, template_format, profile, jobs):
+    # type: (click.Context, bool, str, str, str, str, str, str, int) -> None
     factory = ctx.obj['factory']  # type: CLIFactory
     factory.profile = profile
     config = factory.create_config_obj(stage)
@@ -534,7 +691,8 @@ def package(ctx, single_file, stage, merge_template,
     packager = factory.create_app_packager(config, options,
                                            pkg_format,
                                            template_format,
-                                           merge_template)
+                                           merge_template,
+                                           jobs=jobs)
     if pkg_format == 'terraform' and (merge_template or
                                       single_file or
                                       template_format != 'json'):
@@ -549,7 +707,7 @@ def package(ctx, single_file, stage, merge_template,
         dirname = tempfile.mkdtemp()
         try:
             packager.package_app(config, dirname, stage)
-            create_zip_file(source_dir=dirname, outfile=out)
+            create_zip_file(source_dir=dirname, outfile=out, jobs=jobs)
         finally:
             shutil.rmtree(dirname)
     else:
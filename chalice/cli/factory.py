@@ -9,7 +9,8 @@ import functools
 import click
 from botocore.config import Config as BotocoreConfig
 from botocore.session import Session
-from typing import Any, Optional, Dict, MutableMapping, cast  # noqa
+from typing import Any, Optional, Dict, List, MutableMapping, Tuple  # noqa
+from typing import cast  # noqa
 
 from chalice import __version__ as chalice_version
 from chalice.awsclient import TypedAWSClient
@@ -33,6 +34,8 @@ from chalice.deploy import validate
 from chalice.invoke import LambdaInvokeHandler
 from chalice.invoke import LambdaInvoker
 from chalice.invoke import LambdaResponseFormatter
+from chalice.importprofile import ImportProfiler
+from chalice.utils import OSUtils
 
 
 OptStr = Optional[str]
@@ -138,9 +141,9 @@ class CLIFactory(object):
         )
 
     def create_default_deployer(
-        self, session: Session, config: Config, ui: UI
+        self, session: Session, config: Config, ui: UI, jobs: int = 1
     ) -> deployer.Deployer:
-        return deployer.create_default_deployer(session, config, ui)
+        return deployer.create_default_deployer(session, config, ui, jobs)
 
     def create_plan_only_deployer(
         self, session: Session, config: Config, ui: UI
@@ -218,6 +221,7 @@ class CLIFactory(object):
         package_format: str,
         template_format: str,
         merge_template: OptStr = None,
+        jobs: int = 1,
     ) -> AppPackager:
         return create_app_packager(
             config,
@@ -225,6 +229,7 @@ class CLIFactory(object):
             package_format,
             template_format,
             merge_template=merge_template,
+            jobs=jobs,
         )
 
     def create_log_retriever(
@@ -287,8 +292,39 @@ class CLIFactory(object):
     ) -> Chalice:
         # validate_features indicates that we should validate that
         # any expiremental features used have the appropriate feature flags.
-        if self.project_dir not in sys.path:
-            sys.path.insert(0, self.project_dir)
+        prepend, append = self.get_app_sys_path()
+        for path in prepend:
+            if path not in sys.path:
+                sys.path.insert(0, path)
+        for path in append:
+            if path not in sys.path:
+                sys.path.append(path)
+        if environment_variables is not None:
+            self._environ.update(environment_variables)
+        try:
+            app = importlib.import_module('app')
+            chalice_app = getattr(app, 'app')
+        except SyntaxError as e:
+            message = (
+                'Unable to import your app.py file:\n\n'
+                'File "%s", line %s\n'
+                '  %s\n'
+                'SyntaxError: %s'
+            ) % (getattr(e, 'filename'), e.lineno, e.text, e.msg)
+            raise RuntimeError(message)
+        if validate_feature_flags:
+            validate.validate_feature_flags(chalice_app)
+        return chalice_app
+
+    def get_app_sys_path(self) -> Tuple[List[str], List[str]]:
+        """Return the paths needed on sys.path to import the app.
+
+        :return: A tuple of the paths to insert at the start of sys.path
+            and the paths to add to the end of sys.path.
+
+        """
+        prepend = [self.project_dir]
+        append = []
         # The vendor directory has its contents copied up to the top level of
         # the deployment package. This means that imports will work in the
         # lambda function as if the vendor directory is on the python path.
@@ -296,7 +332,7 @@ class CLIFactory(object):
         # the path so it will be treated the same as if it were running on
         # lambda.
         vendor_dir = os.path.join(self.project_dir, 'vendor')
-        if os.path.isdir(vendor_dir) and vendor_dir not in sys.path:
+        if os.path.isdir(vendor_dir):
             # This is a tradeoff we have to make for local use.
             # The common use case of vendor/ is to include
             # extension modules built for AWS Lambda.  If you're
@@ -307,23 +343,17 @@ class CLIFactory(object):
             # This gives you a change to install the correct
             # version locally and still keep the lambda
             # specific one in vendor/
-            sys.path.append(vendor_dir)
-        if environment_variables is not None:
-            self._environ.update(environment_variables)
-        try:
-            app = importlib.import_module('app')
-            chalice_app = getattr(app, 'app')
-        except SyntaxError as e:
-            message = (
-                'Unable to import your app.py file:\n\n'
-                'File "%s", line %s\n'
-                '  %s\n'
-                'SyntaxError: %s'
-            ) % (getattr(e, 'filename'), e.lineno, e.text, e.msg)
-            raise RuntimeError(message)
-        if validate_feature_flags:
-            validate.validate_feature_flags(chalice_app)
-        return chalice_app
+            append.append(vendor_dir)
+        return prepend, append
+
+    def create_import_profiler(
+        self, stage: str = DEFAULT_STAGE_NAME
+    ) -> ImportProfiler:
+        config = self.create_config_obj(stage)
+        environ = dict(self._environ)
+        environ.update(config.environment_variables)
+        prepend, append = self.get_app_sys_path()
+        return ImportProfiler(OSUtils(), prepend, append, environ)
 
     def load_project_config(self) -> Dict[str, Any]:
         """Load the chalice config file from the project directory.
@@ -336,9 +366,11 @@ class CLIFactory(object):
             return json.loads(f.read())
 
     def create_local_server(
-        self, app_obj: Chalice, config: Config, host: str, port: int
+        self, app_obj: Chalice, config: Config, host: str, port: int,
+        options: Optional[local.LocalServerOptions] = None,
     ) -> local.LocalDevServer:
-        return local.create_local_server(app_obj, config, host, port)
+        return local.create_local_server(app_obj, config, host, port,
+                                         options)
 
     def create_package_options(self) -> PackageOptions:
         """Create the package options that are required to target regions."""
@@ -8,6 +8,8 @@ from chalice import __version__ as current_chalice_version
 from chalice.app import Chalice  # noqa
 from chalice.constants import DEFAULT_STAGE_NAME
 from chalice.constants import DEFAULT_HANDLER_NAME
+from chalice.constants import DEFAULT_PROJECT_HASH_ALGORITHM
+from chalice.constants import DEFAULT_LAMBDA_ARCHITECTURE
 
 
 StrMap = Dict[str, Any]
@@ -282,6 +284,75 @@ class Config(object):
             return False
         return v
 
+    @property
+    def store_compressed_files(self) -> bool:
+        v = self._chain_lookup('store_compressed_files',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return False
+        return v
+
+    @property
+    def project_hash_algorithm(self) -> str:
+        v = self._chain_lookup('project_hash_algorithm',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return DEFAULT_PROJECT_HASH_ALGORITHM
+        return v
+
+    @property
+    def architecture(self) -> str:
+        v = self._chain_lookup('architecture',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return DEFAULT_LAMBDA_ARCHITECTURE
+        return v
+
+    @property
+    def deployment_bucket(self) -> Optional[str]:
+        return self._chain_lookup('deployment_bucket',
+                                  varies_per_chalice_stage=True,
+                                  varies_per_function=False)
+
+    @property
+    def precompile_bytecode(self) -> bool:
+        v = self._chain_lookup('precompile_bytecode',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return False
+        return v
+
+    @property
+    def slim_package(self) -> bool:
+        v = self._chain_lookup('slim_package',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return False
+        return v
+
+    @property
+    def slim_package_exclude(self) -> List[str]:
+        v = self._chain_lookup('slim_package_exclude',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return []
+        return v
+
+    @property
+    def slim_package_keep(self) -> List[str]:
+        v = self._chain_lookup('slim_package_keep',
+                               varies_per_chalice_stage=True,
+                               varies_per_function=False)
+        if v is None:
+            return []
+        return v
+
     @property
     def iam_role_arn(self) -> str:
         return self._chain_lookup('iam_role_arn',
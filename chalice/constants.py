@@ -40,6 +40,7 @@ def index():
 
 GITIGNORE = """\
 .chalice/deployments/
+.chalice/cache/
 .chalice/venv/
 """
 
@@ -59,6 +60,22 @@ DEFAULT_HANDLER_NAME = 'api_handler'
 MIN_COMPRESSION_SIZE = 0
 MAX_COMPRESSION_SIZE = 10485760
 
+# The wheel cache used when building deployment packages evicts the
+# least recently used wheels once it grows beyond this size.
+DEFAULT_WHEEL_CACHE_MAX_SIZE = 1024 ** 3
+
+# Hash algorithms that can be used to hash the project files that
+# determine the name of a deployment package.  Both produce 128 bit
+# digests, blake2b is faster on 64 bit platforms.
+PROJECT_HASH_ALGORITHMS = ('md5', 'blake2b')
+DEFAULT_PROJECT_HASH_ALGORITHM = 'md5'
+
+# The instruction set architectures lambda functions can run on.  The
+# python dependencies in the deployment package are built for the
+# configured architecture.
+LAMBDA_ARCHITECTURES = ('x86_64', 'arm64')
+DEFAULT_LAMBDA_ARCHITECTURE = 'x86_64'
+
 LAMBDA_TRUST_POLICY = {
     "Version": "2012-10-17",
     "Statement": [{
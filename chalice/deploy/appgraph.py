@@ -25,7 +25,9 @@ class ApplicationGraphBuilder(object):
 
     def build(self, config: Config, stage_name: str) -> models.Application:
         resources: List[models.Model] = []
-        deployment = models.DeploymentPackage(models.Placeholder.BUILD_STAGE)
+        deployment = models.DeploymentPackage(
+            models.Placeholder.BUILD_STAGE, bucket=config.deployment_bucket
+        )
         for function in config.chalice_app.pure_lambda_functions:
             resource = self._create_lambda_model(
                 config=config,
@@ -449,8 +451,10 @@ class ApplicationGraphBuilder(object):
                 % (config.app_name, config.chalice_stage, 'managed-layer'),
                 runtime=config.lambda_python_version,
                 deployment_package=models.DeploymentPackage(
-                    models.Placeholder.BUILD_STAGE
+                    models.Placeholder.BUILD_STAGE,
+                    bucket=config.deployment_bucket,
                 ),
+                architecture=config.architecture,
             )
         return self._managed_layer
 
@@ -575,6 +579,7 @@ class ApplicationGraphBuilder(object):
             layers=lambda_layers,
             managed_layer=self._get_managed_lambda_layer(config),
             xray=config.xray_enabled,
+            architecture=config.architecture,
         )
         self._inject_role_traits(function, role)
         return function
@@ -728,24 +733,24 @@ class DependencyBuilder(object):
     def build_dependencies(self, graph: models.Model) -> List[models.Model]:
         seen: Set[int] = set()
         ordered: List[models.Model] = []
+        ordered_ids: Set[int] = set()
         for resource in graph.dependencies():
-            self._traverse(resource, ordered, seen)
+            self._traverse(resource, ordered, ordered_ids, seen)
         return ordered
 
     def _traverse(
         self,
         resource: models.Model,
         ordered: List[models.Model],
+        ordered_ids: Set[int],
         seen: Set[int],
     ) -> None:
         for dep in resource.dependencies():
             if id(dep) not in seen:
                 seen.add(id(dep))
-                self._traverse(dep, ordered, seen)
-        # If recreating this list is a perf issue later on,
-        # we can create yet-another set of ids that gets updated
-        # when we add a resource to the ordered list.
-        if id(resource) not in [id(r) for r in ordered]:
+                self._traverse(dep, ordered, ordered_ids, seen)
+        if id(resource) not in ordered_ids:
+            ordered_ids.add(id(resource))
             ordered.append(resource)
 
 
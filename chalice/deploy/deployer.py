@@ -72,7 +72,9 @@ executes them.  It also manages taking the output of API calls and storing them
 in variables so they can be referenced in subsequent ``APICall`` objects (see
 the ``Variable`` class to see how this is used).  For example, if a lambda
 function needs the ``role_arn`` that's the result of a previous ``create_role``
-API call, a ``Variable`` object is used to forward this information.
+API call, a ``Variable`` object is used to forward this information.  API
+calls for different resources are made concurrently unless one of them
+references a variable set by the other.
 
 The executor also records these variables with their associated resources so a
 ``deployed.json`` file can be written to disk afterwards.  An ``APICall``
@@ -116,11 +118,15 @@ from chalice.deploy.executor import DisplayOnlyExecutor
 from chalice.deploy.packager import PipRunner
 from chalice.deploy.packager import SubprocessPip
 from chalice.deploy.packager import DependencyBuilder as PipDependencyBuilder
+from chalice.deploy.packager import WheelCache
+from chalice.deploy.packager import wheel_cache_enabled
 from chalice.deploy.packager import LambdaDeploymentPackager
 from chalice.deploy.packager import AppOnlyDeploymentPackager
 from chalice.deploy.packager import LayerDeploymentPackager
 from chalice.deploy.packager import BaseLambdaDeploymentPackager  # noqa
 from chalice.deploy.packager import EmptyPackageError
+from chalice.deploy.packager import PackageSlimmer
+from chalice.deploy.packager import BytecodeCompiler
 from chalice.deploy.planner import PlanStage
 from chalice.deploy.planner import RemoteState
 from chalice.deploy.planner import NoopPlanner
@@ -256,9 +262,10 @@ def create_plan_only_deployer(session, config, ui):
                             NoopResultsRecorder)
 
 
-def create_default_deployer(session, config, ui):
-    # type: (Session, Config, UI) -> Deployer
-    return _create_deployer(session, config, ui, Executor, ResultsRecorder)
+def create_default_deployer(session, config, ui, jobs=1):
+    # type: (Session, Config, UI, int) -> Deployer
+    return _create_deployer(session, config, ui, Executor, ResultsRecorder,
+                            jobs=jobs)
 
 
 def _create_deployer(session,       # type: Session
@@ -266,6 +273,7 @@ def _create_deployer(session,       # type: Session
                      ui,            # type: UI
                      executor_cls,  # type: Type[BaseExecutor]
                      recorder_cls,  # type: Type[ResultsRecorder]
+                     jobs=1,        # type: int
                      ):
     # type: (...) -> Deployer
     client = TypedAWSClient(session)
@@ -274,7 +282,7 @@ def _create_deployer(session,       # type: Session
         application_builder=ApplicationGraphBuilder(),
         deps_builder=DependencyBuilder(),
         build_stage=create_build_stage(
-            osutils, UI(), TemplatedSwaggerGenerator(), config
+            osutils, UI(), TemplatedSwaggerGenerator(), config, jobs=jobs
         ),
         plan_stage=PlanStage(
             osutils=osutils, remote_state=RemoteState(
@@ -286,14 +294,30 @@ def _create_deployer(session,       # type: Session
     )
 
 
-def create_build_stage(osutils, ui, swagger_gen, config):
-    # type: (OSUtils, UI, SwaggerGenerator, Config) -> BuildStage
+def create_build_stage(osutils, ui, swagger_gen, config, jobs=1):
+    # type: (OSUtils, UI, SwaggerGenerator, Config, int) -> BuildStage
     pip_runner = PipRunner(pip=SubprocessPip(osutils=osutils),
-                           osutils=osutils)
+                           osutils=osutils, jobs=jobs)
+    wheel_cache = None  # type: Optional[WheelCache]
+    if wheel_cache_enabled(osutils.environ()):
+        wheel_cache = WheelCache.create_default(osutils)
     dependency_builder = PipDependencyBuilder(
         osutils=osutils,
-        pip_runner=pip_runner
+        pip_runner=pip_runner,
+        wheel_cache=wheel_cache,
+        architecture=config.architecture,
     )
+    slimmer = None  # type: Optional[PackageSlimmer]
+    if config.slim_package:
+        slimmer = PackageSlimmer(
+            osutils,
+            exclude=config.slim_package_exclude,
+            keep=config.slim_package_keep,
+        )
+    bytecode_compiler = None  # type: Optional[BytecodeCompiler]
+    if config.precompile_bytecode:
+        bytecode_compiler = BytecodeCompiler(
+            osutils, ui, config.lambda_python_version)
     deployment_packager = cast(BaseDeployStep, None)
     if config.automatic_layer:
         deployment_packager = ManagedLayerDeploymentPackager(
@@ -301,11 +325,21 @@ def create_build_stage(osutils, ui, swagger_gen, config):
                 osutils=osutils,
                 dependency_builder=dependency_builder,
                 ui=ui,
+                jobs=jobs,
+                store_compressed=config.store_compressed_files,
+                hash_algorithm=config.project_hash_algorithm,
+                bytecode_compiler=bytecode_compiler,
             ),
             layer_packager=LayerDeploymentPackager(
                 osutils=osutils,
                 dependency_builder=dependency_builder,
                 ui=ui,
+                jobs=jobs,
+                store_compressed=config.store_compressed_files,
+                hash_algorithm=config.project_hash_algorithm,
+                slimmer=slimmer,
+                bytecode_compiler=bytecode_compiler,
+                architecture=config.architecture,
             )
         )
     else:
@@ -314,6 +348,12 @@ def create_build_stage(osutils, ui, swagger_gen, config):
                 osutils=osutils,
                 dependency_builder=dependency_builder,
                 ui=ui,
+                jobs=jobs,
+                store_compressed=config.store_compressed_files,
+                hash_algorithm=config.project_hash_algorithm,
+                slimmer=slimmer,
+                bytecode_compiler=bytecode_compiler,
+                architecture=config.architecture,
             )
         )
     build_stage = BuildStage(
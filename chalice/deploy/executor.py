@@ -1,9 +1,13 @@
 import re
+import bisect
+import heapq
 import pprint
+from concurrent.futures import Future  # noqa
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import asdict, is_dataclass
 
 import jmespath
-from typing import Dict, List, Any  # noqa
+from typing import Dict, List, Any, Optional, Set  # noqa
 
 from chalice.deploy import models # noqa
 from chalice.awsclient import TypedAWSClient  # noqa
@@ -23,72 +27,179 @@ class BaseExecutor(object):
 
 
 class Executor(BaseExecutor):
-    def __init__(self, client, ui):
-        # type: (TypedAWSClient, UI) -> None
+    """Execute a plan, running independent API calls concurrently.
+
+    An ``APICall`` is started as soon as the instructions it depends on
+    have finished, see ``InstructionGraph``.  Up to ``max_workers`` API
+    calls are made at the same time, the other instructions are cheap
+    and run on the calling thread.  Plan messages are written and
+    resources are recorded in the order of the plan regardless of the
+    order the instructions finish in.
+
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+
+    def __init__(self, client, ui, max_workers=DEFAULT_MAX_WORKERS):
+        # type: (TypedAWSClient, UI, int) -> None
         super(Executor, self).__init__(client, ui)
         # A mapping of variables that's populated as API calls
         # are made.  These can be used in subsequent API calls.
         self.variables = {}  # type: Dict[str, Any]
         self._resource_value_index = {}  # type: Dict[str, Any]
+        # The position in the plan each recorded resource was first
+        # recorded at, in the same order as self.resource_values.
+        self._resource_value_positions = []  # type: List[int]
+        self._resource_positions = {}  # type: Dict[str, int]
+        self._position_offset = 0
         self._variable_resolver = VariableResolver()
+        self._max_workers = max_workers
 
     def execute(self, plan):
         # type: (models.Plan) -> None
-        messages = plan.messages
-        for instruction in plan.instructions:
-            message = messages.get(id(instruction))
+        self._set_resource_positions(plan.instructions)
+        state = _ExecutionState(plan)
+        try:
+            with ThreadPoolExecutor(
+                    max_workers=self._max_workers) as thread_pool:
+                while True:
+                    self._start_ready_instructions(state, thread_pool)
+                    self._write_started_messages(state)
+                    if not state.in_flight:
+                        break
+                    done, _ = wait(state.in_flight,
+                                   return_when=FIRST_COMPLETED)
+                    self._finish_api_calls(state, done)
+        finally:
+            for index in sorted(state.outputs):
+                self.variables.update(state.outputs[index])
+            self._position_offset += len(plan.instructions)
+        if state.errors:
+            raise state.errors[min(state.errors)]
+
+    def _start_ready_instructions(self, state, thread_pool):
+        # type: (_ExecutionState, ThreadPoolExecutor) -> None
+        # Nothing new is started once an instruction has failed.
+        while state.ready and not state.errors:
+            index = state.ready[0]
+            instruction = state.instructions[index]
+            is_api_call = isinstance(instruction, models.APICall)
+            if is_api_call and len(state.in_flight) >= self._max_workers:
+                return
+            heapq.heappop(state.ready)
+            state.started[index] = True
+            variables = self._variables_for(
+                state.graph.bindings[index], state.outputs)
+            if is_api_call:
+                future = thread_pool.submit(
+                    self._run_instruction, instruction, variables)
+                state.in_flight[future] = index
+                continue
+            try:
+                self._run_instruction(instruction, variables)
+            except Exception as e:
+                state.errors[index] = e
+            else:
+                state.finish(index, variables)
+
+    def _write_started_messages(self, state):
+        # type: (_ExecutionState) -> None
+        instructions = state.instructions
+        while (state.next_message < len(instructions) and
+               state.started[state.next_message]):
+            message = state.plan.messages.get(
+                id(instructions[state.next_message]))
             if message is not None:
                 self._ui.write(message)
-            getattr(self, '_do_%s' % instruction.__class__.__name__.lower(),
-                    self._default_handler)(instruction)
+            state.next_message += 1
 
-    def _default_handler(self, instruction):
-        # type: (models.Instruction) -> None
+    def _finish_api_calls(self, state, done):
+        # type: (_ExecutionState, Set[Future]) -> None
+        for future in done:
+            index = state.in_flight.pop(future)
+            try:
+                state.finish(index, future.result())
+            except Exception as e:
+                state.errors[index] = e
+
+    def _variables_for(self,
+                       bindings,  # type: Dict[str, Optional[int]]
+                       outputs,   # type: Dict[int, Dict[str, Any]]
+                       ):
+        # type: (...) -> Dict[str, Any]
+        # Each instruction sees the value of a variable set by the last
+        # instruction before it in the plan, just like when the plan is
+        # executed one instruction at a time.
+        variables = {}  # type: Dict[str, Any]
+        for name, index in bindings.items():
+            if index is not None:
+                variables[name] = outputs[index][name]
+            elif name in self.variables:
+                variables[name] = self.variables[name]
+        return variables
+
+    def _run_instruction(self, instruction, variables):
+        # type: (models.Instruction, Dict[str, Any]) -> Dict[str, Any]
+        getattr(self, '_do_%s' % instruction.__class__.__name__.lower(),
+                self._default_handler)(instruction, variables)
+        return variables
+
+    def _set_resource_positions(self, instructions):
+        # type: (List[models.Instruction]) -> None
+        for i, instruction in enumerate(instructions):
+            if isinstance(instruction, models.RecordResource):
+                self._resource_positions.setdefault(
+                    instruction.resource_name, self._position_offset + i)
+
+    def _default_handler(self, instruction, variables):
+        # type: (models.Instruction, Dict[str, Any]) -> None
         raise RuntimeError("Deployment executor encountered an "
                            "unknown instruction: %s"
                            % instruction.__class__.__name__)
 
-    def _do_apicall(self, instruction):
-        # type: (models.APICall) -> None
-        final_kwargs = self._resolve_variables(instruction)
+    def _do_apicall(self, instruction, variables):
+        # type: (models.APICall, Dict[str, Any]) -> None
+        final_kwargs = self._resolve_variables(instruction, variables)
         method = getattr(self._client, instruction.method_name)
         result = method(**final_kwargs)
         if instruction.output_var is not None:
-            self.variables[instruction.output_var] = result
+            variables[instruction.output_var] = result
 
-    def _do_copyvariable(self, instruction):
-        # type: (models.CopyVariable) -> None
+    def _do_copyvariable(self, instruction, variables):
+        # type: (models.CopyVariable, Dict[str, Any]) -> None
         to_var = instruction.to_var
         from_var = instruction.from_var
-        self.variables[to_var] = self.variables[from_var]
+        variables[to_var] = variables[from_var]
 
-    def _do_storevalue(self, instruction):
-        # type: (models.StoreValue) -> None
+    def _do_storevalue(self, instruction, variables):
+        # type: (models.StoreValue, Dict[str, Any]) -> None
         result = self._variable_resolver.resolve_variables(
-            instruction.value, self.variables)
-        self.variables[instruction.name] = result
+            instruction.value, variables)
+        variables[instruction.name] = result
 
-    def _do_storemultiplevalue(self, instruction):
-        # type: (models.StoreValue) -> None
+    def _do_storemultiplevalue(self, instruction, variables):
+        # type: (models.StoreValue, Dict[str, Any]) -> None
         result = self._variable_resolver.resolve_variables(
-            instruction.value, self.variables)
-        data = self.variables.get(instruction.name)
+            instruction.value, variables)
+        data = variables.get(instruction.name)
         if data and isinstance(data, list):
-            self.variables[instruction.name].extend(result)
+            # A new list is created instead of extending the existing
+            # one, which instructions running concurrently may be using.
+            variables[instruction.name] = data + result
         else:
-            self.variables[instruction.name] = result
+            variables[instruction.name] = result
 
-    def _do_recordresourcevariable(self, instruction):
-        # type: (models.RecordResourceVariable) -> None
+    def _do_recordresourcevariable(self, instruction, variables):
+        # type: (models.RecordResourceVariable, Dict[str, Any]) -> None
         payload = {
             'name': instruction.resource_name,
             'resource_type': instruction.resource_type,
-            instruction.name: self.variables[instruction.variable_name],
+            instruction.name: variables[instruction.variable_name],
         }
         self._add_to_deployed_values(payload)
 
-    def _do_recordresourcevalue(self, instruction):
-        # type: (models.RecordResourceValue) -> None
+    def _do_recordresourcevalue(self, instruction, variables):
+        # type: (models.RecordResourceValue, Dict[str, Any]) -> None
         payload = {
             'name': instruction.resource_name,
             'resource_type': instruction.resource_type,
@@ -101,25 +212,31 @@ class Executor(BaseExecutor):
         key = payload['name']
         if key not in self._resource_value_index:
             self._resource_value_index[key] = payload
-            self.resource_values.append(payload)
+            # Resources are kept in the order they're first recorded in
+            # the plan, which isn't always the order they finish in.
+            position = self._resource_positions.get(
+                key, self._position_offset)
+            index = bisect.bisect(self._resource_value_positions, position)
+            self._resource_value_positions.insert(index, position)
+            self.resource_values.insert(index, payload)
         else:
             # If the key already exists, we merge the new payload
             # with the existing payload.
             self._resource_value_index[key].update(payload)
 
-    def _do_jpsearch(self, instruction):
-        # type: (models.JPSearch) -> None
-        v = self.variables[instruction.input_var]
+    def _do_jpsearch(self, instruction, variables):
+        # type: (models.JPSearch, Dict[str, Any]) -> None
+        v = variables[instruction.input_var]
         result = jmespath.search(instruction.expression, v)
-        self.variables[instruction.output_var] = result
+        variables[instruction.output_var] = result
 
-    def _do_builtinfunction(self, instruction):
-        # type: (models.BuiltinFunction) -> None
+    def _do_builtinfunction(self, instruction, variables):
+        # type: (models.BuiltinFunction, Dict[str, Any]) -> None
         # Split this out to a separate class of built in functions
         # once we add more functions.
         if instruction.function_name == 'parse_arn':
             resolved_args = self._variable_resolver.resolve_variables(
-                instruction.args, self.variables)
+                instruction.args, variables)
             value = resolved_args[0]
             parts = value.split(':')
             result = {
@@ -130,7 +247,7 @@ class Executor(BaseExecutor):
                 'dns_suffix': self._client.endpoint_dns_suffix(parts[2],
                                                                parts[3])
             }
-            self.variables[instruction.output_var] = result
+            variables[instruction.output_var] = result
         elif instruction.function_name == 'interrogate_profile':
             region = self._client.region_name
             result = {
@@ -139,10 +256,10 @@ class Executor(BaseExecutor):
                 'dns_suffix': self._client.endpoint_dns_suffix('apigateway',
                                                                region)
             }
-            self.variables[instruction.output_var] = result
+            variables[instruction.output_var] = result
         elif instruction.function_name == 'service_principal':
             resolved_args = self._variable_resolver.resolve_variables(
-                instruction.args, self.variables)
+                instruction.args, variables)
             service_name = resolved_args[0]
             region_name = self._client.region_name
             dns_suffix = self._client.endpoint_dns_suffix(service_name,
@@ -152,21 +269,191 @@ class Executor(BaseExecutor):
                                                             region_name,
                                                             dns_suffix)
             }
-            self.variables[instruction.output_var] = result
+            variables[instruction.output_var] = result
         else:
             raise ValueError("Unknown builtin function: %s"
                              % instruction.function_name)
 
-    def _resolve_variables(self, api_call):
-        # type: (models.APICall) -> Dict[str, Any]
+    def _resolve_variables(self, api_call, variables):
+        # type: (models.APICall, Dict[str, Any]) -> Dict[str, Any]
         try:
             return self._variable_resolver.resolve_variables(
-                api_call.params, self.variables)
+                api_call.params, variables)
         except UnresolvedValueError as e:
             e.method_name = api_call.method_name
             raise
 
 
+class _ExecutionState(object):
+    def __init__(self, plan):
+        # type: (models.Plan) -> None
+        self.plan = plan
+        self.instructions = plan.instructions
+        self.graph = InstructionGraph(plan)
+        self.remaining = [len(deps) for deps in self.graph.dependencies]
+        # Instruction indices that can be started, lowest first.
+        self.ready = [
+            i for i, count in enumerate(self.remaining) if count == 0]
+        self.started = [False] * len(self.instructions)
+        # The variables set by each finished instruction, by index.
+        self.outputs = {}  # type: Dict[int, Dict[str, Any]]
+        self.errors = {}  # type: Dict[int, Exception]
+        self.in_flight = {}  # type: Dict[Future, int]
+        self.next_message = 0
+
+    def finish(self, index, variables):
+        # type: (int, Dict[str, Any]) -> None
+        self.outputs[index] = {
+            name: variables[name] for name in self.graph.writes[index]
+            if name in variables
+        }
+        for dependent in self.graph.dependents[index]:
+            self.remaining[dependent] -= 1
+            if self.remaining[dependent] == 0:
+                heapq.heappush(self.ready, dependent)
+
+
+class InstructionGraph(object):
+    """The dependencies between the instructions in a plan.
+
+    An instruction depends on the instructions that set the variables
+    it references, and on the instruction before it in the same group
+    of the plan.  Instructions without a group depend on every
+    instruction before them, and every instruction after them depends
+    on them.
+
+    The variables an instruction references are bound to the last
+    instruction before it in the plan that sets them, so instructions
+    that reuse a variable name don't need to wait on each other.
+
+    """
+
+    def __init__(self, plan):
+        # type: (models.Plan) -> None
+        count = len(plan.instructions)
+        self.dependencies = [
+            set() for _ in range(count)]  # type: List[Set[int]]
+        self.dependents = [[] for _ in range(count)]  # type: List[List[int]]
+        self.bindings = []  # type: List[Dict[str, Optional[int]]]
+        self.writes = []  # type: List[List[str]]
+        self._build(plan)
+
+    def _build(self, plan):
+        # type: (models.Plan) -> None
+        last_writer = {}  # type: Dict[str, int]
+        ordering = _PlanOrdering(plan)
+        for i, instruction in enumerate(plan.instructions):
+            deps = self.dependencies[i]
+            bindings = {}  # type: Dict[str, Optional[int]]
+            for name in self._reads(instruction):
+                bindings[name] = last_writer.get(name)
+                if name in last_writer:
+                    deps.add(last_writer[name])
+            self.bindings.append(bindings)
+            deps.update(ordering.group_dependencies(i, instruction))
+            deps.update(ordering.record_dependencies(i, instruction))
+            writes = self._writes(instruction)
+            self.writes.append(writes)
+            for name in writes:
+                last_writer[name] = i
+            for dep in deps:
+                self.dependents[dep].append(i)
+
+    def _reads(self, instruction):
+        # type: (models.Instruction) -> List[str]
+        if isinstance(instruction, models.APICall):
+            return self._referenced_variables(instruction.params)
+        elif isinstance(instruction, models.StoreValue):
+            return self._referenced_variables(instruction.value)
+        elif isinstance(instruction, models.StoreMultipleValue):
+            # The values are added to the existing list, if there is one.
+            return [instruction.name] + self._referenced_variables(
+                instruction.value)
+        elif isinstance(instruction, (models.CopyVariable,
+                                      models.CopyVariableFromDict)):
+            return [instruction.from_var]
+        elif isinstance(instruction, models.RecordResourceVariable):
+            return [instruction.variable_name]
+        elif isinstance(instruction, models.JPSearch):
+            return [instruction.input_var]
+        elif isinstance(instruction, models.BuiltinFunction):
+            return self._referenced_variables(instruction.args)
+        return []
+
+    def _writes(self, instruction):
+        # type: (models.Instruction) -> List[str]
+        if isinstance(instruction, (models.APICall, models.JPSearch,
+                                    models.BuiltinFunction)):
+            if instruction.output_var is not None:
+                return [instruction.output_var]
+        elif isinstance(instruction, (models.StoreValue,
+                                      models.StoreMultipleValue)):
+            return [instruction.name]
+        elif isinstance(instruction, (models.CopyVariable,
+                                      models.CopyVariableFromDict)):
+            return [instruction.to_var]
+        return []
+
+    def _referenced_variables(self, value):
+        # type: (Any) -> List[str]
+        # This mirrors the types handled by the VariableResolver.
+        value_type = type(value).__name__.lower()
+        if value_type in ('variable', 'keydatavariable'):
+            return [value.name]
+        elif value_type == 'stringformat':
+            return list(value.variables)
+        elif isinstance(value, dict):
+            value = list(value.values())
+        if isinstance(value, list):
+            names = []  # type: List[str]
+            for item in value:
+                names.extend(self._referenced_variables(item))
+            return names
+        return []
+
+
+class _PlanOrdering(object):
+    # Tracks the ordering between instructions that isn't expressed
+    # through the variables they reference.
+    def __init__(self, plan):
+        # type: (models.Plan) -> None
+        self._groups = plan.groups
+        self._last_in_group = {}  # type: Dict[str, int]
+        self._last_record = {}  # type: Dict[str, int]
+        self._last_barrier = None  # type: Optional[int]
+        self._since_barrier = []  # type: List[int]
+
+    def group_dependencies(self, index, instruction):
+        # type: (int, models.Instruction) -> Set[int]
+        deps = set()  # type: Set[int]
+        if self._last_barrier is not None:
+            deps.add(self._last_barrier)
+        group = self._groups.get(id(instruction))
+        if group is None:
+            deps.update(self._since_barrier)
+            self._last_barrier = index
+            self._since_barrier = []
+            return deps
+        if group in self._last_in_group:
+            deps.add(self._last_in_group[group])
+        self._last_in_group[group] = index
+        self._since_barrier.append(index)
+        return deps
+
+    def record_dependencies(self, index, instruction):
+        # type: (int, models.Instruction) -> Set[int]
+        if not isinstance(instruction, models.RecordResource):
+            return set()
+        # Values recorded for the same resource are merged in
+        # the order they're recorded.
+        name = instruction.resource_name
+        previous = self._last_record.get(name)
+        self._last_record[name] = index
+        if previous is None:
+            return set()
+        return {previous}
+
+
 class VariableResolver(object):
     def resolve_variables(self, value, variables):
         # type: (Any, Dict[str, str]) -> Any
@@ -45,6 +45,10 @@ StrMap = Dict[str, str]
 class Plan:
     instructions: List[Instruction] = field(default_factory=list)
     messages: Dict[int, str] = field(default_factory=dict)
+    # Maps the id() of an instruction to the group it was planned in.
+    # Instructions in the same group are executed in order, instructions
+    # without a group are executed after every instruction before them.
+    groups: Dict[int, str] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -135,6 +139,7 @@ class Application(Model):
 @dataclass
 class DeploymentPackage(Model):
     filename: DV[str]
+    bucket: Opt[str] = None
 
 
 @dataclass
@@ -180,6 +185,7 @@ class LambdaLayer(ManagedModel):
     runtime: str
     deployment_package: DeploymentPackage
     is_empty: bool = False
+    architecture: str = 'x86_64'
 
     def dependencies(self) -> List[Model]:
         return [self.deployment_package]
@@ -205,6 +211,7 @@ class LambdaFunction(ManagedModel):
     layers: List[str]
     managed_layer: Opt[LambdaLayer] = None
     log_group: Opt[LogGroup] = None
+    architecture: str = 'x86_64'
 
     def dependencies(self) -> List[Model]:
         resources: List[Model] = []
@@ -1,15 +1,24 @@
 # pylint: disable=too-many-lines
 from __future__ import annotations
+import os
 import sys
+import json
+import time
+import uuid
 import hashlib
 import inspect
 import re
 import subprocess
 import logging
+import fnmatch
 import functools
+import posixpath
+import contextlib
+import py_compile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
 from email.parser import FeedParser
 from email.message import Message  # noqa
-from zipfile import ZipFile  # noqa
 
 from typing import Any, Set, List, Optional, Tuple, Iterable, Callable  # noqa
 from typing import Iterator  # noqa
@@ -18,8 +27,13 @@ from chalice.compat import pip_import_string
 from chalice.compat import pip_no_compile_c_env_vars
 from chalice.compat import pip_no_compile_c_shim
 from chalice.utils import OSUtils
+from chalice.utils import ChaliceZipFile  # noqa
 from chalice.utils import UI  # noqa
 from chalice.constants import MISSING_DEPENDENCIES_TEMPLATE
+from chalice.constants import DEFAULT_WHEEL_CACHE_MAX_SIZE
+from chalice.constants import DEFAULT_PROJECT_HASH_ALGORITHM
+from chalice.constants import PROJECT_HASH_ALGORITHMS
+from chalice.constants import DEFAULT_LAMBDA_ARCHITECTURE
 
 import chalice
 from chalice import app
@@ -30,6 +44,9 @@ OptStrMap = Optional[StrMap]
 EnvVars = MutableMapping
 OptStr = Optional[str]
 OptBytes = Optional[bytes]
+# A single pip invocation: (key, command, args, env_vars, shim).  The key
+# identifies the package the invocation is for when reporting errors.
+PipCommand = Tuple[str, str, List[str], Optional[EnvVars], OptStr]
 
 logger = logging.getLogger(__name__)
 
@@ -41,8 +58,15 @@ class InvalidSourceDistributionNameError(Exception):
 class MissingDependencyError(Exception):
     """Raised when some dependencies could not be packaged for any reason."""
 
-    def __init__(self, missing: Set[Package]) -> None:
+    def __init__(
+        self, missing: Set[Package], errors: Optional[Dict[str, str]] = None
+    ) -> None:
         self.missing = missing
+        #: A mapping of package identifier to the error pip reported
+        #: the last time it failed to download or build that package.
+        if errors is None:
+            errors = {}
+        self.errors = errors
 
 
 class NoSuchPackageError(Exception):
@@ -84,11 +108,36 @@ class BaseLambdaDeploymentPackager(object):
     }
 
     def __init__(
-        self, osutils: OSUtils, dependency_builder: DependencyBuilder, ui: UI
+        self,
+        osutils: OSUtils,
+        dependency_builder: DependencyBuilder,
+        ui: UI,
+        jobs: int = 1,
+        store_compressed: bool = False,
+        hash_algorithm: str = DEFAULT_PROJECT_HASH_ALGORITHM,
+        slimmer: Optional[PackageSlimmer] = None,
+        bytecode_compiler: Optional[BytecodeCompiler] = None,
+        architecture: str = DEFAULT_LAMBDA_ARCHITECTURE,
     ) -> None:
         self._osutils = osutils
         self._dependency_builder = dependency_builder
         self._ui = ui
+        # The number of threads used to compress files into the
+        # deployment package, and whether or not files that are already
+        # compressed are stored as is.
+        self._jobs = jobs
+        self._store_compressed = store_compressed
+        # The algorithm used to hash project files when computing the
+        # deployment package filename.
+        self._hash_algorithm = hash_algorithm
+        # Removes files that aren't needed at runtime from the python
+        # dependencies before they're added to the deployment package.
+        self._slimmer = slimmer
+        # Compiles the python modules in the deployment package to
+        # bytecode so they don't need to be compiled on each cold start.
+        self._bytecode_compiler = bytecode_compiler
+        # The architecture the python dependencies are built for.
+        self._architecture = architecture
 
     def create_deployment_package(
         self, project_dir: str, python_version: str
@@ -99,11 +148,56 @@ class BaseLambdaDeploymentPackager(object):
         # Gets the path to a requirements.txt file out of a project dir path
         return self._osutils.joinpath(project_dir, 'requirements.txt')
 
+    def _open_package_for_writing(
+        self, package_filename: str
+    ) -> ChaliceZipFile:
+        return self._osutils.open_zip(
+            package_filename,
+            'w',
+            self._osutils.ZIP_DEFLATED,
+            jobs=self._jobs,
+            store_compressed=self._store_compressed,
+        )
+
+    def _write_files(
+        self, zipped: ChaliceZipFile, files: Iterator[Tuple[str, str]]
+    ) -> None:
+        if self._bytecode_compiler is None:
+            zipped.write_files(files)
+            return
+        file_list = list(files)
+        zipped.write_files(file_list)
+        self._add_bytecode(zipped, file_list)
+
+    def _add_bytecode(
+        self, zipped: ChaliceZipFile, files: List[Tuple[str, str]]
+    ) -> None:
+        assert self._bytecode_compiler is not None
+        compiler = self._bytecode_compiler
+        # Bytecode that's already in the package, for example from a
+        # __pycache__ directory in vendor/, is left as is.
+        existing = set(zipped.namelist())
+        sources = [
+            (filename, arcname) for filename, arcname in files
+            if arcname.endswith('.py')
+            and compiler.bytecode_arcname(arcname).replace(os.sep, '/')
+            not in existing
+        ]
+        if not sources:
+            return
+        with self._osutils.tempdir() as tmpdir:
+            zipped.write_files(compiler.compile_files(sources, tmpdir))
+
     def _add_vendor_files(
-        self, zipped: ZipFile, dirname: str, prefix: str = ''
+        self, zipped: ChaliceZipFile, dirname: str, prefix: str = ''
     ) -> None:
         if not self._osutils.directory_exists(dirname):
             return
+        self._write_files(zipped, self._iter_vendor_filenames(dirname, prefix))
+
+    def _iter_vendor_filenames(
+        self, dirname: str, prefix: str
+    ) -> Iterator[Tuple[str, str]]:
         prefix_len = len(dirname) + 1
         for root, _, filenames in self._osutils.walk(
             dirname, followlinks=True
@@ -113,7 +207,7 @@ class BaseLambdaDeploymentPackager(object):
                 zip_path = full_path[prefix_len:]
                 if prefix:
                     zip_path = self._osutils.joinpath(prefix, zip_path)
-                zipped.write(full_path, zip_path)
+                yield (full_path, zip_path)
 
     def deployment_package_filename(
         self, project_dir: str, python_version: str
@@ -144,8 +238,25 @@ class BaseLambdaDeploymentPackager(object):
         return deployment_package_filename
 
     def _add_py_deps(
-        self, zip_fileobj: ZipFile, deps_dir: str, prefix: str = ''
+        self, zip_fileobj: ChaliceZipFile, deps_dir: str, prefix: str = ''
     ) -> None:
+        if self._slimmer is not None:
+            self._slim_py_deps(deps_dir)
+        self._write_files(zip_fileobj, self._iter_py_deps(deps_dir, prefix))
+
+    def _slim_py_deps(self, deps_dir: str) -> None:
+        assert self._slimmer is not None
+        report = self._slimmer.slim(deps_dir)
+        self._ui.write(
+            "Slimmed python dependencies: removed %s files, stripped %s "
+            "shared libraries, saved %s bytes.\n"
+            % (report.files_removed, report.files_stripped,
+               report.bytes_saved)
+        )
+
+    def _iter_py_deps(
+        self, deps_dir: str, prefix: str
+    ) -> Iterator[Tuple[str, str]]:
         prefix_len = len(deps_dir) + 1
         for root, dirnames, filenames in self._osutils.walk(deps_dir):
             if root == deps_dir and 'chalice' in dirnames:
@@ -157,11 +268,12 @@ class BaseLambdaDeploymentPackager(object):
                 zip_path = full_path[prefix_len:]
                 if prefix:
                     zip_path = self._osutils.joinpath(prefix, zip_path)
-                zip_fileobj.write(full_path, zip_path)
+                yield (full_path, zip_path)
 
-    def _add_app_files(self, zip_fileobj: ZipFile, project_dir: str) -> None:
-        for full_path, zip_path in self._iter_app_filenames(project_dir):
-            zip_fileobj.write(full_path, zip_path)
+    def _add_app_files(
+        self, zip_fileobj: ChaliceZipFile, project_dir: str
+    ) -> None:
+        self._write_files(zip_fileobj, self._iter_app_filenames(project_dir))
 
     def _iter_app_filenames(
         self, project_dir: str
@@ -170,6 +282,13 @@ class BaseLambdaDeploymentPackager(object):
         if chalice_router.endswith('.pyc'):
             chalice_router = chalice_router[:-1]
         yield (chalice_router, 'chalice/app.py')
+        # The parts of the runtime that chalice/app.py imports on first use.
+        runtime_dir = self._osutils.dirname(chalice_router)
+        # pylint: disable=protected-access
+        for module_name in sorted(set(app._LAZY_ATTRIBUTES.values())):
+            filename = module_name.split('.')[-1] + '.py'
+            yield (self._osutils.joinpath(runtime_dir, filename),
+                   'chalice/%s' % filename)
 
         chalice_init = inspect.getfile(chalice)
         if chalice_init.endswith('.pyc'):
@@ -181,45 +300,40 @@ class BaseLambdaDeploymentPackager(object):
     def _hash_project_dir(
         self, requirements_filename: str, vendor_dir: str, project_dir: str
     ) -> str:
-        if not self._osutils.file_exists(requirements_filename):
-            contents = b''
-        else:
-            contents = cast(
-                bytes,
-                self._osutils.get_file_contents(
-                    requirements_filename, binary=True
-                ),
-            )
-        h = hashlib.md5(contents)
-        for filename, _ in self._iter_app_filenames(project_dir):
-            with self._osutils.open(filename, 'rb') as f:
-                reader = functools.partial(f.read, 1024 * 1024)
-                for chunk in iter(reader, b''):
-                    h.update(chunk)
+        filenames = []
+        if self._osutils.file_exists(requirements_filename):
+            filenames.append(requirements_filename)
+        filenames.extend(
+            filename for filename, _ in self._iter_app_filenames(project_dir)
+        )
+        filenames.extend(self._iter_vendor_filepaths(vendor_dir))
+        return self._hash_files(project_dir, filenames)
+
+    def _iter_vendor_filepaths(self, vendor_dir: str) -> Iterator[str]:
         if self._osutils.directory_exists(vendor_dir):
-            self._hash_vendor_dir(vendor_dir, h)
+            for filename, _ in self._iter_vendor_filenames(vendor_dir, ''):
+                yield filename
+
+    def _hash_files(self, project_dir: str, filenames: List[str]) -> str:
+        # The digest of each file is cached in a manifest in the project's
+        # .chalice directory, so only files that changed since the last
+        # deploy are read again.
+        digest_cache = FileDigestCache.for_project(
+            project_dir, self._osutils, self._hash_algorithm
+        )
+        h = digest_cache.new_hash()
+        for digest in digest_cache.digests(filenames):
+            h.update(digest.encode('ascii'))
+        if self._slimmer is not None:
+            # Changing the slimming rules changes what ends up in the
+            # package, so a previously built package can't be reused.
+            h.update(self._slimmer.fingerprint().encode('utf-8'))
+        if self._bytecode_compiler is not None:
+            h.update(b'precompiled-bytecode')
+        if self._architecture != DEFAULT_LAMBDA_ARCHITECTURE:
+            h.update(self._architecture.encode('ascii'))
         return h.hexdigest()
 
-    def _hash_vendor_dir(self, vendor_dir: str, md5: Any) -> None:
-        for rootdir, _, filenames in self._osutils.walk(
-            vendor_dir, followlinks=True
-        ):
-            for filename in filenames:
-                fullpath = self._osutils.joinpath(rootdir, filename)
-                with self._osutils.open(fullpath, 'rb') as f:
-                    # Not actually an issue, but pylint will complain
-                    # about the f var being used in the lambda function
-                    # is being used in a loop.  This is ok because
-                    # we're immediately using the lambda function.
-                    # Also binding it as a default argument fixes
-                    # pylint, but mypy will complain that it can't
-                    # infer the types.  So the compromise here is to
-                    # just write it the idiomatic way and have pylint
-                    # ignore this warning.
-                    reader = functools.partial(f.read, 1024 * 1024)
-                    for chunk in iter(reader, b''):
-                        md5.update(chunk)
-
     def inject_latest_app(
         self, deployment_package_filename: str, project_dir: str
     ) -> None:
@@ -239,9 +353,11 @@ class BaseLambdaDeploymentPackager(object):
         """
         # Use the premade zip file and replace the app.py file
         # with the latest version.  Python's zipfile does not have
-        # a way to do this efficiently so we need to create a new
+        # a way to do this in place so we need to create a new
         # zip file that has all the same stuff except for the new
-        # app file.
+        # app file.  The compressed bytes of everything we aren't
+        # replacing are copied over directly, so only the app files
+        # that changed are compressed again.
         self._ui.write("Regen deployment package.\n")
         tmpzip = deployment_package_filename + '.tmp.zip'
 
@@ -252,16 +368,19 @@ class BaseLambdaDeploymentPackager(object):
                 for el in inzip.infolist():
                     if self._needs_latest_version(el.filename):
                         continue
-                    contents = inzip.read(el.filename)
-                    outzip.writestr(el, contents)
+                    outzip.copy_entry(inzip, el)
                 # Then at the end, add back the app.py, chalicelib,
                 # and runtime files.
-                self._add_app_files(outzip, project_dir)
+                app_files = list(self._iter_app_filenames(project_dir))
+                for full_path, zip_path in app_files:
+                    outzip.copy_or_write(inzip, full_path, zip_path)
+                if self._bytecode_compiler is not None:
+                    self._add_bytecode(outzip, app_files)
         self._osutils.move(tmpzip, deployment_package_filename)
 
     def _needs_latest_version(self, filename: str) -> bool:
         return filename == 'app.py' or filename.startswith(
-            ('chalicelib/', 'chalice/')
+            ('chalicelib/', 'chalice/', '__pycache__/app.')
         )
 
     def _iter_chalice_lib_if_needed(
@@ -296,9 +415,22 @@ class BaseLambdaDeploymentPackager(object):
                 abi, requirements_filepath, site_packages_dir
             )
         except MissingDependencyError as e:
-            missing_packages = '\n'.join([p.identifier for p in e.missing])
+            missing_packages = '\n'.join(
+                self._format_missing_package(identifier, e.errors)
+                for identifier in sorted(p.identifier for p in e.missing)
+            )
             self._ui.write(MISSING_DEPENDENCIES_TEMPLATE % missing_packages)
 
+    def _format_missing_package(
+        self, identifier: str, errors: Dict[str, str]
+    ) -> str:
+        # Pip can be fairly verbose, the last line of its output is
+        # usually the most useful summary of why a package failed.
+        lines = errors.get(identifier, '').strip().splitlines()
+        if not lines:
+            return identifier
+        return '%s\n  %s' % (identifier, lines[-1].strip())
+
 
 class LambdaDeploymentPackager(BaseLambdaDeploymentPackager):
     def create_deployment_package(
@@ -321,9 +453,7 @@ class LambdaDeploymentPackager(BaseLambdaDeploymentPackager):
             self._build_python_dependencies(
                 python_version, requirements_filepath, site_packages_dir=tmpdir
             )
-            with self._osutils.open_zip(
-                package_filename, 'w', self._osutils.ZIP_DEFLATED
-            ) as z:
+            with self._open_package_for_writing(package_filename) as z:
                 self._add_py_deps(z, deps_dir=tmpdir)
                 self._add_app_files(z, project_dir)
                 self._add_vendor_files(
@@ -346,9 +476,7 @@ class AppOnlyDeploymentPackager(BaseLambdaDeploymentPackager):
             self._ui.write("  Reusing existing app deployment package.\n")
             return package_filename
         self._create_output_dir_if_needed(package_filename)
-        with self._osutils.open_zip(
-            package_filename, 'w', self._osutils.ZIP_DEFLATED
-        ) as z:
+        with self._open_package_for_writing(package_filename) as z:
             self._add_app_files(z, project_dir)
         return package_filename
 
@@ -362,13 +490,10 @@ class AppOnlyDeploymentPackager(BaseLambdaDeploymentPackager):
     def _deployment_package_filename(
         self, project_dir: str, python_version: str, prefix: str = ''
     ) -> str:
-        h = hashlib.md5(b'')
-        for filename, _ in self._iter_app_filenames(project_dir):
-            with self._osutils.open(filename, 'rb') as f:
-                reader = functools.partial(f.read, 1024 * 1024)
-                for chunk in iter(reader, b''):
-                    h.update(chunk)
-        digest = h.hexdigest()
+        app_filenames = self._iter_app_filenames(project_dir)
+        digest = self._hash_files(
+            project_dir, [filename for filename, _ in app_filenames]
+        )
         filename = '%s%s-%s.zip' % (prefix, digest, python_version)
         deployment_package_filename = self._osutils.joinpath(
             project_dir, '.chalice', 'deployments', filename
@@ -405,9 +530,7 @@ class LayerDeploymentPackager(BaseLambdaDeploymentPackager):
             self._build_python_dependencies(
                 python_version, requirements_filepath, site_packages_dir=tmpdir
             )
-            with self._osutils.open_zip(
-                package_filename, 'w', self._osutils.ZIP_DEFLATED
-            ) as z:
+            with self._open_package_for_writing(package_filename) as z:
                 prefix = self._PREFIX % python_version
                 self._add_py_deps(z, deps_dir=tmpdir, prefix=prefix)
                 self._add_vendor_files(
@@ -449,20 +572,12 @@ class LayerDeploymentPackager(BaseLambdaDeploymentPackager):
         self, project_dir: str, python_version: str, prefix: str = ''
     ) -> str:
         requirements_filename = self._get_requirements_filename(project_dir)
-        if not self._osutils.file_exists(requirements_filename):
-            contents = b''
-        else:
-            contents = cast(
-                bytes,
-                self._osutils.get_file_contents(
-                    requirements_filename, binary=True
-                ),
-            )
-        h = hashlib.md5(contents)
+        filenames = []
+        if self._osutils.file_exists(requirements_filename):
+            filenames.append(requirements_filename)
         vendor_dir = self._osutils.joinpath(project_dir, self._VENDOR_DIR)
-        if self._osutils.directory_exists(vendor_dir):
-            self._hash_vendor_dir(vendor_dir, h)
-        hash_contents = h.hexdigest()
+        filenames.extend(self._iter_vendor_filepaths(vendor_dir))
+        hash_contents = self._hash_files(project_dir, filenames)
         filename = '%s%s-%s.zip' % (prefix, hash_contents, python_version)
         deployment_package_filename = self._osutils.joinpath(
             project_dir, '.chalice', 'deployments', filename
@@ -483,11 +598,17 @@ class DependencyBuilder(object):
     packager.
     """
 
-    _ADDITIONAL_COMPATIBLE_PLATFORM = {'any', 'linux_x86_64'}
+    # Maps a lambda architecture to the machine name used in wheel
+    # platform tags.
+    _ARCHITECTURE_TO_MACHINE = {
+        'x86_64': 'x86_64',
+        'arm64': 'aarch64',
+    }
     _MANYLINUX_LEGACY_MAP = {
         'manylinux1_x86_64': 'manylinux_2_5_x86_64',
         'manylinux2010_x86_64': 'manylinux_2_12_x86_64',
         'manylinux2014_x86_64': 'manylinux_2_17_x86_64',
+        'manylinux2014_aarch64': 'manylinux_2_17_aarch64',
     }
 
     # Mapping of abi to glibc version in Lambda runtime.
@@ -512,12 +633,22 @@ class DependencyBuilder(object):
     }
 
     def __init__(
-        self, osutils: OSUtils, pip_runner: Optional[PipRunner] = None
+        self,
+        osutils: OSUtils,
+        pip_runner: Optional[PipRunner] = None,
+        wheel_cache: Optional[WheelCache] = None,
+        architecture: str = DEFAULT_LAMBDA_ARCHITECTURE,
     ) -> None:
         self._osutils = osutils
         if pip_runner is None:
             pip_runner = PipRunner(SubprocessPip(osutils))
         self._pip = pip_runner
+        self._wheel_cache = wheel_cache
+        # The machine wheels are downloaded and built for, this is part of
+        # the key used to look up wheels in the wheel cache.  An unknown
+        # architecture is reported when the config is validated.
+        self._platform = self._ARCHITECTURE_TO_MACHINE.get(
+            architecture, architecture)
 
     def _is_compatible_wheel_filename(
         self, expected_abi: str, filename: str
@@ -554,7 +685,7 @@ class DependencyBuilder(object):
         # legacy manylinux formats to the new perennial format.
         # Then we verify that the glibc version is compatible with the version
         # on the Lambda runtime (from _RUNTIME_GLIBC).
-        if platform in self._ADDITIONAL_COMPATIBLE_PLATFORM:
+        if platform in ('any', 'linux_%s' % self._platform):
             logger.debug("Found compatible platform tag: %s", platform)
             return True
         elif platform.startswith('manylinux'):
@@ -562,7 +693,7 @@ class DependencyBuilder(object):
             # PEP 600.
             perennial_tag = self._MANYLINUX_LEGACY_MAP.get(platform, platform)
             m = re.match("manylinux_([0-9]+)_([0-9]+)_(.*)", perennial_tag)
-            if m is None:
+            if m is None or m.group(3) != self._platform:
                 return False
             tag_major, tag_minor = [int(x) for x in m.groups()[:2]]
             runtime_major, runtime_minor = self._RUNTIME_GLIBC.get(
@@ -631,17 +762,20 @@ class DependencyBuilder(object):
 
     def _download_binary_wheels(
         self, abi: str, packages: Set[Package], directory: str
-    ) -> None:
+    ) -> Dict[str, str]:
         # Try to get binary wheels for each package that isn't compatible.
         logger.debug("Downloading manylinux wheels: %s", packages)
-        self._pip.download_manylinux_wheels(
-            abi, [pkg.identifier for pkg in packages], directory
+        return self._pip.download_manylinux_wheels(
+            abi, sorted(pkg.identifier for pkg in packages), directory,
+            platform='manylinux2014_%s' % self._platform,
         )
 
-    def _download_sdists(self, packages: Set[Package], directory: str) -> None:
+    def _download_sdists(
+        self, packages: Set[Package], directory: str
+    ) -> Dict[str, str]:
         logger.debug("Downloading missing sdists: %s", packages)
-        self._pip.download_sdists(
-            [pkg.identifier for pkg in packages], directory
+        return self._pip.download_sdists(
+            sorted(pkg.identifier for pkg in packages), directory
         )
 
     def _find_sdists(self, directory: str) -> Set[Package]:
@@ -656,15 +790,20 @@ class DependencyBuilder(object):
 
     def _build_sdists(
         self, sdists: Set[Package], directory: str, compile_c: bool = True
-    ) -> None:
+    ) -> Dict[str, str]:
         logger.debug(
             "Build missing wheels from sdists (C compiling %s): %s",
             compile_c,
             sdists,
         )
-        for sdist in sdists:
-            path_to_sdist = self._osutils.joinpath(directory, sdist.filename)
-            self._pip.build_wheel(path_to_sdist, directory, compile_c)
+        identifiers = {
+            self._osutils.joinpath(directory, sdist.filename): sdist.identifier
+            for sdist in sdists
+        }
+        errors = self._pip.build_wheels(
+            sorted(identifiers), directory, compile_c
+        )
+        return {identifiers[path]: error for path, error in errors.items()}
 
     def _categorize_wheel_files(
         self, abi: str, directory: str
@@ -699,7 +838,7 @@ class DependencyBuilder(object):
 
     def _download_dependencies(
         self, abi: str, directory: str, requirements_filename: str
-    ) -> Tuple[Set[Package], Set[Package]]:
+    ) -> Tuple[Set[Package], Set[Package], Dict[str, str]]:
         # Download all dependencies we can, letting pip choose what to
         # download.
         # deps should represent the best effort we can make to gather all the
@@ -732,7 +871,13 @@ class DependencyBuilder(object):
         # For these packages we need to explicitly try to download a
         # compatible wheel file.
         missing_wheels = sdists.union(incompatible_wheels)
-        self._download_binary_wheels(abi, missing_wheels, directory)
+        # Any wheels we've previously downloaded or built for these
+        # packages can be copied from the wheel cache instead.
+        cached_wheels = self._get_cached_wheels(abi, missing_wheels, directory)
+        uncached_wheels = missing_wheels - cached_wheels
+        # Keep track of why pip failed for each package so we can tell
+        # the user about it if we're never able to get a compatible wheel.
+        errors = self._download_binary_wheels(abi, uncached_wheels, directory)
 
         # Re-count the wheel files after the second download pass. Anything
         # that has an sdist but not a valid wheel file is still not going to
@@ -753,14 +898,16 @@ class DependencyBuilder(object):
         # wheels from our set of incompatible wheels.
         incompatible_wheels -= compatible_wheels
         missing_sdists = incompatible_wheels - sdists
-        self._download_sdists(missing_sdists, directory)
+        errors.update(self._download_sdists(missing_sdists, directory))
         sdists = self._find_sdists(directory)
         logger.debug(
             "compatible wheels after second download pass: %s",
             compatible_wheels,
         )
         missing_wheels = sdists - compatible_wheels
-        self._build_sdists(missing_wheels, directory, compile_c=True)
+        errors.update(
+            self._build_sdists(missing_wheels, directory, compile_c=True)
+        )
 
         # There is still the case where the package had optional C dependencies
         # for speedups. In this case the wheel file will have built above with
@@ -778,7 +925,9 @@ class DependencyBuilder(object):
             compatible_wheels,
         )
         missing_wheels = sdists - compatible_wheels
-        self._build_sdists(missing_wheels, directory, compile_c=False)
+        errors.update(
+            self._build_sdists(missing_wheels, directory, compile_c=False)
+        )
 
         # Final pass to find the compatible wheel files and see if there are
         # any unmet dependencies left over. At this point there is nothing we
@@ -797,6 +946,11 @@ class DependencyBuilder(object):
         # causing it to lie about its compatibility. To fix this we have a
         # manually curated whitelist of packages that will work, despite
         # claiming otherwise.
+        self._add_wheels_to_cache(
+            abi,
+            {wheel for wheel in compatible_wheels if wheel in uncached_wheels},
+            directory,
+        )
         compatible_wheels, incompatible_wheels = self._apply_wheel_whitelist(
             compatible_wheels, incompatible_wheels
         )
@@ -804,7 +958,37 @@ class DependencyBuilder(object):
         logger.debug("Final compatible: %s", compatible_wheels)
         logger.debug("Final incompatible: %s", incompatible_wheels)
         logger.debug("Final missing wheels: %s", missing_wheels)
-        return compatible_wheels, missing_wheels
+        return compatible_wheels, missing_wheels, errors
+
+    def _get_cached_wheels(
+        self, abi: str, packages: Set[Package], directory: str
+    ) -> Set[Package]:
+        if self._wheel_cache is None:
+            return set()
+        cached_wheels = set()
+        for package in packages:
+            filename = self._wheel_cache.get(
+                package.name, package.version, abi, self._platform, directory
+            )
+            if filename is not None:
+                cached_wheels.add(package)
+        logger.debug("Wheels found in wheel cache: %s", cached_wheels)
+        return cached_wheels
+
+    def _add_wheels_to_cache(
+        self, abi: str, wheels: Set[Package], directory: str
+    ) -> None:
+        if self._wheel_cache is None:
+            return
+        for wheel in wheels:
+            logger.debug("Adding wheel to wheel cache: %s", wheel)
+            self._wheel_cache.put(
+                wheel.name,
+                wheel.version,
+                abi,
+                self._platform,
+                self._osutils.joinpath(directory, wheel.filename),
+            )
 
     def _apply_wheel_whitelist(
         self,
@@ -849,7 +1033,9 @@ class DependencyBuilder(object):
         if self._osutils.directory_exists(dst_dir):
             self._osutils.rmtree(dst_dir)
         self._osutils.makedirs(dst_dir)
-        for wheel in wheels:
+        # Wheels are installed in a fixed order so that the contents of
+        # site-packages don't depend on the order pip finished in.
+        for wheel in sorted(wheels, key=lambda wheel: wheel.filename):
             zipfile_path = self._osutils.joinpath(src_dir, wheel.filename)
             self._osutils.extract_zipfile(zipfile_path, dst_dir)
             self._install_purelib_and_platlib(wheel, dst_dir)
@@ -859,12 +1045,21 @@ class DependencyBuilder(object):
     ) -> None:
         if self._has_at_least_one_package(requirements_filepath):
             with self._osutils.tempdir() as tempdir:
-                wheels, packages_without_wheels = self._download_dependencies(
-                    abi, tempdir, requirements_filepath
+                wheels, packages_without_wheels, errors = (
+                    self._download_dependencies(
+                        abi, tempdir, requirements_filepath
+                    )
                 )
                 self._install_wheels(tempdir, target_directory, wheels)
             if packages_without_wheels:
-                raise MissingDependencyError(packages_without_wheels)
+                raise MissingDependencyError(
+                    packages_without_wheels,
+                    {
+                        pkg.identifier: errors[pkg.identifier]
+                        for pkg in packages_without_wheels
+                        if pkg.identifier in errors
+                    },
+                )
 
 
 class Package(object):
@@ -885,6 +1080,10 @@ class Package(object):
     def name(self) -> str:
         return self._name
 
+    @property
+    def version(self) -> str:
+        return self._version
+
     @property
     def data_dir(self) -> str:
         # The directory format is {distribution}-{version}.data
@@ -941,6 +1140,683 @@ class Package(object):
         return re.sub(r"[-_.]+", "-", name).lower()
 
 
+@dataclass
+class WheelCacheEntry(object):
+    name: str
+    version: str
+    abi: str
+    platform: str
+    filename: str
+    digest: str
+    size: int
+    last_used: float
+
+
+class WheelCache(object):
+    """Persistent cache of wheels that were downloaded or built for Lambda.
+
+    Wheels are looked up by package name, version, ABI and platform.
+    The wheel files are content addressed, they're stored by the
+    SHA-256 of their contents so identical wheels are only stored once.
+    When the size of the stored wheels exceeds ``max_size`` bytes, the
+    least recently used wheels are removed.
+
+    Multiple chalice processes can share a cache.  Changes to the index
+    are made while holding a lock file in the cache directory.
+
+    """
+
+    _INDEX_FILENAME = 'index.json'
+    _LOCK_FILENAME = 'index.lock'
+    _WHEELS_DIRNAME = 'wheels'
+
+    def __init__(
+        self,
+        cache_dir: str,
+        osutils: Optional[OSUtils] = None,
+        max_size: int = DEFAULT_WHEEL_CACHE_MAX_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if osutils is None:
+            osutils = OSUtils()
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._osutils = osutils
+        self._clock = clock
+
+    @classmethod
+    def create_default(cls, osutils: Optional[OSUtils] = None) -> WheelCache:
+        if osutils is None:
+            osutils = OSUtils()
+        return cls(get_default_wheel_cache_dir(osutils.environ()), osutils)
+
+    def get(
+        self, name: str, version: str, abi: str, platform: str,
+        directory: str
+    ) -> Optional[str]:
+        """Copy a cached wheel into ``directory``.
+
+        Returns the filename of the wheel, or None if it isn't cached.
+
+        """
+        if not self._osutils.file_exists(self._index_path()):
+            return None
+        with self._index_lock():
+            entries = self._load_index()
+            key = self._entry_key(name, version, abi, platform)
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            wheel_path = self._wheel_path(entry.digest)
+            if not self._osutils.file_exists(wheel_path):
+                del entries[key]
+                self._save_index(entries)
+                return None
+            self._osutils.copy(
+                wheel_path, self._osutils.joinpath(directory, entry.filename))
+            entry.last_used = self._clock()
+            self._save_index(entries)
+            return entry.filename
+
+    def put(
+        self, name: str, version: str, abi: str, platform: str,
+        wheel_path: str
+    ) -> None:
+        contents = cast(bytes, self._osutils.get_file_contents(wheel_path))
+        digest = hashlib.sha256(contents).hexdigest()
+        cached_path = self._wheel_path(digest)
+        # The wheel is written while holding the lock so another process
+        # can't evict it before it's added to the index.
+        with self._index_lock():
+            if not self._osutils.file_exists(cached_path):
+                self._atomic_write(cached_path, contents)
+            entries = self._load_index()
+            entry = WheelCacheEntry(
+                name=name,
+                version=version,
+                abi=abi,
+                platform=platform,
+                filename=self._osutils.basename(wheel_path),
+                digest=digest,
+                size=len(contents),
+                last_used=self._clock(),
+            )
+            entries[self._entry_key(name, version, abi, platform)] = entry
+            self._evict(entries, self.max_size)
+            self._save_index(entries)
+
+    def entries(self) -> List[WheelCacheEntry]:
+        """Return the cached wheels, most recently used first."""
+        return sorted(self._load_index().values(),
+                      key=lambda entry: entry.last_used, reverse=True)
+
+    def total_size(self) -> int:
+        return self._total_size(self._load_index())
+
+    def prune(self, max_size: Optional[int] = None) -> List[WheelCacheEntry]:
+        """Remove least recently used wheels until under ``max_size`` bytes.
+
+        Returns the entries that were removed.
+
+        """
+        if max_size is None:
+            max_size = self.max_size
+        with self._index_lock():
+            entries = self._load_index()
+            removed = self._evict(entries, max_size)
+            self._save_index(entries)
+        return removed
+
+    def _evict(
+        self, entries: Dict[str, WheelCacheEntry], max_size: int
+    ) -> List[WheelCacheEntry]:
+        removed = []
+        least_recently_used = sorted(
+            entries.items(), key=lambda item: item[1].last_used)
+        for key, entry in least_recently_used:
+            if self._total_size(entries) <= max_size:
+                break
+            del entries[key]
+            removed.append(entry)
+        # A wheel file can be shared by multiple entries, so it's only
+        # deleted once nothing refers to it.
+        in_use = {entry.digest for entry in entries.values()}
+        for entry in removed:
+            if entry.digest not in in_use:
+                self._osutils.remove_file(self._wheel_path(entry.digest))
+        return removed
+
+    def _total_size(self, entries: Dict[str, WheelCacheEntry]) -> int:
+        sizes = {entry.digest: entry.size for entry in entries.values()}
+        return sum(sizes.values())
+
+    def _entry_key(
+        self, name: str, version: str, abi: str, platform: str
+    ) -> str:
+        return '%s==%s-%s-%s' % (name, version, abi, platform)
+
+    def _wheel_path(self, digest: str) -> str:
+        return self._osutils.joinpath(
+            self.cache_dir, self._WHEELS_DIRNAME, digest[:2], digest + '.whl')
+
+    def _index_path(self) -> str:
+        return self._osutils.joinpath(self.cache_dir, self._INDEX_FILENAME)
+
+    @contextlib.contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        _ensure_directory(self._osutils, self.cache_dir)
+        with self._osutils.file_lock(self._osutils.joinpath(
+                self.cache_dir, self._LOCK_FILENAME)):
+            yield
+
+    def _load_index(self) -> Dict[str, WheelCacheEntry]:
+        index_path = self._index_path()
+        if not self._osutils.file_exists(index_path):
+            return {}
+        try:
+            data = json.loads(self._osutils.get_file_contents(
+                index_path, binary=False))
+            return {key: WheelCacheEntry(**value)
+                    for key, value in data['entries'].items()}
+        except (ValueError, KeyError, TypeError):
+            # A corrupt index is treated as an empty cache, it will be
+            # replaced the next time a wheel is added.
+            logger.debug("Ignoring invalid wheel cache index: %s", index_path)
+            return {}
+
+    def _save_index(self, entries: Dict[str, WheelCacheEntry]) -> None:
+        data = {'entries': {key: asdict(entry)
+                            for key, entry in sorted(entries.items())}}
+        self._atomic_write(self._index_path(),
+                           json.dumps(data, indent=2).encode('utf-8'))
+
+    def _atomic_write(self, filename: str, contents: bytes) -> None:
+        # The index is read without holding the lock, so files are
+        # written to a temp file first and then moved into place.
+        _atomic_write(self._osutils, filename, contents)
+
+
+def _atomic_write(osutils: OSUtils, filename: str, contents: bytes) -> None:
+    _ensure_directory(osutils, osutils.dirname(filename))
+    tmp_filename = '%s.%s.tmp' % (filename, uuid.uuid4().hex)
+    osutils.set_file_contents(tmp_filename, cast(str, contents), binary=True)
+    osutils.replace(tmp_filename, filename)
+
+
+def _ensure_directory(osutils: OSUtils, dirname: str) -> None:
+    if not osutils.directory_exists(dirname):
+        try:
+            osutils.makedirs(dirname)
+        except FileExistsError:
+            # Another process created it first.
+            pass
+
+
+def wheel_cache_enabled(environ: MutableMapping) -> bool:
+    """Check if the wheel cache should be used when building packages.
+
+    The cache can be turned off by setting ``$CHALICE_DISABLE_WHEEL_CACHE``
+    to ``true`` or ``1``.
+
+    """
+    value = environ.get('CHALICE_DISABLE_WHEEL_CACHE', '')
+    return value.lower() not in ('true', '1')
+
+
+def get_default_wheel_cache_dir(environ: MutableMapping) -> str:
+    """Return the directory of the wheel cache used by chalice.
+
+    This is ``$CHALICE_WHEEL_CACHE_DIR`` if it's set, otherwise it's
+    a ``chalice/wheel-cache`` directory in the user's cache directory.
+
+    """
+    cache_dir = environ.get('CHALICE_WHEEL_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+    base_dir = environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(base_dir, 'chalice', 'wheel-cache')
+
+
+@dataclass
+class FileDigestEntry(object):
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class FileDigestCache(object):
+    """Cache the digests of file contents in a manifest file.
+
+    Each digest is recorded along with the size and mtime of the file,
+    a file is only read and hashed again if either of them change.
+    When many files need to be hashed they're hashed in a thread pool,
+    hashlib releases the GIL while it hashes large buffers.
+
+    """
+
+    _MANIFEST_VERSION = 1
+    _CHUNK_SIZE = 1024 * 1024
+    # Hash changed files in parallel once there are at least this many.
+    _PARALLEL_THRESHOLD = 16
+    _MAX_WORKERS = 8
+    # A file modified within this many nanoseconds of when it was hashed
+    # could be modified again without its mtime changing, so its digest
+    # isn't recorded in the manifest.
+    _RACY_WINDOW_NS = 2 * 10 ** 9
+
+    def __init__(
+        self,
+        manifest_filename: str,
+        osutils: Optional[OSUtils] = None,
+        algorithm: str = DEFAULT_PROJECT_HASH_ALGORITHM,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if algorithm not in PROJECT_HASH_ALGORITHMS:
+            raise ValueError(
+                "Unknown project hash algorithm '%s', must be one of: %s"
+                % (algorithm, ', '.join(PROJECT_HASH_ALGORITHMS))
+            )
+        if osutils is None:
+            osutils = OSUtils()
+        self.manifest_filename = manifest_filename
+        self.algorithm = algorithm
+        self._osutils = osutils
+        self._clock = clock
+        self._entries: Optional[Dict[str, FileDigestEntry]] = None
+
+    @classmethod
+    def for_project(
+        cls,
+        project_dir: str,
+        osutils: OSUtils,
+        algorithm: str = DEFAULT_PROJECT_HASH_ALGORITHM,
+    ) -> FileDigestCache:
+        return cls(
+            osutils.joinpath(
+                project_dir, '.chalice', 'cache', 'file-digests.json'
+            ),
+            osutils,
+            algorithm,
+        )
+
+    def new_hash(self) -> Any:
+        """Return a new hash object for the configured algorithm."""
+        if self.algorithm == 'blake2b':
+            return hashlib.blake2b(digest_size=16)
+        return hashlib.md5()
+
+    def digests(self, filenames: List[str]) -> List[str]:
+        """Return the digest of the contents of each file, in order."""
+        entries = self._load_manifest()
+        digests: Dict[str, str] = {}
+        changed: List[Tuple[str, os.stat_result]] = []
+        for filename in filenames:
+            st = self._osutils.stat(filename)
+            entry = entries.get(filename)
+            if (entry is not None and entry.size == st.st_size
+                    and entry.mtime_ns == st.st_mtime_ns):
+                digests[filename] = entry.digest
+            else:
+                changed.append((filename, st))
+        if changed:
+            logger.debug("Hashing %s changed files.", len(changed))
+            now_ns = int(self._clock() * 10 ** 9)
+            new_digests = self._hash_files([name for name, _ in changed])
+            for (filename, st), digest in zip(changed, new_digests):
+                digests[filename] = digest
+                if now_ns - st.st_mtime_ns >= self._RACY_WINDOW_NS:
+                    entries[filename] = FileDigestEntry(
+                        st.st_size, st.st_mtime_ns, digest
+                    )
+                else:
+                    entries.pop(filename, None)
+            self._save_manifest(entries)
+        return [digests[filename] for filename in filenames]
+
+    def _hash_files(self, filenames: List[str]) -> List[str]:
+        workers = min(self._MAX_WORKERS, os.cpu_count() or 1)
+        if len(filenames) < self._PARALLEL_THRESHOLD or workers == 1:
+            return [self._hash_file(filename) for filename in filenames]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._hash_file, filenames))
+
+    def _hash_file(self, filename: str) -> str:
+        h = self.new_hash()
+        with self._osutils.open(filename, 'rb') as f:
+            reader = functools.partial(f.read, self._CHUNK_SIZE)
+            for chunk in iter(reader, b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _load_manifest(self) -> Dict[str, FileDigestEntry]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if not self._osutils.file_exists(self.manifest_filename):
+            return self._entries
+        try:
+            data = json.loads(self._osutils.get_file_contents(
+                self.manifest_filename, binary=False))
+            if (data['version'] == self._MANIFEST_VERSION
+                    and data['algorithm'] == self.algorithm):
+                self._entries = {
+                    filename: FileDigestEntry(**value)
+                    for filename, value in data['files'].items()
+                }
+        except (ValueError, KeyError, TypeError):
+            logger.debug(
+                "Ignoring invalid file digest manifest: %s",
+                self.manifest_filename,
+            )
+        return self._entries
+
+    def _save_manifest(self, entries: Dict[str, FileDigestEntry]) -> None:
+        # Entries for files that no longer exist are dropped so the
+        # manifest doesn't grow forever.
+        data = {
+            'version': self._MANIFEST_VERSION,
+            'algorithm': self.algorithm,
+            'files': {
+                filename: asdict(entry)
+                for filename, entry in sorted(entries.items())
+                if self._osutils.file_exists(filename)
+            },
+        }
+        _atomic_write(
+            self._osutils,
+            self.manifest_filename,
+            json.dumps(data, indent=2).encode('utf-8'),
+        )
+
+
+@dataclass
+class SlimReport(object):
+    #: The number of files removed from the dependencies.
+    files_removed: int = 0
+    #: The number of shared libraries debug symbols were stripped from.
+    files_stripped: int = 0
+    #: The total number of bytes saved.
+    bytes_saved: int = 0
+
+
+class PackageSlimmer(object):
+    """Remove files from site-packages that aren't needed at runtime.
+
+    Exclusion rules are glob patterns.  A pattern without a ``/`` is
+    matched against the name of every file and directory, a matching
+    directory is removed along with everything in it.  A pattern with a
+    ``/`` is matched against the path relative to site-packages.  Any
+    package whose top level name is in ``keep`` is left untouched.
+
+    Debug symbols are also stripped from shared libraries if a ``strip``
+    command is available.  Libraries that ``strip`` can't handle, such
+    as ones built for a different architecture, are left as is.
+
+    """
+
+    DEFAULT_EXCLUDE = [
+        '__pycache__',
+        '*.pyc',
+        '*.pyo',
+        'tests',
+        'test',
+        'docs',
+        '*.dist-info/RECORD',
+    ]
+    _STRIP_ARGS = ['--strip-debug']
+
+    def __init__(
+        self,
+        osutils: OSUtils,
+        exclude: Optional[List[str]] = None,
+        keep: Optional[List[str]] = None,
+        strip_debug_symbols: bool = True,
+    ) -> None:
+        self._osutils = osutils
+        self._exclude = self.DEFAULT_EXCLUDE + list(exclude or [])
+        self._keep = set(self._normalize_name(name) for name in keep or [])
+        self._strip_debug_symbols = strip_debug_symbols
+
+    def fingerprint(self) -> str:
+        """Return a string that identifies the slimming rules."""
+        return json.dumps(
+            {
+                'exclude': self._exclude,
+                'keep': sorted(self._keep),
+                'strip_debug_symbols': self._strip_debug_symbols,
+            },
+            sort_keys=True,
+        )
+
+    def slim(self, site_packages: str) -> SlimReport:
+        """Slim a site-packages directory in place."""
+        report = SlimReport()
+        strip_command = self._get_strip_command()
+        prefix_len = len(site_packages) + 1
+        for root, dirnames, filenames in self._osutils.walk(site_packages):
+            relative_root = root[prefix_len:].replace(os.sep, '/')
+            for dirname in list(dirnames):
+                path = posixpath.join(relative_root, dirname)
+                if self._should_remove(path):
+                    dirnames.remove(dirname)
+                    self._remove_directory(
+                        self._osutils.joinpath(root, dirname), report
+                    )
+            for filename in filenames:
+                path = posixpath.join(relative_root, filename)
+                full_path = self._osutils.joinpath(root, filename)
+                if self._should_remove(path):
+                    self._remove_file(full_path, report)
+                elif (strip_command is not None
+                      and self._is_shared_library(filename)
+                      and not self._is_kept(path)):
+                    self._strip(strip_command, full_path, report)
+        return report
+
+    def _get_strip_command(self) -> Optional[List[str]]:
+        if not self._strip_debug_symbols:
+            return None
+        strip = self._osutils.which('strip')
+        if strip is None:
+            logger.debug("No strip command found, debug symbols won't be "
+                         "removed from shared libraries.")
+            return None
+        return [strip] + self._STRIP_ARGS
+
+    def _should_remove(self, path: str) -> bool:
+        if self._is_kept(path):
+            return False
+        name = posixpath.basename(path)
+        for pattern in self._exclude:
+            if '/' in pattern:
+                if fnmatch.fnmatchcase(path, pattern):
+                    return True
+            elif fnmatch.fnmatchcase(name, pattern):
+                return True
+        return False
+
+    def _is_kept(self, path: str) -> bool:
+        # The top level name of "yaml/__init__.py", "yaml-6.0.dist-info"
+        # and "yaml.py" is "yaml".
+        top_level = re.split(r'[-.]', path.split('/', 1)[0], 1)[0]
+        return self._normalize_name(top_level) in self._keep
+
+    def _normalize_name(self, name: str) -> str:
+        return re.sub(r'[-_.]+', '_', name).lower()
+
+    def _is_shared_library(self, filename: str) -> bool:
+        # Libraries vendored by auditwheel are versioned, for example
+        # "libgfortran-2e0d59d6.so.5.0.0".
+        return filename.endswith('.so') or '.so.' in filename
+
+    def _remove_file(self, filename: str, report: SlimReport) -> None:
+        logger.debug("Removing %s from dependencies.", filename)
+        report.files_removed += 1
+        report.bytes_saved += self._osutils.stat(filename).st_size
+        self._osutils.remove_file(filename)
+
+    def _remove_directory(self, dirname: str, report: SlimReport) -> None:
+        logger.debug("Removing %s from dependencies.", dirname)
+        for root, _, filenames in self._osutils.walk(dirname):
+            for filename in filenames:
+                report.files_removed += 1
+                report.bytes_saved += self._osutils.stat(
+                    self._osutils.joinpath(root, filename)
+                ).st_size
+        self._osutils.rmtree(dirname)
+
+    def _strip(
+        self, strip_command: List[str], filename: str, report: SlimReport
+    ) -> None:
+        original_size = self._osutils.stat(filename).st_size
+        p = self._osutils.popen(
+            strip_command + [filename],
+            stdout=self._osutils.pipe,
+            stderr=self._osutils.pipe,
+        )
+        _, err = p.communicate()
+        if p.returncode != 0:
+            logger.debug("Unable to strip %s: %s", filename, err)
+            return
+        report.files_stripped += 1
+        report.bytes_saved += (
+            original_size - self._osutils.stat(filename).st_size
+        )
+
+
+class BytecodeCompiler(object):
+    """Compile python modules to bytecode for a Lambda runtime.
+
+    Modules are compiled to unchecked-hash pycs.  Python loads these
+    without checking them against their source, and because they don't
+    contain the source mtime the same source always compiles to the same
+    pyc, which keeps deployment packages deterministic.
+
+    Bytecode is specific to a python version, so modules are compiled in
+    process if the running interpreter matches the Lambda runtime and
+    otherwise by an interpreter for the runtime found on the PATH, for
+    example ``python3.11``.
+
+    """
+
+    _COMPILE_SCRIPT = '\n'.join([
+        'import json, py_compile, sys',
+        'with open(sys.argv[1]) as f:',
+        '    jobs = json.load(f)',
+        'for source, cfile, dfile in jobs:',
+        '    try:',
+        '        py_compile.compile(',
+        '            source, cfile=cfile, dfile=dfile, doraise=True,',
+        '            optimize=0, invalidation_mode=(',
+        '                py_compile.PycInvalidationMode.UNCHECKED_HASH))',
+        '    except py_compile.PyCompileError as e:',
+        '        sys.stderr.write("%s\\n" % e)',
+    ])
+
+    def __init__(self, osutils: OSUtils, ui: UI, python_version: str) -> None:
+        self._osutils = osutils
+        self._ui = ui
+        self._python_version = python_version
+        self._cache_tag = 'cpython-%s' % (
+            python_version[len('python'):].replace('.', '')
+        )
+        self._interpreter: OptStr = None
+        self._interpreter_resolved = False
+
+    def bytecode_arcname(self, arcname: str) -> str:
+        """Return the archive name of the bytecode for a module."""
+        dirname, filename = os.path.split(arcname)
+        return os.path.join(
+            dirname,
+            '__pycache__',
+            '%s.%s.pyc' % (filename[:-len('.py')], self._cache_tag),
+        )
+
+    def compile_files(
+        self, files: List[Tuple[str, str]], output_dir: str
+    ) -> List[Tuple[str, str]]:
+        """Compile modules into ``output_dir``.
+
+        :param files: A list of ``(filename, arcname)`` tuples of the
+            modules to compile.
+        :return: A list of ``(filename, arcname)`` tuples of the bytecode
+            that was written.  Modules that can't be compiled, such as
+            ones with syntax errors, are skipped.
+
+        """
+        jobs = []
+        for filename, arcname in files:
+            pyc_arcname = self.bytecode_arcname(arcname)
+            cfile = self._osutils.joinpath(output_dir, pyc_arcname)
+            jobs.append((filename, cfile, arcname, pyc_arcname))
+        if self._is_running_interpreter():
+            self._compile_in_process(jobs)
+        else:
+            interpreter = self._find_interpreter()
+            if interpreter is None:
+                return []
+            self._compile_in_subprocess(interpreter, jobs, output_dir)
+        return [
+            (cfile, pyc_arcname) for _, cfile, _, pyc_arcname in jobs
+            if self._osutils.file_exists(cfile)
+        ]
+
+    def _is_running_interpreter(self) -> bool:
+        return sys.implementation.cache_tag == self._cache_tag
+
+    def _find_interpreter(self) -> OptStr:
+        if not self._interpreter_resolved:
+            self._interpreter_resolved = True
+            self._interpreter = self._osutils.which(self._python_version)
+            if self._interpreter is None:
+                self._ui.write(
+                    "Unable to precompile bytecode, no %s interpreter "
+                    "found.\n" % self._python_version
+                )
+        return self._interpreter
+
+    def _compile_in_process(
+        self, jobs: List[Tuple[str, str, str, str]]
+    ) -> None:
+        for source, cfile, dfile, _ in jobs:
+            try:
+                py_compile.compile(
+                    source,
+                    cfile=cfile,
+                    dfile=dfile,
+                    doraise=True,
+                    optimize=0,
+                    invalidation_mode=(
+                        py_compile.PycInvalidationMode.UNCHECKED_HASH
+                    ),
+                )
+            except py_compile.PyCompileError as e:
+                logger.debug("Unable to compile %s: %s", source, e)
+
+    def _compile_in_subprocess(
+        self,
+        interpreter: str,
+        jobs: List[Tuple[str, str, str, str]],
+        output_dir: str,
+    ) -> None:
+        jobs_filename = self._osutils.joinpath(output_dir, 'jobs.json')
+        self._osutils.set_file_contents(
+            jobs_filename,
+            json.dumps([job[:3] for job in jobs]),
+            binary=False,
+        )
+        p = self._osutils.popen(
+            [interpreter, '-c', self._COMPILE_SCRIPT, jobs_filename],
+            stdout=self._osutils.pipe,
+            stderr=self._osutils.pipe,
+        )
+        _, err = p.communicate()
+        if err:
+            logger.debug("Errors compiling bytecode with %s: %s",
+                         interpreter, err)
+
+
 class SDistMetadataFetcher(object):
     """This is the "correct" way to get name and version from an sdist."""
 
@@ -1077,19 +1953,29 @@ class SubprocessPip(object):
 
 
 class PipRunner(object):
-    """Wrapper around pip calls used by chalice."""
+    """Wrapper around pip calls used by chalice.
+
+    Commands that operate on a single package at a time are run with up
+    to ``jobs`` pip processes in parallel.  Each pip process is given a
+    distinct package so they never write the same file in the
+    destination directory.
+    """
 
     _LINK_IS_DIR_PATTERN = (
         "Processing (.+?)\n  Link is a directory, ignoring download_dir"
     )
 
     def __init__(
-        self, pip: SubprocessPip, osutils: Optional[OSUtils] = None
+        self,
+        pip: SubprocessPip,
+        osutils: Optional[OSUtils] = None,
+        jobs: int = 1,
     ) -> None:
         if osutils is None:
             osutils = OSUtils()
         self._wrapped_pip = pip
         self._osutils = osutils
+        self._jobs = max(jobs, 1)
 
     def _execute(
         self,
@@ -1106,20 +1992,65 @@ class PipRunner(object):
         )
         return rc, out, err
 
-    def build_wheel(
-        self, wheel: str, directory: str, compile_c: bool = True
-    ) -> None:
-        """Build an sdist into a wheel file."""
+    def _execute_all(self, commands: List[PipCommand]) -> Dict[str, str]:
+        """Execute independent pip commands, returning any errors.
+
+        Commands are started in the order they're given, with at most
+        ``jobs`` of them running at once.  The returned dict maps the key
+        of each command that failed to the stderr pip produced.
+        """
+
+        def execute(command: PipCommand) -> Tuple[int, bytes, bytes]:
+            _, name, args, env_vars, shim = command
+            return self._execute(name, args, env_vars=env_vars, shim=shim)
+
+        if self._jobs == 1 or len(commands) < 2:
+            results = [execute(command) for command in commands]
+        else:
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                results = list(executor.map(execute, commands))
+        errors = {}
+        for command, (rc, _, err) in zip(commands, results):
+            if rc != 0:
+                if err is None:
+                    err = b'Unknown error'
+                errors[command[0]] = err.decode('utf-8', 'replace')
+        return errors
+
+    def _build_wheel_command(
+        self, wheel: str, directory: str, compile_c: bool
+    ) -> PipCommand:
         arguments = ['--no-deps', '--wheel-dir', directory, wheel]
         env_vars = self._osutils.environ()
         shim = ''
         if not compile_c:
             env_vars.update(pip_no_compile_c_env_vars)
             shim = pip_no_compile_c_shim
+        return (wheel, 'wheel', arguments, env_vars, shim)
+
+    def build_wheel(
+        self, wheel: str, directory: str, compile_c: bool = True
+    ) -> None:
+        """Build an sdist into a wheel file."""
         # Ignore rc and stderr from this command since building the wheels
         # may fail and we will find out when we categorize the files that were
         # generated.
-        self._execute('wheel', arguments, env_vars=env_vars, shim=shim)
+        self.build_wheels([wheel], directory, compile_c)
+
+    def build_wheels(
+        self, wheels: List[str], directory: str, compile_c: bool = True
+    ) -> Dict[str, str]:
+        """Build each sdist into a wheel file.
+
+        Returns a mapping of sdist path to the error pip reported for
+        every sdist that could not be built.
+        """
+        return self._execute_all(
+            [
+                self._build_wheel_command(wheel, directory, compile_c)
+                for wheel in wheels
+            ]
+        )
 
     def download_all_dependencies(
         self, requirements_filename: str, directory: str
@@ -1148,36 +2079,41 @@ class PipRunner(object):
             raise PackageDownloadError(error)
         stdout = out.decode()
         matches = re.finditer(self._LINK_IS_DIR_PATTERN, stdout)
-        for match in matches:
-            wheel_package_path = str(match.group(1))
-            # Looks odd we do not check on the error status of building the
-            # wheel here. We can assume this is a valid package path since
-            # we already passed the pip download stage. This stage would have
-            # thrown a PackageDownloadError if any of the listed packages were
-            # not valid.
-            # If it fails the actual build step, it will have the same behavior
-            # as any other package we fail to build a valid wheel for, and
-            # complain at deployment time.
-            self.build_wheel(wheel_package_path, directory)
+        # Looks odd we do not check on the error status of building the
+        # wheel here. We can assume this is a valid package path since
+        # we already passed the pip download stage. This stage would have
+        # thrown a PackageDownloadError if any of the listed packages were
+        # not valid.
+        # If it fails the actual build step, it will have the same behavior
+        # as any other package we fail to build a valid wheel for, and
+        # complain at deployment time.
+        self.build_wheels(
+            [str(match.group(1)) for match in matches], directory
+        )
 
     def download_manylinux_wheels(
-        self, abi: str, packages: List[str], directory: str
-    ) -> None:
+        self,
+        abi: str,
+        packages: List[str],
+        directory: str,
+        platform: str = 'manylinux2014_x86_64',
+    ) -> Dict[str, str]:
         """Download wheel files for manylinux for all the given packages."""
         # If any one of these dependencies fails pip will bail out. Since we
         # are only interested in all the ones we can download, we need to feed
         # each package to pip individually. The return code of pip doesn't
         # matter here since we will inspect the working directory to see which
         # wheels were downloaded. We are only interested in wheel files
-        # compatible with lambda, which means manylinux1_x86_64 platform and
-        # cpython implementation. The compatible abi depends on the python
-        # version and is checked later.
+        # compatible with lambda, which means a manylinux platform for the
+        # function's architecture and cpython implementation. The compatible
+        # abi depends on the python version and is checked later.
+        commands: List[PipCommand] = []
         for package in packages:
             arguments = [
                 '--only-binary=:all:',
                 '--no-deps',
                 '--platform',
-                'manylinux2014_x86_64',
+                platform,
                 '--implementation',
                 'cp',
                 '--abi',
@@ -1186,9 +2122,14 @@ class PipRunner(object):
                 directory,
                 package,
             ]
-            self._execute('download', arguments)
-
-    def download_sdists(self, packages: List[str], directory: str) -> None:
+            commands.append((package, 'download', arguments, None, None))
+        return self._execute_all(commands)
+
+    def download_sdists(
+        self, packages: List[str], directory: str
+    ) -> Dict[str, str]:
+        """Download sdists for all the given packages."""
+        commands: List[PipCommand] = []
         for package in packages:
             arguments = [
                 "--no-binary=:all:",
@@ -1197,4 +2138,5 @@ class PipRunner(object):
                 directory,
                 package,
             ]
-            self._execute('download', arguments)
+            commands.append((package, 'download', arguments, None, None))
+        return self._execute_all(commands)
@@ -1,12 +1,17 @@
 # pylint: disable=too-many-lines
 import re
 import json
+import base64
+import hashlib
+import functools
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import List, Dict, Any, Optional, Union, Tuple, Set, cast  # noqa
-from typing import Sequence  # noqa
+from typing import Sequence, Callable  # noqa
 
 from chalice.config import Config, DeployedResources  # noqa
+from chalice.constants import DEFAULT_LAMBDA_ARCHITECTURE
 from chalice.utils import OSUtils  # noqa
 from chalice.deploy import models
 from chalice.awsclient import TypedAWSClient, ResourceDoesNotExistError  # noqa
@@ -16,14 +21,22 @@ InstructionMsg = Union[models.Instruction, Tuple[models.Instruction, str]]
 MarkedResource = Dict[str, List[models.RecordResource]]
 CacheTuples = Union[Tuple[str, str, str], Tuple[str, str]]
 ApiMap = Union[models.RestAPI, models.WebsocketAPI]
+# A function that stores a looked up value along with the lookup itself.
+Lookup = Tuple[Callable[[Any], None], Callable[[], Any]]
 
 
 class RemoteState(object):
-    def __init__(self, client, deployed_resources):
-        # type: (TypedAWSClient, DeployedResources) -> None
+    DEFAULT_MAX_WORKERS = 8
+
+    def __init__(self, client, deployed_resources,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        # type: (TypedAWSClient, DeployedResources, int) -> None
         self._client = client
         self._cache = {}  # type: Dict[CacheTuples, bool]
+        self._s3_object_cache = {}  # type: Dict[Tuple[str, str], bool]
+        self._function_configs = {}  # type: Dict[str, Dict[str, Any]]
         self._deployed_resources = deployed_resources
+        self._max_workers = max_workers
 
     def _cache_key(self, resource):
         # type: (models.ManagedModel) -> CacheTuples
@@ -56,6 +69,62 @@ class RemoteState(object):
         raise ValueError("Deployed values for resource does not exist: %s"
                          % resource.resource_name)
 
+    def prefetch(self, resources):
+        # type: (List[models.Model]) -> None
+        """Look up the remote state for all the resources at once.
+
+        The lookups that ``resource_exists`` and ``lambda_code_is_current``
+        would otherwise make one at a time while planning are made
+        concurrently, and their results are cached.  Errors are raised
+        in the order of ``resources``.
+
+        """
+        lookups = []  # type: List[Lookup]
+        for resource in resources:
+            if isinstance(resource, models.LambdaFunction):
+                lookups.append((
+                    functools.partial(self._store_function_state, resource),
+                    functools.partial(self._fetch_function_state, resource),
+                ))
+                continue
+            if isinstance(resource, models.DomainName):
+                mapping = resource.api_mapping
+                lookups.append((
+                    functools.partial(self._cache.__setitem__,
+                                      self._cache_key(mapping)),
+                    functools.partial(self._resource_exists_apimapping,
+                                      mapping, resource.domain_name),
+                ))
+            handler = getattr(self, '_resource_exists_%s'
+                              % resource.__class__.__name__.lower(), None)
+            # API mappings are looked up along with their domain name.
+            if handler is not None and \
+                    not isinstance(resource, models.APIMapping):
+                key = self._cache_key(cast(models.ManagedModel, resource))
+                lookups.append((
+                    functools.partial(self._cache.__setitem__, key),
+                    functools.partial(handler, resource),
+                ))
+        if not lookups:
+            return
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            futures = [(store, pool.submit(fetch))
+                       for store, fetch in lookups]
+            for store, future in futures:
+                store(future.result())
+
+    def _fetch_function_state(self, resource):
+        # type: (models.LambdaFunction) -> Optional[Dict[str, Any]]
+        if not self._resource_exists_lambdafunction(resource):
+            return None
+        return self._client.get_function_configuration(resource.function_name)
+
+    def _store_function_state(self, resource, config):
+        # type: (models.LambdaFunction, Optional[Dict[str, Any]]) -> None
+        self._cache[self._cache_key(resource)] = config is not None
+        if config is not None:
+            self._function_configs[resource.function_name] = config
+
     def resource_exists(self, resource, *args):
         # type: (models.ManagedModel, Optional[Any]) -> bool
         key = self._cache_key(resource)
@@ -147,6 +216,34 @@ class RemoteState(object):
         # type: (models.LambdaFunction) -> bool
         return self._client.lambda_function_exists(resource.function_name)
 
+    def lambda_code_is_current(self, resource, code_sha256):
+        # type: (models.LambdaFunction, str) -> bool
+        """Check if the deployed function already has this code.
+
+        ``code_sha256`` is the base64 encoded SHA-256 digest of the
+        deployment package, which is how Lambda reports ``CodeSha256``.
+        The code also has to be uploaded again to change the function's
+        architecture.
+
+        """
+        config = self._function_configs.get(resource.function_name)
+        if config is None:
+            config = self._client.get_function_configuration(
+                resource.function_name)
+            self._function_configs[resource.function_name] = config
+        architectures = config.get(
+            'Architectures', [DEFAULT_LAMBDA_ARCHITECTURE])
+        return (config.get('CodeSha256') == code_sha256 and
+                architectures == [resource.architecture])
+
+    def s3_object_exists(self, bucket, key):
+        # type: (str, str) -> bool
+        cache_key = (bucket, key)
+        if cache_key not in self._s3_object_cache:
+            self._s3_object_cache[cache_key] = self._client.s3_object_exists(
+                bucket, key)
+        return self._s3_object_cache[cache_key]
+
     def _resource_exists_managediamrole(self, resource):
         # type: (models.ManagedIAMRole) -> bool
         try:
@@ -194,15 +291,26 @@ class RemoteState(object):
 
 
 class PlanStage(object):
+    # Deployment packages are uploaded under a key derived from their
+    # contents, so stages deployed with the same bucket can share the
+    # same upload.  Lambda only reads code from a bucket in the
+    # function's region, so that's always within a single region.
+    _DEPLOYMENT_PACKAGE_KEY = 'deployment-packages/%s.zip'
+    _HASH_CHUNK_SIZE = 1024 * 1024
+
     def __init__(self, remote_state, osutils):
         # type: (RemoteState, OSUtils) -> None
         self._remote_state = remote_state
         self._osutils = osutils
+        self._package_digests = {}  # type: Dict[str, bytes]
+        self._uploaded_package_keys = {}  # type: Dict[str, Variable]
 
     def execute(self, resources):
         # type: (List[models.Model]) -> models.Plan
         plan = []  # type: List[models.Instruction]
         messages = {}  # type: Dict[int, str]
+        groups = {}  # type: Dict[int, str]
+        self._remote_state.prefetch(resources)
         for resource in resources:
             name = '_plan_%s' % resource.__class__.__name__.lower()
             handler = getattr(self, name, None)
@@ -210,7 +318,20 @@ class PlanStage(object):
                 result = handler(resource)
                 if result:
                     self._add_result_to_plan(result, plan, messages)
-        return models.Plan(plan, messages)
+                    group = self._group_name(resource)
+                    for instruction in plan[-len(result):]:
+                        groups[id(instruction)] = group
+        return models.Plan(plan, messages, groups)
+
+    def _group_name(self, resource):
+        # type: (models.Model) -> str
+        # The executor runs the instructions for different resources
+        # concurrently unless one needs a variable set by the other.
+        # Connecting a function to a bucket replaces the bucket's whole
+        # notification configuration, so those are made one at a time.
+        if isinstance(resource, models.S3BucketNotification):
+            return 's3_bucket_notification:%s' % resource.bucket
+        return '%s:%s' % (resource.__class__.__name__, id(resource))
 
     def _add_result_to_plan(self,
                             result,    # type: Sequence[InstructionMsg]
@@ -393,11 +514,73 @@ class PlanStage(object):
         ])
         return api_calls
 
+    def _package_digest(self, filename):
+        # type: (str) -> bytes
+        if filename not in self._package_digests:
+            h = hashlib.sha256()
+            with self._osutils.open(filename, 'rb') as f:
+                reader = functools.partial(f.read, self._HASH_CHUNK_SIZE)
+                for chunk in iter(reader, b''):
+                    h.update(chunk)
+            self._package_digests[filename] = h.digest()
+        return self._package_digests[filename]
+
+    def _package_s3_key(self, filename):
+        # type: (str) -> str
+        return self._DEPLOYMENT_PACKAGE_KEY % (
+            self._package_digest(filename).hex())
+
+    def _code_params(self, package):
+        # type: (models.DeploymentPackage) -> Dict[str, Any]
+        filename = cast(str, package.filename)
+        if package.bucket is None:
+            return {
+                'zip_contents': self._osutils.get_file_contents(
+                    filename, binary=True),
+            }
+        # If the package is uploaded in this plan, the key is referenced
+        # through the upload's output variable so the function isn't
+        # created before the upload finishes.
+        s3_key = self._uploaded_package_keys.get(
+            filename, self._package_s3_key(filename))  # type: Any
+        return {
+            'zip_contents': None,
+            's3_bucket': package.bucket,
+            's3_key': s3_key,
+        }
+
+    def _plan_deploymentpackage(self, resource):
+        # type: (models.DeploymentPackage) -> Sequence[InstructionMsg]
+        if resource.bucket is None:
+            return []
+        filename = cast(str, resource.filename)
+        key = self._package_s3_key(filename)
+        if self._remote_state.s3_object_exists(resource.bucket, key):
+            return []
+        varname = 'deployment_package_%s_s3_key' % (
+            self._package_digest(filename).hex())
+        self._uploaded_package_keys[filename] = Variable(varname)
+        return [
+            (models.APICall(
+                method_name='upload_deployment_package',
+                params={'bucket': resource.bucket,
+                        'key': key,
+                        'filename': filename},
+                output_var=varname,
+            ), "Uploading deployment package: s3://%s/%s\n" % (
+                resource.bucket, key)),
+        ]
+
     def _plan_lambdalayer(self, resource):
         # type: (models.LambdaLayer) -> Sequence[InstructionMsg]
 
         api_calls = []  # type: List[InstructionMsg]
-        filename = cast(str, resource.deployment_package.filename)
+        params = {
+            'layer_name': resource.layer_name,
+            'runtime': resource.runtime,
+            'architecture': resource.architecture,
+        }  # type: Dict[str, Any]
+        params.update(self._code_params(resource.deployment_package))
 
         # Automatically clean up old layer versions.
         # See:
@@ -421,10 +604,7 @@ class PlanStage(object):
         api_calls.extend([(
             models.APICall(
                 method_name='publish_layer',
-                params={'layer_name': resource.layer_name,
-                        'zip_contents': self._osutils.get_file_contents(
-                            filename, binary=True),
-                        'runtime': resource.runtime},
+                params=params,
                 output_var='layer_version_arn'
             ), "%s lambda layer: %s\n" % (msg, resource.layer_name)),
             models.RecordResourceVariable(
@@ -480,8 +660,6 @@ class PlanStage(object):
             params = {
                 'function_name': resource.function_name,
                 'role_arn': role_arn,
-                'zip_contents': self._osutils.get_file_contents(
-                    filename, binary=True),
                 'runtime': resource.runtime,
                 'handler': resource.handler,
                 'environment_variables': resource.environment_variables,
@@ -491,8 +669,10 @@ class PlanStage(object):
                 'memory_size': resource.memory_size,
                 'security_group_ids': resource.security_group_ids,
                 'subnet_ids': resource.subnet_ids,
-                'layers': layers
+                'layers': layers,
+                'architecture': resource.architecture,
             }
+            params.update(self._code_params(resource.deployment_package))
 
             api_calls.extend([
                 (models.APICall(
@@ -513,8 +693,6 @@ class PlanStage(object):
             params = {
                 'function_name': resource.function_name,
                 'role_arn': role_arn,
-                'zip_contents': self._osutils.get_file_contents(
-                    filename, binary=True),
                 'runtime': resource.runtime,
                 'environment_variables': resource.environment_variables,
                 'xray': resource.xray,
@@ -523,8 +701,17 @@ class PlanStage(object):
                 'memory_size': resource.memory_size,
                 'security_group_ids': resource.security_group_ids,
                 'subnet_ids': resource.subnet_ids,
-                'layers': layers
+                'layers': layers,
+                'architecture': resource.architecture,
             }
+            # Packages can be tens of megabytes, so the code is only
+            # uploaded when it's different from the deployed code.
+            code_sha256 = base64.b64encode(
+                self._package_digest(filename)).decode('ascii')
+            if not self._remote_state.lambda_code_is_current(
+                    resource, code_sha256):
+                params.update(
+                    self._code_params(resource.deployment_package))
             api_calls.extend([
                 (models.APICall(
                     method_name='update_function',
@@ -8,6 +8,8 @@ from chalice.config import Config  # noqa
 from chalice.constants import EXPERIMENTAL_ERROR_MSG
 from chalice.constants import MIN_COMPRESSION_SIZE
 from chalice.constants import MAX_COMPRESSION_SIZE
+from chalice.constants import PROJECT_HASH_ALGORITHMS
+from chalice.constants import LAMBDA_ARCHITECTURES
 from chalice.compat import STRING_TYPES
 
 
@@ -50,6 +52,8 @@ def validate_configuration(config):
     validate_resource_policy(config)
     validate_sqs_configuration(config.chalice_app)
     validate_environment_variables_type(config)
+    validate_project_hash_algorithm(config)
+    validate_architecture(config)
 
 
 def validate_resource_policy(config):
@@ -73,6 +77,22 @@ def validate_resource_policy(config):
              "api_gateway_endpoint_vpce specified"))
 
 
+def validate_project_hash_algorithm(config):
+    # type: (Config) -> None
+    if config.project_hash_algorithm not in PROJECT_HASH_ALGORITHMS:
+        raise ValueError(
+            "project_hash_algorithm must be one of %s" % (
+                ", ".join(PROJECT_HASH_ALGORITHMS)))
+
+
+def validate_architecture(config):
+    # type: (Config) -> None
+    if config.architecture not in LAMBDA_ARCHITECTURES:
+        raise ValueError(
+            "architecture must be one of %s" % (
+                ", ".join(LAMBDA_ARCHITECTURES)))
+
+
 def validate_endpoint_type(config):
     # type: (Config) -> None
     if not config.api_gateway_endpoint_type:
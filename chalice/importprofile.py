@@ -0,0 +1,236 @@
+"""Profile how long it takes to import a chalice app.
+
+The app is imported in a new python interpreter run with ``-X importtime``,
+which reports how long each module took to import.  Only the imports made
+while importing ``app.py`` are included, the modules the interpreter
+imports on startup are the same for every app.
+
+"""
+from __future__ import annotations
+import json
+import sys
+from dataclasses import dataclass, field
+
+from typing import Any, Dict, List, MutableMapping, Optional  # noqa
+
+from chalice.utils import OSUtils
+
+
+# Written to stderr right before the app is imported so the imports made
+# on interpreter startup can be told apart from the imports made by the app.
+_APP_IMPORT_MARKER = 'chalice: importing app'
+_IMPORT_TIME_PREFIX = 'import time:'
+_IMPORT_APP_SCRIPT = '\n'.join([
+    'import json, sys',
+    'sys.path[:0] = json.loads(sys.argv[1])',
+    'sys.path.extend(json.loads(sys.argv[2]))',
+    'sys.stderr.write(%r)' % (_APP_IMPORT_MARKER + '\n'),
+    'sys.stderr.flush()',
+    'import app',
+])
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+class ImportProfileError(Exception):
+    pass
+
+
+@dataclass
+class ImportRecord(object):
+    #: The fully qualified name of the module.
+    name: str
+    #: Time spent importing the module itself in microseconds.
+    self_us: int
+    #: Time spent importing the module and everything it imported, in
+    #: microseconds.
+    cumulative_us: int
+    #: The modules first imported while importing this module, in the
+    #: order they were imported.
+    children: List[ImportRecord] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'self_us': self.self_us,
+            'cumulative_us': self.cumulative_us,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+
+@dataclass
+class ImportProfile(object):
+    #: The modules imported by the interpreter while importing the app,
+    #: usually just ``app``.
+    roots: List[ImportRecord]
+
+    @property
+    def total_us(self) -> int:
+        return sum(record.cumulative_us for record in self.roots)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'total_us': self.total_us,
+            'imports': [record.to_dict() for record in self.roots],
+        }
+
+    def to_speedscope(self, name: str = 'app') -> Dict[str, Any]:
+        """Convert the profile to the speedscope evented file format.
+
+        ``-X importtime`` only records how long each import took, so the
+        children of each module are laid out one after another from the
+        start of its import, followed by the module's own time.
+
+        """
+        frames: List[Dict[str, str]] = []
+        frame_indexes: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+
+        def add_events(record: ImportRecord, start: int) -> None:
+            if record.name not in frame_indexes:
+                frame_indexes[record.name] = len(frames)
+                frames.append({'name': record.name})
+            frame = frame_indexes[record.name]
+            events.append({'type': 'O', 'frame': frame, 'at': start})
+            offset = start
+            for child in record.children:
+                add_events(child, offset)
+                offset += child.cumulative_us
+            events.append({
+                'type': 'C',
+                'frame': frame,
+                'at': start + record.cumulative_us,
+            })
+
+        offset = 0
+        for record in self.roots:
+            add_events(record, offset)
+            offset += record.cumulative_us
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': name,
+            'exporter': 'chalice profile-imports',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'evented',
+                'name': name,
+                'unit': 'microseconds',
+                'startValue': 0,
+                'endValue': offset,
+                'events': events,
+            }],
+        }
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the ``-X importtime`` output into a tree of imports.
+
+    Each line is written once a module finishes importing, so a module's
+    children are listed before it, one level further indented.  Lines that
+    aren't import times are ignored.
+
+    """
+    pending: Dict[int, List[ImportRecord]] = {}
+    for line in output.splitlines():
+        if not line.startswith(_IMPORT_TIME_PREFIX):
+            continue
+        parts = line[len(_IMPORT_TIME_PREFIX):].split('|', 2)
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            # The header line, "self [us] | cumulative | imported package".
+            continue
+        name_part = parts[2][1:]
+        name = name_part.lstrip(' ')
+        depth = (len(name_part) - len(name)) // 2
+        record = ImportRecord(
+            name=name.rstrip(),
+            self_us=self_us,
+            cumulative_us=cumulative_us,
+            children=pending.pop(depth + 1, []),
+        )
+        pending.setdefault(depth, []).append(record)
+    return pending.get(0, [])
+
+
+def format_import_tree(
+    profile: ImportProfile, min_time_us: int = 0
+) -> str:
+    """Format a profile as a tree, slowest imports first.
+
+    Imports that took less than ``min_time_us`` are left out.
+
+    """
+    lines = [
+        'Total import time: %.2f ms' % (profile.total_us / 1000.0),
+        '',
+        '%15s %10s  %s' % ('cumulative (ms)', 'self (ms)', 'module'),
+    ]
+
+    def add_lines(records: List[ImportRecord], depth: int) -> None:
+        for record in sorted(
+            records, key=lambda r: r.cumulative_us, reverse=True
+        ):
+            if record.cumulative_us < min_time_us:
+                continue
+            lines.append('%15.2f %10.2f  %s%s' % (
+                record.cumulative_us / 1000.0,
+                record.self_us / 1000.0,
+                '  ' * depth,
+                record.name,
+            ))
+            add_lines(record.children, depth + 1)
+
+    add_lines(profile.roots, 0)
+    return '\n'.join(lines) + '\n'
+
+
+class ImportProfiler(object):
+    def __init__(
+        self,
+        osutils: OSUtils,
+        sys_path_prepend: List[str],
+        sys_path_append: List[str],
+        environ: MutableMapping,
+        python_executable: Optional[str] = None,
+    ) -> None:
+        self._osutils = osutils
+        self._sys_path_prepend = sys_path_prepend
+        self._sys_path_append = sys_path_append
+        self._environ = environ
+        if python_executable is None:
+            python_executable = sys.executable
+        self._python_executable = python_executable
+
+    def profile(self) -> ImportProfile:
+        """Import the app in a new interpreter and profile its imports.
+
+        :raises ImportProfileError: If the app can't be imported.
+
+        """
+        p = self._osutils.popen(
+            [
+                self._python_executable, '-X', 'importtime',
+                '-c', _IMPORT_APP_SCRIPT,
+                json.dumps(self._sys_path_prepend),
+                json.dumps(self._sys_path_append),
+            ],
+            stdout=self._osutils.pipe,
+            stderr=self._osutils.pipe,
+            env=self._environ,
+        )
+        _, err = p.communicate()
+        stderr = err.decode('utf-8', 'replace')
+        _, marker, app_output = stderr.partition(_APP_IMPORT_MARKER)
+        if p.returncode != 0 or not marker:
+            errors = [
+                line for line in (app_output or stderr).splitlines()
+                if not line.startswith(_IMPORT_TIME_PREFIX)
+            ]
+            raise ImportProfileError(
+                'Unable to import your app.py file:\n\n%s'
+                % '\n'.join(errors).strip()
+            )
+        return ImportProfile(roots=parse_importtime(app_output))
@@ -14,6 +14,14 @@ import functools
 import warnings
 from collections import namedtuple
 import json
+import math
+import queue
+import socket
+import asyncio
+import http.client
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 from six.moves.BaseHTTPServer import HTTPServer
 from six.moves.BaseHTTPServer import BaseHTTPRequestHandler
@@ -24,7 +32,9 @@ from typing import (
     Dict,
     Tuple,
     Callable,
+    Iterator,
     Optional,
+    Set,
     Union,
 )  # noqa
 
@@ -55,12 +65,72 @@ class Clock(object):
         return time.time()
 
 
+#: The HTTP servers that can be selected with ``chalice local --server``.
+SERVER_TYPES = ('threaded', 'pool', 'asyncio')
+DEFAULT_POOL_SIZE = 10
+DEFAULT_LISTEN_BACKLOG = 128
+DEFAULT_KEEP_ALIVE_TIMEOUT = 5.0
+DEFAULT_STATS_INTERVAL = 10.0
+
+
+@dataclass
+class LocalServerOptions(object):
+    #: One of ``threaded`` (a thread per connection), ``pool``
+    #: (a fixed size pool of worker threads) or ``asyncio`` (an event
+    #: loop that runs the app in a fixed size pool of worker threads).
+    server_type: str = 'threaded'
+    #: The number of worker threads used by the ``pool`` and ``asyncio``
+    #: servers.
+    pool_size: int = DEFAULT_POOL_SIZE
+    #: The size of the socket listen backlog used by the ``pool`` and
+    #: ``asyncio`` servers.
+    listen_backlog: int = DEFAULT_LISTEN_BACKLOG
+    #: The number of seconds the ``pool`` and ``asyncio`` servers wait
+    #: for the next request on an idle keep-alive connection before
+    #: closing it.
+    keep_alive_timeout: float = DEFAULT_KEEP_ALIVE_TIMEOUT
+    #: Whether or not to periodically print requests/sec and p99 latency.
+    stats: bool = False
+
+    def get_server_cls(self) -> ServerCls:
+        if self.server_type == 'threaded':
+            return ThreadedHTTPServer
+        elif self.server_type == 'pool':
+            return functools.partial(
+                PooledHTTPServer,
+                pool_size=self.pool_size,
+                listen_backlog=self.listen_backlog,
+                keep_alive_timeout=self.keep_alive_timeout,
+            )
+        elif self.server_type == 'asyncio':
+            return functools.partial(
+                AsyncioHTTPServer,
+                pool_size=self.pool_size,
+                listen_backlog=self.listen_backlog,
+                keep_alive_timeout=self.keep_alive_timeout,
+            )
+        raise ValueError("Unknown server type: %s, expected one of: %s"
+                         % (self.server_type, ', '.join(SERVER_TYPES)))
+
+
 def create_local_server(app_obj: Chalice,
                         config: Config,
-                        host: str, port: int) -> LocalDevServer:
+                        host: str, port: int,
+                        options: Optional[LocalServerOptions] = None
+                        ) -> LocalDevServer:
+    if options is None:
+        options = LocalServerOptions()
     CustomLocalChalice.__bases__ = (LocalChalice, app_obj.__class__)
     app_obj.__class__ = CustomLocalChalice
-    return LocalDevServer(app_obj, config, host, port)
+    # Any REST API handler that was already created needs to be rebuilt
+    # with the local mode settings.
+    app_obj._rest_api_handler = None
+    stats = None
+    if options.stats:
+        stats = RequestStats()
+    return LocalDevServer(app_obj, config, host, port,
+                          server_cls=options.get_server_cls(),
+                          stats=stats)
 
 
 class LocalARNBuilder(object):
@@ -111,6 +181,19 @@ class ARNMatcher(object):
         return False
 
 
+class _RouteNode(object):
+    """A single path segment in the compiled route trie."""
+
+    def __init__(self) -> None:
+        # The route template that terminates at this node, if any.
+        self.route: Optional[str] = None
+        self.literals: Dict[str, _RouteNode] = {}
+        # Tuples of (segment, capture_name, child_node), kept sorted
+        # by segment so captures are tried in the same order as the
+        # sorted route templates.
+        self.captures: List[Tuple[str, str, _RouteNode]] = []
+
+
 class RouteMatcher(object):
     def __init__(self, route_urls: List[str]) -> None:
         # Sorting the route_urls ensures we always check
@@ -118,6 +201,28 @@ class RouteMatcher(object):
         # variable/capture parts of the route, e.g
         # '/foo/bar' before '/foo/{capture}'
         self.route_urls = sorted(route_urls)
+        self._root = self._compile(self.route_urls)
+
+    def _compile(self, route_urls: List[str]) -> _RouteNode:
+        root = _RouteNode()
+        for route_url in route_urls:
+            node = root
+            for segment in route_url.split('/'):
+                node = self._get_or_add_child(node, segment)
+            node.route = route_url
+        return root
+
+    def _get_or_add_child(self, node: _RouteNode,
+                          segment: str) -> _RouteNode:
+        if not (segment.startswith('{') and segment.endswith('}')):
+            return node.literals.setdefault(segment, _RouteNode())
+        for existing, _, child in node.captures:
+            if existing == segment:
+                return child
+        child = _RouteNode()
+        node.captures.append((segment, segment[1:-1], child))
+        node.captures.sort(key=lambda capture: capture[0])
+        return child
 
     def match_route(self, url: str) -> MatchResult:
         """Match the url against known routes.
@@ -139,19 +244,37 @@ class RouteMatcher(object):
         if path != '/' and path.endswith('/'):
             path = path[:-1]
         parts = path.split('/')
-        captured = {}
-        for route_url in self.route_urls:
-            url_parts = route_url.split('/')
-            if len(parts) == len(url_parts):
-                for i, j in zip(parts, url_parts):
-                    if j.startswith('{') and j.endswith('}'):
-                        captured[j[1:-1]] = i
-                        continue
-                    if i != j:
-                        break
-                else:
-                    return MatchResult(route_url, captured, query_params)
-        raise ValueError("No matching route found for: %s" % url)
+        captured: Dict[str, str] = {}
+        route_url = self._match_node(self._root, parts, 0, captured)
+        if route_url is None:
+            raise ValueError("No matching route found for: %s" % url)
+        return MatchResult(route_url, captured, query_params)
+
+    def _match_node(self, node: _RouteNode, parts: List[str],
+                    index: int, captured: Dict[str, str]) -> Optional[str]:
+        # Children are tried in the same order the sorted route templates
+        # would be checked, which in practice means a literal segment is
+        # tried before any capture.  We backtrack if a branch doesn't lead
+        # to a complete route.
+        if index == len(parts):
+            return node.route
+        part = parts[index]
+        literal = node.literals.get(part)
+        for segment, name, child in node.captures:
+            if literal is not None and part < segment:
+                route_url = self._match_node(
+                    literal, parts, index + 1, captured)
+                if route_url is not None:
+                    return route_url
+                literal = None
+            captured[name] = part
+            route_url = self._match_node(child, parts, index + 1, captured)
+            if route_url is not None:
+                return route_url
+            del captured[name]
+        if literal is not None:
+            return self._match_node(literal, parts, index + 1, captured)
+        return None
 
 
 class LambdaEventConverter(object):
@@ -445,7 +568,13 @@ class LocalGatewayAuthorizer(object):
 
 
 class LocalGateway(object):
-    """A class for faking the behavior of API Gateway."""
+    """A class for faking the behavior of API Gateway.
+
+    A single instance is shared by all the request handler threads
+    of a ``LocalDevServer``, so no per-request state can be stored on
+    this object (or the converter/authorizer objects it creates).
+
+    """
 
     MAX_LAMBDA_EXECUTION_TIME = 900
 
@@ -581,14 +710,24 @@ class LocalGateway(object):
 class ChaliceRequestHandler(BaseHTTPRequestHandler):
     """A class for mapping raw HTTP events to and from LocalGateway."""
     protocol_version = 'HTTP/1.1'
+    # The headers and body are written separately, so with Nagle's
+    # algorithm enabled keep-alive clients wait on a delayed ACK
+    # before receiving the body of each response.
+    disable_nagle_algorithm = True
 
     def __init__(self,
                  request: bytes,
                  client_address: Tuple[str, int],
                  server: HTTPServer,
                  app_object: Chalice,
-                 config: Config) -> None:
-        self.local_gateway = LocalGateway(app_object, config)
+                 config: Config,
+                 local_gateway: Optional[LocalGateway] = None,
+                 stats: Optional[RequestStats] = None) -> None:
+        if local_gateway is None:
+            local_gateway = LocalGateway(app_object, config)
+        self.local_gateway = local_gateway
+        self._app_object = app_object
+        self._stats = stats
         BaseHTTPRequestHandler.__init__(
             self, request, client_address, server)  # type: ignore
 
@@ -601,6 +740,14 @@ class ChaliceRequestHandler(BaseHTTPRequestHandler):
         return converted_headers, body
 
     def _generic_handle(self) -> None:
+        start_time = time.perf_counter()
+        try:
+            self._handle_request()
+        finally:
+            if self._stats is not None:
+                self._stats.record(time.perf_counter() - start_time)
+
+    def _handle_request(self) -> None:
         headers, body = self._parse_payload()
         try:
             response = self.local_gateway.handle_request(
@@ -633,11 +780,23 @@ class ChaliceRequestHandler(BaseHTTPRequestHandler):
     def _send_http_response(self,
                             code: int,
                             headers: HeaderType,
-                            body: Optional[Union[str, bytes]]) -> None:
+                            body: Optional[Union[str, bytes,
+                                                 Iterator[Any]]]) -> None:
         if body is None:
             self._send_http_response_no_body(code, headers)
-        else:
+        elif isinstance(body, (str, bytes)):
             self._send_http_response_with_body(code, headers, body)
+        elif self.request_version != 'HTTP/1.1':
+            # Chunked transfer encoding is only available in HTTP/1.1,
+            # older clients get the joined body.
+            try:
+                joined = b''.join(self._encode_chunks(body))
+            except Exception:
+                self._abort_streamed_response()
+                return
+            self._send_http_response_with_body(code, headers, joined)
+        else:
+            self._send_chunked_http_response(code, headers, body)
 
     def _send_http_response_with_body(self,
                                       code: int,
@@ -653,6 +812,50 @@ class ChaliceRequestHandler(BaseHTTPRequestHandler):
         self._send_headers(headers)
         self.wfile.write(body)
 
+    def _send_chunked_http_response(self,
+                                    code: int,
+                                    headers: HeaderType,
+                                    body: Iterator[Any]) -> None:
+        self.send_response(code)
+        self.send_header('Transfer-Encoding', 'chunked')
+        content_type = headers.pop(
+            'Content-Type', 'application/json')
+        self.send_header('Content-Type', content_type)
+        self._send_headers(headers)
+        chunks = self._encode_chunks(body)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except Exception:
+                self._abort_streamed_response()
+                return
+            # An empty chunk marks the end of the body, so we can't
+            # send any empty chunks from the view.
+            if chunk:
+                self.wfile.write(b'%X\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _abort_streamed_response(self) -> None:
+        # The status code may already have been sent, so the only way to
+        # tell the client the response is incomplete is to close the
+        # connection without sending the rest of the response.
+        self._app_object.log.error(
+            "Caught exception while streaming response for path %s",
+            self.path, exc_info=True)
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    def _encode_chunks(self, body: Iterator[Any]) -> Iterator[bytes]:
+        for chunk in body:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode('utf-8')
+            yield chunk
+
     do_GET = do_PUT = do_POST = do_HEAD = do_DELETE = \
         do_PATCH = do_OPTIONS = _generic_handle
 
@@ -686,17 +889,355 @@ class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
     daemon_threads = True
 
 
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that handles connections with a fixed pool of threads.
+
+    Unlike ``ThreadedHTTPServer``, the number of threads doesn't grow
+    with the number of connections.  Once every worker is busy, new
+    connections wait in the socket's listen backlog until a worker is
+    available.  Because a keep-alive connection holds on to its worker,
+    connections that are idle for longer than ``keep_alive_timeout``
+    seconds are closed so they can't starve other clients.
+    """
+
+    def __init__(self,
+                 server_address: Tuple[str, int],
+                 handler_cls: HandlerCls,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 listen_backlog: int = DEFAULT_LISTEN_BACKLOG,
+                 keep_alive_timeout: float = DEFAULT_KEEP_ALIVE_TIMEOUT
+                 ) -> None:
+        # This is read by server_activate() when the socket starts
+        # listening, so it must be set before calling the base class.
+        self.request_queue_size = listen_backlog
+        self.pool_size = pool_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self._requests: queue.Queue[
+            Optional[Tuple[socket.socket, Tuple[str, int]]]] = queue.Queue()
+        self._available_workers = threading.Semaphore(pool_size)
+        HTTPServer.__init__(self, server_address, handler_cls)
+        self._workers = []
+        for _ in range(pool_size):
+            worker = threading.Thread(target=self._process_requests)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def process_request(self, request: socket.socket,
+                        client_address: Tuple[str, int]) -> None:
+        # Blocking here until a worker is free means we stop accepting
+        # connections, which leaves them in the listen backlog.
+        self._available_workers.acquire()
+        request.settimeout(self.keep_alive_timeout)
+        self._requests.put((request, client_address))
+
+    def _process_requests(self) -> None:
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self._available_workers.release()
+
+    def server_close(self) -> None:
+        HTTPServer.server_close(self)
+        for _ in self._workers:
+            self._requests.put(None)
+
+
+class _AsyncioConnection(object):
+    """Socket-like object given to the request handler by AsyncioHTTPServer.
+
+    The event loop has already read the entire request, so the handler
+    reads it from memory.  Anything the handler sends is handed back to
+    the event loop to write to the client, and the handler waits until
+    it has been written.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop,
+                 writer: asyncio.StreamWriter, raw_request: bytes) -> None:
+        self._loop = loop
+        self._writer = writer
+        self._raw_request = raw_request
+        self._sent_headers = False
+        #: Set if the response headers asked to close the connection.
+        self.close_requested = False
+
+    def makefile(self, mode: str, bufsize: int = -1) -> BytesIO:
+        return BytesIO(self._raw_request)
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        pass
+
+    def shutdown(self, how: int) -> None:
+        # The event loop closes the connection once the handler returns.
+        self.close_requested = True
+
+    def setsockopt(self, *args: Any) -> None:
+        pass
+
+    def sendall(self, data: bytes) -> None:
+        data = bytes(data)
+        if not self._sent_headers:
+            # The status line and headers are always sent with a
+            # single write before the body.
+            self._sent_headers = True
+            self.close_requested = b'\r\nconnection: close\r\n' in \
+                data.lower()
+        # Wait until the data has been flushed to the client so a slow
+        # client can't make streamed response bodies pile up in memory.
+        asyncio.run_coroutine_threadsafe(
+            self._write_and_drain(data), self._loop).result()
+
+    async def _write_and_drain(self, data: bytes) -> None:
+        self._writer.write(data)
+        await self._writer.drain()
+
+
+class AsyncioHTTPServer(object):
+    """HTTP server that handles connections in an asyncio event loop.
+
+    Requests are read in the event loop, so idle or slow clients don't
+    tie up a thread.  Each request is then given to the request handler,
+    which runs the app in a fixed size pool of worker threads, so the
+    responses are the same as the ones sent by ``ThreadedHTTPServer``.
+    This implements the parts of the ``HTTPServer`` interface used by
+    ``LocalDevServer``.
+    """
+
+    # Requests with larger headers are rejected by closing the connection.
+    MAX_HEADER_SIZE = 64 * 1024
+
+    def __init__(self,
+                 server_address: Tuple[str, int],
+                 handler_cls: HandlerCls,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 listen_backlog: int = DEFAULT_LISTEN_BACKLOG,
+                 keep_alive_timeout: float = DEFAULT_KEEP_ALIVE_TIMEOUT
+                 ) -> None:
+        self.RequestHandlerClass = handler_cls
+        self.pool_size = pool_size
+        self.request_queue_size = listen_backlog
+        self.keep_alive_timeout = keep_alive_timeout
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+        self._loop = asyncio.new_event_loop()
+        self._is_shut_down = threading.Event()
+        self._request_handled: Optional[asyncio.Future[None]] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        # Bind the socket the same way HTTPServer does, so we fail
+        # immediately if the address is already in use.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(server_address)
+        except Exception:
+            sock.close()
+            raise
+        self.server_address = sock.getsockname()
+        self.server_port = self.server_address[1]
+        self._server = self._loop.run_until_complete(asyncio.start_server(
+            self._handle_connection, sock=sock, backlog=listen_backlog,
+            limit=self.MAX_HEADER_SIZE))
+
+    def serve_forever(self) -> None:
+        self._is_shut_down.clear()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._is_shut_down.set()
+
+    def handle_request(self) -> None:
+        self._request_handled = self._loop.create_future()
+        try:
+            self._loop.run_until_complete(self._request_handled)
+        finally:
+            self._request_handled = None
+
+    def shutdown(self) -> None:
+        # Like HTTPServer.shutdown(), this must be called from another
+        # thread and blocks until serve_forever() returns.
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._is_shut_down.wait()
+
+    def server_close(self) -> None:
+        self._server.close()
+        # Closing the open connections lets their tasks finish before
+        # we close the loop.
+        for writer in list(self._writers):
+            writer.close()
+        tasks = asyncio.all_tasks(self._loop)
+        if tasks:
+            self._loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True))
+        self._executor.shutdown(wait=False)
+        self._loop.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        client_address = writer.get_extra_info('peername')
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    raw_request, keep_alive = await self._read_request(
+                        reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                        asyncio.LimitOverrunError, ValueError,
+                        ConnectionError):
+                    return
+                connection = _AsyncioConnection(
+                    self._loop, writer, raw_request)
+                await self._loop.run_in_executor(
+                    self._executor, self._finish_request, connection,
+                    client_address)
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    return
+                if self._request_handled is not None and \
+                        not self._request_handled.done():
+                    self._request_handled.set_result(None)
+                if not keep_alive or connection.close_requested:
+                    return
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader
+                            ) -> Tuple[bytes, bool]:
+        # The keep-alive timeout only applies while we're waiting for
+        # the start of the next request.
+        head = await asyncio.wait_for(
+            reader.readuntil(b'\r\n\r\n'), self.keep_alive_timeout)
+        request_line, _, header_lines = head.partition(b'\r\n')
+        headers = http.client.parse_headers(BytesIO(header_lines))
+        body = b''
+        content_length = headers.get('content-length')
+        if content_length is not None and content_length.isdigit():
+            body = await reader.readexactly(int(content_length))
+        return head + body, self._is_keep_alive(request_line, headers)
+
+    def _is_keep_alive(self, request_line: bytes,
+                       headers: http.client.HTTPMessage) -> bool:
+        # This mirrors how BaseHTTPRequestHandler.parse_request()
+        # decides whether to close the connection.
+        words = request_line.split()
+        if len(words) != 3:
+            return False
+        connection_type = headers.get('connection', '').lower()
+        if connection_type == 'close':
+            return False
+        if words[2] >= b'HTTP/1.1':
+            return True
+        return connection_type == 'keep-alive'
+
+    def _finish_request(self, connection: _AsyncioConnection,
+                        client_address: Tuple[str, int]) -> None:
+        try:
+            self.RequestHandlerClass(connection, client_address, self)
+        except Exception:
+            self.handle_error(connection, client_address)
+
+    def handle_error(self, request: Any,
+                     client_address: Tuple[str, int]) -> None:
+        HTTPServer.handle_error(self, request, client_address)  # type: ignore
+
+
+RequestStatsSummary = namedtuple(
+    'RequestStatsSummary',
+    ['num_requests', 'requests_per_second', 'p99_latency'])
+
+
+class RequestStats(object):
+    """Collect request latencies for ``chalice local --stats``.
+
+    Latencies are accumulated until ``summarize()`` is called, which
+    reports on the requests made since the previous summary.
+    """
+
+    def __init__(self, clock: Optional[Clock] = None) -> None:
+        if clock is None:
+            clock = Clock()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies: List[float] = []
+        self._start_time = clock.time()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def summarize(self) -> Optional[RequestStatsSummary]:
+        now = self._clock.time()
+        with self._lock:
+            latencies = self._latencies
+            elapsed = now - self._start_time
+            self._latencies = []
+            self._start_time = now
+        if not latencies:
+            return None
+        latencies.sort()
+        p99_index = int(math.ceil(len(latencies) * 0.99)) - 1
+        requests_per_second = len(latencies) / elapsed if elapsed > 0 else 0
+        return RequestStatsSummary(
+            num_requests=len(latencies),
+            requests_per_second=requests_per_second,
+            p99_latency=latencies[p99_index],
+        )
+
+
+class RequestStatsReporter(threading.Thread):
+    """Thread that periodically prints a summary of ``RequestStats``."""
+
+    def __init__(self, stats: RequestStats,
+                 interval: float = DEFAULT_STATS_INTERVAL) -> None:
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self._stats = stats
+        self._interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self.report()
+
+    def report(self) -> None:
+        summary = self._stats.summarize()
+        if summary is None:
+            return
+        print("Requests: %s, requests/sec: %.2f, p99 latency: %.2f ms" % (
+            summary.num_requests, summary.requests_per_second,
+            summary.p99_latency * 1000))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.report()
+
+
 class LocalDevServer(object):
     def __init__(self,
                  app_object: Chalice,
                  config: Config, host: str, port: int,
                  handler_cls: HandlerCls = ChaliceRequestHandler,
-                 server_cls: ServerCls = ThreadedHTTPServer) -> None:
+                 server_cls: ServerCls = ThreadedHTTPServer,
+                 stats: Optional[RequestStats] = None) -> None:
         self.app_object = app_object
         self.host = host
         self.port = port
+        self.stats = stats
+        # The gateway precomputes the route matcher and authorizer for
+        # the app, so we create it once and share it across every
+        # request instead of rebuilding it in each handler.
+        self.local_gateway = LocalGateway(app_object, config)
         self._wrapped_handler = functools.partial(
-            handler_cls, app_object=app_object, config=config)
+            handler_cls, app_object=app_object, config=config,
+            local_gateway=self.local_gateway, stats=stats)
         self.server = server_cls((host, port), self._wrapped_handler)
 
     def handle_single_request(self) -> None:
@@ -704,7 +1245,15 @@ class LocalDevServer(object):
 
     def serve_forever(self) -> None:
         print("Serving on http://%s:%s" % (self.host, self.port))
-        self.server.serve_forever()
+        if self.stats is None:
+            self.server.serve_forever()
+            return
+        reporter = RequestStatsReporter(self.stats)
+        reporter.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            reporter.stop()
 
     def shutdown(self) -> None:
         # This must be called from another thread of else it
@@ -738,6 +1287,9 @@ class HTTPServerThread(threading.Thread):
 class LocalChalice(Chalice):
 
     _THREAD_LOCAL = threading.local()
+    # Generator/iterator response bodies are sent to the client
+    # using chunked transfer encoding.
+    _STREAM_RESPONSE_BODY = True
 
     # This is a known mypy bug where you can't override instance
     # variables with properties.  So this should be type safe, which
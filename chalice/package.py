@@ -28,9 +28,14 @@ from chalice.deploy.deployer import create_build_stage
 
 
 def create_app_packager(
-        config, options, package_format='cloudformation',
-        template_format='json', merge_template=None):
-    # type: (Config, PackageOptions, str, str, Optional[str]) -> AppPackager
+        config,                           # type: Config
+        options,                          # type: PackageOptions
+        package_format='cloudformation',  # type: str
+        template_format='json',           # type: str
+        merge_template=None,              # type: Optional[str]
+        jobs=1,                           # type: int
+):
+    # type: (...) -> AppPackager
     osutils = OSUtils()
     ui = UI()
     application_builder = ApplicationGraphBuilder()
@@ -41,7 +46,7 @@ def create_app_packager(
     template_serializer = cast(TemplateSerializer, JSONTemplateSerializer())
     if package_format == 'cloudformation':
         build_stage = create_build_stage(
-            osutils, ui, CFNSwaggerGenerator(), config)
+            osutils, ui, CFNSwaggerGenerator(), config, jobs=jobs)
         use_yaml_serializer = template_format == 'yaml'
         if merge_template is not None and \
                 YAMLTemplateSerializer.is_yaml_template(merge_template):
@@ -61,7 +66,7 @@ def create_app_packager(
         generator = SAMTemplateGenerator(config, options)
     else:
         build_stage = create_build_stage(
-            osutils, ui, TerraformSwaggerGenerator(), config)
+            osutils, ui, TerraformSwaggerGenerator(), config, jobs=jobs)
         generator = TerraformGenerator(config, options)
         post_processors.append(
             TerraformCodeLocationPostProcessor(osutils=osutils))
@@ -193,6 +198,7 @@ class SAMTemplateGenerator(TemplateGenerator):
             "Type": "AWS::Serverless::LayerVersion",
             "Properties": {
                 "CompatibleRuntimes": [resource.runtime],
+                "CompatibleArchitectures": [resource.architecture],
                 "ContentUri": resource.deployment_package.filename,
                 "LayerName": resource.layer_name
             }
@@ -247,6 +253,7 @@ class SAMTemplateGenerator(TemplateGenerator):
                 'Tracing': resource.xray and 'Active' or 'PassThrough',
                 'Timeout': resource.timeout,
                 'MemorySize': resource.memory_size,
+                'Architectures': [resource.architecture],
             },
         }  # type: Dict[str, Any]
 
@@ -827,7 +834,8 @@ class TerraformGenerator(TemplateGenerator):
             'terraform': {
                 'required_version': '>= 0.12.26, < 1.4.0',
                 'required_providers': {
-                    'aws': {'version': '>= 2, < 5'},
+                    # 3.61 added the lambda architectures arguments.
+                    'aws': {'version': '>= 3.61, < 5'},
                     'null': {'version': '>= 2, < 4'}
                 }
             },
@@ -1244,6 +1252,7 @@ class TerraformGenerator(TemplateGenerator):
                 resource.resource_name] = {
                     'layer_name': resource.layer_name,
                     'compatible_runtimes': [resource.runtime],
+                    'compatible_architectures': [resource.architecture],
                     'filename': resource.deployment_package.filename,
         }
         self._chalice_layer = resource.resource_name
@@ -1253,6 +1262,7 @@ class TerraformGenerator(TemplateGenerator):
         func_definition = {
             'function_name': resource.function_name,
             'runtime': resource.runtime,
+            'architectures': [resource.architecture],
             'handler': resource.handler,
             'memory_size': resource.memory_size,
             'tags': resource.tags,
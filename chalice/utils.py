@@ -1,5 +1,7 @@
 import io
 import os
+import copy
+import zlib
 import zipfile
 import json
 import contextlib
@@ -7,22 +9,50 @@ import tempfile
 import re
 import shutil
 import sys
+import struct
 import tarfile
 from datetime import datetime, timedelta
 import subprocess
 from os import PathLike  # noqa
+from concurrent.futures import Future, ThreadPoolExecutor  # noqa
 
-from collections import OrderedDict  # noqa
+from collections import OrderedDict, deque  # noqa
 import click
 from typing import IO, Dict, List, Any, Tuple, Iterator, BinaryIO, Text  # noqa
 from typing import Optional, Union  # noqa
 from typing import MutableMapping, Callable  # noqa
+from typing import Deque, Iterable  # noqa
 from typing import cast  # noqa
 import dateutil.parser
 from dateutil.tz import tzutc
 
 from chalice.constants import WELCOME_PROMPT
 
+if sys.platform == 'win32':
+    import msvcrt
+
+    def _lock_file(f: IO[bytes]) -> None:
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after trying for 10 seconds.
+                pass
+
+    def _unlock_file(f: IO[bytes]) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f: IO[bytes]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f: IO[bytes]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
 OptInt = Optional[int]
 OptBytes = Optional[bytes]
 EnvVars = MutableMapping
@@ -105,13 +135,41 @@ class ChaliceZipFile(zipfile.ZipFile):
 
     Normalizes datetime and permissions.
 
+    Besides the arguments accepted by ``zipfile.ZipFile``, this class
+    accepts a ``jobs`` argument, the number of threads used to compress
+    files in ``write_files()``, and a ``store_compressed`` argument.  When
+    ``store_compressed`` is true, files that are already compressed (based
+    on their file extension) are stored in the archive without being
+    compressed again.
+
     """
 
     compression = 0  # Try to make mypy happy.
     _default_time_time = (1980, 1, 1, 0, 0, 0)
+    # The fixed size portion of a local file header, see section 4.3.7
+    # of the zip file APPNOTE.
+    _local_file_header = struct.Struct('<4s2B4HL2L2H')
+    _local_file_header_signature = b'PK\x03\x04'
+    # Bit 3 of the general purpose flags indicates the CRC and sizes
+    # follow the file data in a data descriptor instead of being in the
+    # local file header.
+    _data_descriptor_flag = 0x08
+    _copy_chunk_size = 1024 * 1024
+    # Files larger than this are always streamed into the archive by
+    # write_files() instead of being compressed in memory by a worker.
+    _max_parallel_file_size = 32 * 1024 * 1024
+    _compressed_extensions = (
+        '.zip', '.whl', '.egg', '.jar', '.gz', '.tgz', '.bz2', '.xz',
+        '.lzma', '.zst', '.7z', '.npz', '.png', '.jpg', '.jpeg', '.gif',
+        '.webp', '.woff', '.woff2', '.mp3', '.mp4',
+    )
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self._osutils = cast(OSUtils, kwargs.pop('osutils', OSUtils()))
+        self._jobs = max(cast(int, kwargs.pop('jobs', 1)), 1)
+        self._store_compressed = cast(
+            bool, kwargs.pop('store_compressed', False)
+        )
         super(ChaliceZipFile, self).__init__(*args, **kwargs)
 
     # pylint: disable=W0221
@@ -126,8 +184,177 @@ class ChaliceZipFile(zipfile.ZipFile):
         # We know that in our packager code we never call write() on
         # directories.
         zinfo = self._create_zipinfo(filename, arcname, compress_type)
+        # The file is copied into the archive in chunks so we don't have
+        # to hold the entire file in memory.  ZipFile.writestr() writes
+        # through open() as well so the output is the same.
+        with open(filename, 'rb') as f, self.open(zinfo, 'w') as dest:
+            shutil.copyfileobj(f, dest, self._copy_chunk_size)
+
+    def write_files(self, files: Iterable[Tuple[StrPath, StrPath]]) -> None:
+        """Write each ``(filename, arcname)`` pair to the archive.
+
+        This produces the same archive as calling ``write()`` for each
+        file.  If ``jobs`` is greater than one, files are read and
+        compressed in a thread pool, zlib releases the GIL while it
+        compresses, and are then written to the archive in the order
+        they were given.  Large files are always streamed into the
+        archive by ``write()`` so they aren't held in memory.
+
+        """
+        if self._jobs == 1 or self.compression not in (
+            zipfile.ZIP_STORED,
+            zipfile.ZIP_DEFLATED,
+        ):
+            for filename, arcname in files:
+                self.write(filename, arcname)
+            return
+        pending: Deque[Tuple[zipfile.ZipInfo, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+            for filename, arcname in files:
+                zinfo = self._create_zipinfo(filename, arcname, None)
+                if zinfo.file_size > self._max_parallel_file_size:
+                    while pending:
+                        self._write_compressed_entry(*pending.popleft())
+                    self.write(filename, arcname)
+                    continue
+                pending.append((zinfo, executor.submit(
+                    self._compress_file, filename, zinfo.compress_type)))
+                # Limit how many compressed files we hold in memory
+                # while waiting for earlier files to finish.
+                while len(pending) > self._jobs * 2:
+                    self._write_compressed_entry(*pending.popleft())
+            while pending:
+                self._write_compressed_entry(*pending.popleft())
+
+    def _compress_file(
+        self, filename: StrPath, compress_type: int
+    ) -> Tuple[int, int, List[bytes]]:
+        # This must compress data exactly the way ZipFile.writestr() does
+        # so the output doesn't depend on the number of jobs.
+        compressor = None
+        if compress_type == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15
+            )
+        crc = 0
+        file_size = 0
+        chunks = []
         with open(filename, 'rb') as f:
-            self.writestr(zinfo, f.read())
+            for chunk in iter(lambda: f.read(self._copy_chunk_size), b''):
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                chunks.append(chunk)
+        if compressor is not None:
+            chunks.append(compressor.flush())
+        return crc, file_size, chunks
+
+    def _write_compressed_entry(
+        self, zinfo: zipfile.ZipInfo, future: Future
+    ) -> None:
+        crc, file_size, chunks = future.result()
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = sum(len(chunk) for chunk in chunks)
+        self._write_raw_entry(zinfo, chunks)
+
+    def copy_entry(
+        self, source: zipfile.ZipFile, zinfo: zipfile.ZipInfo
+    ) -> None:
+        """Copy an entry from another zip file without recompressing it.
+
+        The compressed bytes of the entry are copied as is, which produces
+        the same output as reading the entry and writing it back with
+        ``writestr()`` at a fraction of the cost.
+
+        """
+        assert source.fp is not None and self.fp is not None
+        source.fp.seek(zinfo.header_offset)
+        header = self._local_file_header.unpack(
+            source.fp.read(self._local_file_header.size)
+        )
+        if header[0] != self._local_file_header_signature:
+            raise zipfile.BadZipFile(
+                "Bad magic number for file header: %s" % zinfo.filename
+            )
+        # The last two fields are the lengths of the filename and extra
+        # field, the compressed data starts immediately after them.
+        source.fp.seek(header[-2] + header[-1], os.SEEK_CUR)
+        new_zinfo = copy.copy(zinfo)
+        # We know the CRC and sizes up front so they're always written
+        # in the local file header, same as writestr() does.
+        new_zinfo.flag_bits &= ~self._data_descriptor_flag
+        self._write_raw_entry(
+            new_zinfo, self._iter_raw_data(source.fp, zinfo)
+        )
+
+    def _iter_raw_data(
+        self, fileobj: IO[bytes], zinfo: zipfile.ZipInfo
+    ) -> Iterator[bytes]:
+        remaining = zinfo.compress_size
+        while remaining > 0:
+            chunk = fileobj.read(min(remaining, self._copy_chunk_size))
+            if not chunk:
+                raise zipfile.BadZipFile(
+                    "Truncated file data: %s" % zinfo.filename
+                )
+            yield chunk
+            remaining -= len(chunk)
+
+    def _write_raw_entry(
+        self, zinfo: zipfile.ZipInfo, data: Iterable[bytes]
+    ) -> None:
+        # Writes an entry whose CRC and sizes are already set on the zinfo
+        # and whose data is already compressed.
+        assert self.fp is not None
+        # ZipFile.writestr() uses this same check to decide whether the
+        # local file header needs a zip64 extra field.
+        zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        # The _lock attribute isn't in the zipfile type stubs.
+        with self._lock:  # type: ignore
+            zinfo.header_offset = self.fp.tell()
+            self.fp.write(zinfo.FileHeader(zip64))
+            for chunk in data:
+                self.fp.write(chunk)
+            # This mirrors the bookkeeping ZipFile.writestr() does so the
+            # entry is included in the central directory on close().
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+            self.start_dir = self.fp.tell()
+            self._didModify = True
+
+    def copy_or_write(
+        self, source: zipfile.ZipFile, filename: StrPath, arcname: StrPath
+    ) -> None:
+        """Write a file, reusing its entry in ``source`` if it's unchanged.
+
+        If ``source`` has an entry for ``arcname`` with the same contents
+        and permissions as ``filename``, its compressed bytes are copied
+        with ``copy_entry()``.  Otherwise ``filename`` is compressed and
+        written as usual.
+
+        """
+        zinfo = self._create_zipinfo(filename, arcname, None)
+        try:
+            previous = source.getinfo(zinfo.filename)
+        except KeyError:
+            self.write(filename, arcname)
+            return
+        if (previous.file_size == zinfo.file_size
+                and previous.external_attr == zinfo.external_attr
+                and previous.compress_type == zinfo.compress_type
+                and previous.CRC == self._crc32(filename)):
+            self.copy_entry(source, previous)
+        else:
+            self.write(filename, arcname)
+
+    def _crc32(self, filename: StrPath) -> int:
+        crc = 0
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(self._copy_chunk_size), b''):
+                crc = zlib.crc32(chunk, crc)
+        return crc
 
     def _create_zipinfo(
         self,
@@ -153,27 +380,49 @@ class ChaliceZipFile(zipfile.ZipFile):
         # so we have to shift it up to the right place.
         zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
         zinfo.file_size = st.st_size
-        zinfo.compress_type = compress_type or self.compression
+        zinfo.compress_type = compress_type or self._get_compress_type(arcname)
         return zinfo
 
+    def _get_compress_type(self, arcname: str) -> int:
+        if self._store_compressed and arcname.lower().endswith(
+            self._compressed_extensions
+        ):
+            return zipfile.ZIP_STORED
+        return self.compression
 
-def create_zip_file(source_dir: str, outfile: str) -> None:
+
+def create_zip_file(
+    source_dir: str,
+    outfile: str,
+    jobs: int = 1,
+    store_compressed: bool = False,
+) -> None:
     """Create a zip file from a source input directory.
 
     This function is intended to be an equivalent to
     `zip -r`.  You give it a source directory, `source_dir`,
     and it will recursively zip up the files into a zipfile
-    specified by the `outfile` argument.
+    specified by the `outfile` argument.  The `jobs` and
+    `store_compressed` arguments are passed to `ChaliceZipFile`.
 
     """
     with ChaliceZipFile(
-        outfile, 'w', compression=zipfile.ZIP_DEFLATED, osutils=OSUtils()
+        outfile,
+        'w',
+        compression=zipfile.ZIP_DEFLATED,
+        osutils=OSUtils(),
+        jobs=jobs,
+        store_compressed=store_compressed,
     ) as z:
-        for root, _, filenames in os.walk(source_dir):
-            for filename in filenames:
-                full_name = os.path.join(root, filename)
-                archive_name = os.path.relpath(full_name, source_dir)
-                z.write(full_name, archive_name)
+        z.write_files(_iter_zip_file_names(source_dir))
+
+
+def _iter_zip_file_names(source_dir: str) -> Iterator[Tuple[str, str]]:
+    for root, _, filenames in os.walk(source_dir):
+        for filename in filenames:
+            full_name = os.path.join(root, filename)
+            archive_name = os.path.relpath(full_name, source_dir)
+            yield full_name, archive_name
 
 
 class OSUtils(object):
@@ -186,10 +435,20 @@ class OSUtils(object):
         return open(filename, mode)
 
     def open_zip(
-        self, filename: str, mode: str, compression: int = ZIP_DEFLATED
-    ) -> zipfile.ZipFile:
+        self,
+        filename: str,
+        mode: str,
+        compression: int = ZIP_DEFLATED,
+        jobs: int = 1,
+        store_compressed: bool = False,
+    ) -> ChaliceZipFile:
         return ChaliceZipFile(
-            filename, mode, compression=compression, osutils=self
+            filename,
+            mode,
+            compression=compression,
+            osutils=self,
+            jobs=jobs,
+            store_compressed=store_compressed,
         )
 
     def remove_file(self, filename: str) -> None:
@@ -333,6 +592,24 @@ class OSUtils(object):
     def move(self, source: str, destination: str) -> None:
         shutil.move(source, destination)
 
+    def replace(self, source: str, destination: str) -> None:
+        os.replace(source, destination)
+
+    @contextlib.contextmanager
+    def file_lock(self, filename: str) -> Iterator[None]:
+        """Hold an exclusive lock on ``filename`` until the block exits.
+
+        The lock is shared between processes, and is released if the
+        process holding it exits.
+
+        """
+        with open(filename, 'a+b') as f:
+            _lock_file(f)
+            try:
+                yield
+            finally:
+                _unlock_file(f)
+
     @contextlib.contextmanager
     def tempdir(self) -> Any:
         tempdir = tempfile.mkdtemp()
@@ -373,6 +650,9 @@ class OSUtils(object):
     def basename(self, path: str) -> str:
         return os.path.basename(path)
 
+    def which(self, command: str) -> Optional[str]:
+        return shutil.which(command)
+
 
 def getting_started_prompt(prompter: Any) -> bool:
     return prompter.prompt(WELCOME_PROMPT)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Compare dependency ordering strategies used when deploying an app.
+
+The ``QuadraticDependencyBuilder`` below is the builder chalice used
+before the ordered resources were tracked with a set of ids.  It's kept
+here so the two can be compared against each other on synthetic app
+graphs with a given number of models.
+
+Usage::
+
+    $ python scripts/benchmarks/bench_build_dependencies.py
+    $ python scripts/benchmarks/bench_build_dependencies.py --sizes 100 10000
+
+"""
+import argparse
+import timeit
+
+from chalice.deploy import models
+from chalice.deploy.appgraph import DependencyBuilder
+
+
+class QuadraticDependencyBuilder(object):
+    def build_dependencies(self, graph):
+        seen = set()
+        ordered = []
+        for resource in graph.dependencies():
+            self._traverse(resource, ordered, seen)
+        return ordered
+
+    def _traverse(self, resource, ordered, seen):
+        for dep in resource.dependencies():
+            if id(dep) not in seen:
+                seen.add(id(dep))
+                self._traverse(dep, ordered, seen)
+        if id(resource) not in [id(r) for r in ordered]:
+            ordered.append(resource)
+
+
+def generate_application(num_models):
+    # Every function has its own log group and SQS event source, and they
+    # all share the app's role, policy and deployment package, which is
+    # roughly what an app with many event handlers looks like.
+    policy = models.AutoGenIAMPolicy(document=models.Placeholder.BUILD_STAGE)
+    role = models.ManagedIAMRole(
+        resource_name='default-role', role_name='app-dev',
+        trust_policy={}, policy=policy)
+    package = models.DeploymentPackage(filename='deployment.zip')
+    resources = []
+    num_functions = max(1, (num_models - 3) // 3)
+    for i in range(num_functions):
+        function = models.LambdaFunction(
+            resource_name='handler%s' % i,
+            function_name='app-dev-handler%s' % i,
+            deployment_package=package,
+            environment_variables={},
+            xray=False,
+            runtime='python3.9',
+            handler='app.handler%s' % i,
+            tags={},
+            timeout=60,
+            memory_size=128,
+            role=role,
+            security_group_ids=[],
+            subnet_ids=[],
+            reserved_concurrency=None,
+            layers=[],
+            log_group=models.LogGroup(
+                resource_name='handler%s-log-group' % i,
+                log_group_name='/aws/lambda/app-dev-handler%s' % i,
+                retention_in_days=14,
+            ),
+        )
+        resources.append(models.SQSEventSource(
+            resource_name='handler%s-sqs-event-source' % i,
+            queue='queue%s' % i,
+            batch_size=10,
+            maximum_batching_window_in_seconds=0,
+            lambda_function=function,
+        ))
+    return models.Application(stage='dev', resources=resources)
+
+
+def bench(builder, application, repeat):
+    return min(timeit.repeat(
+        lambda: builder.build_dependencies(application),
+        number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print('%8s %16s %16s %9s' % ('models', 'quadratic (ms)', 'linear (ms)',
+                                 'speedup'))
+    for size in args.sizes:
+        application = generate_application(size)
+        quadratic = QuadraticDependencyBuilder()
+        linear = DependencyBuilder()
+        expected = quadratic.build_dependencies(application)
+        assert [id(r) for r in linear.build_dependencies(application)] == \
+            [id(r) for r in expected]
+        quadratic_time = bench(quadratic, application, args.repeat) * 1e3
+        linear_time = bench(linear, application, args.repeat) * 1e3
+        print('%8s %16.2f %16.2f %8.1fx' % (
+            len(expected), quadratic_time, linear_time,
+            quadratic_time / linear_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Measure how long ``create_zip_file`` takes with different job counts.
+
+The files are compressed with one thread per job and the resulting zip
+files are checked to be identical to the serial output.
+
+Usage::
+
+    $ python scripts/benchmarks/bench_create_zip_file.py
+    $ python scripts/benchmarks/bench_create_zip_file.py --size 150 \\
+        --jobs 1 2 4 8
+
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import timeit
+
+from chalice.utils import create_zip_file
+
+
+FILE_SIZE = 256 * 1024
+
+
+def generate_source_dir(directory, total_size, seed=0):
+    # Mostly compressible source files with some incompressible
+    # binaries, similar to a site-packages directory.
+    rng = random.Random(seed)
+    words = [b'import', b'def', b'class', b'return', b'self', b'value',
+             b'for', b'in', b'if', b'else', b'None', b'True']
+    written = 0
+    index = 0
+    while written < total_size:
+        if index % 4 == 0:
+            filename = 'module%s.so' % index
+            contents = os.urandom(FILE_SIZE)
+        else:
+            filename = 'module%s.py' % index
+            contents = b' '.join(
+                rng.choice(words) for _ in range(FILE_SIZE // 5)
+            )[:FILE_SIZE]
+        with open(os.path.join(directory, filename), 'wb') as f:
+            f.write(contents)
+        written += len(contents)
+        index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=100,
+                        help='Size of the source directory in MB.')
+    parser.add_argument('--jobs', nargs='+', type=int, default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    tmpdir = tempfile.mkdtemp()
+    try:
+        source_dir = os.path.join(tmpdir, 'source')
+        os.makedirs(source_dir)
+        generate_source_dir(source_dir, args.size * 1024 * 1024)
+        expected = None
+        print('%6s %12s %9s' % ('jobs', 'time (ms)', 'speedup'))
+        baseline = None
+        for jobs in args.jobs:
+            outfile = os.path.join(tmpdir, 'out-%s.zip' % jobs)
+            elapsed = min(timeit.repeat(
+                lambda: create_zip_file(source_dir, outfile, jobs=jobs),
+                number=1, repeat=args.repeat)) * 1000
+            with open(outfile, 'rb') as f:
+                contents = f.read()
+            if expected is None:
+                expected, baseline = contents, elapsed
+            assert contents == expected
+            print('%6s %12.2f %8.1fx' % (jobs, elapsed, baseline / elapsed))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
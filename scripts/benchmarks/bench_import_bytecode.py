@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""Measure how long it takes to import an app with and without bytecode.
+
+A deployment package is built for a synthetic app, once with only the
+python sources and once with precompiled bytecode.  Each package is
+extracted and the app is imported in a new interpreter that can't write
+bytecode, similar to a Lambda cold start where the extracted package is
+read only.
+
+Usage::
+
+    $ python scripts/benchmarks/bench_import_bytecode.py
+    $ python scripts/benchmarks/bench_import_bytecode.py --modules 50 500
+
+"""
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import zipfile
+
+from chalice.deploy.packager import BytecodeCompiler
+from chalice.deploy.packager import LambdaDeploymentPackager
+from chalice.utils import OSUtils, UI
+
+
+MODULE_TEMPLATE = '''
+import json
+
+
+class Model{index}(object):
+    def __init__(self, value):
+        self.value = value
+
+    def to_json(self):
+        return json.dumps({{'value': self.value, 'index': {index}}})
+
+'''
+
+FUNCTION_TEMPLATE = '''
+def handler_{index}_{n}(event, context=None):
+    values = [item * {n} for item in event.get('items', [])]
+    if not values:
+        return {{'status': 'empty'}}
+    return {{'status': 'ok', 'total': sum(values), 'count': len(values)}}
+'''
+
+
+def create_project(directory, num_modules, functions_per_module=40):
+    package_dir = os.path.join(directory, 'vendor', 'benchpackage')
+    os.makedirs(package_dir)
+    imports = []
+    for index in range(num_modules):
+        contents = MODULE_TEMPLATE.format(index=index) + ''.join(
+            FUNCTION_TEMPLATE.format(index=index, n=n)
+            for n in range(functions_per_module))
+        with open(os.path.join(package_dir, 'module%s.py' % index),
+                  'w') as f:
+            f.write(contents)
+        imports.append('from benchpackage import module%s\n' % index)
+    with open(os.path.join(package_dir, '__init__.py'), 'w') as f:
+        f.write('')
+    with open(os.path.join(directory, 'app.py'), 'w') as f:
+        f.write('from chalice import Chalice\n')
+        f.writelines(imports)
+        f.write('app = Chalice(app_name="bench")\n')
+
+
+def create_package(project_dir, filename, bytecode_compiler=None):
+    osutils = OSUtils()
+    packager = LambdaDeploymentPackager(
+        osutils=osutils, dependency_builder=None, ui=UI(out=io.StringIO()),
+        bytecode_compiler=bytecode_compiler)
+    with osutils.open_zip(filename, 'w', osutils.ZIP_DEFLATED) as z:
+        packager._add_app_files(z, project_dir)
+        packager._add_vendor_files(
+            z, os.path.join(project_dir, 'vendor'))
+    extract_dir = filename[:-len('.zip')]
+    with zipfile.ZipFile(filename) as z:
+        z.extractall(extract_dir)
+    return extract_dir
+
+
+def time_import(directory, statement, repeat):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    command = [sys.executable, '-S', '-c', statement]
+    return min(timeit.repeat(
+        lambda: subprocess.check_call(command, cwd=directory, env=env),
+        number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modules', nargs='+', type=int,
+                        default=[10, 100, 300],
+                        help='Number of modules imported by the app.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    compiler = BytecodeCompiler(
+        OSUtils(), UI(), 'python%s.%s' % sys.version_info[:2])
+    print('%8s %15s %17s %9s' % ('modules', 'source (ms)',
+                                 'bytecode (ms)', 'speedup'))
+    for num_modules in args.modules:
+        tmpdir = tempfile.mkdtemp()
+        try:
+            project_dir = os.path.join(tmpdir, 'project')
+            create_project(project_dir, num_modules)
+            source_dir = create_package(
+                project_dir, os.path.join(tmpdir, 'source.zip'))
+            bytecode_dir = create_package(
+                project_dir, os.path.join(tmpdir, 'bytecode.zip'), compiler)
+            # The interpreter's own startup time is the same either way,
+            # so it's subtracted from both measurements.
+            startup = time_import(source_dir, 'pass', args.repeat)
+            source = time_import(
+                source_dir, 'import app', args.repeat) - startup
+            bytecode = time_import(
+                bytecode_dir, 'import app', args.repeat) - startup
+            print('%8s %15.2f %17.2f %8.1fx' % (
+                num_modules, source * 1000, bytecode * 1000,
+                source / bytecode))
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
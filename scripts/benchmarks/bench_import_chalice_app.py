@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Measure how long it takes to import ``chalice.app``.
+
+``chalice.app`` is imported on every Lambda cold start.  The import is
+run in a new interpreter with ``-X importtime`` and the fastest of the
+repeated runs is reported, along with the slowest modules it imported.
+Bytecode is written to a temporary directory on the first run and used
+by the timed runs, unless ``--no-bytecode`` is given.
+
+Usage::
+
+    $ python scripts/benchmarks/bench_import_chalice_app.py
+    $ python scripts/benchmarks/bench_import_chalice_app.py --repeat 50 \\
+        --top 20 --no-bytecode
+
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from chalice.importprofile import parse_importtime
+
+
+# Written to stderr right before the statement is run so the modules
+# imported on interpreter startup aren't counted.
+MARKER = 'bench: running statement\n'
+
+
+def profile_import(statement, env, pycache_prefix):
+    script = 'import sys; sys.stderr.write(%r); %s' % (MARKER, statement)
+    p = subprocess.run(
+        [sys.executable, '-X', 'importtime',
+         '-X', 'pycache_prefix=%s' % pycache_prefix, '-c', script],
+        stderr=subprocess.PIPE, env=env, check=True)
+    output = p.stderr.decode('utf-8').partition(MARKER)[2]
+    return parse_importtime(output)
+
+
+def flatten(records):
+    for record in records:
+        yield record
+        yield from flatten(record.children)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--statement', default='import chalice.app')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--top', type=int, default=10,
+                        help='Number of the slowest imports to show.')
+    parser.add_argument('--no-bytecode', action='store_true',
+                        help='Compile every module from source.')
+    args = parser.parse_args()
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    if args.no_bytecode:
+        env['PYTHONDONTWRITEBYTECODE'] = '1'
+    pycache_prefix = tempfile.mkdtemp()
+    try:
+        # The first run writes the bytecode, so it isn't counted.
+        profile_import(args.statement, env, pycache_prefix)
+        fastest = None
+        for _ in range(args.repeat):
+            roots = profile_import(args.statement, env, pycache_prefix)
+            total = sum(record.cumulative_us for record in roots)
+            if fastest is None or total < fastest[0]:
+                fastest = (total, roots)
+    finally:
+        shutil.rmtree(pycache_prefix)
+    total, roots = fastest
+    records = sorted(flatten(roots), key=lambda r: r.cumulative_us,
+                     reverse=True)
+    print('%s: %.2f ms, %s modules imported (fastest of %s runs)' % (
+        args.statement, total / 1000.0, len(records), args.repeat))
+    print('')
+    print('%15s %10s  %s' % ('cumulative (ms)', 'self (ms)', 'module'))
+    for record in records[:args.top]:
+        print('%15.2f %10.2f  %s' % (
+            record.cumulative_us / 1000.0, record.self_us / 1000.0,
+            record.name))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""Measure how long it takes to inject the latest app into a package.
+
+A deployment package is created from a synthetic site-packages directory
+and ``inject_latest_app`` is then timed against the previous behavior of
+decompressing and recompressing every entry in the package.
+
+Usage::
+
+    $ python scripts/benchmarks/bench_inject_latest_app.py
+    $ python scripts/benchmarks/bench_inject_latest_app.py --sizes 10 150
+
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import tempfile
+import timeit
+
+from chalice.deploy.packager import LambdaDeploymentPackager
+from chalice.utils import OSUtils, UI
+
+
+FILE_SIZE = 64 * 1024
+
+
+def generate_site_packages(directory, total_size, seed=0):
+    # Writes a mix of compressible source files and incompressible
+    # binary files, similar to packages with C extensions.
+    rng = random.Random(seed)
+    words = [b'import', b'def', b'class', b'return', b'self', b'value',
+             b'for', b'in', b'if', b'else', b'None', b'True']
+    written = 0
+    index = 0
+    while written < total_size:
+        package_dir = os.path.join(directory, 'package%s' % (index // 50))
+        if not os.path.isdir(package_dir):
+            os.makedirs(package_dir)
+        if index % 4 == 0:
+            filename = os.path.join(package_dir, 'module%s.so' % index)
+            contents = os.urandom(FILE_SIZE)
+        else:
+            filename = os.path.join(package_dir, 'module%s.py' % index)
+            contents = b' '.join(
+                rng.choice(words) for _ in range(FILE_SIZE // 5)
+            )[:FILE_SIZE]
+        with open(filename, 'wb') as f:
+            f.write(contents)
+        written += len(contents)
+        index += 1
+
+
+def create_project(directory):
+    os.makedirs(os.path.join(directory, 'chalicelib'))
+    with open(os.path.join(directory, 'app.py'), 'w') as f:
+        f.write('from chalice import Chalice\napp = Chalice("bench")\n')
+    with open(os.path.join(directory, 'chalicelib', 'lib.py'), 'w') as f:
+        f.write('VALUE = 1\n')
+
+
+def create_package(osutils, site_packages, project_dir, filename):
+    packager = LambdaDeploymentPackager(
+        osutils=osutils, dependency_builder=None, ui=UI(out=io.StringIO()))
+    with osutils.open_zip(filename, 'w', osutils.ZIP_DEFLATED) as z:
+        packager._add_py_deps(z, deps_dir=site_packages)
+        packager._add_app_files(z, project_dir)
+    return packager
+
+
+def recompress_latest_app(osutils, packager, filename, project_dir):
+    tmpzip = filename + '.tmp.zip'
+    with osutils.open_zip(filename, 'r') as inzip:
+        with osutils.open_zip(tmpzip, 'w', osutils.ZIP_DEFLATED) as outzip:
+            for el in inzip.infolist():
+                if packager._needs_latest_version(el.filename):
+                    continue
+                outzip.writestr(el, inzip.read(el.filename))
+            packager._add_app_files(outzip, project_dir)
+    osutils.move(tmpzip, filename)
+
+
+def bench(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10, 50, 150],
+                        help='Size of site-packages in MB.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    osutils = OSUtils()
+    print('%10s %17s %17s %9s' % ('size (MB)', 'recompress (ms)',
+                                  'raw copy (ms)', 'speedup'))
+    for size in args.sizes:
+        tmpdir = tempfile.mkdtemp()
+        try:
+            site_packages = os.path.join(tmpdir, 'site-packages')
+            project_dir = os.path.join(tmpdir, 'project')
+            generate_site_packages(site_packages, size * 1024 * 1024)
+            create_project(project_dir)
+            filename = os.path.join(tmpdir, 'deployment.zip')
+            packager = create_package(
+                osutils, site_packages, project_dir, filename)
+            recompress = bench(
+                lambda: recompress_latest_app(
+                    osutils, packager, filename, project_dir),
+                args.repeat) * 1000
+            raw_copy = bench(
+                lambda: packager.inject_latest_app(filename, project_dir),
+                args.repeat) * 1000
+            print('%10s %17.2f %17.2f %8.1fx' % (
+                size, recompress, raw_copy, recompress / raw_copy))
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Compare the JSON codecs available for ``app.api.json_codec``.
+
+Each codec is used to parse a request body with ``Request.json_body``
+and to serialize the same value with ``Response.to_dict()``.  Codecs
+whose library isn't installed are skipped.
+
+Usage::
+
+    $ pip install orjson ujson
+    $ python scripts/benchmarks/bench_json_codec.py
+    $ python scripts/benchmarks/bench_json_codec.py --sizes 100000 5000000
+
+"""
+import argparse
+import decimal
+import json
+import random
+import timeit
+
+from chalice.app import (
+    JSONCodec, OrjsonCodec, UjsonCodec, Request, Response,
+)
+
+
+CODECS = [
+    ('json', JSONCodec),
+    ('orjson', OrjsonCodec),
+    ('ujson', UjsonCodec),
+]
+
+
+def generate_record(rng, index):
+    return {
+        'id': index,
+        'uuid': '%032x' % rng.getrandbits(128),
+        'name': 'user-%s' % index,
+        'email': 'user%s@example.com' % index,
+        'active': rng.random() > 0.5,
+        'score': rng.random() * 100,
+        'balance': decimal.Decimal('%.2f' % (rng.random() * 10000)),
+        'tags': [rng.choice(['a', 'b', 'c', 'd']) for _ in range(5)],
+        'address': {
+            'street': '%s Main St' % rng.randint(1, 9999),
+            'city': 'Seattle',
+            'zip': '%05d' % rng.randint(0, 99999),
+        },
+        'notes': None,
+    }
+
+
+def generate_payload(target_size, seed=0):
+    # Builds a list of records whose JSON encoding is roughly
+    # ``target_size`` bytes, similar to a paginated API response.
+    rng = random.Random(seed)
+    records = []
+    size = 0
+    while size < target_size:
+        record = generate_record(rng, len(records))
+        size += len(JSONCodec().dumps(record)) + 1
+        records.append(record)
+    return {'items': records, 'count': len(records), 'next': None}
+
+
+def create_event(body):
+    return {
+        'requestContext': {'httpMethod': 'POST', 'resourcePath': '/'},
+        'headers': {'content-type': 'application/json'},
+        'pathParameters': {},
+        'multiValueQueryStringParameters': None,
+        'body': body,
+        'stageVariables': {},
+    }
+
+
+def bench(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[100000, 1000000, 5000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    codecs = []
+    for name, codec_cls in CODECS:
+        try:
+            codecs.append((name, codec_cls()))
+        except ImportError:
+            print('Skipping %s, it is not installed.' % name)
+    print('%10s %8s %12s %12s' % ('size', 'codec', 'loads (ms)',
+                                  'dumps (ms)'))
+    for size in args.sizes:
+        payload = generate_payload(size)
+        body = json.dumps(payload, default=float)
+        for name, codec in codecs:
+            def loads():
+                Request(create_event(body), json_codec=codec).json_body
+
+            def dumps():
+                Response(body=payload).to_dict(json_codec=codec)
+
+            print('%10s %8s %12.2f %12.2f' % (
+                len(body), name, bench(loads, args.repeat) * 1000,
+                bench(dumps, args.repeat) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Measure the per-invocation overhead of dispatching a REST API event.
+
+This compares ``Chalice.__call__``, which reuses a cached
+``RestAPIEventHandler`` and middleware chain, with building a new handler
+and middleware chain on every invocation (the previous behavior).
+
+Usage::
+
+    $ python scripts/benchmarks/bench_rest_dispatch.py
+    $ python scripts/benchmarks/bench_rest_dispatch.py --middleware 0 5 20
+
+"""
+import argparse
+import timeit
+
+from chalice import Chalice
+from chalice.app import RestAPIEventHandler
+
+
+def create_app(num_middleware):
+    app = Chalice('bench', configure_logs=False)
+
+    def passthrough(event, get_response):
+        return get_response(event)
+
+    for _ in range(num_middleware):
+        app.register_middleware(passthrough, 'http')
+
+    @app.route('/users/{user_id}')
+    def get_user(user_id):
+        return {'user_id': user_id}
+
+    return app
+
+
+def create_event():
+    return {
+        'requestContext': {
+            'httpMethod': 'GET',
+            'resourcePath': '/users/{user_id}',
+        },
+        'headers': {'accept': 'application/json'},
+        'pathParameters': {'user_id': '12345'},
+        'multiValueQueryStringParameters': None,
+        'body': None,
+        'stageVariables': {},
+    }
+
+
+def uncached_dispatch(app, event, context):
+    handler = RestAPIEventHandler(
+        app.routes, app.api, app.log, app.debug,
+        middleware_handlers=app._get_middleware_handlers('http'),
+    )
+    app.current_request = handler.create_request_object(event, context)
+    return handler(event, context)
+
+
+def bench(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--middleware', nargs='+', type=int,
+                        default=[0, 1, 5, 20])
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    event = create_event()
+    print('%10s %15s %15s %9s' % ('middleware', 'uncached (us)',
+                                  'cached (us)', 'speedup'))
+    for num_middleware in args.middleware:
+        app = create_app(num_middleware)
+        assert app(event, None) == uncached_dispatch(app, event, None)
+        uncached = bench(lambda: uncached_dispatch(app, event, None),
+                         args.number, args.repeat) * 1e6
+        cached = bench(lambda: app(event, None),
+                       args.number, args.repeat) * 1e6
+        print('%10s %15.2f %15.2f %8.2fx' % (
+            num_middleware, uncached, cached, uncached / cached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Compare route matching strategies used by ``chalice local``.
+
+The ``LinearRouteMatcher`` below is the matcher chalice used before
+route templates were compiled into a trie.  It's kept here so the two
+can be compared against each other.
+
+Usage::
+
+    $ python scripts/benchmarks/bench_route_matcher.py
+    $ python scripts/benchmarks/bench_route_matcher.py --sizes 10 100 1000
+
+"""
+import argparse
+import random
+import timeit
+
+from chalice.compat import urlparse, parse_qs
+from chalice.local import MatchResult, RouteMatcher
+
+
+class LinearRouteMatcher(object):
+    def __init__(self, route_urls):
+        self.route_urls = sorted(route_urls)
+
+    def match_route(self, url):
+        parsed_url = urlparse(url)
+        query_params = parse_qs(parsed_url.query, keep_blank_values=True)
+        path = parsed_url.path
+        if path != '/' and path.endswith('/'):
+            path = path[:-1]
+        parts = path.split('/')
+        captured = {}
+        for route_url in self.route_urls:
+            url_parts = route_url.split('/')
+            if len(parts) == len(url_parts):
+                for i, j in zip(parts, url_parts):
+                    if j.startswith('{') and j.endswith('}'):
+                        captured[j[1:-1]] = i
+                        continue
+                    if i != j:
+                        break
+                else:
+                    return MatchResult(route_url, captured, query_params)
+        raise ValueError("No matching route found for: %s" % url)
+
+
+def generate_routes(num_routes):
+    routes = []
+    resource = 0
+    while len(routes) < num_routes:
+        name = 'resource%s' % resource
+        routes.extend([
+            '/%s' % name,
+            '/%s/{%s_id}' % (name, name),
+            '/%s/{%s_id}/children' % (name, name),
+            '/%s/{%s_id}/children/{child_id}' % (name, name),
+            '/%s/search/recent' % name,
+        ])
+        resource += 1
+    return routes[:num_routes]
+
+
+def generate_urls(routes, count, seed=0):
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(count):
+        route = rng.choice(routes)
+        parts = []
+        for segment in route.split('/'):
+            if segment.startswith('{'):
+                segment = str(rng.randint(1, 100000))
+            parts.append(segment)
+        urls.append('/'.join(parts))
+    return urls
+
+
+def bench(matcher, urls, repeat):
+    def run():
+        for url in urls:
+            matcher.match_route(url)
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / len(urls)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[10, 100, 1000])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print('%8s %14s %14s %9s' % ('routes', 'linear (us)', 'trie (us)',
+                                 'speedup'))
+    for size in args.sizes:
+        routes = generate_routes(size)
+        urls = generate_urls(routes, args.requests)
+        linear = LinearRouteMatcher(routes)
+        trie = RouteMatcher(routes)
+        for url in urls:
+            assert linear.match_route(url).route == \
+                trie.match_route(url).route
+        linear_time = bench(linear, urls, args.repeat) * 1e6
+        trie_time = bench(trie, urls, args.repeat) * 1e6
+        print('%8s %14.2f %14.2f %8.1fx' % (
+            size, linear_time, trie_time, linear_time / trie_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,7 +21,7 @@ def recursive_include(relative_dir):
 
 install_requires = [
     'click>=7,<9.0',
-    'botocore>=1.14.0,<2.0.0',
+    'botocore>=1.21.51,<2.0.0',
     'typing-extensions>=4.0.0,<5.0.0;python_version<"3.8"',
     'six>=1.10.0,<2.0.0',
     'pip>=9,<25.1',
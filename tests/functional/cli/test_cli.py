@@ -9,6 +9,7 @@ import pytest
 from click.testing import CliRunner
 from botocore.exceptions import ClientError
 
+import chalice
 from chalice import cli
 from chalice.cli import factory
 from chalice.cli import newproj
@@ -21,6 +22,7 @@ from chalice.invoke import LambdaInvokeHandler
 from chalice.invoke import UnhandledLambdaError
 from chalice.awsclient import ReadTimeout
 from chalice.deploy.validate import ExperimentalFeatureError
+from chalice.deploy.packager import WheelCache
 
 
 class FakeConfig(object):
@@ -36,6 +38,18 @@ def runner():
     return CliRunner()
 
 
+@pytest.fixture
+def chalice_importable(monkeypatch):
+    # profile-imports imports the app in a new interpreter, which needs
+    # to be able to import chalice when it isn't installed.
+    chalice_root = os.path.dirname(os.path.dirname(
+        os.path.abspath(chalice.__file__)))
+    pythonpath = os.environ.get('PYTHONPATH')
+    if pythonpath:
+        chalice_root = os.pathsep.join([chalice_root, pythonpath])
+    monkeypatch.setenv('PYTHONPATH', chalice_root)
+
+
 @pytest.fixture
 def mock_cli_factory():
     cli_factory = mock.Mock(spec=factory.CLIFactory)
@@ -248,6 +262,62 @@ def test_can_package_command(runner, mock_cli_factory):
         assert 'deployment.zip' in dir_contents
 
 
+def test_can_profile_imports(runner, chalice_importable):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        result = _run_cli_command(
+            runner, cli.profile_imports,
+            ['--min-time', '0', '-o', 'profile.json',
+             '--output-format', 'json'])
+        assert result.exit_code == 0, result.output
+        assert result.output.startswith('Total import time: ')
+        assert re.search(r'^\s+[\d.]+\s+[\d.]+  app$', result.output,
+                         re.MULTILINE)
+        with open('profile.json') as f:
+            profile = json.load(f)
+        assert profile['imports'][0]['name'] == 'app'
+
+
+def test_can_export_speedscope_profile(runner, chalice_importable):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        result = _run_cli_command(
+            runner, cli.profile_imports, ['-o', 'profile.speedscope.json'])
+        assert result.exit_code == 0, result.output
+        with open('profile.speedscope.json') as f:
+            profile = json.load(f)
+        assert profile['shared']['frames'][0] == {'name': 'app'}
+        assert profile['profiles'][0]['type'] == 'evented'
+
+
+def test_profile_imports_fails_when_over_budget(runner, chalice_importable):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        result = _run_cli_command(
+            runner, cli.profile_imports, ['--budget', '0'])
+        assert result.exit_code == 1
+        assert 'over the budget of 0.00 ms' in result.output
+        result = _run_cli_command(
+            runner, cli.profile_imports, ['--budget', '100000'])
+        assert result.exit_code == 0, result.output
+
+
+def test_profile_imports_fails_when_app_cant_be_imported(runner,
+                                                         chalice_importable):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        with open('app.py', 'w') as f:
+            f.write('import doesnotexist\n')
+        result = _run_cli_command(runner, cli.profile_imports, [])
+        assert result.exit_code == 1
+        assert 'Unable to import your app.py file' in result.output
+        assert "No module named 'doesnotexist'" in result.output
+
+
 def test_can_package_with_yaml_command(runner):
     with runner.isolated_filesystem():
         newproj.create_new_project_skeleton('testproject')
@@ -358,6 +428,46 @@ def test_can_deploy_specify_connection_timeout(runner, mock_cli_factory):
         )
 
 
+def test_can_deploy_with_parallel_jobs(runner, mock_cli_factory):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        result = _run_cli_command(runner, cli.deploy, ['--jobs', '4'],
+                                  cli_factory=mock_cli_factory)
+        assert result.exit_code == 0, result.output
+        mock_cli_factory.create_default_deployer.assert_called_with(
+            session=mock.sentinel.Session,
+            config=mock_cli_factory.create_config_obj.return_value,
+            ui=mock.ANY,
+            jobs=4,
+        )
+
+
+def test_can_package_with_parallel_jobs(runner, mock_cli_factory):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        result = _run_cli_command(runner, cli.package,
+                                  ['--jobs', '4', 'outdir'],
+                                  cli_factory=mock_cli_factory)
+        assert result.exit_code == 0, result.output
+        mock_cli_factory.create_app_packager.assert_called_with(
+            mock_cli_factory.create_config_obj.return_value,
+            mock_cli_factory.create_package_options.return_value,
+            'cloudformation', 'json', None, jobs=4,
+        )
+
+
+def test_jobs_must_be_positive(runner, mock_cli_factory):
+    with runner.isolated_filesystem():
+        newproj.create_new_project_skeleton('testproject')
+        os.chdir('testproject')
+        result = _run_cli_command(runner, cli.deploy, ['--jobs', '0'],
+                                  cli_factory=mock_cli_factory)
+        assert result.exit_code == 2
+        assert not mock_cli_factory.create_default_deployer.called
+
+
 def test_can_retrieve_url(runner, mock_cli_factory):
     deployed_values_dev = {
         "schema_version": "2.0",
@@ -722,3 +832,21 @@ def test_chalice_cli_mode_env_var_always_set(runner):
         result = runner.invoke(cli.new_project, ['testproject'], obj={})
         assert result.exit_code == 0
         assert os.environ['AWS_CHALICE_CLI_MODE'] == 'true'
+
+
+def test_can_list_and_prune_wheel_cache(runner, tmpdir, monkeypatch):
+    cache_dir = str(tmpdir.join('wheel-cache'))
+    monkeypatch.setenv('CHALICE_WHEEL_CACHE_DIR', cache_dir)
+    wheel = tmpdir.join('foo-1.0-py3-none-any.whl')
+    wheel.write_binary(b'foo')
+    WheelCache(cache_dir).put('foo', '1.0', 'cp38', 'x86_64', str(wheel))
+
+    result = runner.invoke(cli.cache, ['list'])
+    assert result.exit_code == 0, result.output
+    assert 'foo==1.0 (cp38, x86_64)' in result.output
+    assert 'Total size: 3 bytes' in result.output
+
+    result = runner.invoke(cli.cache, ['prune', '--all'])
+    assert result.exit_code == 0, result.output
+    assert 'Removed foo==1.0 (cp38, x86_64)' in result.output
+    assert WheelCache(cache_dir).entries() == []
@@ -16,6 +16,7 @@ from chalice.utils import UI
 from chalice import Chalice
 from chalice.logs import LogRetriever
 from chalice.invoke import LambdaInvokeHandler
+from chalice.importprofile import ImportProfileError
 
 
 @fixture
@@ -202,6 +203,47 @@ def test_can_import_vendor_package(clifactory):
     assert sys.path[-1] == vendor_lib
 
 
+def test_app_sys_path_includes_vendor_dir(clifactory):
+    assert clifactory.get_app_sys_path() == ([clifactory.project_dir], [])
+    vendor_dir = os.path.join(clifactory.project_dir, 'vendor')
+    os.makedirs(vendor_dir)
+    assert clifactory.get_app_sys_path() == (
+        [clifactory.project_dir], [vendor_dir])
+
+
+def test_can_profile_app_imports(clifactory):
+    vendedlib_dir = os.path.join(
+        clifactory.project_dir, 'vendor', 'vendedlib')
+    os.makedirs(vendedlib_dir)
+    open(os.path.join(vendedlib_dir, '__init__.py'), 'a').close()
+    config_file = os.path.join(
+        clifactory.project_dir, '.chalice', 'config.json')
+    with open(config_file, 'w') as f:
+        f.write('{"environment_variables": {"PROFILE_TEST": "true"}}')
+    app_py = os.path.join(clifactory.project_dir, 'app.py')
+    with open(app_py, 'a') as f:
+        f.write('import os\n')
+        f.write('assert os.environ["PROFILE_TEST"] == "true"\n')
+        f.write('import vendedlib\n')
+    profiler = clifactory.create_import_profiler()
+    profile = profiler.profile()
+    assert [record.name for record in profile.roots] == ['app']
+    assert 'vendedlib' in [
+        record.name for record in profile.roots[0].children]
+    assert profile.total_us > 0
+
+
+def test_profile_imports_raises_error_on_failed_import(clifactory):
+    app_py = os.path.join(clifactory.project_dir, 'app.py')
+    with open(app_py, 'a') as f:
+        f.write('raise ValueError("bad app")\n')
+    profiler = clifactory.create_import_profiler()
+    with pytest.raises(ImportProfileError) as e:
+        profiler.profile()
+    assert 'ValueError: bad app' in str(e.value)
+    assert 'import time:' not in str(e.value)
+
+
 def test_error_raised_on_invalid_config_json(clifactory):
     filename = os.path.join(
         clifactory.project_dir, '.chalice', 'config.json')
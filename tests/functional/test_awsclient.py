@@ -1,5 +1,6 @@
 import json
 import datetime
+import threading
 import time
 from unittest import mock
 
@@ -331,6 +332,20 @@ class TestLambdaLayer(object):
             'name', b'foo', 'python2.7') == 'arn:12345:name:3'
         stubbed_session.verify_stubs()
 
+    def test_can_publish_layer_with_architecture(self, stubbed_session):
+        stubbed_session.stub('lambda').publish_layer_version(
+            LayerName='name',
+            CompatibleRuntimes=['python3.11'],
+            CompatibleArchitectures=['arm64'],
+            Content={'ZipFile': b'foo'},
+        ).returns({'LayerVersionArn': 'arn:12345:name:3'})
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        assert awsclient.publish_layer(
+            'name', b'foo', 'python3.11',
+            architecture='arm64') == 'arn:12345:name:3'
+        stubbed_session.verify_stubs()
+
 
 class TestLambdaFunctionExists(object):
 
@@ -1702,6 +1717,126 @@ class TestInvokeLambdaFunction(object):
             awsclient.invoke_function('name', payload=b'payload') == {}
 
 
+class InMemoryS3(object):
+    """A local stand-in for the S3 operations used to upload packages."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted = []
+        self.fail_part = None
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise botocore.exceptions.ClientError(
+                {'Error': {'Code': '404', 'Message': 'Not Found'}},
+                'HeadObject')
+        return {'ContentLength': len(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+        return {}
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = 'upload-%s' % len(self.uploads)
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_part:
+            raise botocore.exceptions.ClientError(
+                {'Error': {'Code': 'InternalError', 'Message': 'Error'}},
+                'UploadPart')
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = Body
+        return {'ETag': 'etag-%s' % PartNumber}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId,
+                                  MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b''.join(
+            parts[part['PartNumber']] for part in MultipartUpload['Parts'])
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+        self.aborted.append(UploadId)
+
+
+class TestUploadDeploymentPackage(object):
+    @pytest.fixture
+    def s3(self):
+        return InMemoryS3()
+
+    @pytest.fixture
+    def awsclient(self, s3):
+        session = mock.Mock(spec=botocore.session.Session)
+        session.create_client.return_value = s3
+        awsclient = TypedAWSClient(session)
+        awsclient.S3_MULTIPART_CHUNKSIZE = 10
+        awsclient.S3_MAX_CONCURRENCY = 4
+        return awsclient
+
+    def test_s3_object_exists(self, stubbed_session):
+        s3 = stubbed_session.stub('s3')
+        s3.head_object(Bucket='bucket', Key='key').returns({})
+        s3.head_object(Bucket='bucket', Key='missing').raises_error(
+            error_code='404', message='Not Found')
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        assert awsclient.s3_object_exists('bucket', 'key')
+        assert not awsclient.s3_object_exists('bucket', 'missing')
+        stubbed_session.verify_stubs()
+
+    def test_small_package_is_uploaded_in_one_request(self, stubbed_session,
+                                                      tmpdir):
+        filename = str(tmpdir.join('deployment.zip'))
+        with open(filename, 'wb') as f:
+            f.write(b'foo')
+        stubbed_session.stub('s3').put_object(
+            Bucket='bucket', Key='key', Body=b'foo').returns({})
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        assert awsclient.upload_deployment_package(
+            'bucket', 'key', filename) == 'key'
+        stubbed_session.verify_stubs()
+
+    def test_large_package_uses_multipart_upload(self, awsclient, s3,
+                                                 tmpdir):
+        contents = bytes(range(256)) * 4
+        filename = str(tmpdir.join('deployment.zip'))
+        with open(filename, 'wb') as f:
+            f.write(contents)
+        awsclient.upload_deployment_package('bucket', 'key', filename)
+        assert s3.objects[('bucket', 'key')] == contents
+        assert s3.uploads == {}
+
+    def test_part_size_grows_to_stay_under_max_parts(self, awsclient, s3,
+                                                     tmpdir):
+        awsclient.S3_MAX_PARTS = 4
+        contents = b'a' * 100
+        filename = str(tmpdir.join('deployment.zip'))
+        with open(filename, 'wb') as f:
+            f.write(contents)
+        with mock.patch.object(s3, 'upload_part',
+                               wraps=s3.upload_part) as upload_part:
+            awsclient.upload_deployment_package('bucket', 'key', filename)
+        assert upload_part.call_count == 4
+        assert s3.objects[('bucket', 'key')] == contents
+
+    def test_multipart_upload_is_aborted_on_error(self, awsclient, s3,
+                                                  tmpdir):
+        s3.fail_part = 2
+        filename = str(tmpdir.join('deployment.zip'))
+        with open(filename, 'wb') as f:
+            f.write(b'a' * 100)
+        with pytest.raises(botocore.exceptions.ClientError):
+            awsclient.upload_deployment_package('bucket', 'key', filename)
+        assert s3.aborted == ['upload-0']
+        assert ('bucket', 'key') not in s3.objects
+
+
 class TestCreateLambdaFunction(object):
 
     SUCCESS_RESPONSE = {
@@ -1709,6 +1844,21 @@ class TestCreateLambdaFunction(object):
         'State': 'Active',
     }
 
+    def test_create_function_from_s3(self, stubbed_session):
+        stubbed_session.stub('lambda').create_function(
+            FunctionName='name',
+            Runtime='python3.9',
+            Code={'S3Bucket': 'bucket', 'S3Key': 'key'},
+            Handler='app.app',
+            Role='myarn'
+        ).returns(self.SUCCESS_RESPONSE)
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        assert awsclient.create_function(
+            'name', 'myarn', None, 'python3.9', 'app.app',
+            s3_bucket='bucket', s3_key='key') == 'arn:12345:name'
+        stubbed_session.verify_stubs()
+
     def test_create_function_succeeds_first_try(self, stubbed_session):
         stubbed_session.stub('lambda').create_function(
             FunctionName='name',
@@ -1867,6 +2017,23 @@ class TestCreateLambdaFunction(object):
         ) == 'arn:12345:name'
         stubbed_session.verify_stubs()
 
+    def test_create_function_with_architecture(self, stubbed_session):
+        stubbed_session.stub('lambda').create_function(
+            FunctionName='name',
+            Runtime='python3.11',
+            Code={'ZipFile': b'foo'},
+            Handler='app.app',
+            Role='myarn',
+            Architectures=['arm64'],
+        ).returns(self.SUCCESS_RESPONSE)
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        assert awsclient.create_function(
+            'name', 'myarn', b'foo', 'python3.11', 'app.app',
+            architecture='arm64'
+        ) == 'arn:12345:name'
+        stubbed_session.verify_stubs()
+
     def test_create_function_is_retried_and_succeeds(self, stubbed_session):
         kwargs = {
             'FunctionName': 'name',
@@ -2221,6 +2388,49 @@ class TestUpdateLambdaFunction(object):
         )
         stubbed_session.verify_stubs()
 
+    def test_update_function_code_with_architecture(self, stubbed_session):
+        lambda_client = stubbed_session.stub('lambda')
+        lambda_client.update_function_code(
+            FunctionName='name', ZipFile=b'foo',
+            Architectures=['arm64']).returns(self.SUCCESS_RESPONSE)
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        awsclient.update_function('name', b'foo', architecture='arm64')
+        stubbed_session.verify_stubs()
+
+    def test_update_function_code_from_s3(self, stubbed_session):
+        lambda_client = stubbed_session.stub('lambda')
+        lambda_client.update_function_code(
+            FunctionName='name', S3Bucket='bucket',
+            S3Key='key').returns(self.SUCCESS_RESPONSE)
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        awsclient.update_function('name', s3_bucket='bucket', s3_key='key')
+        stubbed_session.verify_stubs()
+
+    def test_update_function_without_code(self, stubbed_session):
+        lambda_client = stubbed_session.stub('lambda')
+        lambda_client.update_function_configuration(
+            FunctionName='name',
+            Timeout=240).returns(
+                {'FunctionArn': 'arn', 'LastUpdateStatus': 'Successful'})
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        result = awsclient.update_function(
+            'name', timeout=240, architecture='arm64')
+        assert result['FunctionArn'] == 'arn'
+        stubbed_session.verify_stubs()
+
+    def test_update_function_without_code_or_config(self, stubbed_session):
+        lambda_client = stubbed_session.stub('lambda')
+        lambda_client.get_function_configuration(
+            FunctionName='name').returns({'FunctionArn': 'arn'})
+        stubbed_session.activate_stubs()
+        awsclient = TypedAWSClient(stubbed_session)
+        result = awsclient.update_function('name')
+        assert result['FunctionArn'] == 'arn'
+        stubbed_session.verify_stubs()
+
     def test_update_function_with_adding_tags(self, stubbed_session):
         function_arn = 'arn'
 
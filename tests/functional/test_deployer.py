@@ -3,6 +3,8 @@ import zipfile
 import json
 from unittest import mock
 import hashlib
+import subprocess
+import sys
 
 from pytest import fixture
 import pytest
@@ -18,6 +20,8 @@ from chalice.deploy.packager import EmptyPackageError
 from chalice.deploy.packager import LambdaDeploymentPackager
 from chalice.deploy.packager import DependencyBuilder
 from chalice.deploy.packager import Package
+from chalice.deploy.packager import PackageSlimmer
+from chalice.deploy.packager import BytecodeCompiler
 
 
 slow = pytest.mark.slow
@@ -100,6 +104,52 @@ def test_can_inject_latest_app(tmpdir, chalice_deployer):
         assert contents == b'# Test app NEW VERSION'
 
 
+@slow
+def test_inject_latest_app_is_deterministic(tmpdir, chalice_deployer):
+    appdir = _create_app_structure(tmpdir)
+    appdir.join('app.py').write('# Test app v1')
+    vendor = appdir.mkdir('vendor')
+    vendor.join('vendored.py').write('# Vendored module ' * 100)
+    name = chalice_deployer.create_deployment_package(
+        str(appdir), 'python3.11')
+
+    appdir.join('app.py').write('# Test app NEW VERSION')
+    chalice_deployer.inject_latest_app(name, str(appdir))
+    with open(name, 'rb') as f:
+        first = f.read()
+    chalice_deployer.inject_latest_app(name, str(appdir))
+    with open(name, 'rb') as f:
+        second = f.read()
+    assert first == second
+    with zipfile.ZipFile(name) as f:
+        assert f.testzip() is None
+        assert f.read('app.py') == b'# Test app NEW VERSION'
+        assert f.read('vendored.py') == b'# Vendored module ' * 100
+
+
+@slow
+def test_parallel_deployment_package_is_identical(tmpdir):
+    appdir = _create_app_structure(tmpdir)
+    appdir.join('app.py').write('# Test app v1')
+    vendor = appdir.mkdir('vendor')
+    for i in range(20):
+        vendor.join('vendored%s.py' % i).write('# Vendored module\n' * i)
+    vendor.join('model.bin').write(os.urandom(1024 * 1024), mode='wb')
+    contents = []
+    for jobs in [1, 4]:
+        packager = chalice.deploy.packager.LambdaDeploymentPackager(
+            osutils=chalice.utils.OSUtils(),
+            dependency_builder=mock.Mock(spec=DependencyBuilder),
+            ui=chalice.utils.UI(),
+            jobs=jobs,
+        )
+        name = packager.create_deployment_package(str(appdir), 'python3.11')
+        with open(name, 'rb') as f:
+            contents.append(f.read())
+        os.remove(name)
+    assert contents[0] == contents[1]
+
+
 @slow
 def test_zipfile_hash_only_based_on_contents(tmpdir, chalice_deployer):
     appdir = _create_app_structure(tmpdir)
@@ -124,6 +174,34 @@ def test_zipfile_hash_only_based_on_contents(tmpdir, chalice_deployer):
     assert new_checksum == original_checksum
 
 
+def test_zip_filename_uses_file_digest_manifest(tmpdir, chalice_deployer):
+    appdir = _create_app_structure(tmpdir)
+    first = chalice_deployer.deployment_package_filename(
+        str(appdir), 'python3.11')
+    manifest = appdir.join('.chalice', 'cache', 'file-digests.json')
+    assert manifest.check(file=True)
+    assert chalice_deployer.deployment_package_filename(
+        str(appdir), 'python3.11') == first
+    appdir.join('app.py').write('# Test app v2')
+    assert chalice_deployer.deployment_package_filename(
+        str(appdir), 'python3.11') != first
+
+
+def test_zip_filename_depends_on_hash_algorithm(tmpdir):
+    appdir = _create_app_structure(tmpdir)
+    filenames = []
+    for algorithm in ['md5', 'blake2b']:
+        packager = LambdaDeploymentPackager(
+            osutils=chalice.utils.OSUtils(),
+            dependency_builder=mock.Mock(spec=DependencyBuilder),
+            ui=chalice.utils.UI(),
+            hash_algorithm=algorithm,
+        )
+        filenames.append(packager.deployment_package_filename(
+            str(appdir), 'python3.11'))
+    assert filenames[0] != filenames[1]
+
+
 @slow
 def test_app_injection_still_compresses_file(tmpdir, chalice_deployer):
     appdir = _create_app_structure(tmpdir)
@@ -344,6 +422,114 @@ def test_subsequent_deploy_replaces_vendor_symlink(tmpdir, chalice_deployer):
         _assert_in_zip('otherpackage/__init__.py', b'# v2', f)
 
 
+def _install_fake_site_packages(abi, requirements_filename, site_packages):
+    for filename in ['foo/__init__.py', 'foo/tests/test_foo.py',
+                     'foo-1.0.dist-info/RECORD',
+                     'foo-1.0.dist-info/METADATA']:
+        path = os.path.join(site_packages, *filename.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write('# %s' % filename)
+
+
+@pytest.mark.parametrize('packager_cls,prefix', [
+    (LambdaDeploymentPackager, ''),
+    (chalice.deploy.packager.LayerDeploymentPackager,
+     'python/lib/python3.11/site-packages/'),
+])
+def test_can_slim_python_dependencies(tmpdir, packager_cls, prefix):
+    appdir = _create_app_structure(tmpdir)
+    appdir.join('requirements.txt').write('foo')
+    vendor = appdir.mkdir('vendor').mkdir('mypackage')
+    vendor.mkdir('tests').join('test_mypackage.py').write('# Test')
+    builder = mock.Mock(spec=DependencyBuilder)
+    builder.build_site_packages.side_effect = _install_fake_site_packages
+    ui = mock.Mock(spec=chalice.utils.UI)
+    osutils = chalice.utils.OSUtils()
+    packager = packager_cls(
+        osutils=osutils, dependency_builder=builder, ui=ui,
+        slimmer=PackageSlimmer(osutils, strip_debug_symbols=False),
+    )
+    name = packager.create_deployment_package(str(appdir), 'python3.11')
+    with zipfile.ZipFile(name) as f:
+        _assert_in_zip(prefix + 'foo/__init__.py', b'# foo/__init__.py', f)
+        _assert_in_zip(prefix + 'foo-1.0.dist-info/METADATA',
+                       b'# foo-1.0.dist-info/METADATA', f)
+        _assert_not_in_zip(prefix + 'foo/tests/test_foo.py', f)
+        _assert_not_in_zip(prefix + 'foo-1.0.dist-info/RECORD', f)
+        # Files in vendor/ are never removed.
+        _assert_in_zip(prefix + 'mypackage/tests/test_mypackage.py',
+                       b'# Test', f)
+    output = ''.join([call[0][0] for call in ui.write.call_args_list])
+    assert 'Slimmed python dependencies: removed 2 files' in output
+
+
+def test_zip_filename_changes_when_slimming(tmpdir, chalice_deployer):
+    appdir = _create_app_structure(tmpdir)
+    osutils = chalice.utils.OSUtils()
+    slim_packager = LambdaDeploymentPackager(
+        osutils=osutils,
+        dependency_builder=mock.Mock(spec=DependencyBuilder),
+        ui=chalice.utils.UI(),
+        slimmer=PackageSlimmer(osutils),
+    )
+    slim_filename = slim_packager.deployment_package_filename(
+        str(appdir), 'python3.11')
+    filename = chalice_deployer.deployment_package_filename(
+        str(appdir), 'python3.11')
+    assert slim_filename != filename
+
+
+@fixture
+def bytecode_packager():
+    ui = chalice.utils.UI()
+    osutils = chalice.utils.OSUtils()
+    python_version = 'python%s.%s' % sys.version_info[:2]
+    return LambdaDeploymentPackager(
+        osutils=osutils,
+        dependency_builder=mock.Mock(spec=DependencyBuilder),
+        ui=ui,
+        bytecode_compiler=BytecodeCompiler(osutils, ui, python_version),
+    ), python_version
+
+
+def test_can_include_precompiled_bytecode(tmpdir, bytecode_packager):
+    packager, python_version = bytecode_packager
+    appdir = _create_app_structure(tmpdir)
+    appdir.mkdir('chalicelib').join('__init__.py').write('# Test package')
+    vendor = appdir.mkdir('vendor').mkdir('mypackage')
+    vendor.join('__init__.py').write('# Test package')
+    name = packager.create_deployment_package(str(appdir), python_version)
+    tag = sys.implementation.cache_tag
+    with zipfile.ZipFile(name) as f:
+        allfiles = f.namelist()
+        assert '__pycache__/app.%s.pyc' % tag in allfiles
+        assert 'chalicelib/__pycache__/__init__.%s.pyc' % tag in allfiles
+        assert 'chalice/__pycache__/app.%s.pyc' % tag in allfiles
+        assert 'mypackage/__pycache__/__init__.%s.pyc' % tag in allfiles
+    with open(name, 'rb') as f:
+        original = f.read()
+    os.remove(name)
+    name = packager.create_deployment_package(str(appdir), python_version)
+    with open(name, 'rb') as f:
+        assert f.read() == original
+
+
+def test_inject_latest_app_updates_bytecode(tmpdir, bytecode_packager):
+    packager, python_version = bytecode_packager
+    appdir = _create_app_structure(tmpdir)
+    name = packager.create_deployment_package(str(appdir), python_version)
+    pyc_name = '__pycache__/app.%s.pyc' % sys.implementation.cache_tag
+    with zipfile.ZipFile(name) as f:
+        original = f.read(pyc_name)
+    appdir.join('app.py').write('# Test app v2')
+    packager.inject_latest_app(name, str(appdir))
+    with zipfile.ZipFile(name) as f:
+        assert f.namelist().count(pyc_name) == 1
+        assert f.read(pyc_name) != original
+
+
 def test_zip_filename_changes_on_vendor_update(tmpdir, chalice_deployer):
     appdir = _create_app_structure(tmpdir)
     vendor = appdir.mkdir('vendor')
@@ -391,6 +577,42 @@ def test_chalice_runtime_injected_on_change(tmpdir, chalice_deployer):
         assert 'chalice/app.py' in z.namelist()
 
 
+@slow
+def test_can_import_lazy_runtime_modules_from_package(tmpdir,
+                                                      chalice_deployer):
+    appdir = _create_app_structure(tmpdir)
+    appdir.join('app.py').write(
+        'from chalice import Chalice\n'
+        'app = Chalice(app_name="lazy")\n'
+        '@app.on_sns_message(topic="mytopic")\n'
+        'def handler(event):\n'
+        '    return event.message\n'
+    )
+    name = chalice_deployer.create_deployment_package(
+        str(appdir), 'python3.11')
+    extracted = tmpdir.join('extracted')
+    with zipfile.ZipFile(name) as z:
+        assert 'chalice/_events.py' in z.namelist()
+        assert 'chalice/_authorizer.py' in z.namelist()
+        assert 'chalice/_websocket.py' in z.namelist()
+        z.extractall(str(extracted))
+    # The site dir isn't added to sys.path so chalice is imported from
+    # the deployment package instead of this checkout.
+    env = dict(os.environ)
+    env.pop('PYTHONPATH', None)
+    script = (
+        'import json, app, chalice\n'
+        'event = {"Records": [{"Sns": {"Message": "hello", '
+        '"Subject": "", "MessageAttributes": {}}}]}\n'
+        'print(json.dumps([chalice.__file__, app.handler(event, None)]))\n'
+    )
+    output = subprocess.check_output(
+        [sys.executable, '-S', '-c', script], cwd=str(extracted), env=env)
+    filename, result = json.loads(output)
+    assert filename == os.path.join(str(extracted), 'chalice', '__init__.py')
+    assert result == 'hello'
+
+
 def test_does_handle_missing_dependency_error(tmpdir):
     appdir = _create_app_structure(tmpdir)
     builder = mock.Mock(spec=DependencyBuilder)
@@ -411,6 +633,34 @@ def test_does_handle_missing_dependency_error(tmpdir):
     assert 'Could not install dependencies:\nfoo==1.2' in output
 
 
+def test_does_report_pip_error_for_missing_dependency(tmpdir):
+    appdir = _create_app_structure(tmpdir)
+    builder = mock.Mock(spec=DependencyBuilder)
+    packages = []
+    for identifier in ['foo==1.2', 'bar==2.0']:
+        fake_package = mock.Mock(spec=Package)
+        fake_package.identifier = identifier
+        packages.append(fake_package)
+    builder.build_site_packages.side_effect = MissingDependencyError(
+        set(packages),
+        {'foo==1.2': 'Building wheel for foo\nerror: command gcc failed\n'})
+    ui = mock.Mock(spec=chalice.utils.UI)
+    packager = LambdaDeploymentPackager(
+        osutils=chalice.utils.OSUtils(),
+        dependency_builder=builder,
+        ui=ui,
+    )
+    packager.create_deployment_package(str(appdir), 'python3.11')
+
+    output = ''.join([call[0][0] for call in ui.write.call_args_list])
+    assert (
+        'Could not install dependencies:\n'
+        'bar==2.0\n'
+        'foo==1.2\n'
+        '  error: command gcc failed\n'
+    ) in output
+
+
 def _remove_runtime_from_deployment_package(filename):
     new_filename = os.path.join(os.path.dirname(filename), 'new.zip')
     with zipfile.ZipFile(filename, 'r') as original:
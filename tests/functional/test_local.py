@@ -1,7 +1,9 @@
 import os
 import socket
+import asyncio
 import time
 import contextlib
+import functools
 from threading import Thread
 from threading import Event
 from threading import Lock
@@ -16,6 +18,10 @@ from requests.adapters import HTTPAdapter
 
 from chalice import app
 from chalice.local import create_local_server
+from chalice.local import LocalGateway
+from chalice.local import LocalGatewayException
+from chalice.local import LocalServerOptions
+from chalice.local import _AsyncioConnection
 from chalice.config import Config
 from chalice.utils import OSUtils
 
@@ -55,12 +61,13 @@ def basic_app(tmpdir):
 
 
 class ThreadedLocalServer(Thread):
-    def __init__(self, port, host='localhost'):
+    def __init__(self, port, host='localhost', options=None):
         super(ThreadedLocalServer, self).__init__()
         self._app_object = None
         self._config = None
         self._host = host
         self._port = port
+        self._options = options
         self._server = None
         self._server_ready = Event()
 
@@ -73,7 +80,8 @@ class ThreadedLocalServer(Thread):
 
     def run(self):
         self._server = create_local_server(
-            self._app_object, self._config, self._host, self._port)
+            self._app_object, self._config, self._host, self._port,
+            self._options)
         self._server_ready.set()
         self._server.serve_forever()
 
@@ -85,6 +93,7 @@ class ThreadedLocalServer(Thread):
     def shutdown(self):
         if self._server is not None:
             self._server.server.shutdown()
+            self._server.server.server_close()
 
 
 @pytest.fixture
@@ -138,6 +147,26 @@ def local_server_factory(unused_tcp_port):
         threaded_server.shutdown()
 
 
+@pytest.fixture()
+def configured_server_factory(unused_tcp_port):
+    servers = []
+
+    def create_server(app_object, config, server_type, **kwargs):
+        options = LocalServerOptions(server_type=server_type, **kwargs)
+        threaded_server = ThreadedLocalServer(unused_tcp_port,
+                                              options=options)
+        servers.append(threaded_server)
+        threaded_server.configure(app_object, config)
+        threaded_server.start()
+        return threaded_server, unused_tcp_port
+
+    try:
+        yield create_server
+    finally:
+        for threaded_server in servers:
+            threaded_server.shutdown()
+
+
 @pytest.fixture
 def sample_app():
     demo = app.Chalice('demo-app')
@@ -276,6 +305,191 @@ def test_can_accept_multiple_connections(config, sample_app,
     assert response.text == '{"hello":"world"}'
 
 
+@pytest.mark.parametrize('server_type', ['pool', 'asyncio'])
+def test_can_handle_concurrent_requests(config, sample_app, server_type,
+                                        configured_server_factory):
+    local_server, port = configured_server_factory(
+        sample_app, config, server_type, pool_size=2)
+    local_server.wait_for_server_ready()
+    responses = []
+    lock = Lock()
+
+    def make_requests():
+        with requests.Session() as session:
+            for _ in range(5):
+                response = local_server.make_call(
+                    session.get, '/', port, timeout=5)
+                with lock:
+                    responses.append((response.status_code, response.text))
+
+    threads = [Thread(target=make_requests) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert responses == [(200, '{"hello":"world"}')] * 25
+
+
+def test_pooled_server_closes_idle_keep_alive_connections(
+        config, sample_app, configured_server_factory):
+    local_server, port = configured_server_factory(
+        sample_app, config, 'pool', pool_size=1, keep_alive_timeout=0.2)
+    local_server.wait_for_server_ready()
+    # The idle connection occupies the only worker until the keep-alive
+    # timeout expires, after which the request below can be handled.
+    idle = socket.create_connection(('localhost', port), timeout=1)
+    try:
+        response = local_server.make_call(requests.get, '/', port, timeout=5)
+    finally:
+        idle.close()
+    assert response.status_code == 200
+    assert response.text == '{"hello":"world"}'
+
+
+@pytest.mark.parametrize('method,path,body', [
+    ('GET', '/', None),
+    ('POST', '/test-cors', b''),
+    ('OPTIONS', '/test-cors', None),
+    ('POST', '/count', b'{"counter": 1}'),
+    ('GET', '/missing', None),
+])
+def test_asyncio_server_matches_local_gateway(config, sample_app, method,
+                                              path, body,
+                                              configured_server_factory):
+    local_server, port = configured_server_factory(
+        sample_app, config, 'asyncio')
+    local_server.wait_for_server_ready()
+    headers = {'Content-Type': 'application/json'}
+    gateway = LocalGateway(sample_app, config)
+    try:
+        expected = gateway.handle_request(method, path, headers, body)
+        expected_body = expected['body']
+    except LocalGatewayException as e:
+        expected = {'statusCode': e.CODE, 'headers': e.headers}
+        expected_body = e.body
+    response = local_server.make_call(
+        functools.partial(requests.request, method, headers=headers,
+                          data=body), path, port, timeout=5)
+    assert response.status_code == expected['statusCode']
+    if isinstance(expected_body, str):
+        expected_body = expected_body.encode('utf-8')
+    assert response.content == (expected_body or b'')
+    for name, value in expected['headers'].items():
+        if name.lower() != 'x-amzn-requestid':
+            assert response.headers[name] == value
+
+
+def test_asyncio_server_closes_idle_keep_alive_connections(
+        config, sample_app, configured_server_factory):
+    local_server, port = configured_server_factory(
+        sample_app, config, 'asyncio', keep_alive_timeout=0.2)
+    local_server.wait_for_server_ready()
+    with contextlib.closing(socket.create_connection(
+            ('localhost', port), timeout=5)) as idle:
+        assert idle.recv(1024) == b''
+
+
+def test_asyncio_server_closes_http_1_0_connections(
+        config, sample_app, configured_server_factory):
+    local_server, port = configured_server_factory(
+        sample_app, config, 'asyncio')
+    local_server.wait_for_server_ready()
+    with contextlib.closing(socket.create_connection(
+            ('localhost', port), timeout=5)) as conn:
+        conn.sendall(b'GET / HTTP/1.0\r\n\r\n')
+        response = b''
+        while True:
+            data = conn.recv(1024)
+            if not data:
+                break
+            response += data
+    assert response.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert response.endswith(b'\r\n\r\n{"hello":"world"}')
+
+
+def test_asyncio_server_can_handle_single_request(config, sample_app,
+                                                  unused_tcp_port):
+    options = LocalServerOptions(server_type='asyncio')
+    dev_server = create_local_server(sample_app, config, 'localhost',
+                                     unused_tcp_port, options)
+    responses = []
+
+    def make_request():
+        response = requests.get(
+            'http://localhost:%s/' % unused_tcp_port, timeout=5)
+        responses.append((response.status_code, response.text))
+
+    client = Thread(target=make_request)
+    client.start()
+    try:
+        dev_server.handle_single_request()
+        client.join()
+    finally:
+        dev_server.server.server_close()
+    assert responses == [(200, '{"hello":"world"}')]
+
+
+@pytest.mark.parametrize('server_type', ['threaded', 'pool', 'asyncio'])
+def test_error_mid_stream_closes_connection(config, server_type,
+                                            configured_server_factory):
+    demo = app.Chalice('streaming-app')
+
+    @demo.route('/stream')
+    def stream():
+        def _generate():
+            yield 'first,'
+            raise ValueError('error')
+        return app.Response(body=_generate())
+
+    local_server, port = configured_server_factory(demo, config, server_type)
+    local_server.wait_for_server_ready()
+    with contextlib.closing(socket.create_connection(
+            ('localhost', port), timeout=5)) as conn:
+        conn.sendall(b'GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        response = b''
+        while True:
+            data = conn.recv(1024)
+            if not data:
+                break
+            response += data
+    assert response.startswith(b'HTTP/1.1 200 OK\r\n')
+    # The connection is closed without sending the final chunk.
+    assert response.endswith(b'\r\n\r\n6\r\nfirst,\r\n')
+
+
+def test_asyncio_connection_waits_for_client_to_drain():
+    loop = asyncio.new_event_loop()
+    loop_thread = Thread(target=loop.run_forever)
+    loop_thread.start()
+    drained = Event()
+    written = []
+
+    class SlowWriter(object):
+        def write(self, data):
+            written.append(data)
+
+        async def drain(self):
+            await loop.run_in_executor(None, drained.wait)
+
+    connection = _AsyncioConnection(loop, SlowWriter(), b'')
+    sender = Thread(target=connection.sendall, args=(b'chunk',))
+    try:
+        sender.start()
+        sender.join(0.2)
+        # The data is written, but sendall() doesn't return until
+        # the client has read it.
+        assert sender.is_alive()
+        assert written == [b'chunk']
+        drained.set()
+        sender.join(5)
+        assert not sender.is_alive()
+    finally:
+        drained.set()
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+
 def test_can_import_env_vars(unused_tcp_port, http_session):
     with cd(ENV_APP_DIR):
         p = subprocess.Popen(['chalice', 'local', '--port',
@@ -19,6 +19,7 @@ from chalice.deploy.packager import SubprocessPip
 from chalice.deploy.packager import SDistMetadataFetcher
 from chalice.deploy.packager import InvalidSourceDistributionNameError
 from chalice.deploy.packager import UnsupportedPackageError
+from chalice.deploy.packager import WheelCache
 from chalice.compat import pip_no_compile_c_env_vars
 from chalice.compat import pip_no_compile_c_shim
 from chalice.package import PackageOptions
@@ -91,6 +92,7 @@ class FakePip(object):
         self._call_history = []
         self._side_effects = defaultdict(lambda: [])
         self._return_tuple = (0, b'', b'')
+        self._command_return_tuples = {}
 
     def main(self, args, env_vars=None, shim=None):
         cmd, args = args[0], args[1:]
@@ -106,11 +108,14 @@ class FakePip(object):
                 side_effect.execute(args)
         except IndexError:
             pass
-        return self._return_tuple
+        return self._command_return_tuples.get(cmd, self._return_tuple)
 
     def set_return_tuple(self, rc, out, err):
         self._return_tuple = (rc, out, err)
 
+    def set_command_return_tuple(self, cmd, rc, out, err):
+        self._command_return_tuples[cmd] = (rc, out, err)
+
     def packages_to_download(self, expected_args, packages, whl_contents=None):
         side_effects = [PipSideEffect(pkg,
                                       '--dest',
@@ -304,6 +309,88 @@ class TestDependencyBuilder(object):
         for req in reqs:
             assert req in installed_packages
 
+    def test_can_get_arm64_whls(self, tmpdir, pip_runner):
+        reqs = ['foo', 'bar', 'baz']
+        pip, runner = pip_runner
+        appdir = str(_create_app_structure(tmpdir))
+        self._write_requirements_txt(reqs, appdir)
+        builder = DependencyBuilder(OSUtils(), runner, architecture='arm64')
+        requirements_file = os.path.join(appdir, 'requirements.txt')
+        pip.packages_to_download(
+            expected_args=['-r', requirements_file, '--dest', mock.ANY],
+            packages=[
+                'foo-1.2-cp36-cp36m-manylinux2014_aarch64.whl',
+                'bar-1.2-cp36-cp36m-manylinux_2_17_aarch64.whl',
+                'baz-1.2-cp36-cp36m-manylinux2014_x86_64.whl',
+            ]
+        )
+        pip.packages_to_download(
+            expected_args=[
+                '--only-binary=:all:', '--no-deps', '--platform',
+                'manylinux2014_aarch64', '--implementation', 'cp',
+                '--abi', 'cp36m', '--dest', mock.ANY,
+                'baz==1.2'
+            ],
+            packages=[
+                'baz-1.2-cp36-cp36m-manylinux2014_aarch64.whl',
+            ]
+        )
+
+        site_packages = os.path.join(appdir, '.chalice.', 'site-packages')
+        builder.build_site_packages('cp36m', requirements_file, site_packages)
+        installed_packages = os.listdir(site_packages)
+
+        pip.validate()
+        for req in reqs:
+            assert req in installed_packages
+
+    def test_uses_wheel_cache_for_built_sdists(self, tmpdir, pip_runner):
+        reqs = ['foo']
+        pip, runner = pip_runner
+        appdir = str(_create_app_structure(tmpdir))
+        self._write_requirements_txt(reqs, appdir)
+        wheel_cache = WheelCache(str(tmpdir.join('wheel-cache')))
+        builder = DependencyBuilder(OSUtils(), runner, wheel_cache)
+        requirements_file = os.path.join(appdir, 'requirements.txt')
+        initial_download_args = ['-r', requirements_file, '--dest', mock.ANY]
+        pip.packages_to_download(
+            expected_args=initial_download_args,
+            packages=['foo-1.2.zip']
+        )
+        pip.packages_to_download(
+            expected_args=[
+                '--only-binary=:all:', '--no-deps', '--platform',
+                'manylinux2014_x86_64', '--implementation', 'cp',
+                '--abi', 'cp36m', '--dest', mock.ANY,
+                'foo==1.2'
+            ],
+            packages=[]
+        )
+        pip.wheels_to_build(
+            expected_args=['--no-deps', '--wheel-dir', mock.ANY,
+                           PathArgumentEndingWith('foo-1.2.zip')],
+            wheels_to_build=['foo-1.2-cp36-none-any.whl']
+        )
+        site_packages = os.path.join(appdir, '.chalice.', 'site-packages')
+        builder.build_site_packages('cp36m', requirements_file, site_packages)
+        pip.validate()
+        assert len(pip.calls['download']) == 2
+        assert len(pip.calls['wheel']) == 1
+        assert [e.filename for e in wheel_cache.entries()] == [
+            'foo-1.2-cp36-none-any.whl']
+
+        # Building again only needs pip to resolve the dependencies,
+        # the wheel is copied from the cache instead of being built.
+        pip.packages_to_download(
+            expected_args=initial_download_args,
+            packages=['foo-1.2.zip']
+        )
+        builder.build_site_packages('cp36m', requirements_file, site_packages)
+        pip.validate()
+        assert len(pip.calls['download']) == 3
+        assert len(pip.calls['wheel']) == 1
+        assert os.listdir(site_packages) == ['foo']
+
     def test_can_get_whls_all_manylinux(self, tmpdir, pip_runner):
         reqs = ['foo', 'bar']
         pip, runner = pip_runner
@@ -674,6 +761,31 @@ class TestDependencyBuilder(object):
         assert missing_packages[0].identifier == 'foo==1.2'
         assert len(installed_packages) == 0
 
+    def test_does_report_pip_errors_for_missing_packages(self, tmpdir,
+                                                         pip_runner):
+        reqs = ['foo']
+        pip, runner = pip_runner
+        appdir, builder = self._make_appdir_and_dependency_builder(
+            reqs, tmpdir, runner)
+        requirements_file = os.path.join(appdir, 'requirements.txt')
+        pip.packages_to_download(
+            expected_args=['-r', requirements_file, '--dest', mock.ANY],
+            packages=['foo-1.2.zip']
+        )
+        pip.set_command_return_tuple(
+            'wheel', 1, b'', b'Building wheel\nerror: command gcc failed')
+
+        site_packages = os.path.join(appdir, '.chalice.', 'site-packages')
+        with pytest.raises(MissingDependencyError) as e:
+            builder.build_site_packages(
+                'cp36m', requirements_file, site_packages)
+
+        pip.validate()
+        assert [p.identifier for p in e.value.missing] == ['foo==1.2']
+        assert e.value.errors == {
+            'foo==1.2': 'Building wheel\nerror: command gcc failed'
+        }
+
     def test_does_fail_on_narrow_py27_unicode(self, tmpdir, osutils,
                                               pip_runner):
         reqs = ['baz']
@@ -2,7 +2,11 @@ import zipfile
 import json
 import os
 import io
+import sys
 import tarfile
+import threading
+import subprocess
+from unittest import mock
 
 import pytest
 
@@ -48,6 +52,192 @@ def test_can_zip_recursive_contents(tmpdir):
         assert f.read('subdir/subsubdir/leaf.txt') == b'leaf.txt'
 
 
+def _create_source_zip(tmpdir):
+    source = tmpdir.mkdir('sourcedir')
+    source.join('hello.txt').write(b'hello world ' * 1000)
+    source.join('empty.txt').write(b'')
+    subdir = source.mkdir('subdir')
+    subdir.join('data.bin').write(os.urandom(100000), mode='wb')
+    outfile = str(tmpdir.join('source.zip'))
+    utils.create_zip_file(source_dir=str(source), outfile=outfile)
+    return source, outfile
+
+
+def test_copy_entry_matches_recompressing(tmpdir, osutils):
+    _, source_zip = _create_source_zip(tmpdir)
+    copied = str(tmpdir.join('copied.zip'))
+    recompressed = str(tmpdir.join('recompressed.zip'))
+    with osutils.open_zip(source_zip, 'r') as inzip:
+        with osutils.open_zip(copied, 'w') as outzip:
+            for zinfo in inzip.infolist():
+                outzip.copy_entry(inzip, zinfo)
+        with osutils.open_zip(recompressed, 'w') as outzip:
+            for zinfo in inzip.infolist():
+                outzip.writestr(zinfo, inzip.read(zinfo))
+    with open(copied, 'rb') as f, open(recompressed, 'rb') as g:
+        assert f.read() == g.read()
+
+
+def test_copy_entry_with_data_descriptor(tmpdir, osutils):
+    class UnseekableWriter(io.RawIOBase):
+        def __init__(self, f):
+            self._f = f
+
+        def writable(self):
+            return True
+
+        def write(self, data):
+            return self._f.write(data)
+
+    # Writing to an unseekable stream puts the CRC and sizes in a data
+    # descriptor after the file data.
+    source_zip = str(tmpdir.join('source.zip'))
+    with open(source_zip, 'wb') as f:
+        with zipfile.ZipFile(UnseekableWriter(f), 'w',
+                             zipfile.ZIP_DEFLATED) as z:
+            z.writestr('foo.txt', b'foo' * 1000)
+            z.writestr('bar.txt', b'bar' * 1000)
+    copied = str(tmpdir.join('copied.zip'))
+    with osutils.open_zip(source_zip, 'r') as inzip:
+        assert all(zinfo.flag_bits & 0x08 for zinfo in inzip.infolist())
+        with osutils.open_zip(copied, 'w') as outzip:
+            for zinfo in inzip.infolist():
+                outzip.copy_entry(inzip, zinfo)
+    with zipfile.ZipFile(copied) as z:
+        assert z.testzip() is None
+        assert z.read('foo.txt') == b'foo' * 1000
+        assert z.read('bar.txt') == b'bar' * 1000
+
+
+def test_copy_or_write_only_recompresses_changed_files(tmpdir, osutils):
+    source, source_zip = _create_source_zip(tmpdir)
+    source.join('hello.txt').write(b'hello new world')
+    outfile = str(tmpdir.join('out.zip'))
+    with osutils.open_zip(source_zip, 'r') as inzip:
+        with osutils.open_zip(outfile, 'w') as outzip:
+            outzip.copy_entry = mock.Mock(wraps=outzip.copy_entry)
+            for name in ['hello.txt', 'empty.txt', 'subdir/data.bin',
+                         'new.txt']:
+                if name == 'new.txt':
+                    source.join(name).write(b'new')
+                outzip.copy_or_write(inzip, str(source.join(name)), name)
+            copied = [call[0][1].filename
+                      for call in outzip.copy_entry.call_args_list]
+    assert copied == ['empty.txt', 'subdir/data.bin']
+    with zipfile.ZipFile(outfile) as z:
+        assert z.testzip() is None
+        assert z.read('hello.txt') == b'hello new world'
+        assert z.read('new.txt') == b'new'
+        assert z.read('subdir/data.bin') == source.join(
+            'subdir', 'data.bin').read_binary()
+
+
+def _create_mixed_source_dir(tmpdir):
+    source = tmpdir.mkdir('sourcedir')
+    source.join('random.bin').write(os.urandom(3 * 1024 * 1024), mode='wb')
+    source.join('text.py').write(b'def foo():\n    return 1\n' * 200000)
+    source.join('empty.txt').write(b'')
+    source.join('archive.gz').write(os.urandom(1024), mode='wb')
+    subdir = source.mkdir('subdir')
+    for i in range(50):
+        subdir.join('module%s.py' % i).write(b'x = %d\n' % i * (i + 1))
+    return source
+
+
+@pytest.mark.parametrize('jobs', [2, 4, 16])
+def test_parallel_zip_matches_serial_zip(tmpdir, jobs):
+    source = _create_mixed_source_dir(tmpdir)
+    serial = str(tmpdir.join('serial.zip'))
+    parallel = str(tmpdir.join('parallel.zip'))
+    utils.create_zip_file(source_dir=str(source), outfile=serial)
+    utils.create_zip_file(source_dir=str(source), outfile=parallel,
+                          jobs=jobs)
+    with open(serial, 'rb') as f, open(parallel, 'rb') as g:
+        assert f.read() == g.read()
+    with zipfile.ZipFile(parallel) as z:
+        assert z.testzip() is None
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_can_store_compressed_files(tmpdir, jobs):
+    source = _create_mixed_source_dir(tmpdir)
+    outfile = str(tmpdir.join('out.zip'))
+    utils.create_zip_file(source_dir=str(source), outfile=outfile,
+                          jobs=jobs, store_compressed=True)
+    with zipfile.ZipFile(outfile) as z:
+        assert z.testzip() is None
+        assert z.getinfo('archive.gz').compress_type == zipfile.ZIP_STORED
+        assert z.getinfo('text.py').compress_type == zipfile.ZIP_DEFLATED
+        assert z.read('archive.gz') == source.join('archive.gz').read_binary()
+
+
+def test_write_files_with_unsupported_parallel_compression(tmpdir, osutils):
+    source = _create_mixed_source_dir(tmpdir)
+    outfile = str(tmpdir.join('out.zip'))
+    with osutils.open_zip(outfile, 'w', zipfile.ZIP_BZIP2, jobs=4) as z:
+        z.write_files([(str(source.join('text.py')), 'text.py')])
+    with zipfile.ZipFile(outfile) as z:
+        assert z.getinfo('text.py').compress_type == zipfile.ZIP_BZIP2
+        assert z.read('text.py') == source.join('text.py').read_binary()
+
+
+# Writes a file to a zip archive in a new process and prints how much
+# the peak RSS of the process grew, in bytes.
+MEASURE_ZIP_RSS = """
+import resource
+import sys
+import zipfile
+from chalice.utils import ChaliceZipFile
+
+def max_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else.
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+before = max_rss()
+with ChaliceZipFile(sys.argv[1], 'w', compression=zipfile.ZIP_DEFLATED,
+                    jobs=int(sys.argv[3])) as z:
+    z.write_files([(sys.argv[2], 'large.bin')])
+print(max_rss() - before)
+"""
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(sys.platform == 'win32',
+                    reason='resource module is not available on Windows')
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_write_large_file_has_bounded_memory_usage(tmpdir, jobs):
+    size = 300 * 1024 * 1024
+    filename = str(tmpdir.join('large.bin'))
+    chunk = os.urandom(1024) * 1024
+    with open(filename, 'wb') as f:
+        for _ in range(size // len(chunk)):
+            f.write(chunk)
+    outfile = str(tmpdir.join('out.zip'))
+    output = subprocess.check_output(
+        [sys.executable, '-c', MEASURE_ZIP_RSS, outfile, filename, str(jobs)])
+    assert int(output) < 64 * 1024 * 1024
+    with zipfile.ZipFile(outfile) as z:
+        assert z.getinfo('large.bin').file_size == size
+        assert z.testzip() is None
+
+
+def test_write_files_streams_large_files_in_order(tmpdir, osutils):
+    source = _create_mixed_source_dir(tmpdir)
+    files = [(str(source.join(name)), name)
+             for name in ['text.py', 'random.bin', 'empty.txt']]
+    outfile = str(tmpdir.join('out.zip'))
+    with osutils.open_zip(outfile, 'w', jobs=4) as z:
+        # Only text.py is larger than this.
+        z._max_parallel_file_size = 4 * 1024 * 1024
+        z.write = mock.Mock(wraps=z.write)
+        z.write_files(files)
+    assert z.write.call_args_list == [mock.call(*files[0])]
+    with zipfile.ZipFile(outfile) as z:
+        assert z.namelist() == ['text.py', 'random.bin', 'empty.txt']
+        assert z.testzip() is None
+
+
 def test_can_write_recorded_values(tmpdir):
     filename = str(tmpdir.join('deployed.json'))
     utils.record_deployed_values({'dev': {'deployed': 'foo'}}, filename)
@@ -135,6 +325,31 @@ def test_error_raise_tar_symlink_out_of_extract_dir(tmp_path, osutils):
 
 
 class TestOSUtils(object):
+    def test_file_lock_is_exclusive(self, tmpdir, osutils):
+        lock_file = str(tmpdir.join('file.lock'))
+        events = []
+
+        def hold_lock():
+            with osutils.file_lock(lock_file):
+                events.append('second')
+
+        with osutils.file_lock(lock_file):
+            waiting = threading.Thread(target=hold_lock)
+            waiting.start()
+            waiting.join(0.2)
+            events.append('first')
+        waiting.join(5)
+        assert events == ['first', 'second']
+
+    def test_can_replace_file(self, tmpdir, osutils):
+        source = tmpdir.join('source')
+        source.write('new')
+        destination = tmpdir.join('destination')
+        destination.write('old')
+        osutils.replace(str(source), str(destination))
+        assert destination.read() == 'new'
+        assert not source.check()
+
     def test_can_read_unicode(self, tmpdir, osutils):
         filename = str(tmpdir.join('file.txt'))
         checkmark = u'\2713'
@@ -4,7 +4,7 @@ import re
 
 from chalice import cli
 from chalice.cli.factory import CLIFactory
-from chalice.local import LocalDevServer
+from chalice.local import LocalDevServer, LocalServerOptions
 
 
 def test_cannot_run_local_mode_with_trailing_slash_route():
@@ -21,6 +21,19 @@ def test_cannot_run_local_mode_with_trailing_slash_route():
     assert str(e.value) == 'Route cannot end with a trailing slash: foobar/'
 
 
+def test_local_server_options_passed_to_factory():
+    factory = mock.Mock(spec=CLIFactory)
+    factory.create_config_obj.return_value.chalice_app.routes = {}
+    local_server = mock.Mock(spec=LocalDevServer)
+    factory.create_local_server.return_value = local_server
+    options = LocalServerOptions(server_type='pool', pool_size=4)
+    cli.run_local_server(factory, 'localhost', 8000, 'dev', options)
+    config = factory.create_config_obj.return_value
+    factory.create_local_server.assert_called_with(
+        config.chalice_app, config, 'localhost', 8000, options)
+    local_server.serve_forever.assert_called_with()
+
+
 def test_get_system_info():
     system_info = cli.get_system_info()
     assert re.match(r'python\s*([\d.]+),?\s*(.*) (.*)', system_info)
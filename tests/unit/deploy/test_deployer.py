@@ -342,6 +342,16 @@ class TestDependencyBuilder(object):
         deps = dep_builder.build_dependencies(app)
         assert deps == [leaf, second_parent, first_parent]
 
+    def test_resource_listed_twice_is_ordered_once(self):
+        leaf = LeafResource(name='leaf')
+        parent = FooResource(name='parent', leaf=leaf)
+        app = models.Application(
+            stage='dev', resources=[parent, leaf, parent])
+
+        dep_builder = DependencyBuilder()
+        deps = dep_builder.build_dependencies(app)
+        assert deps == [leaf, parent]
+
 
 class RoleTestCase(object):
     def __init__(self, given, roles, app_name='appname'):
@@ -940,6 +950,38 @@ def test_can_create_deployer_with_layer_builds():
     assert isinstance(deployer, Deployer)
 
 
+def test_can_create_deployer_with_parallel_jobs():
+    session = botocore.session.get_session()
+    deployer = create_default_deployer(session, Config.create(
+        project_dir='.',
+        chalice_stage='dev',
+        store_compressed_files=True,
+    ), UI(), jobs=4)
+    assert isinstance(deployer, Deployer)
+
+
+def test_can_create_deployer_with_slim_package():
+    session = botocore.session.get_session()
+    deployer = create_default_deployer(session, Config.create(
+        project_dir='.',
+        chalice_stage='dev',
+        slim_package=True,
+        slim_package_keep=['numpy'],
+    ), UI())
+    assert isinstance(deployer, Deployer)
+
+
+def test_can_create_deployer_with_precompiled_bytecode():
+    session = botocore.session.get_session()
+    deployer = create_default_deployer(session, Config.create(
+        project_dir='.',
+        chalice_stage='dev',
+        precompile_bytecode=True,
+        automatic_layer=True,
+    ), UI())
+    assert isinstance(deployer, Deployer)
+
+
 def test_can_create_deletion_deployer():
     session = botocore.session.get_session()
     deployer = create_deletion_deployer(TypedAWSClient(session), UI())
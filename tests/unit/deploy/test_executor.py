@@ -1,11 +1,12 @@
 import re
+import threading
 from unittest import mock
 import pytest
 
 from chalice.awsclient import TypedAWSClient
 from chalice.deploy import models
 from chalice.deploy.executor import Executor, UnresolvedValueError, \
-    VariableResolver, DisplayOnlyExecutor
+    VariableResolver, DisplayOnlyExecutor, InstructionGraph
 from chalice.deploy.models import APICall, RecordResourceVariable, \
     RecordResourceValue, StoreValue, JPSearch, BuiltinFunction, Instruction, \
     CopyVariable
@@ -282,6 +283,131 @@ class TestExecutor(object):
             self.execute([CustomInstruction()])
 
 
+class TestConcurrentExecutor(object):
+    def setup_method(self):
+        self.mock_client = mock.Mock(spec=TypedAWSClient)
+        self.ui = mock.Mock(spec=UI)
+        self.executor = Executor(self.mock_client, self.ui, max_workers=4)
+
+    def execute(self, grouped_instructions, messages=None):
+        plan = models.Plan(messages=messages or {})
+        for group, instructions in grouped_instructions:
+            for instruction in instructions:
+                plan.instructions.append(instruction)
+                if group is not None:
+                    plan.groups[id(instruction)] = group
+        self.executor.execute(plan)
+
+    def test_independent_api_calls_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def update_function(function_name):
+            # Both calls have to be running at the same time for
+            # the barrier to be passed.
+            barrier.wait()
+            return {'FunctionArn': 'arn:%s' % function_name}
+
+        self.mock_client.update_function.side_effect = update_function
+        self.execute([
+            ('a', [APICall('update_function', {'function_name': 'a'},
+                           output_var='result'),
+                   JPSearch('FunctionArn', input_var='result',
+                            output_var='a_arn'),
+                   RecordResourceVariable('lambda_function', 'a',
+                                          'lambda_arn', 'a_arn')]),
+            ('b', [APICall('update_function', {'function_name': 'b'},
+                           output_var='result'),
+                   JPSearch('FunctionArn', input_var='result',
+                            output_var='b_arn'),
+                   RecordResourceVariable('lambda_function', 'b',
+                                          'lambda_arn', 'b_arn')]),
+        ])
+        assert self.executor.resource_values == [
+            {'name': 'a', 'resource_type': 'lambda_function',
+             'lambda_arn': 'arn:a'},
+            {'name': 'b', 'resource_type': 'lambda_function',
+             'lambda_arn': 'arn:b'},
+        ]
+        assert self.executor.variables['result'] == {'FunctionArn': 'arn:b'}
+
+    def test_output_is_in_plan_order(self):
+        b_finished = threading.Event()
+
+        def create_role(name):
+            if name == 'a':
+                assert b_finished.wait(timeout=5)
+            else:
+                b_finished.set()
+            return 'arn:%s' % name
+
+        self.mock_client.create_role.side_effect = create_role
+        a = APICall('create_role', {'name': 'a'}, output_var='a_arn')
+        b = APICall('create_role', {'name': 'b'}, output_var='b_arn')
+        self.execute([
+            ('a', [a, RecordResourceVariable('iam_role', 'a', 'role_arn',
+                                             'a_arn')]),
+            ('b', [b, RecordResourceVariable('iam_role', 'b', 'role_arn',
+                                             'b_arn')]),
+        ], messages={id(a): 'Creating a\n', id(b): 'Creating b\n'})
+        assert [r['name'] for r in self.executor.resource_values] == [
+            'a', 'b']
+        assert self.ui.write.call_args_list == [
+            mock.call('Creating a\n'), mock.call('Creating b\n')]
+
+    def test_waits_for_referenced_variables(self):
+        calls = []
+        self.mock_client.create_role.side_effect = (
+            lambda name: calls.append(name) or 'role-arn')
+        self.mock_client.create_function.side_effect = (
+            lambda role_arn: calls.append(role_arn) or 'function-arn')
+        self.execute([
+            ('role', [APICall('create_role', {'name': 'role'},
+                              output_var='role_arn')]),
+            ('function', [APICall('create_function',
+                                  {'role_arn': Variable('role_arn')})]),
+        ])
+        assert calls == ['role', 'role-arn']
+
+    def test_ungrouped_instructions_run_after_everything_before(self):
+        graph = InstructionGraph(models.Plan(
+            instructions=[APICall('a', {}), APICall('b', {}),
+                          APICall('c', {}), APICall('d', {})],
+        ))
+        assert graph.dependencies == [set(), {0}, {1}, {2}]
+
+    def test_graph_dependencies(self):
+        instructions = [
+            APICall('create_role', {}, output_var='role_arn'),
+            APICall('put_role_policy', {}),
+            APICall('create_function', {'role_arn': Variable('role_arn')},
+                    output_var='result'),
+            APICall('update_function', {}, output_var='result'),
+            JPSearch('FunctionArn', input_var='result', output_var='arn'),
+            APICall('delete_function', {}),
+        ]
+        groups = ['role', 'role', 'a', 'b', 'b', None]
+        plan = models.Plan(instructions=instructions, groups={
+            id(instruction): group
+            for instruction, group in zip(instructions, groups)
+            if group is not None
+        })
+        graph = InstructionGraph(plan)
+        assert graph.dependencies == [
+            set(), {0}, {0}, set(), {3}, {0, 1, 2, 3, 4}]
+        assert graph.bindings[2] == {'role_arn': 0}
+        assert graph.bindings[4] == {'result': 3}
+
+    def test_stops_starting_instructions_after_an_error(self):
+        self.mock_client.create_role.side_effect = RuntimeError('error')
+        with pytest.raises(RuntimeError):
+            self.execute([
+                ('a', [APICall('create_role', {'name': 'a'}),
+                       RecordResourceValue('iam_role', 'a', 'role_name',
+                                           'a')]),
+            ])
+        assert self.executor.resource_values == []
+
+
 class TestDisplayOnlyExecutor(object):
 
     # Note: This executor doesn't have any guarantees on its output,
@@ -1,7 +1,17 @@
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
 import pytest
 from collections import namedtuple
 
 from chalice.utils import OSUtils
+from chalice.utils import UI
 from chalice.compat import pip_no_compile_c_env_vars
 from chalice.compat import pip_no_compile_c_shim
 from chalice.deploy.packager import Package
@@ -10,6 +20,12 @@ from chalice.deploy.packager import SubprocessPip
 from chalice.deploy.packager import InvalidSourceDistributionNameError
 from chalice.deploy.packager import NoSuchPackageError
 from chalice.deploy.packager import PackageDownloadError
+from chalice.deploy.packager import WheelCache
+from chalice.deploy.packager import FileDigestCache
+from chalice.deploy.packager import PackageSlimmer
+from chalice.deploy.packager import BytecodeCompiler
+from chalice.deploy.packager import get_default_wheel_cache_dir
+from chalice.deploy.packager import wheel_cache_enabled
 
 
 FakePipCall = namedtuple('FakePipEntry', ['args', 'env_vars', 'shim'])
@@ -35,11 +51,36 @@ class FakePip(object):
         return self._calls
 
 
+class ConcurrentFakePip(object):
+    # Every call waits until ``parties`` calls are running at the same
+    # time, so this only finishes if pip is run in parallel.
+    def __init__(self, parties, failures=None):
+        self._barrier = threading.Barrier(parties, timeout=10)
+        self._lock = threading.Lock()
+        self._calls = []
+        if failures is None:
+            failures = {}
+        self._failures = failures
+
+    def main(self, args, env_vars=None, shim=None):
+        with self._lock:
+            self._calls.append(FakePipCall(args, env_vars, shim))
+        self._barrier.wait()
+        package = args[-1]
+        if package in self._failures:
+            return 1, b'', self._failures[package]
+        return 0, b'', b''
+
+    @property
+    def calls(self):
+        return self._calls
+
+
 @pytest.fixture
 def pip_factory():
-    def create_pip_runner(osutils=None):
+    def create_pip_runner(osutils=None, jobs=1):
         pip = FakePip()
-        pip_runner = PipRunner(pip, osutils=osutils)
+        pip_runner = PipRunner(pip, osutils=osutils, jobs=jobs)
         return pip, pip_runner
     return create_pip_runner
 
@@ -285,6 +326,49 @@ class TestPipRunner(object):
             runner.download_all_dependencies('requirements.txt', 'directory')
         assert str(einfo.value) == 'Unknown error'
 
+    def test_download_sdists_returns_errors_per_package(self, pip_factory):
+        pip, runner = pip_factory()
+        pip.add_return((0, b'', b''))
+        pip.add_return((1, b'', b'ERROR: No matching distribution for bar'))
+        pip.add_return((1, b'', None))
+        errors = runner.download_sdists(['foo', 'bar', 'baz'], 'directory')
+        assert errors == {
+            'bar': 'ERROR: No matching distribution for bar',
+            'baz': 'Unknown error',
+        }
+
+    def test_build_wheels_returns_errors_per_sdist(self, pip_factory):
+        pip, runner = pip_factory()
+        pip.add_return((1, b'', b'error: command gcc failed'))
+        errors = runner.build_wheels(['foo.tar.gz', 'bar.tar.gz'], 'directory')
+        assert [call.args[-1] for call in pip.calls] == [
+            'foo.tar.gz', 'bar.tar.gz']
+        assert errors == {'foo.tar.gz': 'error: command gcc failed'}
+
+    def test_download_wheels_runs_jobs_in_parallel(self):
+        packages = ['foo', 'bar', 'baz']
+        pip = ConcurrentFakePip(
+            parties=3, failures={'bar': b'ERROR: no manylinux wheel'})
+        runner = PipRunner(pip, jobs=3)
+        errors = runner.download_manylinux_wheels(
+            'cp37m', packages, 'directory')
+        assert sorted(call.args[-1] for call in pip.calls) == sorted(packages)
+        assert errors == {'bar': 'ERROR: no manylinux wheel'}
+
+    def test_build_wheels_runs_jobs_in_parallel(self):
+        pip = ConcurrentFakePip(parties=2)
+        runner = PipRunner(pip, jobs=2)
+        errors = runner.build_wheels(
+            ['foo.tar.gz', 'bar.tar.gz'], 'directory', compile_c=False)
+        assert errors == {}
+        for call in pip.calls:
+            assert call.shim == pip_no_compile_c_shim
+
+    def test_jobs_must_be_at_least_one(self, pip_factory):
+        pip, runner = pip_factory(jobs=0)
+        runner.download_sdists(['foo', 'bar'], 'directory')
+        assert [call.args[-1] for call in pip.calls] == ['foo', 'bar']
+
 
 class TestSubprocessPip(object):
     def test_does_use_custom_pip_import_string(self):
@@ -297,3 +381,438 @@ class TestSubprocessPip(object):
         pip_execution_string = fake_osutils.popens[0][0][0][2]
         import_statement = pip_execution_string.split(';')[1].strip()
         assert import_statement == expected_import_statement
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class TestWheelCache(object):
+    @pytest.fixture
+    def wheel_cache(self, tmpdir):
+        return WheelCache(str(tmpdir.join('cache')), max_size=100,
+                          clock=FakeClock())
+
+    def write_wheel(self, tmpdir, filename, contents):
+        path = tmpdir.join(filename)
+        path.write_binary(contents)
+        return str(path)
+
+    def test_can_get_wheel_that_was_put(self, wheel_cache, tmpdir):
+        wheel = self.write_wheel(tmpdir, 'foo-1.0-cp37-cp37m-any.whl', b'foo')
+        wheel_cache.put('foo', '1.0', 'cp37m', 'x86_64', wheel)
+        dest = tmpdir.mkdir('dest')
+        filename = wheel_cache.get('foo', '1.0', 'cp37m', 'x86_64', str(dest))
+        assert filename == 'foo-1.0-cp37-cp37m-any.whl'
+        assert dest.join(filename).read_binary() == b'foo'
+
+    @pytest.mark.parametrize('key', [
+        ('bar', '1.0', 'cp37m', 'x86_64'),
+        ('foo', '2.0', 'cp37m', 'x86_64'),
+        ('foo', '1.0', 'cp38', 'x86_64'),
+        ('foo', '1.0', 'cp37m', 'aarch64'),
+    ])
+    def test_cache_miss_for_different_key(self, wheel_cache, tmpdir, key):
+        wheel = self.write_wheel(tmpdir, 'foo-1.0-cp37-cp37m-any.whl', b'foo')
+        wheel_cache.put('foo', '1.0', 'cp37m', 'x86_64', wheel)
+        assert wheel_cache.get(*key, directory=str(tmpdir)) is None
+
+    def test_identical_wheels_stored_once(self, wheel_cache, tmpdir):
+        wheel = self.write_wheel(tmpdir, 'foo-1.0-py3-none-any.whl', b'foo')
+        wheel_cache.put('foo', '1.0', 'cp37m', 'x86_64', wheel)
+        wheel_cache.put('foo', '1.0', 'cp38', 'x86_64', wheel)
+        assert len(wheel_cache.entries()) == 2
+        assert wheel_cache.total_size() == 3
+
+    def test_evicts_least_recently_used_wheels(self, wheel_cache, tmpdir):
+        for name in ['a', 'b', 'c']:
+            wheel = self.write_wheel(
+                tmpdir, '%s-1.0-py3-none-any.whl' % name, name.encode() * 40)
+            wheel_cache.put(name, '1.0', 'cp37m', 'x86_64', wheel)
+            if name == 'b':
+                # Using 'a' makes 'b' the least recently used wheel.
+                wheel_cache.get('a', '1.0', 'cp37m', 'x86_64', str(tmpdir))
+        assert [e.name for e in wheel_cache.entries()] == ['c', 'a']
+        assert wheel_cache.total_size() == 80
+        assert wheel_cache.get(
+            'b', '1.0', 'cp37m', 'x86_64', str(tmpdir)) is None
+
+    def test_can_prune_cache(self, wheel_cache, tmpdir):
+        for name in ['a', 'b']:
+            wheel = self.write_wheel(
+                tmpdir, '%s-1.0-py3-none-any.whl' % name, name.encode() * 10)
+            wheel_cache.put(name, '1.0', 'cp37m', 'x86_64', wheel)
+        removed = wheel_cache.prune(max_size=10)
+        assert [e.name for e in removed] == ['a']
+        removed = wheel_cache.prune(max_size=0)
+        assert [e.name for e in removed] == ['b']
+        assert wheel_cache.entries() == []
+        assert wheel_cache.total_size() == 0
+
+    def test_missing_wheel_file_is_cache_miss(self, wheel_cache, tmpdir):
+        wheel = self.write_wheel(tmpdir, 'foo-1.0-py3-none-any.whl', b'foo')
+        wheel_cache.put('foo', '1.0', 'cp37m', 'x86_64', wheel)
+        for dirpath, _, filenames in OSUtils().walk(wheel_cache.cache_dir):
+            for filename in filenames:
+                if filename.endswith('.whl'):
+                    OSUtils().remove_file(OSUtils().joinpath(
+                        dirpath, filename))
+        assert wheel_cache.get(
+            'foo', '1.0', 'cp37m', 'x86_64', str(tmpdir)) is None
+        assert wheel_cache.entries() == []
+
+    def test_concurrent_puts_keep_all_entries(self, tmpdir):
+        cache_dir = str(tmpdir.join('cache'))
+        wheels = [
+            ('pkg%s' % i, self.write_wheel(
+                tmpdir, 'pkg%s-1.0-py3-none-any.whl' % i, b'%d' % i))
+            for i in range(8)
+        ]
+
+        def put(name, wheel):
+            # Each put uses its own cache object, like separate processes.
+            WheelCache(cache_dir).put(name, '1.0', 'cp37m', 'x86_64', wheel)
+
+        threads = [threading.Thread(target=put, args=wheel)
+                   for wheel in wheels]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(e.name for e in WheelCache(cache_dir).entries()) == \
+            sorted(name for name, _ in wheels)
+
+    def test_invalid_index_is_empty_cache(self, wheel_cache, tmpdir):
+        tmpdir.mkdir('cache').join('index.json').write('not json')
+        assert wheel_cache.entries() == []
+        assert wheel_cache.get(
+            'foo', '1.0', 'cp37m', 'x86_64', str(tmpdir)) is None
+
+
+def test_default_wheel_cache_dir_can_be_overridden():
+    environ = {'CHALICE_WHEEL_CACHE_DIR': '/tmp/wheels'}
+    assert get_default_wheel_cache_dir(environ) == '/tmp/wheels'
+
+
+def test_default_wheel_cache_dir_uses_xdg_cache_home():
+    environ = {'XDG_CACHE_HOME': '/tmp/cache'}
+    assert get_default_wheel_cache_dir(environ) == OSUtils().joinpath(
+        '/tmp/cache', 'chalice', 'wheel-cache')
+
+
+@pytest.mark.parametrize('environ,enabled', [
+    ({}, True),
+    ({'CHALICE_DISABLE_WHEEL_CACHE': ''}, True),
+    ({'CHALICE_DISABLE_WHEEL_CACHE': 'false'}, True),
+    ({'CHALICE_DISABLE_WHEEL_CACHE': 'true'}, False),
+    ({'CHALICE_DISABLE_WHEEL_CACHE': 'TRUE'}, False),
+    ({'CHALICE_DISABLE_WHEEL_CACHE': '1'}, False),
+])
+def test_wheel_cache_can_be_disabled(environ, enabled):
+    assert wheel_cache_enabled(environ) == enabled
+
+
+class TestFileDigestCache(object):
+    @pytest.fixture
+    def manifest(self, tmpdir):
+        return str(tmpdir.join('.chalice', 'cache', 'file-digests.json'))
+
+    def write_file(self, tmpdir, filename, contents, age=60):
+        path = tmpdir.join(filename)
+        path.write_binary(contents)
+        # Files modified in the last couple of seconds aren't recorded
+        # in the manifest, so make them look older than that.
+        mtime = time.time() - age
+        os.utime(str(path), (mtime, mtime))
+        return str(path)
+
+    def test_returns_digest_of_each_file(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        bar = self.write_file(tmpdir, 'bar.py', b'bar')
+        cache = FileDigestCache(manifest)
+        assert cache.digests([foo, bar]) == [
+            hashlib.md5(b'foo').hexdigest(),
+            hashlib.md5(b'bar').hexdigest(),
+        ]
+
+    def test_unchanged_files_are_not_read_again(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        bar = self.write_file(tmpdir, 'bar.py', b'bar')
+        FileDigestCache(manifest).digests([foo, bar])
+        osutils = mock.Mock(wraps=OSUtils())
+        cache = FileDigestCache(manifest, osutils=osutils)
+        assert cache.digests([foo, bar]) == [
+            hashlib.md5(b'foo').hexdigest(),
+            hashlib.md5(b'bar').hexdigest(),
+        ]
+        assert not osutils.open.called
+
+    def test_changed_files_are_hashed_again(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        FileDigestCache(manifest).digests([foo])
+        self.write_file(tmpdir, 'foo.py', b'new foo', age=30)
+        assert FileDigestCache(manifest).digests([foo]) == [
+            hashlib.md5(b'new foo').hexdigest()]
+
+    def test_recently_modified_files_are_not_recorded(self, tmpdir,
+                                                      manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo', age=0)
+        bar = self.write_file(tmpdir, 'bar.py', b'bar')
+        FileDigestCache(manifest).digests([foo, bar])
+        with open(manifest) as f:
+            assert list(json.load(f)['files']) == [bar]
+
+    def test_can_use_blake2b(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        cache = FileDigestCache(manifest, algorithm='blake2b')
+        assert cache.digests([foo]) == [
+            hashlib.blake2b(b'foo', digest_size=16).hexdigest()]
+        assert cache.new_hash().name == 'blake2b'
+
+    def test_changing_algorithm_ignores_manifest(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        FileDigestCache(manifest).digests([foo])
+        cache = FileDigestCache(manifest, algorithm='blake2b')
+        assert cache.digests([foo]) == [
+            hashlib.blake2b(b'foo', digest_size=16).hexdigest()]
+
+    def test_unknown_algorithm_raises_error(self, manifest):
+        with pytest.raises(ValueError):
+            FileDigestCache(manifest, algorithm='crc32')
+
+    def test_invalid_manifest_is_ignored(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        os.makedirs(os.path.dirname(manifest))
+        with open(manifest, 'w') as f:
+            f.write('not json')
+        assert FileDigestCache(manifest).digests([foo]) == [
+            hashlib.md5(b'foo').hexdigest()]
+
+    def test_deleted_files_are_removed_from_manifest(self, tmpdir, manifest):
+        foo = self.write_file(tmpdir, 'foo.py', b'foo')
+        bar = self.write_file(tmpdir, 'bar.py', b'bar')
+        FileDigestCache(manifest).digests([foo, bar])
+        os.remove(bar)
+        self.write_file(tmpdir, 'foo.py', b'new foo')
+        FileDigestCache(manifest).digests([foo])
+        with open(manifest) as f:
+            assert list(json.load(f)['files']) == [foo]
+
+    def test_can_hash_many_files_in_parallel(self, tmpdir, manifest):
+        filenames = [
+            self.write_file(tmpdir, 'file%s.py' % i, b'%d' % i * 1000)
+            for i in range(50)
+        ]
+        cache = FileDigestCache(manifest)
+        cache._MAX_WORKERS = 4
+        with mock.patch('os.cpu_count', return_value=4):
+            digests = cache.digests(filenames)
+        assert digests == [
+            hashlib.md5(b'%d' % i * 1000).hexdigest() for i in range(50)]
+
+
+class TestPackageSlimmer(object):
+    @pytest.fixture
+    def site_packages(self, tmpdir):
+        site_packages = tmpdir.mkdir('site-packages')
+        files = {
+            'foo/__init__.py': b'foo',
+            'foo/__pycache__/__init__.cpython-311.pyc': b'cached',
+            'foo/tests/test_foo.py': b'test foo',
+            'foo/tests/data/fixture.json': b'{}',
+            'foo/docs/index.rst': b'docs',
+            'foo/_speedups.so': b'shared library',
+            'foo-1.0.dist-info/RECORD': b'record',
+            'foo-1.0.dist-info/METADATA': b'metadata',
+            'bar/__init__.py': b'bar',
+            'bar/test/conftest.py': b'conftest',
+            'bar/module.pyi': b'stub',
+            'baz.py': b'baz',
+        }
+        for filename, contents in files.items():
+            path = site_packages.join(*filename.split('/'))
+            path.dirpath().ensure(dir=True)
+            path.write_binary(contents)
+        return site_packages
+
+    def list_files(self, site_packages):
+        return sorted(
+            path.relto(site_packages).replace(os.sep, '/')
+            for path in site_packages.visit() if path.check(file=True)
+        )
+
+    def test_removes_default_exclusions(self, site_packages):
+        slimmer = PackageSlimmer(OSUtils(), strip_debug_symbols=False)
+        report = slimmer.slim(str(site_packages))
+        assert self.list_files(site_packages) == [
+            'bar/__init__.py',
+            'bar/module.pyi',
+            'baz.py',
+            'foo-1.0.dist-info/METADATA',
+            'foo/__init__.py',
+            'foo/_speedups.so',
+        ]
+        assert report.files_removed == 6
+        assert report.files_stripped == 0
+        assert report.bytes_saved == len(
+            b'cached' b'test foo' b'{}' b'docs' b'record' b'conftest')
+
+    def test_can_add_exclusions(self, site_packages):
+        slimmer = PackageSlimmer(
+            OSUtils(), exclude=['*.pyi', 'baz.py'], strip_debug_symbols=False)
+        slimmer.slim(str(site_packages))
+        files = self.list_files(site_packages)
+        assert 'bar/module.pyi' not in files
+        assert 'baz.py' not in files
+
+    def test_exclusions_with_slash_match_relative_path(self, site_packages):
+        slimmer = PackageSlimmer(
+            OSUtils(), exclude=['foo/*.so'], strip_debug_symbols=False)
+        slimmer.slim(str(site_packages))
+        files = self.list_files(site_packages)
+        assert 'foo/_speedups.so' not in files
+        assert 'foo/__init__.py' in files
+
+    def test_kept_packages_are_not_slimmed(self, site_packages):
+        slimmer = PackageSlimmer(
+            OSUtils(), keep=['Foo'], strip_debug_symbols=False)
+        slimmer.slim(str(site_packages))
+        files = self.list_files(site_packages)
+        assert 'foo/tests/test_foo.py' in files
+        assert 'foo-1.0.dist-info/RECORD' in files
+        assert 'bar/test/conftest.py' not in files
+
+    def test_strips_shared_libraries(self, site_packages):
+        osutils = mock.Mock(wraps=OSUtils())
+        osutils.which.return_value = '/usr/bin/strip'
+
+        def fake_strip(command, stdout, stderr):
+            with open(command[-1], 'wb') as f:
+                f.write(b'lib')
+            process = mock.Mock()
+            process.communicate.return_value = (b'', b'')
+            process.returncode = 0
+            return process
+
+        osutils.popen.side_effect = fake_strip
+        report = PackageSlimmer(osutils).slim(str(site_packages))
+        osutils.popen.assert_called_once_with(
+            ['/usr/bin/strip', '--strip-debug',
+             str(site_packages.join('foo', '_speedups.so'))],
+            stdout=mock.ANY, stderr=mock.ANY)
+        assert report.files_stripped == 1
+        assert report.bytes_saved == len(
+            b'cached' b'test foo' b'{}' b'docs' b'record' b'conftest'
+            b'shared library') - len(b'lib')
+
+    def test_strip_failures_leave_library_unchanged(self, site_packages):
+        osutils = mock.Mock(wraps=OSUtils())
+        osutils.which.return_value = '/usr/bin/strip'
+        process = mock.Mock()
+        process.communicate.return_value = (b'', b'file format not recognized')
+        process.returncode = 1
+        osutils.popen.return_value = process
+        report = PackageSlimmer(osutils).slim(str(site_packages))
+        assert report.files_stripped == 0
+        assert site_packages.join(
+            'foo', '_speedups.so').read_binary() == b'shared library'
+
+    def test_skips_stripping_without_strip_command(self, site_packages):
+        osutils = mock.Mock(wraps=OSUtils())
+        osutils.which.return_value = None
+        report = PackageSlimmer(osutils).slim(str(site_packages))
+        assert not osutils.popen.called
+        assert report.files_stripped == 0
+
+    def test_fingerprint_changes_with_rules(self):
+        osutils = OSUtils()
+        fingerprints = set([
+            PackageSlimmer(osutils).fingerprint(),
+            PackageSlimmer(osutils, exclude=['*.pyi']).fingerprint(),
+            PackageSlimmer(osutils, keep=['foo']).fingerprint(),
+            PackageSlimmer(osutils, strip_debug_symbols=False).fingerprint(),
+        ])
+        assert len(fingerprints) == 4
+
+
+class TestBytecodeCompiler(object):
+    PYTHON_VERSION = 'python%s.%s' % sys.version_info[:2]
+    CACHE_TAG = sys.implementation.cache_tag
+
+    @pytest.fixture
+    def sources(self, tmpdir):
+        tmpdir.mkdir('pkg').join('module.py').write('VALUE = 1\n')
+        tmpdir.join('app.py').write('import pkg\n')
+        return [
+            (str(tmpdir.join('pkg', 'module.py')), 'pkg/module.py'),
+            (str(tmpdir.join('app.py')), 'app.py'),
+        ]
+
+    def test_bytecode_arcname(self):
+        compiler = BytecodeCompiler(OSUtils(), UI(), 'python3.11')
+        assert compiler.bytecode_arcname('pkg/module.py') == (
+            'pkg/__pycache__/module.cpython-311.pyc')
+        assert compiler.bytecode_arcname('app.py') == (
+            '__pycache__/app.cpython-311.pyc')
+
+    def test_compiles_unchecked_hash_pycs(self, tmpdir, sources):
+        compiler = BytecodeCompiler(OSUtils(), UI(), self.PYTHON_VERSION)
+        output_dir = str(tmpdir.mkdir('output'))
+        pycs = compiler.compile_files(sources, output_dir)
+        assert [arcname for _, arcname in pycs] == [
+            'pkg/__pycache__/module.%s.pyc' % self.CACHE_TAG,
+            '__pycache__/app.%s.pyc' % self.CACHE_TAG,
+        ]
+        with open(pycs[0][0], 'rb') as f:
+            header = f.read(16)
+        assert header[:4] == importlib.util.MAGIC_NUMBER
+        # A flags value of 1 is a hash based pyc that isn't checked
+        # against its source.
+        assert int.from_bytes(header[4:8], 'little') == 1
+        assert header[8:16] == importlib.util.source_hash(b'VALUE = 1\n')
+
+    def test_compiling_is_deterministic(self, tmpdir, sources):
+        compiler = BytecodeCompiler(OSUtils(), UI(), self.PYTHON_VERSION)
+        contents = []
+        for name in ['first', 'second']:
+            pycs = compiler.compile_files(sources, str(tmpdir.mkdir(name)))
+            contents.append([open(f, 'rb').read() for f, _ in pycs])
+        assert contents[0] == contents[1]
+
+    def test_skips_modules_that_cant_compile(self, tmpdir, sources):
+        tmpdir.join('bad.py').write('def (\n')
+        sources.append((str(tmpdir.join('bad.py')), 'bad.py'))
+        compiler = BytecodeCompiler(OSUtils(), UI(), self.PYTHON_VERSION)
+        pycs = compiler.compile_files(sources, str(tmpdir.mkdir('output')))
+        assert len(pycs) == 2
+        assert '__pycache__/bad.%s.pyc' % self.CACHE_TAG not in [
+            arcname for _, arcname in pycs]
+
+    def test_uses_interpreter_for_other_versions(self, tmpdir, sources):
+        osutils = OSUtils()
+        with mock.patch.object(osutils, 'which', return_value=sys.executable):
+            compiler = BytecodeCompiler(osutils, UI(), 'python3.99')
+            pycs = compiler.compile_files(
+                sources, str(tmpdir.mkdir('output')))
+            osutils.which.assert_called_with('python3.99')
+        assert [arcname for _, arcname in pycs] == [
+            'pkg/__pycache__/module.cpython-399.pyc',
+            '__pycache__/app.cpython-399.pyc',
+        ]
+        assert all(os.path.isfile(filename) for filename, _ in pycs)
+
+    def test_warns_once_when_no_interpreter_found(self, tmpdir, sources):
+        osutils = mock.Mock(wraps=OSUtils())
+        osutils.which.return_value = None
+        ui = mock.Mock(spec=UI)
+        compiler = BytecodeCompiler(osutils, ui, 'python3.99')
+        assert compiler.compile_files(sources, str(tmpdir)) == []
+        assert compiler.compile_files(sources, str(tmpdir)) == []
+        ui.write.assert_called_once_with(
+            'Unable to precompile bytecode, no python3.99 interpreter '
+            'found.\n')
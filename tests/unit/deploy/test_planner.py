@@ -1,3 +1,5 @@
+import io
+import threading
 from unittest import mock
 from dataclasses import replace, dataclass
 from typing import Tuple  # noqa
@@ -113,6 +115,10 @@ class InMemoryRemoteState(object):
             known_resources = {}
         self.known_resources = known_resources
         self.deployed_values = {}
+        self.deployed_code = {}
+
+    def prefetch(self, resources):
+        pass
 
     def resource_exists(self, resource, *args):
         if resource.resource_type == 'api_mapping':
@@ -146,10 +152,18 @@ class InMemoryRemoteState(object):
     def resource_deployed_values(self, resource):
         return self.deployed_values[resource.resource_name]
 
+    def lambda_code_is_current(self, resource, code_sha256):
+        return self.deployed_code.get(resource.function_name) == code_sha256
+
+    def s3_object_exists(self, bucket, key):
+        return (bucket, key) in self.known_resources
+
 
 class BasePlannerTests(object):
     def setup_method(self):
         self.osutils = mock.Mock(spec=OSUtils)
+        self.osutils.open.side_effect = (
+            lambda filename, mode: io.BytesIO(b'zip contents'))
         self.remote_state = InMemoryRemoteState()
         self.last_plan = None
 
@@ -540,7 +554,8 @@ class TestPlanLambdaFunction(BasePlannerTests):
             params={
                 'layer_name': 'bar',
                 'zip_contents': mock.ANY,
-                'runtime': 'python2.7'})
+                'runtime': 'python2.7',
+                'architecture': 'x86_64'})
         ]
         self.assert_apicall_equals(plan[0], expected[0])
         assert list(self.last_plan.messages.values()) == [
@@ -571,7 +586,8 @@ class TestPlanLambdaFunction(BasePlannerTests):
                 params={
                     'layer_name': 'bar',
                     'zip_contents': mock.ANY,
-                    'runtime': 'python2.7'}),
+                    'runtime': 'python2.7',
+                    'architecture': 'x86_64'}),
             models.RecordResourceVariable(
                 resource_type='lambda_layer',
                 resource_name='layer',
@@ -606,6 +622,7 @@ class TestPlanLambdaFunction(BasePlannerTests):
                 'security_group_ids': [],
                 'subnet_ids': [],
                 'layers': [],
+                'architecture': 'x86_64',
             },
         ),
             models.APICall(
@@ -640,7 +657,8 @@ class TestPlanLambdaFunction(BasePlannerTests):
             params={
                 'layer_name': 'bar',
                 'zip_contents': mock.ANY,
-                'runtime': 'python2.7'}
+                'runtime': 'python2.7',
+                'architecture': 'x86_64'}
         ),
             models.APICall(
             method_name='create_function',
@@ -657,7 +675,8 @@ class TestPlanLambdaFunction(BasePlannerTests):
                 'memory_size': 128,
                 'security_group_ids': [],
                 'subnet_ids': [],
-                'layers': [Variable('layer_version_arn')] + layers
+                'layers': [Variable('layer_version_arn')] + layers,
+                'architecture': 'x86_64',
             },
         ),
             models.APICall(
@@ -693,6 +712,7 @@ class TestPlanLambdaFunction(BasePlannerTests):
             'security_group_ids': [],
             'subnet_ids': [],
             'layers': [],
+            'architecture': 'x86_64',
         }
         expected_params = dict(memory_size=256, **existing_params)
         expected = [models.APICall(
@@ -758,6 +778,7 @@ class TestPlanLambdaFunction(BasePlannerTests):
                 'security_group_ids': [],
                 'subnet_ids': [],
                 'layers': [],
+                'architecture': 'x86_64',
             },
         ),
             models.APICall(
@@ -780,6 +801,64 @@ class TestPlanLambdaFunction(BasePlannerTests):
             ' appname-dev-function_name\n',
         ]
 
+    def test_can_create_function_for_arm64(self):
+        function = create_function_resource('function_name')
+        function.architecture = 'arm64'
+        self.remote_state.declare_no_resources_exists()
+        plan = self.determine_plan(function)
+        assert plan[0].method_name == 'create_function'
+        assert plan[0].params['architecture'] == 'arm64'
+
+    def test_can_update_function_architecture(self):
+        function = create_function_resource('function_name')
+        self.remote_state.declare_resource_exists(replace(function))
+        function.architecture = 'arm64'
+        plan = self.determine_plan(function)
+        assert plan[0].method_name == 'update_function'
+        assert plan[0].params['architecture'] == 'arm64'
+
+    def test_skips_code_upload_when_code_is_current(self):
+        function = create_function_resource('function_name')
+        self.remote_state.declare_resource_exists(replace(function))
+        # base64(sha256(b'zip contents'))
+        self.remote_state.deployed_code[function.function_name] = (
+            'd7OOKKNrsd15hk8tLFjYZ7J0XN2cEq3QM+f9M9oA9pg=')
+        plan = self.determine_plan(function)
+        assert plan[0].method_name == 'update_function'
+        assert 'zip_contents' not in plan[0].params
+        assert not self.osutils.get_file_contents.called
+
+    def test_uploads_code_when_code_has_changed(self):
+        function = create_function_resource('function_name')
+        self.remote_state.declare_resource_exists(replace(function))
+        self.osutils.get_file_contents.return_value = b'zip contents'
+        self.remote_state.deployed_code[function.function_name] = (
+            'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=')
+        plan = self.determine_plan(function)
+        assert plan[0].params['zip_contents'] == b'zip contents'
+
+    def test_can_create_function_from_deployment_bucket(self):
+        function = create_function_resource('function_name')
+        function.deployment_package.bucket = 'mybucket'
+        plan = self.determine_plan(function)
+        assert plan[0].method_name == 'create_function'
+        params = plan[0].params
+        assert params['zip_contents'] is None
+        assert params['s3_bucket'] == 'mybucket'
+        assert params['s3_key'] == (
+            'deployment-packages/77b38e28a36bb1dd79864f2d2c58d867'
+            'b2745cdd9c12add033e7fd33da00f698.zip')
+        assert not self.osutils.get_file_contents.called
+
+    def test_can_update_function_from_deployment_bucket(self):
+        function = create_function_resource('function_name')
+        function.deployment_package.bucket = 'mybucket'
+        self.remote_state.declare_resource_exists(replace(function))
+        plan = self.determine_plan(function)
+        assert plan[0].method_name == 'update_function'
+        assert plan[0].params['s3_bucket'] == 'mybucket'
+        assert plan[0].params['s3_key'].startswith('deployment-packages/')
+
     def test_can_set_variables_when_needed(self):
         function = create_function_resource('function_name')
         self.remote_state.declare_no_resources_exists()
@@ -800,6 +879,102 @@ class TestPlanLambdaFunction(BasePlannerTests):
         assert role_arn.name == 'myrole-dev_role_arn'
 
 
+class TestPlanDeploymentPackage(BasePlannerTests):
+    KEY = ('deployment-packages/77b38e28a36bb1dd79864f2d2c58d867'
+           'b2745cdd9c12add033e7fd33da00f698.zip')
+
+    def test_no_upload_without_deployment_bucket(self):
+        package = models.DeploymentPackage(filename='foo.zip')
+        assert self.determine_plan(package) == []
+
+    def test_can_upload_deployment_package(self):
+        package = models.DeploymentPackage(
+            filename='foo.zip', bucket='mybucket')
+        plan = self.determine_plan(package)
+        self.assert_apicall_equals(plan[0], models.APICall(
+            method_name='upload_deployment_package',
+            params={'bucket': 'mybucket',
+                    'key': self.KEY,
+                    'filename': 'foo.zip'},
+        ))
+        assert list(self.last_plan.messages.values()) == [
+            'Uploading deployment package: s3://mybucket/%s\n' % self.KEY,
+        ]
+
+    def test_skips_upload_when_package_exists(self):
+        package = models.DeploymentPackage(
+            filename='foo.zip', bucket='mybucket')
+        self.remote_state.known_resources[('mybucket', self.KEY)] = package
+        assert self.determine_plan(package) == []
+
+    def test_can_publish_layer_from_deployment_bucket(self):
+        layer = models.LambdaLayer(
+            resource_name='layer',
+            layer_name='bar',
+            runtime='python2.7',
+            deployment_package=models.DeploymentPackage(
+                filename='foo.zip', bucket='mybucket')
+        )
+        plan = self.determine_plan(layer)
+        self.assert_apicall_equals(plan[0], models.APICall(
+            method_name='publish_layer',
+            params={
+                'layer_name': 'bar',
+                'zip_contents': None,
+                's3_bucket': 'mybucket',
+                's3_key': self.KEY,
+                'runtime': 'python2.7',
+                'architecture': 'x86_64'},
+        ))
+
+    def test_function_waits_for_package_upload(self):
+        package = models.DeploymentPackage(
+            filename='foo.zip', bucket='mybucket')
+        function = create_function_resource('function_name')
+        function.deployment_package = package
+        planner = PlanStage(self.remote_state, self.osutils)
+        plan = planner.execute([package, function]).instructions
+        assert plan[0].method_name == 'upload_deployment_package'
+        assert plan[1].method_name == 'create_function'
+        assert plan[1].params['s3_key'] == Variable(plan[0].output_var)
+
+
+class TestPlanGroups(BasePlannerTests):
+    def create_bucket_event(self, name, bucket):
+        return models.S3BucketNotification(
+            resource_name='%s-s3event' % name,
+            bucket=bucket,
+            events=['s3:ObjectCreated:*'],
+            prefix=None,
+            suffix=None,
+            lambda_function=create_function_resource(name),
+        )
+
+    def test_each_resource_is_planned_in_its_own_group(self):
+        first = create_function_resource('first')
+        second = create_function_resource('second')
+        planner = PlanStage(self.remote_state, self.osutils)
+        plan = planner.execute([first, second])
+        groups = [plan.groups[id(i)] for i in plan.instructions]
+        assert len(set(groups)) == 2
+        first_count = groups.count(groups[0])
+        assert groups[:first_count] == [groups[0]] * first_count
+
+    def test_notifications_for_same_bucket_share_a_group(self):
+        planner = PlanStage(self.remote_state, self.osutils)
+        plan = planner.execute([
+            self.create_bucket_event('first', 'mybucket'),
+            self.create_bucket_event('second', 'mybucket'),
+            self.create_bucket_event('third', 'otherbucket'),
+        ])
+        groups = [plan.groups[id(i)] for i in plan.instructions]
+        # Each event is planned with the same number of instructions.
+        count = len(groups) // 3
+        assert set(groups[:count * 2]) == {groups[0]}
+        assert set(groups[count * 2:]) == {groups[-1]}
+        assert groups[0] != groups[-1]
+
+
 class TestPlanS3Events(BasePlannerTests):
     def test_can_plan_s3_event(self):
         function = create_function_resource('function_name')
@@ -2305,6 +2480,102 @@ class TestRemoteState(object):
         self.client.lambda_function_exists.assert_called_with(
             function.function_name)
 
+    def test_lambda_code_is_current(self):
+        function = create_function_resource('function-name')
+        self.client.get_function_configuration.return_value = {
+            'CodeSha256': 'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=',
+            'Architectures': ['x86_64'],
+        }
+        assert self.remote_state.lambda_code_is_current(
+            function, 'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=')
+        assert not self.remote_state.lambda_code_is_current(
+            function, 'd7OOKKNrsd15hk8tLFjYZ7J0XN2cEq3QM+f9M9oA9pg=')
+        self.client.get_function_configuration.assert_called_with(
+            function.function_name)
+
+    def test_lambda_code_is_not_current_for_new_architecture(self):
+        function = create_function_resource('function-name')
+        function.architecture = 'arm64'
+        self.client.get_function_configuration.return_value = {
+            'CodeSha256': 'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=',
+        }
+        assert not self.remote_state.lambda_code_is_current(
+            function, 'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=')
+
+    def test_prefetch_caches_resource_state(self):
+        function = create_function_resource('function-name')
+        role = models.ManagedIAMRole('my_role',
+                                     role_name='app-dev', trust_policy={},
+                                     policy=None)
+        domain_name = self.create_domain_name()
+        self.client.lambda_function_exists.return_value = True
+        self.client.get_function_configuration.return_value = {
+            'CodeSha256': 'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=',
+            'Architectures': ['x86_64'],
+        }
+        self.client.get_role_arn_for_name.side_effect = \
+            ResourceDoesNotExistError()
+        self.client.domain_name_exists.return_value = True
+        self.client.api_mapping_exists.return_value = False
+        self.remote_state.prefetch(
+            [function, role, domain_name, domain_name.api_mapping])
+        self.client.reset_mock(return_value=False, side_effect=True)
+
+        assert self.remote_state.resource_exists(function)
+        assert self.remote_state.lambda_code_is_current(
+            function, 'VpTQii5T/8rgwxA+Wtb2B2q9lg6x+KVldwQLwQKPcCs=')
+        assert not self.remote_state.resource_exists(role)
+        assert self.remote_state.resource_exists(domain_name)
+        assert not self.remote_state.resource_exists(
+            domain_name.api_mapping, 'example.com')
+        assert self.client.method_calls == []
+
+    def test_prefetch_skips_configuration_of_missing_function(self):
+        function = create_function_resource('function-name')
+        self.client.lambda_function_exists.return_value = False
+        self.remote_state.prefetch([function])
+        assert not self.remote_state.resource_exists(function)
+        assert not self.client.get_function_configuration.called
+
+    def test_prefetch_looks_up_resources_concurrently(self):
+        roles = [
+            models.ManagedIAMRole('role%s' % i, role_name='role%s' % i,
+                                  trust_policy={}, policy=None)
+            for i in range(3)
+        ]
+        barrier = threading.Barrier(len(roles), timeout=5)
+
+        def get_role_arn_for_name(name):
+            barrier.wait()
+            return 'arn:%s' % name
+
+        self.client.get_role_arn_for_name.side_effect = get_role_arn_for_name
+        self.remote_state.prefetch(roles)
+        assert all(self.remote_state.resource_exists(r) for r in roles)
+
+    def test_prefetch_raises_errors_in_resource_order(self):
+        functions = [create_function_resource('first'),
+                     create_function_resource('second')]
+        release_first = threading.Event()
+
+        def lambda_function_exists(name):
+            if name == 'first':
+                release_first.wait(5)
+            else:
+                release_first.set()
+            raise RuntimeError(name)
+
+        self.client.lambda_function_exists.side_effect = \
+            lambda_function_exists
+        with pytest.raises(RuntimeError, match='first'):
+            self.remote_state.prefetch(functions)
+
+    def test_s3_object_exists_is_cached(self):
+        self.client.s3_object_exists.return_value = True
+        assert self.remote_state.s3_object_exists('bucket', 'key')
+        assert self.remote_state.s3_object_exists('bucket', 'key')
+        self.client.s3_object_exists.assert_called_once_with('bucket', 'key')
+
     def test_api_gateway_domain_name_exists(self):
         domain_name = self.create_domain_name()
         self.client.domain_name_exists.return_value = True
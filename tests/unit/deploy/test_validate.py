@@ -14,6 +14,8 @@ from chalice.deploy.validate import validate_route_content_types
 from chalice.deploy.validate import validate_unique_function_names
 from chalice.deploy.validate import validate_feature_flags
 from chalice.deploy.validate import validate_endpoint_type
+from chalice.deploy.validate import validate_project_hash_algorithm
+from chalice.deploy.validate import validate_architecture
 from chalice.deploy.validate import validate_resource_policy
 from chalice.deploy.validate import ExperimentalFeatureError
 
@@ -281,6 +283,26 @@ def test_can_validate_endpoint_type(sample_app):
     validate_endpoint_type(config)
 
 
+def test_can_validate_project_hash_algorithm(sample_app):
+    config = Config.create(
+        chalice_app=sample_app, project_hash_algorithm='sha1')
+    with pytest.raises(ValueError):
+        validate_project_hash_algorithm(config)
+
+    config = Config.create(
+        chalice_app=sample_app, project_hash_algorithm='blake2b')
+    validate_project_hash_algorithm(config)
+
+
+def test_can_validate_architecture(sample_app):
+    config = Config.create(chalice_app=sample_app, architecture='arm')
+    with pytest.raises(ValueError):
+        validate_architecture(config)
+
+    config = Config.create(chalice_app=sample_app, architecture='arm64')
+    validate_architecture(config)
+
+
 def test_can_validate_feature_flags(sample_app):
     # The _features_used is marked internal because we don't want
     # chalice users to access it, but this attribute is intended to be
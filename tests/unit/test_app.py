@@ -4,9 +4,12 @@ import logging
 import json
 import gzip
 import inspect
+import subprocess
 import collections
+import decimal
 from copy import deepcopy
 from datetime import datetime
+from unittest import mock
 
 import pytest
 from pytest import fixture
@@ -588,6 +591,56 @@ def test_error_contains_cors_headers(sample_app_with_cors, create_event):
     assert 'Access-Control-Allow-Origin' in raw_response['headers']
 
 
+def test_error_cors_headers_not_shared_with_route(sample_app_with_cors,
+                                                  create_event):
+    event = create_event('/image', 'POST', {'not': 'image'})
+    raw_response = sample_app_with_cors(event, context=None)
+    raw_response['headers']['Access-Control-Allow-Origin'] = 'changed'
+    route_entry = sample_app_with_cors.routes['/image']['POST']
+    assert route_entry.cors_headers['Access-Control-Allow-Origin'] != \
+        'changed'
+    raw_response = sample_app_with_cors(event, context=None)
+    assert raw_response['headers']['Access-Control-Allow-Origin'] != \
+        'changed'
+
+
+def test_route_entry_precomputes_dispatch_metadata():
+    entry = app.RouteEntry(
+        lambda: {}, 'view-name', '/', method='GET',
+        content_types=['Application/JSON', 'text/plain'],
+        cors=app.CORSConfig(allow_origin='https://foo.bar', max_age=600))
+    assert entry.lowercase_content_types == [
+        'application/json', 'text/plain']
+    assert entry.cors_headers == entry.cors.get_access_control_headers()
+    assert entry.cors_headers['Access-Control-Max-Age'] == '600'
+
+
+def test_route_entry_without_cors_has_no_cors_headers():
+    entry = app.RouteEntry(lambda: {}, 'view-name', '/', method='GET')
+    assert entry.cors_headers is None
+
+
+def test_allowed_methods_reflect_routes_added_later(create_event):
+    demo = app.Chalice('app-name')
+
+    @demo.route('/index', methods=['GET'])
+    def index_view():
+        return {}
+
+    event = create_event('/index', 'POST', {})
+    response = demo(event, context=None)
+    assert response['statusCode'] == 405
+    assert response['headers']['Allow'] == 'GET'
+
+    @demo.route('/index', methods=['PUT'])
+    def put_view():
+        return {}
+
+    response = demo(event, context=None)
+    assert response['statusCode'] == 405
+    assert response['headers']['Allow'] == 'GET, PUT'
+
+
 class TestDefaultCORS(object):
     def test_cors_enabled(self, sample_app_with_default_cors, create_event):
         event = create_event('/on', 'POST', {'not': 'image'})
@@ -786,6 +839,69 @@ def test_json_body_available_with_lowercase_content_type_key(
     assert raw_body == '{"foo": "bar"}'
 
 
+def test_default_json_codec_matches_stdlib_json():
+    body = {'a': [1, 2.5, 'three', None], 'b': {'nested': True},
+            'unicode': '\u2713', 'decimal': decimal.Decimal('1.5')}
+    response = app.Response(body=body)
+    assert response.to_dict()['body'] == json.dumps(
+        body, separators=(',', ':'), default=app.handle_extra_types)
+
+
+def test_can_configure_custom_json_codec(create_event_with_body):
+    demo = app.Chalice('demo-app')
+    calls = []
+
+    def loads(data):
+        calls.append('loads')
+        return json.loads(data)
+
+    def dumps(obj):
+        calls.append('dumps')
+        return json.dumps(obj, sort_keys=True, indent=1)
+
+    demo.api.json_codec = app.CallableJSONCodec(loads=loads, dumps=dumps)
+
+    @demo.route('/', methods=['POST'])
+    def index():
+        return {'b': demo.current_request.json_body, 'a': 1}
+
+    event = create_event_with_body({'foo': 'bar'})
+    response = demo(event, context=None)
+    assert response['body'] == '{\n "a": 1,\n "b": {\n  "foo": "bar"\n }\n}'
+    assert calls == ['loads', 'dumps']
+
+
+@pytest.mark.parametrize('codec_name', ['OrjsonCodec', 'UjsonCodec'])
+def test_optional_json_codecs_round_trip(codec_name,
+                                         create_event_with_body):
+    pytest.importorskip(codec_name[:-len('Codec')].lower())
+    demo = app.Chalice('demo-app')
+    demo.api.json_codec = getattr(app, codec_name)()
+
+    @demo.route('/', methods=['POST'])
+    def index():
+        body = demo.current_request.json_body
+        body['decimal'] = decimal.Decimal('1.5')
+        body['params'] = app.MultiDict({'a': ['1', '2']})
+        return body
+
+    event = create_event_with_body({'foo': 'bar/baz', 'list': [1, 2]})
+    response = demo(event, context=None)
+    assert json.loads(response['body']) == {
+        'foo': 'bar/baz', 'list': [1, 2], 'decimal': 1.5,
+        'params': {'a': '2'},
+    }
+
+
+def test_fastest_json_codec_falls_back_to_stdlib():
+    with mock.patch.object(app.OrjsonCodec, '__init__',
+                           side_effect=ImportError()):
+        with mock.patch.object(app.UjsonCodec, '__init__',
+                               side_effect=ImportError()):
+            codec = app.fastest_json_codec()
+    assert type(codec) is app.JSONCodec
+
+
 def test_content_types_must_be_lists():
     demo = app.Chalice('app-name')
 
@@ -1042,6 +1158,62 @@ def test_chalice_view_errors_propagate_in_debug_mode(sample_app, create_event):
     assert json_response_body(raw_response)['Code'] == 'NotFoundError'
 
 
+def test_can_return_generator_body(create_event):
+    demo = app.Chalice('app-name')
+
+    @demo.route('/index')
+    def index_view():
+        def _generate():
+            yield 'a,b\n'
+            yield '1,2\n'
+        return Response(body=_generate(),
+                        headers={'Content-Type': 'text/csv'})
+
+    event = create_event('/index', 'GET', {})
+    response = demo(event, context=None)
+    assert response['statusCode'] == 200
+    assert response['body'] == 'a,b\n1,2\n'
+
+
+def test_generator_body_with_bytes_is_joined_as_bytes():
+    response = Response(body=iter([b'abc', 'def']),
+                        headers={'Content-Type': 'application/octet-stream'})
+    serialized = response.to_dict(['application/octet-stream'])
+    assert serialized['isBase64Encoded']
+    assert base64.b64decode(serialized['body']) == b'abcdef'
+
+
+def test_response_can_leave_generator_body_for_streaming():
+    body = iter(['abc', 'def'])
+    response = Response(body=body,
+                        headers={'Content-Type': 'application/octet-stream'})
+    serialized = response.to_dict(['application/octet-stream'],
+                                  stream_body=True)
+    assert serialized['body'] is body
+    assert 'isBase64Encoded' not in serialized
+
+
+def test_errors_raised_from_generator_body_are_handled(create_event):
+    demo = app.Chalice('app-name')
+
+    @demo.route('/notfound')
+    def notfound():
+        yield 'partial'
+        raise NotFoundError('not found')
+
+    @demo.route('/error')
+    def error():
+        yield 'partial'
+        raise ValueError('error')
+
+    response = demo(create_event('/notfound', 'GET', {}), context=None)
+    assert response['statusCode'] == 404
+    assert json_response_body(response)['Code'] == 'NotFoundError'
+    response = demo(create_event('/error', 'GET', {}), context=None)
+    assert response['statusCode'] == 500
+    assert json_response_body(response)['Code'] == 'InternalServerError'
+
+
 def test_case_insensitive_mapping():
     mapping = app.CaseInsensitiveMapping({'HEADER': 'Value'})
 
@@ -1051,6 +1223,68 @@ def test_case_insensitive_mapping():
     assert repr({'header': 'Value'}) in repr(mapping)
 
 
+def test_case_insensitive_mapping_is_lazy():
+    mapping = app.CaseInsensitiveMapping({'HEADER': 'Value'})
+    assert mapping._lowercase_dict is None
+    assert dict(mapping) == {'header': 'Value'}
+    assert mapping._lowercase_dict == {'header': 'Value'}
+
+
+def test_case_insensitive_mapping_is_a_snapshot():
+    original = {'HEADER': 'Value'}
+    mapping = app.CaseInsensitiveMapping(original)
+    original['Other'] = 'Value2'
+    assert dict(mapping) == {'header': 'Value'}
+    assert len(mapping) == 1
+
+
+def test_mappings_use_slots():
+    assert not hasattr(app.MultiDict({}), '__dict__')
+    assert not hasattr(app.CaseInsensitiveMapping({}), '__dict__')
+
+
+def test_request_headers_and_query_params_are_lazy(create_event):
+    event = create_event('/', 'GET', {})
+    event['multiValueQueryStringParameters'] = {'key': ['val1', 'val2']}
+    request = app.Request(event)
+    assert request._headers is None
+    assert request.query_params.getlist('key') == ['val1', 'val2']
+    assert request.headers['content-type'] == 'application/json'
+    assert request.query_params is request.query_params
+    assert request.headers is request.headers
+
+
+def test_can_set_arbitrary_attributes_on_request(create_event):
+    request = app.Request(create_event('/', 'GET', {}))
+    request.user = 'user-id'
+    assert request.user == 'user-id'
+    assert request.to_dict()['user'] == 'user-id'
+
+
+def test_request_attributes_can_be_reassigned(create_event):
+    event = create_event('/', 'GET', {})
+    event['multiValueQueryStringParameters'] = {'key': ['val1']}
+    request = app.Request(event)
+    request.query_params = None
+    request.headers = app.CaseInsensitiveMapping({'Foo': 'bar'})
+    assert request.query_params is None
+    assert request.to_dict()['headers'] == {'foo': 'bar'}
+
+
+def test_request_to_dict_has_public_attributes(create_event):
+    event = create_event('/', 'GET', {'name': 'value'})
+    request = app.Request(event, FakeLambdaContext())
+    assert request.to_dict() == {
+        'query_params': None,
+        'headers': {'content-type': 'application/json'},
+        'uri_params': {'name': 'value'},
+        'method': 'GET',
+        'context': event['requestContext'],
+        'stage_vars': {},
+        'path': '/',
+    }
+
+
 def test_unknown_kwargs_raise_error(sample_app, create_event):
     with pytest.raises(TypeError):
         @sample_app.route('/foo', unknown_kwargs='foo')
@@ -3745,3 +3979,131 @@ class TestMiddleware:
             {'name': 'wrapped', 'event': {'input-event': True}},
             {'name': 'myfunction', 'event': {'input-event': True}},
         ]
+
+    def test_rest_api_middleware_chain_is_reused(self):
+        demo = app.Chalice('app-name')
+
+        @demo.middleware('http')
+        def mymiddleware(event, get_response):
+            return get_response(event)
+
+        @demo.route('/')
+        def index():
+            return {'index': True}
+
+        with Client(demo) as c:
+            c.http.get('/')
+            handler = demo._rest_api_handler
+            response = c.http.get('/')
+            assert response.json_body == {'index': True}
+            assert demo._rest_api_handler is handler
+
+    def test_rest_api_picks_up_middleware_registered_later(self):
+        demo = app.Chalice('app-name')
+        called = []
+
+        @demo.route('/')
+        def index():
+            return {'index': True}
+
+        with Client(demo) as c:
+            c.http.get('/')
+
+            @demo.middleware('http')
+            def mymiddleware(event, get_response):
+                called.append('mymiddleware')
+                return get_response(event)
+
+            response = c.http.get('/')
+
+        assert response.json_body == {'index': True}
+        assert called == ['mymiddleware']
+
+    def test_rest_api_picks_up_routes_and_debug_changes(self):
+        demo = app.Chalice('app-name')
+
+        @demo.route('/')
+        def index():
+            return {'index': True}
+
+        with Client(demo) as c:
+            c.http.get('/')
+
+        @demo.route('/error')
+        def error():
+            raise Exception("Error from view.")
+
+        with Client(demo) as c:
+            assert c.http.get('/error').json_body['Code'] == \
+                'InternalServerError'
+            demo.debug = True
+            response = c.http.get('/error')
+            assert response.headers['Content-Type'] == 'text/plain'
+            assert b'Error from view.' in response.body
+
+
+def test_import_does_not_load_lazy_runtime_modules():
+    script = (
+        'import json, sys\n'
+        'before = set(sys.modules)\n'
+        'import chalice.app\n'
+        'print(json.dumps(sorted(set(sys.modules) - before)))\n'
+    )
+    output = subprocess.check_output([sys.executable, '-c', script])
+    imported = set(json.loads(output))
+    for module_name in ['chalice._authorizer', 'chalice._events',
+                        'chalice._websocket', 'base64', 'decimal',
+                        'datetime']:
+        assert module_name not in imported
+
+
+@pytest.mark.parametrize('name,module_name', [
+    ('S3Event', 'chalice._events'),
+    ('SQSRecord', 'chalice._events'),
+    ('WebsocketEvent', 'chalice._events'),
+    ('WebsocketAPI', 'chalice._websocket'),
+    ('WebsocketEventSourceHandler', 'chalice._websocket'),
+    ('AuthResponse', 'chalice._authorizer'),
+    ('ChaliceAuthorizer', 'chalice._authorizer'),
+])
+def test_lazy_attributes_are_importable_from_app(name, module_name):
+    value = getattr(app, name)
+    assert value is getattr(sys.modules[module_name], name)
+    assert name in dir(app)
+
+
+def test_lazy_attributes_are_importable_from_chalice():
+    from chalice import AuthResponse, AuthRoute
+    assert AuthResponse is app.AuthResponse
+    assert AuthRoute is app.AuthRoute
+
+
+def test_unknown_attribute_raises_attribute_error():
+    with pytest.raises(AttributeError):
+        app.NotARealEvent
+    import chalice
+    with pytest.raises(AttributeError):
+        chalice.NotARealEvent
+
+
+def test_websocket_api_created_on_first_use():
+    demo = app.Chalice('app-name')
+    assert isinstance(demo.websocket_api, WebsocketAPI)
+    assert demo.websocket_api is demo.websocket_api
+    websocket_api = WebsocketAPI(env={})
+    demo.websocket_api = websocket_api
+    assert demo.websocket_api is websocket_api
+
+
+def test_event_handlers_use_lazy_event_classes():
+    demo = app.Chalice('app-name')
+
+    @demo.on_sns_message(topic='mytopic')
+    def handler(event):
+        return event
+
+    event = handler({'Records': [{'Sns': {
+        'Message': 'hello', 'Subject': '', 'MessageAttributes': {}}}]},
+        context=None)
+    assert isinstance(event, app.SNSEvent)
+    assert event.message == 'hello'
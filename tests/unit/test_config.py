@@ -309,6 +309,97 @@ def test_new_scope_config_is_separate_copy():
     assert new_config.function_name == 'bar'
 
 
+def test_store_compressed_files_defaults_to_false():
+    c = Config.create()
+    assert not c.store_compressed_files
+
+
+def test_store_compressed_files_from_stage_level():
+    config_from_disk = {
+        'store_compressed_files': False,
+        'stages': {'prod': {'store_compressed_files': True}},
+    }
+    prod = Config('prod', config_from_disk=config_from_disk)
+    dev = Config('dev', config_from_disk=config_from_disk)
+    assert prod.store_compressed_files
+    assert not dev.store_compressed_files
+
+
+def test_project_hash_algorithm_defaults_to_md5():
+    c = Config.create()
+    assert c.project_hash_algorithm == 'md5'
+
+
+def test_project_hash_algorithm_from_stage_level():
+    config_from_disk = {
+        'stages': {'prod': {'project_hash_algorithm': 'blake2b'}},
+    }
+    prod = Config('prod', config_from_disk=config_from_disk)
+    dev = Config('dev', config_from_disk=config_from_disk)
+    assert prod.project_hash_algorithm == 'blake2b'
+    assert dev.project_hash_algorithm == 'md5'
+
+
+def test_architecture_defaults_to_x86_64():
+    c = Config.create()
+    assert c.architecture == 'x86_64'
+
+
+def test_architecture_from_stage_level():
+    config_from_disk = {
+        'stages': {'prod': {'architecture': 'arm64'}},
+    }
+    prod = Config('prod', config_from_disk=config_from_disk)
+    dev = Config('dev', config_from_disk=config_from_disk)
+    assert prod.architecture == 'arm64'
+    assert dev.architecture == 'x86_64'
+
+
+def test_deployment_bucket_from_stage_level():
+    config_from_disk = {
+        'stages': {'prod': {'deployment_bucket': 'mybucket'}},
+    }
+    prod = Config('prod', config_from_disk=config_from_disk)
+    dev = Config('dev', config_from_disk=config_from_disk)
+    assert prod.deployment_bucket == 'mybucket'
+    assert dev.deployment_bucket is None
+
+
+def test_precompile_bytecode_from_stage_level():
+    config_from_disk = {
+        'stages': {'prod': {'precompile_bytecode': True}},
+    }
+    prod = Config('prod', config_from_disk=config_from_disk)
+    dev = Config('dev', config_from_disk=config_from_disk)
+    assert prod.precompile_bytecode
+    assert not dev.precompile_bytecode
+
+
+def test_slim_package_defaults():
+    c = Config.create()
+    assert not c.slim_package
+    assert c.slim_package_exclude == []
+    assert c.slim_package_keep == []
+
+
+def test_slim_package_from_stage_level():
+    config_from_disk = {
+        'slim_package_keep': ['numpy'],
+        'stages': {
+            'prod': {
+                'slim_package': True,
+                'slim_package_exclude': ['*.pyi'],
+            },
+        },
+    }
+    prod = Config('prod', config_from_disk=config_from_disk)
+    dev = Config('dev', config_from_disk=config_from_disk)
+    assert prod.slim_package
+    assert prod.slim_package_exclude == ['*.pyi']
+    assert prod.slim_package_keep == ['numpy']
+    assert not dev.slim_package
+
+
 def test_environment_from_top_level():
     config_from_disk = {'environment_variables': {"foo": "bar"}}
     c = Config('dev', config_from_disk=config_from_disk)
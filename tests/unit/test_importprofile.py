@@ -0,0 +1,109 @@
+import pytest
+
+from chalice.importprofile import ImportProfile
+from chalice.importprofile import ImportRecord
+from chalice.importprofile import parse_importtime
+from chalice.importprofile import format_import_tree
+
+
+IMPORTTIME_OUTPUT = '\n'.join([
+    'import time: self [us] | cumulative | imported package',
+    'import time:       100 |        100 |       chalice.compat',
+    'import time:      2000 |       2100 |     chalice.app',
+    'import time:        50 |       2150 |   chalice',
+    'import time:       300 |        300 |     yaml.error',
+    'import time:       400 |        700 |   yaml',
+    'import time:        10 |       2860 | app',
+])
+
+
+@pytest.fixture
+def profile():
+    return ImportProfile(roots=parse_importtime(IMPORTTIME_OUTPUT))
+
+
+def test_can_parse_importtime_output(profile):
+    assert profile.roots == [
+        ImportRecord('app', 10, 2860, [
+            ImportRecord('chalice', 50, 2150, [
+                ImportRecord('chalice.app', 2000, 2100, [
+                    ImportRecord('chalice.compat', 100, 100),
+                ]),
+            ]),
+            ImportRecord('yaml', 400, 700, [
+                ImportRecord('yaml.error', 300, 300),
+            ]),
+        ]),
+    ]
+    assert profile.total_us == 2860
+
+
+def test_parse_ignores_other_output():
+    output = 'Traceback (most recent call last):\nValueError: bad\n'
+    assert parse_importtime(output) == []
+
+
+def test_format_tree_sorts_by_cumulative_time(profile):
+    assert format_import_tree(profile) == (
+        'Total import time: 2.86 ms\n'
+        '\n'
+        'cumulative (ms)  self (ms)  module\n'
+        '           2.86       0.01  app\n'
+        '           2.15       0.05    chalice\n'
+        '           2.10       2.00      chalice.app\n'
+        '           0.10       0.10        chalice.compat\n'
+        '           0.70       0.40    yaml\n'
+        '           0.30       0.30      yaml.error\n'
+    )
+
+
+def test_format_tree_leaves_out_fast_imports(profile):
+    tree = format_import_tree(profile, min_time_us=500)
+    assert 'chalice.app' in tree
+    assert 'yaml\n' in tree
+    assert 'chalice.compat' not in tree
+    assert 'yaml.error' not in tree
+
+
+def test_can_convert_to_json(profile):
+    data = profile.to_json()
+    assert data['total_us'] == 2860
+    assert data['imports'][0]['name'] == 'app'
+    assert data['imports'][0]['children'][1] == {
+        'name': 'yaml',
+        'self_us': 400,
+        'cumulative_us': 700,
+        'children': [{
+            'name': 'yaml.error',
+            'self_us': 300,
+            'cumulative_us': 300,
+            'children': [],
+        }],
+    }
+
+
+def test_can_convert_to_speedscope(profile):
+    data = profile.to_speedscope()
+    frames = [frame['name'] for frame in data['shared']['frames']]
+    assert frames == ['app', 'chalice', 'chalice.app', 'chalice.compat',
+                      'yaml', 'yaml.error']
+    speedscope_profile = data['profiles'][0]
+    assert speedscope_profile['type'] == 'evented'
+    assert speedscope_profile['unit'] == 'microseconds'
+    assert speedscope_profile['endValue'] == 2860
+    events = [(e['type'], frames[e['frame']], e['at'])
+              for e in speedscope_profile['events']]
+    assert events == [
+        ('O', 'app', 0),
+        ('O', 'chalice', 0),
+        ('O', 'chalice.app', 0),
+        ('O', 'chalice.compat', 0),
+        ('C', 'chalice.compat', 100),
+        ('C', 'chalice.app', 2100),
+        ('C', 'chalice', 2150),
+        ('O', 'yaml', 2150),
+        ('O', 'yaml.error', 2150),
+        ('C', 'yaml.error', 2450),
+        ('C', 'yaml', 2850),
+        ('C', 'app', 2860),
+    ]
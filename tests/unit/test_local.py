@@ -1,5 +1,6 @@
 import re
 import json
+import socket
 import decimal
 from unittest import mock
 
@@ -22,6 +23,10 @@ from chalice.local import NotAuthorizedError
 from chalice.local import ForbiddenError
 from chalice.local import InvalidAuthorizerError
 from chalice.local import LocalDevServer
+from chalice.local import LocalServerOptions
+from chalice.local import AsyncioHTTPServer
+from chalice.local import PooledHTTPServer
+from chalice.local import RequestStats
 
 
 AWS_REQUEST_ID_PATTERN = re.compile(
@@ -583,6 +588,136 @@ def test_multi_value_header(handler):
     assert 'Set-Cookie: CookieB=ValueB' in response
 
 
+@fixture
+def streaming_handler():
+    demo = local.LocalChalice('streaming-app')
+
+    @demo.route('/stream')
+    def stream():
+        def _generate():
+            yield 'first,'
+            yield b''
+            yield b'second,'
+            yield 'third'
+        return Response(body=_generate(),
+                        headers={'Content-Type': 'text/csv'})
+
+    @demo.route('/error-before-first-chunk')
+    def error_before_first_chunk():
+        def _generate():
+            raise ValueError('error')
+            yield 'unreachable'
+        return Response(body=_generate())
+
+    @demo.route('/view-error-before-first-chunk')
+    def view_error_before_first_chunk():
+        def _generate():
+            raise BadRequestError('bad request')
+            yield 'unreachable'
+        return Response(body=_generate())
+
+    @demo.route('/error-mid-stream')
+    def error_mid_stream():
+        def _generate():
+            yield 'first,'
+            raise ValueError('error')
+        return Response(body=_generate(),
+                        headers={'Content-Type': 'text/csv'})
+
+    chalice_handler = ChaliceStubbedHandler(
+        None, ('127.0.0.1', 2000), None, app_object=demo, config=Config())
+    chalice_handler.connection = mock.Mock()
+    return chalice_handler
+
+
+def test_can_stream_generator_body_with_chunked_encoding(streaming_handler):
+    set_current_request(streaming_handler, method='GET', path='/stream')
+    streaming_handler.do_GET()
+    raw_response = streaming_handler.wfile.getvalue()
+    headers, body = raw_response.split(b'\r\n\r\n', 1)
+    header_lines = headers.splitlines()
+    assert b'Transfer-Encoding: chunked' in header_lines
+    assert b'Content-Type: text/csv' in header_lines
+    assert not any(line.startswith(b'Content-Length')
+                   for line in header_lines)
+    assert body == (
+        b'6\r\nfirst,\r\n'
+        b'7\r\nsecond,\r\n'
+        b'5\r\nthird\r\n'
+        b'0\r\n\r\n'
+    )
+
+
+def test_generator_body_is_joined_for_http_10_clients(streaming_handler):
+    set_current_request(streaming_handler, method='GET', path='/stream')
+    streaming_handler.request_version = 'HTTP/1.0'
+    streaming_handler.do_GET()
+    raw_response = streaming_handler.wfile.getvalue()
+    assert b'Content-Length: 18' in raw_response.splitlines()
+    assert raw_response.endswith(b'\r\n\r\nfirst,second,third')
+
+
+def test_error_before_first_chunk_is_internal_server_error(
+        streaming_handler):
+    set_current_request(streaming_handler, method='GET',
+                        path='/error-before-first-chunk')
+    streaming_handler.do_GET()
+    raw_response = streaming_handler.wfile.getvalue()
+    assert raw_response.startswith(b'HTTP/1.1 500 ')
+    assert b'Transfer-Encoding: chunked' not in raw_response
+    assert _get_body_from_response_stream(streaming_handler)['Code'] == \
+        'InternalServerError'
+
+
+def test_view_error_before_first_chunk_is_mapped(streaming_handler):
+    set_current_request(streaming_handler, method='GET',
+                        path='/view-error-before-first-chunk')
+    streaming_handler.do_GET()
+    raw_response = streaming_handler.wfile.getvalue()
+    assert raw_response.startswith(b'HTTP/1.1 400 ')
+    assert _get_body_from_response_stream(streaming_handler) == {
+        'Code': 'BadRequestError', 'Message': 'bad request'}
+
+
+def test_error_mid_stream_closes_connection(streaming_handler):
+    set_current_request(streaming_handler, method='GET',
+                        path='/error-mid-stream')
+    with mock.patch.object(streaming_handler._app_object, 'log') as log:
+        streaming_handler.do_GET()
+    raw_response = streaming_handler.wfile.getvalue()
+    assert raw_response.startswith(b'HTTP/1.1 200 ')
+    # The response is cut off without the final chunk.
+    assert raw_response.endswith(b'\r\n\r\n6\r\nfirst,\r\n')
+    assert streaming_handler.close_connection
+    streaming_handler.connection.shutdown.assert_called_with(
+        socket.SHUT_WR)
+    assert log.error.called
+
+
+def test_error_while_joining_for_http_10_closes_connection(
+        streaming_handler):
+    set_current_request(streaming_handler, method='GET',
+                        path='/error-mid-stream')
+    streaming_handler.request_version = 'HTTP/1.0'
+    with mock.patch.object(streaming_handler._app_object, 'log'):
+        streaming_handler.do_GET()
+    assert streaming_handler.wfile.getvalue() == b''
+    streaming_handler.connection.shutdown.assert_called_with(
+        socket.SHUT_WR)
+
+
+def test_generator_body_is_joined_when_not_in_local_mode(handler):
+    @handler.sample_app.route('/stream')
+    def stream():
+        yield '{"hello": '
+        yield '"world"}'
+
+    handler.local_gateway = LocalGateway(handler.sample_app, Config())
+    set_current_request(handler, method='GET', path='/stream')
+    handler.do_GET()
+    assert _get_body_from_response_stream(handler) == {'hello': 'world'}
+
+
 @pytest.mark.parametrize('actual_url,matched_url', [
     ('/foo', '/foo'),
     ('/foo/', '/foo'),
@@ -610,6 +745,33 @@ def test_can_match_exact_route(actual_url, matched_url):
             matcher.match_route(actual_url)
 
 
+@pytest.mark.parametrize('actual_url,matched_url,captured', [
+    ('/users/1', '/users/{id}', {'id': '1'}),
+    ('/users/1/posts', '/users/{name}/posts', {'name': '1'}),
+    ('/users/me/posts', '/users/me/posts', {}),
+    ('/users/me/other', '/users/{id}/other', {'id': 'me'}),
+    ('/users/me', '/users/{id}', {'id': 'me'}),
+    ('/a/1/c', '/a/{second}/c', {'second': '1'}),
+    ('/', '/', {}),
+])
+def test_match_route_only_returns_captures_for_matched_route(
+        actual_url, matched_url, captured):
+    matcher = local.RouteMatcher([
+        '/', '/users/{id}', '/users/{name}/posts', '/users/me/posts',
+        '/users/{id}/other', '/a/{first}/b', '/a/{second}/c',
+    ])
+    result = matcher.match_route(actual_url)
+    assert result.route == matched_url
+    assert result.captured == captured
+
+
+def test_match_route_backtracks_from_literal_to_capture():
+    matcher = local.RouteMatcher(['/foo/bar/baz', '/foo/{capture}/qux'])
+    result = matcher.match_route('/foo/bar/qux')
+    assert result.route == '/foo/{capture}/qux'
+    assert result.captured == {'capture': 'bar'}
+
+
 def test_lambda_event_contains_source_ip():
     converter = local.LambdaEventConverter(
         local.RouteMatcher(['/foo/bar']))
@@ -745,6 +907,87 @@ def test_wraps_custom_sample_app_with_local_chalice(custom_sample_app):
     assert dev_server.app_object.custom_method() == 'foo'
 
 
+def test_can_create_pooled_local_server(sample_app):
+    options = LocalServerOptions(server_type='pool', pool_size=3,
+                                 listen_backlog=7, keep_alive_timeout=2.5)
+    dev_server = local.create_local_server(sample_app, None, '127.0.0.1',
+                                           port=0, options=options)
+    try:
+        assert isinstance(dev_server.server, PooledHTTPServer)
+        assert dev_server.server.pool_size == 3
+        assert dev_server.server.request_queue_size == 7
+        assert dev_server.server.keep_alive_timeout == 2.5
+        assert dev_server.stats is None
+    finally:
+        dev_server.server.server_close()
+
+
+def test_can_create_asyncio_local_server(sample_app):
+    options = LocalServerOptions(server_type='asyncio', pool_size=3,
+                                 listen_backlog=7, keep_alive_timeout=2.5)
+    dev_server = local.create_local_server(sample_app, None, '127.0.0.1',
+                                           port=0, options=options)
+    try:
+        assert isinstance(dev_server.server, AsyncioHTTPServer)
+        assert dev_server.server.pool_size == 3
+        assert dev_server.server.request_queue_size == 7
+        assert dev_server.server.keep_alive_timeout == 2.5
+        assert dev_server.server.server_port != 0
+    finally:
+        dev_server.server.server_close()
+
+
+def test_can_enable_local_server_stats(sample_app):
+    options = LocalServerOptions(stats=True)
+    dev_server = local.create_local_server(sample_app, None, '127.0.0.1',
+                                           port=0, options=options)
+    try:
+        assert isinstance(dev_server.stats, RequestStats)
+    finally:
+        dev_server.server.server_close()
+
+
+def test_error_on_unknown_server_type():
+    with pytest.raises(ValueError):
+        LocalServerOptions(server_type='unknown').get_server_cls()
+
+
+class TestRequestStats(object):
+    def test_no_summary_without_requests(self):
+        stats = RequestStats(clock=FakeTimeSource([0, 10]))
+        assert stats.summarize() is None
+
+    def test_can_summarize_requests(self):
+        stats = RequestStats(clock=FakeTimeSource([0, 10]))
+        for i in range(1, 201):
+            stats.record(i / 1000.0)
+        summary = stats.summarize()
+        assert summary.num_requests == 200
+        assert summary.requests_per_second == 20
+        assert summary.p99_latency == 0.198
+
+    def test_summary_only_includes_requests_since_last_summary(self):
+        stats = RequestStats(clock=FakeTimeSource([0, 10, 15]))
+        stats.record(1.0)
+        stats.summarize()
+        stats.record(0.5)
+        summary = stats.summarize()
+        assert summary.num_requests == 1
+        assert summary.requests_per_second == 0.2
+        assert summary.p99_latency == 0.5
+
+
+def test_handler_records_request_latency(sample_app):
+    stats = mock.Mock(spec=RequestStats)
+    handler = ChaliceStubbedHandler(
+        None, ('127.0.0.1', 2000), None, app_object=sample_app,
+        config=Config(), stats=stats)
+    set_current_request(handler, method='GET', path='/index')
+    handler.do_GET()
+    assert stats.record.call_count == 1
+    assert stats.record.call_args[0][0] >= 0
+
+
 class TestLambdaContext(object):
     def test_can_get_remaining_time_once(self, lambda_context_args):
         time_source = FakeTimeSource([0, 5])
@@ -1215,9 +1458,56 @@ class TestLocalDevServer(object):
 
         assert provided_args[0] == ('0.0.0.0', 8000)
 
+    def test_reports_stats_when_server_stops(self, sample_app, capsys):
+        http_server = mock.Mock(spec=HTTPServer)
+        stats = RequestStats()
+        stats.record(0.25)
+        dev_server = LocalDevServer(
+            sample_app, Config(), '0.0.0.0', 8000,
+            server_cls=lambda *args: http_server,
+            stats=stats,
+        )
+
+        dev_server.serve_forever()
+
+        http_server.serve_forever.assert_called_with()
+        output = capsys.readouterr().out
+        assert 'Requests: 1,' in output
+        assert 'p99 latency: 250.00 ms' in output
+
     def test_does_use_daemon_threads(self, sample_app):
         server = LocalDevServer(
             sample_app, Config(), '0.0.0.0', 8000
         )
 
         assert server.server.daemon_threads
+
+    def test_shares_single_gateway_across_handlers(self, sample_app):
+        handlers = []
+
+        def handler_cls(*args, **kwargs):
+            handler = ChaliceStubbedHandler(*args, **kwargs)
+            handlers.append(handler)
+            return handler
+
+        def server_cls(address, handler_factory):
+            for _ in range(2):
+                handler_factory(None, ('127.0.0.1', 2000), None)
+            return mock.Mock(spec=HTTPServer)
+
+        server = LocalDevServer(
+            sample_app, Config(), '0.0.0.0', 8000,
+            handler_cls=handler_cls,
+            server_cls=server_cls,
+        )
+
+        assert len(handlers) == 2
+        assert handlers[0].local_gateway is server.local_gateway
+        assert handlers[1].local_gateway is server.local_gateway
+
+
+def test_handler_creates_gateway_if_not_provided(sample_app):
+    handler = ChaliceStubbedHandler(
+        None, ('127.0.0.1', 2000), None, app_object=sample_app,
+        config=Config())
+    assert isinstance(handler.local_gateway, LocalGateway)
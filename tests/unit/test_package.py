@@ -439,9 +439,21 @@ class TestTerraformTemplate(TemplateTestBase):
         assert template['resource']['aws_lambda_layer_version']['layer'] == {
             'layer_name': 'bar',
             'compatible_runtimes': ['python2.7'],
+            'compatible_architectures': ['x86_64'],
             'filename': 'layer.zip',
         }
 
+    def test_adds_architecture(self):
+        function = self.lambda_function()
+        function.architecture = 'arm64'
+        function.managed_layer = self.managed_layer()
+        function.managed_layer.architecture = 'arm64'
+        template = self.template_gen.generate(
+            [function.managed_layer, function])
+        assert self.get_function(template)['architectures'] == ['arm64']
+        layer = template['resource']['aws_lambda_layer_version']['layer']
+        assert layer['compatible_architectures'] == ['arm64']
+
     def test_adds_reserved_concurrency_when_provided(self, sample_app):
         function = self.lambda_function()
         function.reserved_concurrency = 5
@@ -1126,6 +1138,7 @@ class TestSAMTemplate(TemplateTestBase):
             'Type': 'AWS::Serverless::LayerVersion',
             'Properties': {
                 'CompatibleRuntimes': [config.lambda_python_version],
+                'CompatibleArchitectures': ['x86_64'],
                 'LayerName': 'testapp-dev-managed-layer',
                 'ContentUri': models.Placeholder.BUILD_STAGE,
             }
@@ -1156,6 +1169,7 @@ class TestSAMTemplate(TemplateTestBase):
             'Type': 'AWS::Serverless::LayerVersion',
             'Properties': {
                 'CompatibleRuntimes': [config.lambda_python_version],
+                'CompatibleArchitectures': ['x86_64'],
                 'LayerName': 'testapp-dev-managed-layer',
                 'ContentUri': models.Placeholder.BUILD_STAGE,
             }
@@ -1176,6 +1190,18 @@ class TestSAMTemplate(TemplateTestBase):
         template = self.template_gen.generate(resources)
         assert template['Resources']['Foo']['Properties']['Role'] == 'role:arn'
 
+    def test_adds_architecture(self):
+        function = self.lambda_function()
+        function.architecture = 'arm64'
+        function.managed_layer = self.managed_layer()
+        function.managed_layer.architecture = 'arm64'
+        template = self.template_gen.generate(
+            [function.managed_layer, function])
+        resources = template['Resources']
+        assert resources['Foo']['Properties']['Architectures'] == ['arm64']
+        assert resources['Layer']['Properties'][
+            'CompatibleArchitectures'] == ['arm64']
+
     def test_sam_injects_policy(self, sample_app):
         function = models.LambdaFunction(
             resource_name='foo',
@@ -1207,6 +1233,7 @@ class TestSAMTemplate(TemplateTestBase):
                 'CodeUri': 'foo.zip',
                 'Handler': 'app.app',
                 'MemorySize': 128,
+                'Architectures': ['x86_64'],
                 'Tracing': 'PassThrough',
                 'Role': {'Fn::GetAtt': ['Role', 'Arn']},
                 'Runtime': 'python27',
@@ -1304,6 +1331,7 @@ class TestSAMTemplate(TemplateTestBase):
                 'CodeUri': 'foo.zip',
                 'Handler': 'app.app',
                 'MemorySize': 128,
+                'Architectures': ['x86_64'],
                 'Role': 'role:arn',
                 'Tracing': 'PassThrough',
                 'Runtime': 'python27',